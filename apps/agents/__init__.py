@@ -12,8 +12,11 @@ Architecture:
     5. AvailabilityAgent - Checks real-time availability
     6. NegotiationAgent - Suggests alternatives on conflicts
 
-Pipeline:
-    Prompt → Parsing → Temporal → Geo → Validation → Availability → Negotiation → Result
+Pipeline (stage dependency graph, see pipeline.py):
+    Prompt → Parsing → { Temporal | Contact → Geo | Service } → Validation → Availability → Negotiation → Result
+
+Structured requests (contact id, date and time already known):
+    Fields → Contact → Location → Validation → Availability → Negotiation → Result
 """
 
 from .base import BaseAgent, AgentResult
@@ -24,6 +27,8 @@ from .validation_agent import ValidationAgent
 from .availability_agent import AvailabilityAgent
 from .negotiation_agent import NegotiationAgent
 from .orchestrator import AgentOrchestrator, DecisionTrace
+from .pipeline import Stage, StageGraph, StopPipeline
+from .prefetch import PrefetchContext
 
 __all__ = [
     "BaseAgent",
@@ -36,4 +41,8 @@ __all__ = [
     "NegotiationAgent",
     "AgentOrchestrator",
     "DecisionTrace",
+    "Stage",
+    "StageGraph",
+    "StopPipeline",
+    "PrefetchContext",
 ]
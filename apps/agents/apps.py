@@ -0,0 +1,20 @@
+"""
+Agents app configuration.
+Builds the shared agent pipeline once per worker process.
+"""
+
+from django.apps import AppConfig
+
+
+class AgentsConfig(AppConfig):
+    """Configuration for agents app."""
+
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.agents'
+    verbose_name = 'Agents'
+
+    def ready(self):
+        """Build the process-wide orchestrator at worker boot, not on the first request."""
+        from .orchestrator import AgentOrchestrator
+
+        AgentOrchestrator.instance()
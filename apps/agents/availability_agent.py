@@ -12,7 +12,10 @@ from typing import Any, Dict, Optional, List
 from datetime import datetime
 import time
 
+from data.timeutils import TimeWindow
+
 from .base import BaseAgent, AgentResult
+from .prefetch import PrefetchContext
 
 
 class AvailabilityAgent(BaseAgent):
@@ -34,6 +37,8 @@ class AvailabilityAgent(BaseAgent):
                 "hora_fin": str (HH:MM),
                 "ubicacion_id": str (optional),
                 "servicio_id": str (optional),
+                "window": TimeWindow (optional, already converted fecha/hora_inicio/hora_fin),
+                "prefetch": PrefetchContext (optional, contact/service already loaded),
                 "stores": dict (AppointmentStore, ContactStore, ServiceStore)
             }
 
@@ -51,9 +56,14 @@ class AvailabilityAgent(BaseAgent):
             servicio_id = input_data.get("servicio_id")
             stores = input_data.get("stores", {})
 
-            if not all([contacto_id, fecha, hora_inicio, hora_fin]):
+            if not contacto_id or not (input_data.get("window") or all([fecha, hora_inicio, hora_fin])):
                 return self._error("Missing required fields for availability check")
 
+            # Converted once; the checks below work on integer minutes
+            window = input_data.get("window") or TimeWindow.parse(fecha, hora_inicio, hora_fin)
+            if window is None:
+                return self._error(f"Invalid date/time for availability check: {fecha} {hora_inicio}-{hora_fin}")
+
             contact_store = stores.get("contact_store")
             apt_store = stores.get("appointment_store")
             service_store = stores.get("service_store")
@@ -62,16 +72,18 @@ class AvailabilityAgent(BaseAgent):
                 return self._error("Missing required stores")
 
             # Check if contact exists and is active
-            contact = contact_store.get_by_id(contacto_id)
+            prefetch = input_data.get("prefetch") or PrefetchContext()
+            contact = prefetch.contact_for(contact_store, contacto_id)
             if not contact:
                 return self._error(f"Contact not found: {contacto_id}")
 
             if not contact.get("activo", True):
                 return self._error(f"Contact is inactive: {contacto_id}")
 
-            # Check contact availability for date/time/location
+            # Check contact availability for date/time/location: schedule, then
+            # appointment conflicts (one interval index lookup in the store)
             is_available, razon = contact_store.check_availability(
-                contacto_id, fecha, hora_inicio, hora_fin, ubicacion_id
+                contacto_id, window.day, window.start, window.end, ubicacion_id, contact=contact
             )
 
             if not is_available:
@@ -82,35 +94,11 @@ class AvailabilityAgent(BaseAgent):
                     duration_ms=duration_ms,
                 )
 
-            # Check for appointment conflicts
-            appointment_data = {
-                "contacto_id": contacto_id,
-                "fecha": fecha,
-                "hora_inicio": hora_inicio,
-                "hora_fin": hora_fin,
-                "ubicacion_id": ubicacion_id or "",
-            }
-
-            conflicts = apt_store.check_conflicts(appointment_data)
-
-            if conflicts:
-                duration_ms = int((time.time() - start_time) * 1000)
-                conflict_descriptions = [
-                    f"{c.get('type')}: {c.get('message', 'Conflict detected')}"
-                    for c in conflicts
-                ]
-
-                return self._error(
-                    "Appointment conflicts detected",
-                    errors=conflict_descriptions,
-                    duration_ms=duration_ms,
-                )
-
             # Check service duration constraints
             if servicio_id and service_store:
-                service = service_store.get_by_id(servicio_id)
+                service = prefetch.service_for(service_store, servicio_id)
                 if service:
-                    duration = self._calculate_duration(hora_inicio, hora_fin)
+                    duration = self._calculate_duration(window.start, window.end)
                     duration_config = service.get("duracion", {})
 
                     min_duration = duration_config.get("minima", 0)
@@ -148,28 +136,19 @@ class AvailabilityAgent(BaseAgent):
             self._log_debug(f"AvailabilityAgent error: {str(e)}")
             return self._error(f"Availability check error: {str(e)}", duration_ms=duration_ms)
 
-    def _calculate_duration(self, hora_inicio: str, hora_fin: str) -> int:
+    def _calculate_duration(self, start_minutes: int, end_minutes: int) -> int:
         """
         Calculate duration in minutes between two times.
 
         Args:
-            hora_inicio: Start time (HH:MM)
-            hora_fin: End time (HH:MM)
+            start_minutes: Start time (minutes since midnight)
+            end_minutes: End time (minutes since midnight)
 
         Returns:
             Duration in minutes
         """
-        try:
-            start_parts = hora_inicio.split(":")
-            end_parts = hora_fin.split(":")
-
-            start_minutes = int(start_parts[0]) * 60 + int(start_parts[1])
-            end_minutes = int(end_parts[0]) * 60 + int(end_parts[1])
-
-            duration = end_minutes - start_minutes
-            if duration < 0:
-                duration += 24 * 60  # Handle day boundary
+        duration = end_minutes - start_minutes
+        if duration < 0:
+            duration += 24 * 60  # Handle day boundary
 
-            return duration
-        except (ValueError, IndexError):
-            return 0
+        return duration
@@ -55,7 +55,9 @@ class BaseAgent(ABC):
         """Setup logging for agent."""
         import logging
         logger = logging.getLogger(f"agents.{self.agent_name}")
-        logger.setLevel(logging.DEBUG)
+        # setLevel() resets the level cache of every logger in the process
+        if logger.level != logging.DEBUG:
+            logger.setLevel(logging.DEBUG)
         return logger
 
     @abstractmethod
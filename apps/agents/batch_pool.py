@@ -0,0 +1,90 @@
+"""
+Process pool for the pure-compute agents of a batch.
+
+Parsing, temporal reasoning and geo reasoning need no store: their output
+depends only on their input (the prompt, the parsed date and time, the
+location reference and the contact's locations). For a large batch,
+``AgentOrchestrator(batch_processes=N)`` runs them in N worker processes,
+out of reach of the parent's GIL, before booking (see
+``AgentOrchestrator.process_batch``):
+
+1. the workers parse every prompt;
+2. the parent resolves the parsed contact names and loads the contacts
+   with one query;
+3. the workers run temporal and geo reasoning with that prefetched data;
+4. the parent runs every request's stage graph in order, as without the
+   pool. The parsing, temporal and geo stages take the worker's result
+   when their agent input is the one the worker got, and contact
+   resolution, validation, availability and negotiation, which read the
+   stores and the bookings made earlier in the batch, run there.
+
+Jobs are sent in chunks, several per process, so each message carries
+many prompts. Workers are started with "spawn": the parent is a threaded
+web worker, and a forked child could inherit a lock held by another
+thread.
+"""
+
+import math
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from .base import AgentResult
+
+# Chunks per process: enough to even out uneven chunks, few enough messages
+CHUNKS_PER_PROCESS = 4
+
+# Agents of a worker process, built on its first job
+_agents: Optional[Dict[str, Any]] = None
+
+
+def run_agents(jobs: Sequence[Tuple[str, Dict[str, Any]]]) -> List[AgentResult]:
+    """Worker: run each (stage, agent input) job with this process's agents."""
+    global _agents
+    if _agents is None:
+        from .geo_agent import GeoReasoningAgent
+        from .parsing_agent import ParsingAgent
+        from .temporal_agent import TemporalReasoningAgent
+
+        _agents = {
+            "parsing": ParsingAgent(),
+            "temporal_reasoning": TemporalReasoningAgent(),
+            "geo_reasoning": GeoReasoningAgent(),
+        }
+    return [_agents[stage].run(agent_input) for stage, agent_input in jobs]
+
+
+class BatchPool:
+    """Worker processes, started on first use and shared by every batch of the orchestrator."""
+
+    def __init__(self, processes: int):
+        self.processes = processes
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def map(self, fn: Callable[[Sequence[Any]], List[Any]], items: Sequence[Any]) -> List[Any]:
+        """``fn`` over ``items`` in chunks spread across the workers; results in order."""
+        if not items:
+            return []
+        size = math.ceil(len(items) / (self.processes * CHUNKS_PER_PROCESS))
+        chunks = [items[i:i + size] for i in range(0, len(items), size)]
+        return [result for chunk in self._pool().map(fn, chunks) for result in chunk]
+
+    def shutdown(self):
+        """Stop the workers; the next map() starts new ones."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown()
+
+    def _pool(self) -> ProcessPoolExecutor:
+        executor = self._executor
+        if executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.processes, mp_context=multiprocessing.get_context("spawn")
+                    )
+                executor = self._executor
+        return executor
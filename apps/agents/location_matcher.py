@@ -0,0 +1,171 @@
+"""
+Precomputed location matching for GeoReasoningAgent.
+
+A ``LocationMatcher`` is built once per contact from its ``ubicaciones``:
+the lowercased and normalized names go into dicts for exact lookups, and
+every name gets a character-count signature. For fuzzy matching the
+similarity is ``difflib.SequenceMatcher.ratio()`` as before, but each
+name's signature gives an upper bound on that ratio (the characters two
+strings share bound their insert/delete edit distance from below, which
+is what ``SequenceMatcher.quick_ratio()`` computes). Names are scored best
+bound first and the search stops as soon as no remaining bound can beat
+the current best, so most names are never compared character by
+character. The result is the same best match the full scan found, ties
+going to the earlier location.
+
+Matchers are cached per contact in ``location_matchers`` and rebuilt when
+the contact's locations (ids and names) change.
+"""
+
+import heapq
+import threading
+from collections import Counter
+from difflib import SequenceMatcher
+from typing import Any, Dict, List, Optional, Tuple
+
+LOCATION_PREFIXES = ("clínica ", "clinica ", "consultorio ", "oficina ", "hospital ", "centro ")
+
+
+def normalize_location_name(name: str) -> str:
+    """Lowercase, drop a common prefix ("clínica ", "consultorio ", ...) and plain vowel accents."""
+    name = name.lower().strip()
+    for prefix in LOCATION_PREFIXES:
+        if name.startswith(prefix):
+            name = name[len(prefix):].strip()
+    return name.replace("á", "a").replace("é", "e").replace("í", "i").replace("ó", "o").replace("ú", "u")
+
+
+class LocationMatcher:
+    """Exact, normalized and fuzzy lookups over one contact's locations."""
+
+    def __init__(self, locations: List[Dict[str, Any]]):
+        self.signature = self.signature_of(locations)
+        self._locations = [(loc.get("id"), loc.get("nombre")) for loc in locations]
+        self._lowered = [(loc.get("nombre") or "").lower().strip() for loc in locations]
+        self._lengths = [len(name) for name in self._lowered]
+        # Character-count signatures stored by column: _columns[ch][k - 1][i]
+        # is min(k, occurrences of ch in name i), so the characters a query
+        # shares with every name are a sum of columns
+        counts = [Counter(name) for name in self._lowered]
+        self._columns: Dict[str, List[bytes]] = {}
+        for ch in set().union(*counts):
+            column = [c.get(ch, 0) for c in counts]
+            self._columns[ch] = [bytes(min(k, n, 255) for n in column) for k in range(1, min(max(column), 255) + 1)]
+        # First location holding each exact / normalized name
+        self._exact: Dict[str, int] = {}
+        self._normalized: Dict[str, int] = {}
+        for index, loc in enumerate(locations):
+            self._exact.setdefault(self._lowered[index], index)
+            self._normalized.setdefault(normalize_location_name(loc.get("nombre") or ""), index)
+
+    @staticmethod
+    def signature_of(locations: List[Dict[str, Any]]) -> Tuple[Tuple[Any, Any], ...]:
+        """What a matcher depends on: the ids and names of the locations, in order."""
+        return tuple((loc.get("id"), loc.get("nombre")) for loc in locations)
+
+    def exact(self, ubicacion_raw: str) -> Optional[Dict[str, Any]]:
+        """
+        Location whose name equals the reference, as is or normalized.
+
+        As in a scan over the locations, the first location matching either
+        way wins, and an exact match beats a normalized one on the same
+        location.
+        """
+        exact = self._exact.get(ubicacion_raw.lower().strip())
+        normalized = self._normalized.get(normalize_location_name(ubicacion_raw))
+        if exact is not None and (normalized is None or exact <= normalized):
+            return self._match(exact, "exact", 1.0)
+        if normalized is not None:
+            return self._match(normalized, "normalized", 0.95)
+        return None
+
+    def fuzzy(self, ubicacion_raw: str) -> Optional[Dict[str, Any]]:
+        """Location with the highest SequenceMatcher ratio (None if no name shares a character)."""
+        best = self.closest(ubicacion_raw, 1)
+        if not best:
+            return None
+        index, similarity = best[0]
+        return self._match(index, "fuzzy_match", similarity)
+
+    def suggestions(self, ubicacion_raw: str, limit: int = 3) -> List[Dict[str, Any]]:
+        """The ``limit`` most similar locations, best first."""
+        return [
+            {"id": self._locations[index][0], "nombre": self._locations[index][1], "confidence": similarity}
+            for index, similarity in self.closest(ubicacion_raw, limit)
+        ]
+
+    def closest(self, ubicacion_raw: str, limit: int) -> List[Tuple[int, float]]:
+        """
+        (location index, ratio) of the ``limit`` most similar names with a ratio above 0.
+
+        Names are compared in decreasing order of their ratio bound; once
+        ``limit`` names are kept, a name whose bound is below the worst kept
+        ratio cannot enter and, as bounds only decrease, neither can any
+        later one.
+        """
+        query = ubicacion_raw.lower().strip()
+        columns = [
+            self._columns[ch][min(n, len(self._columns[ch])) - 1]
+            for ch, n in Counter(query).items() if ch in self._columns
+        ]
+        if not columns:
+            return []
+        shared = list(map(sum, zip(*columns)))
+        bounds = [2.0 * common / (len(query) + length) for common, length in zip(shared, self._lengths)]
+        # Stable: equal bounds keep location order
+        order = sorted((index for index, common in enumerate(shared) if common), key=bounds.__getitem__, reverse=True)
+
+        # Min-heap of the kept (ratio, -index): its root is the one to drop
+        kept: List[Tuple[float, int]] = []
+        for index in order:
+            if len(kept) == limit and bounds[index] < kept[0][0]:
+                break
+            similarity = SequenceMatcher(None, query, self._lowered[index]).ratio()
+            if not similarity:
+                continue
+            if len(kept) < limit:
+                heapq.heappush(kept, (similarity, -index))
+            elif (similarity, -index) > kept[0]:
+                heapq.heapreplace(kept, (similarity, -index))
+        return [(-negative_index, similarity) for similarity, negative_index in sorted(kept, reverse=True)]
+
+    def _match(self, index: int, matched_by: str, confidence: float) -> Dict[str, Any]:
+        location_id, nombre = self._locations[index]
+        return {
+            "location_id": location_id,
+            "location_name": nombre,
+            "matched_by": matched_by,
+            "confidence": confidence,
+        }
+
+
+class LocationMatcherCache:
+    """Per-process location matchers, keyed by contact id and checked against the locations."""
+
+    def __init__(self):
+        self._entries: Dict[str, LocationMatcher] = {}
+        self._lock = threading.Lock()
+
+    def get(self, contacto_id: Optional[str], locations: List[Dict[str, Any]]) -> LocationMatcher:
+        """Matcher for a contact's locations, building it on a miss or when they changed."""
+        if contacto_id is None:
+            return LocationMatcher(locations)
+        matcher = self._entries.get(contacto_id)
+        if matcher is not None and matcher.signature == LocationMatcher.signature_of(locations):
+            return matcher
+        matcher = LocationMatcher(locations)
+        with self._lock:
+            self._entries[contacto_id] = matcher
+        return matcher
+
+    def invalidate(self, contacto_id: Optional[str] = None):
+        """Drop one contact's matcher, or all of them."""
+        with self._lock:
+            if contacto_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(contacto_id, None)
+
+
+# Shared by every GeoReasoningAgent in this process
+location_matchers = LocationMatcherCache()
@@ -8,10 +8,13 @@ Responsible for:
 """
 
 from typing import Any, Dict, List, Optional
-from datetime import datetime, timedelta
+from datetime import date
 import time
 
+from data.timeutils import TimeWindow, format_minutes, to_date_str, to_minutes, to_ordinal
+
 from .base import BaseAgent, AgentResult
+from .prefetch import PrefetchContext
 
 
 class NegotiationAgent(BaseAgent):
@@ -36,8 +39,10 @@ class NegotiationAgent(BaseAgent):
                 "contacto_id": str,
                 "fecha": str (YYYY-MM-DD),
                 "hora_inicio": str (HH:MM),
+                "window": TimeWindow (optional, requested window already converted),
                 "ubicacion_id": str (optional),
                 "user_preferences": dict (optional, flexible_date, flexible_time),
+                "prefetch": PrefetchContext (optional, contact already loaded),
                 "stores": dict (AppointmentStore, ContactStore)
             }
 
@@ -54,21 +59,34 @@ class NegotiationAgent(BaseAgent):
             user_preferences = input_data.get("user_preferences", {})
             stores = input_data.get("stores", {})
 
-            if not all([contacto_id, fecha, hora_inicio, stores]):
+            window = input_data.get("window")
+            if not all([contacto_id, stores]) or not (window or all([fecha, hora_inicio])):
                 return self._error("Missing required fields for negotiation")
 
+            # Converted once; candidates are generated and checked in minutes
+            if window is None:
+                try:
+                    start = to_minutes(hora_inicio)
+                    window = TimeWindow(to_ordinal(fecha), start, start + 60)
+                except ValueError:
+                    return self._error(f"Invalid date/time for negotiation: {fecha} {hora_inicio}")
+
             contact_store = stores.get("contact_store")
             apt_store = stores.get("appointment_store")
 
             if not contact_store or not apt_store:
                 return self._error("Missing required stores")
 
+            # Loaded once for every candidate's availability check
+            prefetch = input_data.get("prefetch") or PrefetchContext()
+            contact = prefetch.contact_for(contact_store, contacto_id)
+
             # Generate suggestions
             suggestions = []
 
             # Try same-day alternatives (different times)
             same_day_suggestions = self._generate_same_day_suggestions(
-                contacto_id, fecha, hora_inicio, ubicacion_id, stores
+                contacto_id, window, ubicacion_id, stores, contact
             )
             suggestions.extend(same_day_suggestions)
 
@@ -76,7 +94,7 @@ class NegotiationAgent(BaseAgent):
             flexible_date = user_preferences.get("flexible_date", True)
             if flexible_date and not same_day_suggestions:
                 next_days_suggestions = self._generate_next_days_suggestions(
-                    contacto_id, fecha, hora_inicio, ubicacion_id, stores
+                    contacto_id, window, ubicacion_id, stores, contact
                 )
                 suggestions.extend(next_days_suggestions)
 
@@ -118,20 +136,20 @@ class NegotiationAgent(BaseAgent):
     def _generate_same_day_suggestions(
         self,
         contacto_id: str,
-        fecha: str,
-        hora_inicio: str,
+        window: TimeWindow,
         ubicacion_id: Optional[str],
         stores: Dict[str, Any],
+        contact: Optional[Dict[str, Any]] = None,
     ) -> List[Dict[str, Any]]:
         """
         Generate alternative time slots for the same day.
 
         Args:
             contacto_id: Contact ID
-            fecha: Date (YYYY-MM-DD)
-            hora_inicio: Original start time (HH:MM)
+            window: Requested window (date ordinal, minutes)
             ubicacion_id: Location ID
             stores: Data stores
+            contact: Contact dict, if already loaded
 
         Returns:
             List of alternative time slot suggestions
@@ -143,51 +161,46 @@ class NegotiationAgent(BaseAgent):
         if not apt_store or not contact_store:
             return suggestions
 
-        # Generate time slots for this day (30-min intervals)
-        slots = []
-        for hour in range(self.business_start, self.business_end):
-            for minute in [0, 30]:
-                time_str = f"{hour:02d}:{minute:02d}"
-                slots.append(time_str)
-
-        # Try each slot
-        for slot_time in slots:
-            # Skip the original time
-            if slot_time == hora_inicio:
-                continue
-
-            # Calculate end time (assuming 1 hour)
-            end_hour = (int(slot_time.split(":")[0]) + 1) % 24
-            end_minute = int(slot_time.split(":")[1])
-            slot_end = f"{end_hour:02d}:{end_minute:02d}"
-
-            # Check if this slot is available
-            appointment_data = {
+        # Time slots for this day (30-min intervals) in minutes, skipping the original time
+        fecha = to_date_str(window.day)
+        duration = window.duration or 60
+        starts = [
+            start
+            for start in range(self.business_start * 60, self.business_end * 60, self.slot_duration)
+            if start != window.start
+        ]
+        candidates = [
+            {
                 "contacto_id": contacto_id,
                 "fecha": fecha,
-                "hora_inicio": slot_time,
-                "hora_fin": slot_end,
+                "hora_inicio": start,
+                "hora_fin": start + duration,
                 "ubicacion_id": ubicacion_id or "",
             }
+            for start in starts
+        ]
+
+        # Check every slot against a single read of the store
+        conflicts_per_slot = apt_store.check_conflicts_many(candidates)
 
-            conflicts = apt_store.check_conflicts(appointment_data)
+        for start, conflicts in zip(starts, conflicts_per_slot):
+            if conflicts:
+                continue
             is_available, razon = contact_store.check_availability(
-                contacto_id, fecha, slot_time, slot_end, ubicacion_id
+                contacto_id, fecha, start, start + duration, ubicacion_id, contact=contact
             )
 
-            if not conflicts and is_available:
+            if is_available:
                 # Calculate how close this is to the original time
-                original_hour = int(hora_inicio.split(":")[0])
-                slot_hour = int(slot_time.split(":")[0])
-                hour_diff = abs(slot_hour - original_hour)
+                hour_diff = abs(start // 60 - window.start // 60)
 
                 # Higher confidence for closer times
                 confidence = max(0.9 - (hour_diff * 0.05), 0.5)
 
                 suggestions.append({
                     "fecha": fecha,
-                    "hora_inicio": slot_time,
-                    "hora_fin": slot_end,
+                    "hora_inicio": format_minutes(start),
+                    "hora_fin": format_minutes(start + duration),
                     "confidence": confidence,
                     "reason": f"Available slot {hour_diff} hours from requested time",
                 })
@@ -197,20 +210,20 @@ class NegotiationAgent(BaseAgent):
     def _generate_next_days_suggestions(
         self,
         contacto_id: str,
-        fecha: str,
-        hora_inicio: str,
+        window: TimeWindow,
         ubicacion_id: Optional[str],
         stores: Dict[str, Any],
+        contact: Optional[Dict[str, Any]] = None,
     ) -> List[Dict[str, Any]]:
         """
         Generate suggestions for next 3 days at preferred time.
 
         Args:
             contacto_id: Contact ID
-            fecha: Original date (YYYY-MM-DD)
-            hora_inicio: Preferred time (HH:MM)
+            window: Requested window (date ordinal, minutes)
             ubicacion_id: Location ID
             stores: Data stores
+            contact: Contact dict, if already loaded
 
         Returns:
             List of alternative time slot suggestions
@@ -222,47 +235,42 @@ class NegotiationAgent(BaseAgent):
         if not apt_store or not contact_store:
             return suggestions
 
-        # Try next 3 days
-        try:
-            fecha_dt = datetime.strptime(fecha, "%Y-%m-%d")
-        except ValueError:
-            return suggestions
+        end = window.start + (window.duration or 60)
 
+        candidates = []
         for days_ahead in [1, 2, 3]:
-            future_date = fecha_dt + timedelta(days=days_ahead)
-            future_fecha_str = future_date.strftime("%Y-%m-%d")
+            day = window.day + days_ahead
 
             # Skip weekends (Saturday = 5, Sunday = 6)
-            if future_date.weekday() >= 5:
+            if date.fromordinal(day).weekday() >= 5:
                 continue
 
-            # Calculate end time
-            hour_start = int(hora_inicio.split(":")[0])
-            minute_start = int(hora_inicio.split(":")[1])
-            end_hour = (hour_start + 1) % 24
-            hora_fin = f"{end_hour:02d}:{minute_start:02d}"
-
-            # Check availability
-            appointment_data = {
+            candidates.append((days_ahead, {
                 "contacto_id": contacto_id,
-                "fecha": future_fecha_str,
-                "hora_inicio": hora_inicio,
-                "hora_fin": hora_fin,
+                "fecha": to_date_str(day),
+                "hora_inicio": window.start,
+                "hora_fin": end,
                 "ubicacion_id": ubicacion_id or "",
-            }
+            }))
+
+        # Check availability of every day against a single read of the store
+        conflicts_per_day = apt_store.check_conflicts_many([apt for _, apt in candidates])
 
-            conflicts = apt_store.check_conflicts(appointment_data)
+        for (days_ahead, appointment_data), conflicts in zip(candidates, conflicts_per_day):
+            if conflicts:
+                continue
+            future_fecha_str = appointment_data["fecha"]
             is_available, razon = contact_store.check_availability(
-                contacto_id, future_fecha_str, hora_inicio, hora_fin, ubicacion_id
+                contacto_id, future_fecha_str, window.start, end, ubicacion_id, contact=contact
             )
 
-            if not conflicts and is_available:
+            if is_available:
                 confidence = max(0.85 - (days_ahead * 0.1), 0.5)
 
                 suggestions.append({
                     "fecha": future_fecha_str,
-                    "hora_inicio": hora_inicio,
-                    "hora_fin": hora_fin,
+                    "hora_inicio": format_minutes(window.start),
+                    "hora_fin": format_minutes(end),
                     "confidence": confidence,
                     "reason": f"Available in {days_ahead} day(s) at same time",
                 })
@@ -2,7 +2,14 @@
 AgentOrchestrator - Orchestrates the pipeline of AI agents.
 
 Responsible for:
-- Coordinating execution of 6 agents in sequence
+- Coordinating execution of 6 agents as a stage dependency graph
+  (independent stages run concurrently, see pipeline.py)
+- A structured-input fast path (contact id, date, time) that skips
+  parsing and temporal reasoning
+- Batches of requests booked in order against each other, optionally
+  with the pure-compute agents in worker processes (see batch_pool.py)
+- Caching parsing and temporal results of repeated prompts for the day
+  (see prompt_cache.py)
 - Handling errors and fallbacks
 - Recording DecisionTrace for observability
 - Managing overall appointment creation workflow
@@ -13,15 +20,57 @@ from typing import Any, Dict, Optional, List
 from datetime import datetime
 import uuid
 import json
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+
+from data.names import ContactNameIndex
+from data.timeutils import TimeWindow, format_minutes, to_minutes
 
 from .base import AgentResult
+from .batch_pool import BatchPool, run_agents
 from .parsing_agent import ParsingAgent
 from .temporal_agent import TemporalReasoningAgent
 from .geo_agent import GeoReasoningAgent
 from .validation_agent import ValidationAgent
 from .availability_agent import AvailabilityAgent
 from .negotiation_agent import NegotiationAgent
+from .pipeline import Stage, StageGraph, StopPipeline
+from .prefetch import PrefetchContext
+from .prompt_cache import CACHED_STAGES, PromptCache, normalize_prompt
+
+
+def _close_old_connections():
+    """Drop this thread's database connections that are broken or past CONN_MAX_AGE."""
+    from django.core.exceptions import ImproperlyConfigured
+    from django.db import close_old_connections
+
+    try:
+        close_old_connections()
+    except ImproperlyConfigured:
+        # Django not set up (e.g. benchmarks with in-memory stores): no connections
+        pass
+
+
+def _with_fresh_connections(fn, *args, **kwargs):
+    _close_old_connections()
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        _close_old_connections()
+
+
+class StageExecutor(ThreadPoolExecutor):
+    """
+    Thread pool for pipeline stages that manages its threads' database connections.
+
+    Django only recycles the request thread's connection (request_started /
+    request_finished); stages that query the ORM on a pool thread would
+    otherwise keep that thread's connection open forever, never health-checked.
+    """
+
+    def submit(self, fn, /, *args, **kwargs):
+        return super().submit(_with_fresh_connections, fn, *args, **kwargs)
 
 
 @dataclass
@@ -33,7 +82,13 @@ class DecisionTrace:
     input_prompt: str
     user_timezone: str
     user_id: str
+    # "prompt" or "structured"; structured requests keep their fields here
+    input_mode: str = "prompt"
+    input_fields: Dict[str, Any] = field(default_factory=dict)
     agents: List[Dict[str, Any]] = field(default_factory=list)
+    # Wall time of every stage and the chain of stages that bounded the total
+    stages: List[Dict[str, Any]] = field(default_factory=list)
+    critical_path: List[str] = field(default_factory=list)
     final_status: str = "pending"  # pending, success, error, conflict
     final_output: Dict[str, Any] = field(default_factory=dict)
     total_duration_ms: int = 0
@@ -44,10 +99,103 @@ class DecisionTrace:
 
 
 class AgentOrchestrator:
-    """Orchestrates AI agent pipeline."""
+    """
+    Orchestrates AI agent pipeline.
+
+    The pipeline is declared in ``STAGES`` as a dependency graph: temporal
+    reasoning, contact resolution and service lookup only need the parsing
+    output and run concurrently, so a request takes as long as its longest
+    branch rather than the sum of every stage.
+
+    The contact and the service are loaded once, by contact resolution and
+    service lookup, and reach the validation, availability and negotiation
+    agents in a ``PrefetchContext`` (see prefetch.py): a booking costs the
+    same couple of queries whether it books or negotiates.
+
+    Agents only hold read-only configuration set in ``__init__``; every
+    per-request value lives in locals, the stage context and the returned
+    result. One instance can therefore serve concurrent requests, and
+    ``AgentOrchestrator.instance()`` hands out the process-wide one built
+    when the agents app is ready (see apps/agents/apps.py).
+    """
+
+    # (stage, method, dependencies) in the order a sequential run takes them;
+    # when several stages stop the pipeline, the earliest one here is reported
+    STAGES = (
+        ("parsing", "_run_parsing", ()),
+        ("temporal_reasoning", "_run_temporal", ("parsing",)),
+        ("contact_resolution", "_resolve_contact", ("parsing",)),
+        ("service_lookup", "_resolve_service", ("parsing",)),
+        ("geo_reasoning", "_run_geo", ("contact_resolution",)),
+        ("validation", "_run_validation", ("temporal_reasoning", "geo_reasoning", "service_lookup")),
+        ("availability", "_run_availability", ("validation",)),
+        ("negotiation", "_run_negotiation", ("availability",)),
+    )
+
+    # Structured requests already carry the contact id, date and time: the
+    # outputs of parsing and temporal reasoning are seeded into the context,
+    # so only the store-backed stages run
+    STRUCTURED_STAGES = (
+        ("contact_resolution", "_load_contact", ()),
+        ("service_lookup", "_load_service", ()),
+        ("geo_reasoning", "_default_location", ("contact_resolution",)),
+        ("validation", "_run_validation", ("geo_reasoning", "service_lookup")),
+        ("availability", "_run_availability", ("validation",)),
+        ("negotiation", "_run_negotiation", ("availability",)),
+    )
+
+    # Smaller batches run in the caller: sending them to the pool costs more than it saves
+    BATCH_POOL_MIN_PROMPTS = 200
+
+    _instance: Optional['AgentOrchestrator'] = None
+    _instance_lock = threading.Lock()
+
+    @classmethod
+    def instance(cls) -> 'AgentOrchestrator':
+        """Get the process-wide orchestrator, building it on first use."""
+        orchestrator = cls._instance
+        if orchestrator is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls(
+                        max_workers=cls._configured('AGENT_PIPELINE_WORKERS', 4),
+                        batch_processes=cls._configured('AGENT_BATCH_PROCESSES', 0),
+                        prompt_cache_size=cls._configured('AGENT_PROMPT_CACHE_SIZE', 10000),
+                        prompt_cache_ttl=cls._configured('AGENT_PROMPT_CACHE_TTL', 3600),
+                    )
+                orchestrator = cls._instance
+        return orchestrator
+
+    @classmethod
+    def current(cls) -> Optional['AgentOrchestrator']:
+        """The process-wide orchestrator if it was already built, else None (never builds it)."""
+        return cls._instance
+
+    @staticmethod
+    def _configured(name: str, default: int) -> int:
+        from django.conf import settings
+        from django.core.exceptions import ImproperlyConfigured
+
+        try:
+            return getattr(settings, name, default)
+        except ImproperlyConfigured:
+            return default
+
+    def __init__(
+        self, max_workers: int = 4, batch_processes: int = 0, prompt_cache_size: int = 0, prompt_cache_ttl: float = 3600
+    ):
+        """
+        Initialize orchestrator with all agents.
 
-    def __init__(self):
-        """Initialize orchestrator with all agents."""
+        Args:
+            max_workers: Threads for concurrent stages (0 runs every stage in the caller)
+            batch_processes: Worker processes for the pure-compute agents of
+                large batches (0 runs every batch in the caller)
+            prompt_cache_size: Prompts whose parsing and temporal results are
+                cached (0 disables the cache)
+            prompt_cache_ttl: Seconds a cached result is kept at most (it
+                always expires at the user's local midnight)
+        """
         self.parsing_agent = ParsingAgent()
         self.temporal_agent = TemporalReasoningAgent()
         self.geo_agent = GeoReasoningAgent()
@@ -55,6 +203,17 @@ class AgentOrchestrator:
         self.availability_agent = AvailabilityAgent()
         self.negotiation_agent = NegotiationAgent()
 
+        self.graph = self._build_graph(self.STAGES)
+        self.structured_graph = self._build_graph(self.STRUCTURED_STAGES)
+        self.executor = (
+            StageExecutor(max_workers=max_workers, thread_name_prefix="agent-stage") if max_workers else None
+        )
+        self.batch_pool = BatchPool(batch_processes) if batch_processes else None
+        self.prompt_cache = PromptCache(prompt_cache_size, prompt_cache_ttl) if prompt_cache_size else None
+
+    def _build_graph(self, stages) -> StageGraph:
+        return StageGraph([Stage(name, getattr(self, method), deps) for name, method, deps in stages])
+
     def process_appointment_prompt(
         self,
         prompt: str,
@@ -79,8 +238,220 @@ class AgentOrchestrator:
             - suggestions: alternative slots if conflict
         """
         orchestrator_start = time.time()
+        trace, result, context = self._begin(prompt, user_timezone, user_id, stores)
+        return self._execute(self.graph, trace, result, context, orchestrator_start)
+
+    async def aprocess_appointment_prompt(
+        self,
+        prompt: str,
+        user_timezone: str = "America/Mexico_City",
+        user_id: str = "anonymous",
+        stores: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Async process_appointment_prompt() for ASGI views.
+
+        Stages run on the orchestrator's thread pool while the event loop
+        serves other requests; the result is the same as the sync variant.
+        """
+        orchestrator_start = time.time()
+        trace, result, context = self._begin(prompt, user_timezone, user_id, stores)
+        return await self._aexecute(self.graph, trace, result, context, orchestrator_start)
+
+    def process_structured_request(
+        self,
+        contacto_id: str,
+        fecha: str,
+        hora_inicio: str,
+        hora_fin: Optional[str] = None,
+        servicio_id: Optional[str] = None,
+        ubicacion_id: Optional[str] = None,
+        prompt: str = "",
+        user_timezone: str = "America/Mexico_City",
+        user_id: str = "anonymous",
+        stores: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Process an appointment whose fields are already known (e.g. from n8n).
+
+        Skips parsing and temporal reasoning and goes straight to contact
+        lookup, validation, availability and negotiation. The result has
+        the same shape as process_appointment_prompt(), including the
+        DecisionTrace.
+
+        Args:
+            contacto_id: Contact ID
+            fecha: Date (YYYY-MM-DD)
+            hora_inicio: Start time (HH:MM)
+            hora_fin: End time (HH:MM), default one hour after the start
+            servicio_id: Service ID (optional)
+            ubicacion_id: Location ID (optional, default the contact's primary location)
+            prompt: Original message, only recorded in the trace
+            user_timezone: User's timezone (IANA format)
+            user_id: User identifier
+            stores: Dict with appointment_store, contact_store, service_store
+
+        Returns:
+            Same dict as process_appointment_prompt()
+        """
+        orchestrator_start = time.time()
+        fields = {"contacto_id": contacto_id, "fecha": fecha, "hora_inicio": hora_inicio, "hora_fin": hora_fin,
+                  "servicio_id": servicio_id, "ubicacion_id": ubicacion_id}
+        trace, result, context = self._begin_structured(fields, prompt, user_timezone, user_id, stores)
+        return self._execute(self.structured_graph, trace, result, context, orchestrator_start)
+
+    async def aprocess_structured_request(
+        self,
+        contacto_id: str,
+        fecha: str,
+        hora_inicio: str,
+        hora_fin: Optional[str] = None,
+        servicio_id: Optional[str] = None,
+        ubicacion_id: Optional[str] = None,
+        prompt: str = "",
+        user_timezone: str = "America/Mexico_City",
+        user_id: str = "anonymous",
+        stores: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Async process_structured_request() for ASGI views."""
+        orchestrator_start = time.time()
+        fields = {"contacto_id": contacto_id, "fecha": fecha, "hora_inicio": hora_inicio, "hora_fin": hora_fin,
+                  "servicio_id": servicio_id, "ubicacion_id": ubicacion_id}
+        trace, result, context = self._begin_structured(fields, prompt, user_timezone, user_id, stores)
+        return await self._aexecute(self.structured_graph, trace, result, context, orchestrator_start)
 
-        # Create trace
+    def process_batch(self, requests: List[Dict[str, Any]], stores: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Process several requests in order, booking each success before the next one.
+
+        Every request holds the keyword arguments of process_appointment_prompt()
+        or, when it has a ``contacto_id``, of process_structured_request().
+        Successful appointments are created in ``stores["appointment_store"]``
+        as they come, so later requests are checked against them; with a
+        PendingAppointmentStore they are written all at once by its flush().
+
+        With a batch pool and at least BATCH_POOL_MIN_PROMPTS prompts, their
+        parsing, temporal and geo agents run first in the worker processes
+        (see batch_pool.py); the results are the same.
+
+        Args:
+            requests: Keyword arguments of each request, without ``stores``
+            stores: Dict with appointment_store, contact_store, service_store
+
+        Returns:
+            One result per request, as process_appointment_prompt() returns
+            it, with the created record under "appointment" on success
+        """
+        precomputed = {}
+        prompts = sum(not request.get("contacto_id") for request in requests)
+        if self.batch_pool and prompts >= self.BATCH_POOL_MIN_PROMPTS:
+            precomputed = self._precompute_batch(requests, stores)
+
+        results = []
+        for index, request in enumerate(requests):
+            if request.get("contacto_id"):
+                result = self.process_structured_request(**request, stores=stores)
+            elif index in precomputed:
+                result = self._process_precomputed(precomputed[index], stores=stores, **request)
+            else:
+                result = self.process_appointment_prompt(**request, stores=stores)
+            if result["status"] == "success" and result["data"]:
+                result["appointment"] = stores["appointment_store"].create(result["data"])
+            results.append(result)
+        return results
+
+    def _precompute_batch(self, requests: List[Dict[str, Any]], stores: Dict[str, Any]) -> Dict[int, Dict[str, Any]]:
+        """
+        Run the parsing, temporal and geo agents of a batch's prompts in the batch pool.
+
+        Returns:
+            {request index: {stage: (agent input, AgentResult)}} for the
+            prompt requests, as _run_agent() looks them up
+        """
+        inputs = {
+            index: self._parsing_input(request["prompt"], request.get("user_timezone", "America/Mexico_City"))
+            for index, request in enumerate(requests) if not request.get("contacto_id")
+        }
+        parsed = dict(zip(inputs, self.batch_pool.map(run_agents, [("parsing", i) for i in inputs.values()])))
+        precomputed = {index: {"parsing": (inputs[index], parsing_result)} for index, parsing_result in parsed.items()}
+
+        # Contacts of the parsed names, resolved as _resolve_contact() does and loaded with one query
+        contact_store = (stores or {}).get("contact_store")
+        names = {result.data.get("contacto_nombre") for result in parsed.values() if not result.is_error()}
+        contact_ids = {}
+        for name in names:
+            candidates = contact_store.search_by_name(name) if contact_store and name else []
+            if candidates and not ContactNameIndex.ambiguous(candidates):
+                contact_ids[name] = candidates[0]["id"]
+        contacts = contact_store.get_by_ids(list(set(contact_ids.values()))) if contact_ids else {}
+
+        jobs = []
+        for index, parsing_result in parsed.items():
+            if parsing_result.is_error():
+                continue
+            parsed_data = parsing_result.data
+            user_timezone = inputs[index]["user_timezone"]
+            jobs.append((index, "temporal_reasoning", self._temporal_input(parsed_data, user_timezone)))
+            contacto_id = contact_ids.get(parsed_data.get("contacto_nombre"))
+            if contacto_id in contacts:
+                jobs.append((index, "geo_reasoning", self._geo_input(parsed_data, contacto_id, contacts[contacto_id])))
+
+        agent_results = self.batch_pool.map(run_agents, [(stage, agent_input) for _, stage, agent_input in jobs])
+        for (index, stage, agent_input), agent_result in zip(jobs, agent_results):
+            precomputed[index][stage] = (agent_input, agent_result)
+        return precomputed
+
+    def _process_precomputed(
+        self,
+        precomputed: Dict[str, Any],
+        prompt: str,
+        user_timezone: str = "America/Mexico_City",
+        user_id: str = "anonymous",
+        stores: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """process_appointment_prompt() with agent results computed by the batch pool."""
+        orchestrator_start = time.time()
+        trace, result, context = self._begin(prompt, user_timezone, user_id, stores)
+        context["precomputed"] = precomputed
+        return self._execute(self.graph, trace, result, context, orchestrator_start)
+
+    def _execute(self, graph: StageGraph, trace, result, context, orchestrator_start: float) -> Dict[str, Any]:
+        try:
+            self._conclude(trace, result, context, graph.run(context, self.executor))
+        except Exception as e:
+            self._fail(trace, result, e)
+        return self._finish(trace, result, orchestrator_start)
+
+    async def _aexecute(self, graph: StageGraph, trace, result, context, orchestrator_start: float) -> Dict[str, Any]:
+        try:
+            self._conclude(trace, result, context, await graph.arun(context, self.executor))
+        except Exception as e:
+            self._fail(trace, result, e)
+        return self._finish(trace, result, orchestrator_start)
+
+    def _begin_structured(
+        self, fields: Dict[str, Any], prompt: str, user_timezone: str, user_id: str, stores: Optional[Dict[str, Any]]
+    ):
+        """_begin() for a structured request, seeding what the skipped stages would have produced."""
+        trace, result, context = self._begin(prompt, user_timezone, user_id, stores)
+        trace.input_mode = "structured"
+        trace.input_fields = {key: value for key, value in fields.items() if value is not None}
+
+        # Canonical HH:MM (the serializer accepts "9:00"); default one hour, as the temporal agent does
+        start = to_minutes(fields["hora_inicio"])
+        end = to_minutes(fields["hora_fin"]) if fields["hora_fin"] else (start + 60) % (24 * 60)
+        context.update({
+            "contacto_id": fields["contacto_id"],
+            "servicio_id": fields["servicio_id"],
+            "ubicacion_id": fields["ubicacion_id"],
+            "temporal_reasoning": {
+                "fecha": fields["fecha"], "hora_inicio": format_minutes(start), "hora_fin": format_minutes(end),
+            },
+        })
+        return trace, result, context
+
+    def _begin(self, prompt: str, user_timezone: str, user_id: str, stores: Optional[Dict[str, Any]]):
+        """Create the trace, the default result and the stage context of a request."""
         trace = DecisionTrace(
             trace_id=f"trace_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}",
             timestamp=datetime.now().isoformat(),
@@ -89,7 +460,6 @@ class AgentOrchestrator:
             user_id=user_id,
         )
 
-        # Initialize result
         result = {
             "status": "error",
             "data": None,
@@ -98,183 +468,305 @@ class AgentOrchestrator:
             "suggestions": [],
         }
 
-        try:
-            # ==================== AGENT 1: PARSING ====================
-            parsing_result = self.parsing_agent.run({"prompt": prompt, "user_timezone": user_timezone})
-            self._record_agent(trace, "parsing", parsing_result)
+        context = {
+            "prompt": prompt,
+            "user_timezone": user_timezone,
+            "stores": stores,
+            # stage -> AgentResult; each stage writes only its own key
+            "agent_results": {},
+        }
+        return trace, result, context
+
+    def _conclude(self, trace: DecisionTrace, result: Dict[str, Any], context: Dict[str, Any], run):
+        """Fill the trace and the result from a finished stage run."""
+        # Agents are recorded in pipeline order, whatever order they finished in
+        for stage in run.graph.stages:
+            agent_result = context["agent_results"].get(stage.name)
+            if agent_result is not None:
+                self._record_agent(trace, stage.name, agent_result)
+        trace.stages = run.stages()
+        trace.critical_path = run.critical_path()
+
+        error = run.first_error()
+        if isinstance(error, StopPipeline):
+            result.update(error.response)
+            trace.final_status = result["status"]
+            return
+        if error is not None:
+            raise error
+
+        # ==================== SUCCESS ====================
+        contact = context["contact_resolution"]
+        validated_data = context["validation"]["data"]
+        appointment_data = {
+            "contacto_id": contact["contacto_id"],
+            "contacto_nombre": contact["contacto_nombre"],
+            "fecha": validated_data.get("fecha"),
+            "hora_inicio": validated_data.get("hora_inicio"),
+            "hora_fin": validated_data.get("hora_fin"),
+            "ubicacion_id": validated_data.get("ubicacion_id"),
+            "servicio_id": validated_data.get("servicio_id"),
+            "status": "confirmed",
+            "created_via_agent": True,
+            "trace_id": trace.trace_id,
+        }
 
-            if parsing_result.is_error():
-                # Check for ambiguities
-                if parsing_result.data.get("ambiguities"):
-                    result["status"] = "error"
-                    result["message"] = "Prompt is ambiguous and requires clarification"
-                    result["ambiguities"] = parsing_result.data["ambiguities"]
-                else:
-                    result["message"] = f"Could not parse prompt: {parsing_result.message}"
-                trace.final_status = "error"
-                result["trace"] = trace
-                return result
+        result["status"] = "success"
+        result["message"] = "Appointment successfully created"
+        result["data"] = appointment_data
+        trace.final_status = "success"
+        trace.final_output = appointment_data
+
+    @staticmethod
+    def _fail(trace: DecisionTrace, result: Dict[str, Any], error: Exception):
+        result["status"] = "error"
+        result["message"] = f"Orchestrator error: {str(error)}"
+        trace.final_status = "error"
+
+    @staticmethod
+    def _finish(trace: DecisionTrace, result: Dict[str, Any], orchestrator_start: float) -> Dict[str, Any]:
+        # Record total duration
+        trace.total_duration_ms = int((time.time() - orchestrator_start) * 1000)
+        result["trace"] = trace
+        return result
+
+    # ==================== STAGES ====================
+    # Each stage reads the request inputs and its dependencies' outputs from
+    # the context, and raises StopPipeline to end the request early.
+
+    def _run_parsing(self, context: Dict[str, Any]) -> Dict[str, Any]:
+        """AGENT 1: extract entities from the prompt."""
+        parsing_input = self._parsing_input(context["prompt"], context["user_timezone"])
+        if self.prompt_cache:
+            context["prompt_key"] = self.prompt_cache.key(parsing_input["prompt"], parsing_input["user_timezone"])
+        parsing_result = self._run_agent(context, "parsing", self.parsing_agent, parsing_input)
+        context["agent_results"]["parsing"] = parsing_result
+
+        if parsing_result.is_error():
+            # Check for ambiguities
+            if parsing_result.data.get("ambiguities"):
+                raise StopPipeline({
+                    "message": "Prompt is ambiguous and requires clarification",
+                    "ambiguities": parsing_result.data["ambiguities"],
+                })
+            raise StopPipeline({"message": f"Could not parse prompt: {parsing_result.message}"})
+        return parsing_result.data
+
+    def _run_temporal(self, context: Dict[str, Any]) -> Dict[str, Any]:
+        """AGENT 2: resolve the relative date and time."""
+        temporal_result = self._run_agent(
+            context, "temporal_reasoning", self.temporal_agent,
+            self._temporal_input(context["parsing"], context["user_timezone"]),
+        )
+        context["agent_results"]["temporal_reasoning"] = temporal_result
+
+        if temporal_result.is_error():
+            raise StopPipeline({"message": f"Could not resolve date/time: {temporal_result.message}"})
+        return temporal_result.data
+
+    def _resolve_contact(self, context: Dict[str, Any]) -> Dict[str, Any]:
+        """Match the parsed contact name to a contact and load its locations."""
+        contacto_nombre = context["parsing"].get("contacto_nombre")
+        contact_store = (context["stores"] or {}).get("contact_store")
+        candidates = contact_store.search_by_name(contacto_nombre) if contact_store and contacto_nombre else []
+
+        if not candidates:
+            raise StopPipeline({"message": f"Could not find contact: {contacto_nombre}"})
+
+        tied = ContactNameIndex.ambiguous(candidates)
+        if tied:
+            raise StopPipeline({
+                "message": "Prompt is ambiguous and requires clarification",
+                "ambiguities": [{
+                    "field": "contacto",
+                    "message": f"Varios contactos coinciden con '{contacto_nombre}'",
+                    "severity": "error",
+                    "suggestions": [{"id": c["id"], "nombre": c["nombre"], "score": c["score"]} for c in tied],
+                }],
+            })
+
+        contacto_id = candidates[0]["id"]
+        return {
+            "contacto_id": contacto_id,
+            "contacto_nombre": contacto_nombre,
+            "contact": contact_store.get_by_id(contacto_id),
+        }
 
-            parsed_data = parsing_result.data
+    def _load_contact(self, context: Dict[str, Any]) -> Dict[str, Any]:
+        """Structured path: load the requested contact by id."""
+        contacto_id = context["contacto_id"]
+        contact_store = (context["stores"] or {}).get("contact_store")
+        contact = contact_store.get_by_id(contacto_id) if contact_store else None
 
-            # ==================== AGENT 2: TEMPORAL REASONING ====================
-            temporal_input = {
-                "fecha_raw": parsed_data.get("fecha_raw"),
-                "hora_raw": parsed_data.get("hora_raw"),
-                "user_timezone": user_timezone,
-            }
-
-            temporal_result = self.temporal_agent.run(temporal_input)
-            self._record_agent(trace, "temporal_reasoning", temporal_result)
-
-            if temporal_result.is_error():
-                result["message"] = f"Could not resolve date/time: {temporal_result.message}"
-                trace.final_status = "error"
-                result["trace"] = trace
-                return result
-
-            temporal_data = temporal_result.data
-
-            # ==================== AGENT 3: GEOGRAPHICAL REASONING ====================
-            # Get contact ID (need to match name to ID)
-            contacto_nombre = parsed_data.get("contacto_nombre")
-            contacto_id = None
-
-            if stores and contacto_nombre:
-                contact_store = stores.get("contact_store")
-                if contact_store:
-                    # Simple name matching (in production, use better matching)
-                    all_contacts = contact_store.list_all()
-                    for contact in all_contacts:
-                        if contacto_nombre.lower() in contact.get("nombre", "").lower():
-                            contacto_id = contact.get("id")
-                            break
-
-            if not contacto_id:
-                result["message"] = f"Could not find contact: {contacto_nombre}"
-                trace.final_status = "error"
-                result["trace"] = trace
-                return result
-
-            # Get available locations for contact
-            available_locations = []
-            if stores:
-                contact_store = stores.get("contact_store")
-                if contact_store:
-                    contact = contact_store.get_by_id(contacto_id)
-                    if contact:
-                        available_locations = contact.get("ubicaciones", [])
-
-            geo_input = {
-                "ubicacion_raw": parsed_data.get("ubicacion"),
-                "contacto_id": contacto_id,
-                "available_locations": available_locations,
-            }
-
-            geo_result = self.geo_agent.run(geo_input)
-            self._record_agent(trace, "geo_reasoning", geo_result)
-
-            # Geo agent errors are not fatal (location is optional)
-            geo_data = geo_result.data if geo_result.is_success() or geo_result.status == "warning" else {}
-
-            # ==================== AGENT 4: VALIDATION ====================
-            validation_input = {
-                "contacto_id": contacto_id,
-                "contacto_nombre": contacto_nombre,
-                "fecha": temporal_data.get("fecha"),
-                "hora_inicio": temporal_data.get("hora_inicio"),
-                "hora_fin": temporal_data.get("hora_fin"),
-                "ubicacion_id": geo_data.get("location_id"),
-                "servicio_id": parsed_data.get("servicio_id"),
-                "stores": stores,
-            }
-
-            validation_result = self.validation_agent.run(validation_input)
-            self._record_agent(trace, "validation", validation_result)
-
-            if validation_result.is_error():
-                result["message"] = f"Validation failed: {validation_result.message}"
-                result["errors"] = validation_result.errors
-                trace.final_status = "error"
-                result["trace"] = trace
-                return result
-
-            validated_data = validation_result.data
-
-            # ==================== AGENT 5: AVAILABILITY ====================
-            availability_input = {
-                "contacto_id": contacto_id,
-                "fecha": validated_data.get("fecha"),
-                "hora_inicio": validated_data.get("hora_inicio"),
-                "hora_fin": validated_data.get("hora_fin"),
-                "ubicacion_id": validated_data.get("ubicacion_id"),
-                "servicio_id": validated_data.get("servicio_id"),
-                "stores": stores,
-            }
-
-            availability_result = self.availability_agent.run(availability_input)
-            self._record_agent(trace, "availability", availability_result)
-
-            if availability_result.is_error():
-                # Availability conflict - need negotiation
-                # ==================== AGENT 6: NEGOTIATION ====================
-                negotiation_input = {
-                    "appointment_data": validated_data,
-                    "contacto_id": contacto_id,
-                    "fecha": validated_data.get("fecha"),
-                    "hora_inicio": validated_data.get("hora_inicio"),
-                    "ubicacion_id": validated_data.get("ubicacion_id"),
-                    "user_preferences": {"flexible_date": True, "flexible_time": True},
-                    "stores": stores,
-                }
-
-                negotiation_result = self.negotiation_agent.run(negotiation_input)
-                self._record_agent(trace, "negotiation", negotiation_result)
-
-                suggestions = negotiation_result.data.get("suggestions", []) if negotiation_result.is_success() else []
-
-                result["status"] = "conflict"
-                result["message"] = "Requested time is not available"
-                result["error_detail"] = availability_result.message
-                result["suggestions"] = suggestions
-                trace.final_status = "conflict"
-                result["trace"] = trace
-                return result
-
-            # ==================== SUCCESS ====================
-            # Prepare final appointment data
-            appointment_data = {
-                "contacto_id": contacto_id,
-                "contacto_nombre": contacto_nombre,
-                "fecha": validated_data.get("fecha"),
-                "hora_inicio": validated_data.get("hora_inicio"),
-                "hora_fin": validated_data.get("hora_fin"),
-                "ubicacion_id": validated_data.get("ubicacion_id"),
-                "servicio_id": validated_data.get("servicio_id"),
-                "status": "confirmed",
-                "created_via_agent": True,
-                "trace_id": trace.trace_id,
-            }
-
-            result["status"] = "success"
-            result["message"] = "Appointment successfully created"
-            result["data"] = appointment_data
-            trace.final_status = "success"
-            trace.final_output = appointment_data
-
-            return result
+        if not contact:
+            raise StopPipeline({"message": f"Could not find contact: {contacto_id}"})
 
-        except Exception as e:
-            result["status"] = "error"
-            result["message"] = f"Orchestrator error: {str(e)}"
-            trace.final_status = "error"
-            result["trace"] = trace
-            return result
-
-        finally:
-            # Record total duration
-            trace.total_duration_ms = int((time.time() - orchestrator_start) * 1000)
-            result["trace"] = trace
+        return {
+            "contacto_id": contacto_id,
+            "contacto_nombre": contact.get("nombre"),
+            "contact": contact,
+        }
+
+    def _load_service(self, context: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Structured path: load the requested service by id (optional)."""
+        servicio_id = context["servicio_id"]
+        service_store = (context["stores"] or {}).get("service_store")
+        if not servicio_id:
+            return None
+        # A missing service is reported by validation
+        return {"servicio_id": servicio_id, "service": service_store.get_by_id(servicio_id) if service_store else None}
+
+    def _default_location(self, context: Dict[str, Any]) -> Dict[str, Any]:
+        """Structured path: the requested location, or the contact's primary one (as GeoReasoningAgent)."""
+        if context["ubicacion_id"]:
+            return {"location_id": context["ubicacion_id"]}
+        locations = context["contact_resolution"]["contact"].get("ubicaciones") or []
+        return {"location_id": locations[0].get("id")} if locations else {}
+
+    def _resolve_service(self, context: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Match the parsed service name to an active service (optional)."""
+        servicio = context["parsing"].get("servicio")
+        service_store = (context["stores"] or {}).get("service_store")
+        if not servicio or not service_store:
+            return None
+
+        servicio = servicio.lower()
+        for service in service_store.list_all():
+            if service.get("activo", True) and servicio in service.get("nombre", "").lower():
+                return {"servicio_id": service.get("id"), "service": service}
+        return None
+
+    def _run_geo(self, context: Dict[str, Any]) -> Dict[str, Any]:
+        """AGENT 3: resolve the location among the contact's locations."""
+        resolved = context["contact_resolution"]
+        geo_result = self._run_agent(
+            context, "geo_reasoning", self.geo_agent,
+            self._geo_input(context["parsing"], resolved["contacto_id"], resolved["contact"]),
+        )
+        context["agent_results"]["geo_reasoning"] = geo_result
+
+        # Geo agent errors are not fatal (location is optional)
+        return geo_result.data if geo_result.is_success() or geo_result.status == "warning" else {}
+
+    def _run_validation(self, context: Dict[str, Any]) -> Dict[str, Any]:
+        """AGENT 4: validate the resolved appointment."""
+        resolved = context["contact_resolution"]
+        temporal_data = context["temporal_reasoning"]
+        service = context["service_lookup"] or {}
+        prefetch = PrefetchContext(
+            contacto_id=resolved["contacto_id"],
+            contact=resolved["contact"],
+            servicio_id=service.get("servicio_id"),
+            service=service.get("service"),
+        )
+        validation_result = self.validation_agent.run({
+            "contacto_id": resolved["contacto_id"],
+            "contacto_nombre": resolved["contacto_nombre"],
+            "fecha": temporal_data.get("fecha"),
+            "hora_inicio": temporal_data.get("hora_inicio"),
+            "hora_fin": temporal_data.get("hora_fin"),
+            "ubicacion_id": context["geo_reasoning"].get("location_id"),
+            "servicio_id": prefetch.servicio_id,
+            "prefetch": prefetch,
+            "stores": context["stores"],
+        })
+        context["agent_results"]["validation"] = validation_result
+
+        if validation_result.is_error():
+            raise StopPipeline({
+                "message": f"Validation failed: {validation_result.message}",
+                "errors": validation_result.errors,
+            })
+
+        validated_data = validation_result.data
+        # Validated strings are converted once; later agents work on integer minutes
+        window = TimeWindow.parse(
+            validated_data.get("fecha"), validated_data.get("hora_inicio"), validated_data.get("hora_fin")
+        )
+        return {"data": validated_data, "window": window, "prefetch": prefetch}
+
+    def _run_availability(self, context: Dict[str, Any]) -> AgentResult:
+        """AGENT 5: check the slot against bookings and the contact's schedule."""
+        validated = context["validation"]
+        validated_data = validated["data"]
+        availability_result = self.availability_agent.run({
+            "contacto_id": context["contact_resolution"]["contacto_id"],
+            "fecha": validated_data.get("fecha"),
+            "hora_inicio": validated_data.get("hora_inicio"),
+            "hora_fin": validated_data.get("hora_fin"),
+            "window": validated["window"],
+            "ubicacion_id": validated_data.get("ubicacion_id"),
+            "servicio_id": validated_data.get("servicio_id"),
+            "prefetch": validated["prefetch"],
+            "stores": context["stores"],
+        })
+        context["agent_results"]["availability"] = availability_result
+        return availability_result
+
+    def _run_negotiation(self, context: Dict[str, Any]) -> None:
+        """AGENT 6: on an availability conflict, suggest alternatives and stop."""
+        availability_result = context["availability"]
+        if not availability_result.is_error():
+            return None
+
+        validated = context["validation"]
+        validated_data = validated["data"]
+        negotiation_result = self.negotiation_agent.run({
+            "appointment_data": validated_data,
+            "contacto_id": context["contact_resolution"]["contacto_id"],
+            "fecha": validated_data.get("fecha"),
+            "hora_inicio": validated_data.get("hora_inicio"),
+            "window": validated["window"],
+            "ubicacion_id": validated_data.get("ubicacion_id"),
+            "user_preferences": {"flexible_date": True, "flexible_time": True},
+            "prefetch": validated["prefetch"],
+            "stores": context["stores"],
+        })
+        context["agent_results"]["negotiation"] = negotiation_result
+
+        suggestions = negotiation_result.data.get("suggestions", []) if negotiation_result.is_success() else []
+        raise StopPipeline({
+            "status": "conflict",
+            "message": "Requested time is not available",
+            "error_detail": availability_result.message,
+            "suggestions": suggestions,
+        })
+
+    def _run_agent(self, context: Dict[str, Any], stage: str, agent, agent_input: Dict[str, Any]) -> AgentResult:
+        """Run ``agent``, unless the batch pool already ran it on the same input or the prompt cache has it."""
+        precomputed = context.get("precomputed", {}).get(stage)
+        if precomputed is not None and precomputed[0] == agent_input:
+            return precomputed[1]
+
+        prompt_key = context.get("prompt_key") if stage in CACHED_STAGES else None
+        if prompt_key is None:
+            return agent.run(agent_input)
+        agent_result = self.prompt_cache.get(prompt_key, stage)
+        if agent_result is None:
+            agent_result = agent.run(agent_input)
+            self.prompt_cache.put(prompt_key, stage, agent_result)
+        return agent_result
+
+    @staticmethod
+    def _parsing_input(prompt: str, user_timezone: str) -> Dict[str, Any]:
+        # Normalized as the prompt cache keys it, so a cached result is the one the prompt gets
+        return {"prompt": normalize_prompt(prompt), "user_timezone": user_timezone}
+
+    @staticmethod
+    def _temporal_input(parsed_data: Dict[str, Any], user_timezone: str) -> Dict[str, Any]:
+        return {
+            "fecha_raw": parsed_data.get("fecha_raw"),
+            "hora_raw": parsed_data.get("hora_raw"),
+            "user_timezone": user_timezone,
+        }
+
+    @staticmethod
+    def _geo_input(parsed_data: Dict[str, Any], contacto_id: str, contact: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        return {
+            "ubicacion_raw": parsed_data.get("ubicacion"),
+            "contacto_id": contacto_id,
+            "available_locations": contact.get("ubicaciones", []) if contact else [],
+        }
 
     def _record_agent(self, trace: DecisionTrace, agent_name: str, agent_result: AgentResult):
         """
@@ -8,55 +8,55 @@ Responsible for:
 - Extracting location references (clínica norte, consultorio 1)
 - Extracting service types (consulta, chequeo, laboratorio)
 - Detecting ambiguities and missing information
+
+Patterns and keywords live in prompt_patterns.py. Prompts are capped at
+MAX_PROMPT_LENGTH characters and every pattern runs in linear time, so a
+prompt is parsed in bounded time; a watchdog still abandons one that runs
+past PARSE_TIME_BUDGET_MS between extraction steps.
 """
 
-import re
 from typing import Any, Dict, List, Optional
 from datetime import datetime
 import time
 
 from .base import BaseAgent, AgentResult
+from .prompt_patterns import (
+    CONTACT_FALLBACK_PATTERN,
+    CONTACT_PATTERN,
+    DATE_KEYWORDS,
+    DATE_PATTERN,
+    DAY_PATTERN,
+    LOCATION_PATTERN,
+    MAX_PROMPT_LENGTH,
+    SERVICE_KEYWORDS,
+    SERVICE_PATTERN,
+    TIME_PATTERN,
+    TRAILING_PAREN_PATTERN,
+)
+
+# Longest a prompt may take to parse (microseconds normally)
+PARSE_TIME_BUDGET_MS = 100
+
+
+class ParsingTimeout(Exception):
+    """Raised when a prompt runs past the parsing time budget."""
 
 
 class ParsingAgent(BaseAgent):
     """Extracts entities from natural language prompts."""
 
-    def __init__(self):
-        """Initialize ParsingAgent."""
+    def __init__(self, time_budget_ms: float = PARSE_TIME_BUDGET_MS):
+        """
+        Initialize ParsingAgent.
+
+        Args:
+            time_budget_ms: Parsing time after which a prompt is abandoned
+        """
         super().__init__("parsing", version="1.0.0")
+        self.time_budget_ms = time_budget_ms
 
-        # Regex patterns for extraction
-        self.patterns = {
-            # Contact names (Dr. García, Dra. Pérez, etc.)
-            "contact": r"(?:con|with)?\s+(?:dr\.?|dra\.?|doctor|doctora|médico|médica|staff|recurso)\s+([A-ZÁÉÍÓÚa-záéíóú\s\.]+?)(?:\s+(?:en|at|en la|at the)|$)",
-            # Time patterns (10am, 14:30, 3pm, etc.)
-            "time": r"(\d{1,2}):?(\d{0,2})\s*(?:am|pm|AM|PM|h|:)?|(\d{1,2})\s*(?:am|pm|AM|PM)",
-            # Location references (clínica norte, consultorio 1, etc.)
-            "location": r"(?:en|at|en la|at the)\s+([A-ZÁÉÍÓÚa-záéíóú\s\d]+?)(?:\s+(?:el|la|los|las)|$)",
-            # Service types (consulta, chequeo, laboratorio)
-            "service": r"(?:para|for|por|by)\s+(?:una |un |a )?([A-ZÁÉÍÓÚa-záéíóú\s]+?)(?:\s+(?:con|with)|$)",
-        }
-
-        # Common date keywords
-        self.date_keywords = {
-            "hoy": "today",
-            "mañana": "tomorrow",
-            "pasado mañana": "day_after_tomorrow",
-            "próximo": "next",
-            "próxima": "next",
-            "próximos": "next",
-            "próximas": "next",
-            "semana": "week",
-            "mes": "month",
-            "año": "year",
-            "lunes": "monday",
-            "martes": "tuesday",
-            "miércoles": "wednesday",
-            "jueves": "thursday",
-            "viernes": "friday",
-            "sábado": "saturday",
-            "domingo": "sunday",
-        }
+        # Common date keywords (read-only: one instance is shared by concurrent requests)
+        self.date_keywords = DATE_KEYWORDS
 
     def run(self, input_data: Dict[str, Any]) -> AgentResult:
         """
@@ -73,20 +73,30 @@ class ParsingAgent(BaseAgent):
             AgentResult with extracted entities
         """
         start_time = time.time()
+        deadline = time.perf_counter() + self.time_budget_ms / 1000
 
         try:
             prompt = input_data.get("prompt", "").strip()
             if not prompt:
                 return self._error("Prompt is empty", duration_ms=0)
+            if len(prompt) > MAX_PROMPT_LENGTH:
+                return self._error(
+                    f"Prompt is too long ({len(prompt)} characters, max {MAX_PROMPT_LENGTH})",
+                    duration_ms=0,
+                )
 
             # Convert to lowercase for matching
             prompt_lower = prompt.lower()
 
             # Extract entities
             contact = self._extract_contact(prompt)
+            self._check_deadline(deadline, "contact")
             date_info = self._extract_date(prompt_lower)
+            self._check_deadline(deadline, "date")
             time_info = self._extract_time(prompt_lower)
+            self._check_deadline(deadline, "time")
             location = self._extract_location(prompt)
+            self._check_deadline(deadline, "location")
             service = self._extract_service(prompt)
 
             # Detect ambiguities
@@ -133,22 +143,30 @@ class ParsingAgent(BaseAgent):
                 duration_ms=duration_ms,
             )
 
+        except ParsingTimeout as e:
+            duration_ms = int((time.time() - start_time) * 1000)
+            self._log_debug(f"ParsingAgent timeout: {str(e)}")
+            return self._error(str(e), errors=["parsing_timeout"], duration_ms=duration_ms)
+
         except Exception as e:
             duration_ms = int((time.time() - start_time) * 1000)
             self._log_debug(f"ParsingAgent error: {str(e)}")
             return self._error(f"Parsing error: {str(e)}", duration_ms=duration_ms)
 
+    def _check_deadline(self, deadline: float, step: str):
+        """Abandon the prompt if parsing has run past its time budget."""
+        if time.perf_counter() > deadline:
+            raise ParsingTimeout(f"Parsing exceeded {self.time_budget_ms} ms (after {step})")
+
     def _extract_contact(self, prompt: str) -> Optional[str]:
         """Extract contact name from prompt."""
         # Simple extraction - matches patterns like "con Dr. Pérez"
-        pattern = r"(?:con|with)\s+(?:dr\.?|dra\.?|doctor|doctora|médico|médica)\.?\s+([A-ZÁÉÍÓÚa-záéíóú\s]+?)(?:\s+(?:en|en la|at|at the)|$)"
-        match = re.search(pattern, prompt, re.IGNORECASE)
+        match = CONTACT_PATTERN.search(prompt)
         if match:
             return match.group(1).strip()
 
         # Fallback: look for capitalized words after "con"
-        pattern = r"con\s+([A-Z][a-záéíóú]+(?:\s+[A-Z][a-záéíóú]+)?)"
-        match = re.search(pattern, prompt)
+        match = CONTACT_FALLBACK_PATTERN.search(prompt)
         if match:
             return match.group(1).strip()
 
@@ -157,19 +175,17 @@ class ParsingAgent(BaseAgent):
     def _extract_date(self, prompt_lower: str) -> Optional[str]:
         """Extract date reference from prompt."""
         # Check for date keywords
-        for keyword, value in self.date_keywords.items():
+        for keyword in self.date_keywords:
             if keyword in prompt_lower:
                 return keyword
 
         # Check for explicit dates (YYYY-MM-DD or DD/MM/YYYY)
-        date_pattern = r"(\d{4}-\d{2}-\d{2}|\d{2}/\d{2}/\d{4}|\d{2}-\d{2}-\d{4})"
-        match = re.search(date_pattern, prompt_lower)
+        match = DATE_PATTERN.search(prompt_lower)
         if match:
             return match.group(1)
 
         # Check for numbered days (el 24, 25 enero, etc.)
-        day_pattern = r"(?:el\s+)?(\d{1,2})\s+(?:de\s+)?(?:enero|febrero|marzo|abril|mayo|junio|julio|agosto|septiembre|octubre|noviembre|diciembre)?"
-        match = re.search(day_pattern, prompt_lower)
+        match = DAY_PATTERN.search(prompt_lower)
         if match:
             return f"day_{match.group(1)}"
 
@@ -178,8 +194,7 @@ class ParsingAgent(BaseAgent):
     def _extract_time(self, prompt_lower: str) -> Optional[str]:
         """Extract time reference from prompt."""
         # Pattern for times like "10am", "14:30", "3pm"
-        time_pattern = r"(\d{1,2}):?(\d{0,2})\s*(?:am|pm|AM|PM|h)?|(\d{1,2})\s*(?:am|pm|AM|PM)"
-        match = re.search(time_pattern, prompt_lower)
+        match = TIME_PATTERN.search(prompt_lower)
 
         if match:
             if match.group(1):  # Format like "10" or "10:30"
@@ -204,13 +219,12 @@ class ParsingAgent(BaseAgent):
     def _extract_location(self, prompt: str) -> Optional[str]:
         """Extract location reference from prompt."""
         # Pattern for locations after "en" or "at"
-        pattern = r"(?:en|at)\s+(?:la\s+)?(?:clínica\s+)?([A-ZÁÉÍÓÚa-záéíóú\s\d]+?)(?:\s+(?:el|la|los|las|\()|$)"
-        match = re.search(pattern, prompt, re.IGNORECASE)
+        match = LOCATION_PATTERN.search(prompt)
 
         if match:
             location = match.group(1).strip()
             # Remove trailing parentheses or extra text
-            location = re.sub(r"\s+\($", "", location)
+            location = TRAILING_PAREN_PATTERN.sub("", location)
             return location if location else None
 
         return None
@@ -218,17 +232,16 @@ class ParsingAgent(BaseAgent):
     def _extract_service(self, prompt: str) -> Optional[str]:
         """Extract service type from prompt."""
         # Pattern for services like "para una consulta", "for checkup"
-        pattern = r"(?:para|for)\s+(?:una\s+|un\s+|a\s+)?([A-ZÁÉÍÓÚa-záéíóú\s]+?)(?:\s+(?:con|with|en|at)|$)"
-        match = re.search(pattern, prompt, re.IGNORECASE)
+        match = SERVICE_PATTERN.search(prompt)
 
         if match:
             service = match.group(1).strip()
             return service if service else None
 
         # Check for common service keywords
-        services = ["consulta", "chequeo", "laboratorio", "radiografía", "ecografía", "revisión"]
-        for service in services:
-            if service in prompt.lower():
+        prompt_lower = prompt.lower()
+        for service in SERVICE_KEYWORDS:
+            if service in prompt_lower:
                 return service
 
         return None
@@ -0,0 +1,240 @@
+"""
+Stage dependency graph for the agent pipeline.
+
+Stages are declared with the stages they depend on; ``StageGraph.run``
+starts every stage as soon as its dependencies have finished, so stages
+that only share an ancestor (e.g. temporal reasoning, contact resolution
+and service lookup, which all only need the parsing output) run
+concurrently on a thread pool. The calling thread runs one ready stage
+itself instead of waiting idle, so a linear chain never leaves it.
+``StageGraph.arun`` is the async counterpart for ASGI views.
+
+A stage stops the pipeline by raising ``StopPipeline``; its dependents
+(and theirs) are skipped, while independent branches run to completion.
+"""
+
+import asyncio
+import time
+from concurrent.futures import FIRST_COMPLETED, Executor, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+
+class StopPipeline(Exception):
+    """Raised by a stage to end the pipeline with a final response."""
+
+    def __init__(self, response: Dict[str, Any]):
+        """
+        Args:
+            response: Fields merged into the orchestrator result (status, message, ...)
+        """
+        super().__init__(response.get("message", ""))
+        self.response = response
+
+
+@dataclass(frozen=True)
+class Stage:
+    """One pipeline step: a callable over the shared context and its dependencies."""
+
+    name: str
+    run: Callable[[Dict[str, Any]], Any]
+    depends_on: Tuple[str, ...] = ()
+
+
+class StageRun:
+    """Outputs, outcome and timing of every stage in one graph run."""
+
+    def __init__(self, graph: "StageGraph"):
+        self.graph = graph
+        self.outputs: Dict[str, Any] = {}
+        # ok, stopped, failed or skipped
+        self.status: Dict[str, str] = {}
+        self.errors: Dict[str, BaseException] = {}
+        # (start, end) in ms from the start of the run
+        self.timings: Dict[str, Tuple[float, float]] = {}
+
+    def first_error(self) -> Optional[BaseException]:
+        """Stop or exception of the earliest declared stage, as a sequential run would report it."""
+        for stage in self.graph.stages:
+            if stage.name in self.errors:
+                return self.errors[stage.name]
+        return None
+
+    def critical_path(self) -> List[str]:
+        """
+        Chain of stages that determined the total wall time.
+
+        Starts at the stage that finished last and walks back through the
+        dependency that finished last, so the path is the longest branch
+        actually observed.
+        """
+        if not self.timings:
+            return []
+        name = max(self.timings, key=lambda n: self.timings[n][1])
+        path = [name]
+        while True:
+            ran = [dep for dep in self.graph.by_name[name].depends_on if dep in self.timings]
+            if not ran:
+                break
+            name = max(ran, key=lambda n: self.timings[n][1])
+            path.append(name)
+        return path[::-1]
+
+    def stages(self) -> List[Dict[str, Any]]:
+        """Per-stage summary for DecisionTrace, in declaration order."""
+        summary = []
+        for stage in self.graph.stages:
+            start, end = self.timings.get(stage.name, (None, None))
+            summary.append({
+                "stage": stage.name,
+                "depends_on": list(stage.depends_on),
+                "status": self.status.get(stage.name, "skipped"),
+                "start_ms": round(start, 3) if start is not None else None,
+                "duration_ms": round(end - start, 3) if start is not None else 0,
+            })
+        return summary
+
+
+class StageGraph:
+    """Immutable stage dependency graph; safe to run concurrently from many requests."""
+
+    def __init__(self, stages: Sequence[Stage]):
+        """
+        Args:
+            stages: Stages in their sequential order (used to report the first error)
+
+        Raises:
+            ValueError: On duplicate names, unknown dependencies or cycles
+        """
+        self.stages = tuple(stages)
+        self.by_name = {stage.name: stage for stage in self.stages}
+        if len(self.by_name) != len(self.stages):
+            raise ValueError("Duplicate stage names")
+
+        self.dependents: Dict[str, Tuple[str, ...]] = {stage.name: () for stage in self.stages}
+        for stage in self.stages:
+            for dep in stage.depends_on:
+                if dep not in self.by_name:
+                    raise ValueError(f"Stage {stage.name} depends on unknown stage {dep}")
+                self.dependents[dep] += (stage.name,)
+
+        # Kahn's algorithm: every stage must be reachable from the roots
+        remaining = {stage.name: len(stage.depends_on) for stage in self.stages}
+        queue = [name for name, count in remaining.items() if count == 0]
+        for name in queue:
+            for dependent in self.dependents[name]:
+                remaining[dependent] -= 1
+                if remaining[dependent] == 0:
+                    queue.append(dependent)
+        if len(queue) != len(self.stages):
+            raise ValueError("Stage dependencies contain a cycle")
+
+    def run(self, context: Dict[str, Any], executor: Optional[Executor] = None) -> StageRun:
+        """
+        Run every stage once its dependencies finished.
+
+        Each stage's output is stored in ``context`` under the stage name
+        before its dependents start. Without an executor the stages run one
+        after another in the calling thread.
+
+        Args:
+            context: Request inputs; stage outputs are added to it
+            executor: Pool for stages that become ready together
+
+        Returns:
+            StageRun with outputs, statuses, errors and timings
+        """
+        result = StageRun(self)
+        origin = time.perf_counter()
+        remaining = {stage.name: len(stage.depends_on) for stage in self.stages}
+        ready = [stage for stage in self.stages if not stage.depends_on]
+        pending = {}
+
+        while ready or pending:
+            if executor is not None:
+                # Hand all but one ready stage to the pool; this thread runs the first
+                for stage in ready[1:]:
+                    pending[executor.submit(self._execute, stage, context, origin)] = stage
+                del ready[1:]
+
+            if ready:
+                stage = ready.pop(0)
+                finished = [(stage, self._execute(stage, context, origin))]
+                done = [future for future in pending if future.done()]
+            else:
+                finished = []
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            finished += [(pending.pop(future), future.result()) for future in done]
+
+            ready += self._settle(result, context, remaining, finished)
+            ready.sort(key=self.stages.index)
+
+        return result
+
+    async def arun(self, context: Dict[str, Any], executor: Optional[Executor] = None) -> StageRun:
+        """
+        Async counterpart of run().
+
+        Every stage runs in the executor (the loop's default one if None);
+        the event loop only schedules, so other requests keep being served
+        while stages wait on stores.
+
+        Args:
+            context: Request inputs; stage outputs are added to it
+            executor: Pool the stages run on
+
+        Returns:
+            StageRun with outputs, statuses, errors and timings
+        """
+        loop = asyncio.get_running_loop()
+        result = StageRun(self)
+        origin = time.perf_counter()
+        remaining = {stage.name: len(stage.depends_on) for stage in self.stages}
+        ready = [stage for stage in self.stages if not stage.depends_on]
+        pending = {}
+
+        while ready or pending:
+            for stage in ready:
+                pending[loop.run_in_executor(executor, self._execute, stage, context, origin)] = stage
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            finished = [(pending.pop(future), future.result()) for future in done]
+            ready = sorted(self._settle(result, context, remaining, finished), key=self.stages.index)
+
+        return result
+
+    def _settle(
+        self, result: StageRun, context: Dict[str, Any], remaining: Dict[str, int], finished: List[Tuple[Stage, Tuple]]
+    ) -> List[Stage]:
+        """Record finished stages; return the dependents that became ready (skipping the rest)."""
+        ready = []
+        while finished:
+            stage, (status, value, start, end) = finished.pop(0)
+            result.status[stage.name] = status
+            if status == "ok":
+                result.outputs[stage.name] = context[stage.name] = value
+            elif status != "skipped":
+                result.errors[stage.name] = value
+            if start is not None:
+                result.timings[stage.name] = (start, end)
+
+            for name in self.dependents[stage.name]:
+                remaining[name] -= 1
+                if remaining[name]:
+                    continue
+                dependent = self.by_name[name]
+                if all(result.status[dep] == "ok" for dep in dependent.depends_on):
+                    ready.append(dependent)
+                else:
+                    finished.append((dependent, ("skipped", None, None, None)))
+        return ready
+
+    @staticmethod
+    def _execute(stage: Stage, context: Dict[str, Any], origin: float):
+        start = (time.perf_counter() - origin) * 1000
+        try:
+            value, status = stage.run(context), "ok"
+        except StopPipeline as stop:
+            value, status = stop, "stopped"
+        except Exception as e:
+            value, status = e, "failed"
+        return status, value, start, (time.perf_counter() - origin) * 1000
@@ -0,0 +1,35 @@
+"""
+Request-scoped entities shared by the agents of one booking.
+
+The contact and the service of a booking are loaded once by the pipeline
+(contact and service resolution already read them) and handed to
+ValidationAgent, AvailabilityAgent and NegotiationAgent in a
+``PrefetchContext``, so the agents and ``ContactStore.check_availability``
+stop issuing their own ``get_by_id`` queries. Agents called without one
+(directly, or by other callers) fall back to the stores.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+
+@dataclass(frozen=True)
+class PrefetchContext:
+    """Contact and service of one request, as loaded by the pipeline."""
+
+    contacto_id: Optional[str] = None
+    contact: Optional[Dict[str, Any]] = None
+    servicio_id: Optional[str] = None
+    service: Optional[Dict[str, Any]] = None
+
+    def contact_for(self, contact_store: Any, contacto_id: str) -> Optional[Dict[str, Any]]:
+        """The prefetched contact, or a store lookup for any other id."""
+        if contacto_id == self.contacto_id:
+            return self.contact
+        return contact_store.get_by_id(contacto_id) if contact_store else None
+
+    def service_for(self, service_store: Any, servicio_id: str) -> Optional[Dict[str, Any]]:
+        """The prefetched service, or a store lookup for any other id."""
+        if servicio_id == self.servicio_id:
+            return self.service
+        return service_store.get_by_id(servicio_id) if service_store else None
@@ -0,0 +1,143 @@
+"""
+Per-process cache of parsing and temporal reasoning results.
+
+n8n retries and users resend the same prompts ("cita mañana 10am con Dr.
+Pérez"). ParsingAgent only depends on the prompt, and TemporalReasoningAgent
+on the parsed date and time, the timezone and the current date there: a
+relative date ("mañana", "el lunes") resolves to the same day until local
+midnight. Results are therefore cached under (normalized prompt, timezone,
+local date):
+
+- the normalized prompt (NFC, whitespace runs collapsed) is also what the
+  orchestrator hands to ParsingAgent, so a hit returns exactly what the
+  agents would compute;
+- an entry expires after ``ttl`` seconds or at the local midnight ending
+  its date, whichever comes first, and a result computed after that
+  midnight is not stored, so a relative date is never served on another
+  day;
+- only successful results (and warnings) are kept: errors include time
+  budget overruns, which depend on the machine's load;
+- at most ``max_entries`` prompts are kept, least recently used first out.
+
+Results are shared by every request that hits them and must not be
+modified.
+"""
+
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, NamedTuple, Optional
+
+from .base import AgentResult
+from .temporal_agent import user_tz
+
+# Stages whose result only depends on the prompt, the timezone and the local date
+CACHED_STAGES = ("parsing", "temporal_reasoning")
+
+
+def normalize_prompt(prompt: str) -> str:
+    """NFC-normalize and collapse whitespace ("cita  mañana\\n10am" -> "cita mañana 10am")."""
+    return " ".join(unicodedata.normalize("NFC", prompt or "").split())
+
+
+class PromptKey(NamedTuple):
+    prompt: str
+    timezone: str
+    local_date: date
+
+
+class _Entry:
+    __slots__ = ("expires_at", "results")
+
+    def __init__(self, expires_at: float):
+        self.expires_at = expires_at
+        self.results: Dict[str, AgentResult] = {}
+
+
+class PromptCache:
+    """LRU cache with TTL of agent results per (normalized prompt, timezone, local date)."""
+
+    def __init__(self, max_entries: int = 10000, ttl: float = 3600, clock: Callable[[], float] = time.time):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: "OrderedDict[PromptKey, _Entry]" = OrderedDict()
+        self._stats = {stage: {"hits": 0, "misses": 0} for stage in CACHED_STAGES}
+        self._expired = 0
+        self._evicted = 0
+        self._lock = threading.Lock()
+
+    def key(self, prompt: str, user_timezone: str) -> PromptKey:
+        """Cache key of a prompt (already normalized) for a user's timezone, as of now."""
+        return PromptKey(prompt, user_timezone, datetime.fromtimestamp(self._clock(), user_tz(user_timezone)).date())
+
+    def get(self, key: PromptKey, stage: str) -> Optional[AgentResult]:
+        """The cached result of ``stage`` for ``key``, or None (counted as a miss)."""
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now >= entry.expires_at:
+                del self._entries[key]
+                self._expired += 1
+                entry = None
+            result = entry.results.get(stage) if entry is not None else None
+            if result is not None:
+                self._entries.move_to_end(key)
+            self._stats[stage]["hits" if result is not None else "misses"] += 1
+        return result
+
+    def put(self, key: PromptKey, stage: str, result: AgentResult):
+        """Cache the result of ``stage`` for ``key`` (errors are not cached)."""
+        if result.is_error() or not self.max_entries:
+            return
+        now = self._clock()
+        expires_at = min(now + self.ttl, self._midnight_after(key))
+        if now >= expires_at:
+            # Local midnight passed since the key was taken: the result may be of the next day
+            return
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or now >= entry.expires_at:
+                entry = self._entries[key] = _Entry(expires_at)
+            entry.results[stage] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evicted += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters per stage and in total, plus the entry count, for this process."""
+        with self._lock:
+            stages = {stage: dict(counts) for stage, counts in self._stats.items()}
+            entries, expired, evicted = len(self._entries), self._expired, self._evicted
+        hits = sum(counts["hits"] for counts in stages.values())
+        misses = sum(counts["misses"] for counts in stages.values())
+        total = hits + misses
+        for counts in stages.values():
+            lookups = counts["hits"] + counts["misses"]
+            counts["hit_rate"] = round(counts["hits"] / lookups, 4) if lookups else 0.0
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / total, 4) if total else 0.0,
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "expired": expired,
+            "evicted": evicted,
+            "stages": stages,
+        }
+
+    def clear(self):
+        """Drop all entries and counters."""
+        with self._lock:
+            self._entries.clear()
+            self._stats = {stage: {"hits": 0, "misses": 0} for stage in CACHED_STAGES}
+            self._expired = self._evicted = 0
+
+    @staticmethod
+    def _midnight_after(key: PromptKey) -> float:
+        """Timestamp of the local midnight that ends ``key.local_date``."""
+        tz = user_tz(key.timezone)
+        return tz.localize(datetime.combine(key.local_date + timedelta(days=1), datetime.min.time())).timestamp()
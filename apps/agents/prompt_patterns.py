@@ -0,0 +1,116 @@
+"""
+Entity patterns and keywords of ParsingAgent.
+
+The patterns are compiled once at import instead of being looked up in
+the ``re`` module cache on every call, and the keyword tables are shared
+read-only by every ParsingAgent. Their behaviour is pinned by the prompt
+corpus in apps/agents/tests.py (PARSING_CORPUS).
+
+Contacts, locations and services are a lead-in ("con Dr.", "en la",
+"para una") followed by a phrase of letters and spaces that runs up to a
+stop word or the end of the prompt. The old patterns captured the phrase
+with a lazy ``[...\s]+?`` group: it retried the stop word after every
+character and rescanned every run of spaces, and search() started over at
+every lead-in, so a long prompt without a stop word took quadratic time
+or worse (seconds for 10 KB). ``PhrasePattern`` matches the phrase word by
+word with possessive quantifiers, which never backtrack, and its search
+skips lead-ins whose phrase was already scanned: linear in the prompt.
+"""
+
+import re
+from types import MappingProxyType
+from typing import Optional
+
+# Longest prompt ParsingAgent accepts, as AppointmentCreateSerializer.prompt
+MAX_PROMPT_LENGTH = 500
+
+
+class PhrasePattern:
+    """
+    A lead-in followed by a phrase, searched in linear time.
+
+    ``search()`` finds what ``re.search()`` found with the old lazy pattern
+    ``lead options ([chars\s]+?)(?:\s+(?:stop)|$)``, except where that one
+    captured only whitespace. Group 1 is the phrase (without trailing
+    spaces, which callers strip anyway).
+
+    The phrase is words of ``chars`` separated by spaces and ends before
+    the first spaces followed by a stop word, or at the end of the text.
+    A phrase that reaches any other character fails, and so does every
+    later lead-in whose phrase starts before that character, so they are
+    skipped instead of being rescanned.
+    """
+
+    def __init__(self, lead: str, options: str, chars: str, stop: str, flags: int = 0):
+        self.lead = re.compile(lead, flags)
+        self.regex = re.compile(
+            rf"{lead}{options}([{chars}]++(?:\s++(?!{stop})[{chars}]++)*+)(?:\s++(?:{stop})|\s*+\Z)",
+            flags,
+        )
+        self._span = re.compile(rf"[{chars}\s]*+", flags)
+
+    def search(self, text: str) -> Optional[re.Match]:
+        pos = 0
+        # Phrases starting in [scanned_from, scanned] are known to fail
+        scanned_from = scanned = -1
+        while True:
+            lead = self.lead.search(text, pos)
+            if lead is None:
+                return None
+            if not scanned_from <= lead.end() <= scanned:
+                match = self.regex.match(text, lead.start())
+                if match:
+                    return match
+                scanned_from, scanned = lead.end(), self._span.match(text, lead.end()).end()
+            pos = lead.start() + 1
+
+
+# Contact names after "con"/"with" and a title (con Dr. Pérez, with Dra. García)
+CONTACT_PATTERN = PhrasePattern(
+    r"(?:con|with)\s++(?:dr\.?|dra\.?|doctor|doctora|médico|médica)\.?\s++", "",
+    "A-ZÁÉÍÓÚa-záéíóú", "en|en la|at|at the", re.IGNORECASE,
+)
+# Capitalized words after "con" (con Ana López)
+CONTACT_FALLBACK_PATTERN = re.compile(r"con\s+([A-Z][a-záéíóú]+(?:\s+[A-Z][a-záéíóú]+)?)")
+# Explicit dates (YYYY-MM-DD, DD/MM/YYYY, DD-MM-YYYY)
+DATE_PATTERN = re.compile(r"(\d{4}-\d{2}-\d{2}|\d{2}/\d{2}/\d{4}|\d{2}-\d{2}-\d{4})")
+# Numbered days (el 24, 25 de enero)
+DAY_PATTERN = re.compile(
+    r"(?:el\s+)?(\d{1,2})\s+(?:de\s+)?(?:enero|febrero|marzo|abril|mayo|junio|julio|agosto|septiembre|octubre|noviembre|diciembre)?"
+)
+# Times (10am, 14:30, 3pm)
+TIME_PATTERN = re.compile(r"(\d{1,2}):?(\d{0,2})\s*(?:am|pm|AM|PM|h)?|(\d{1,2})\s*(?:am|pm|AM|PM)")
+# Locations after "en"/"at" (en la clínica norte, at consultorio 1)
+LOCATION_PATTERN = PhrasePattern(
+    r"(?:en|at)\s++", r"(?:la\s++)?(?:clínica\s++)?",
+    r"A-ZÁÉÍÓÚa-záéíóú\d", r"el|la|los|las|\(", re.IGNORECASE,
+)
+TRAILING_PAREN_PATTERN = re.compile(r"\s+\($")
+# Services after "para"/"for" (para una consulta, for checkup)
+SERVICE_PATTERN = PhrasePattern(
+    r"(?:para|for)\s++", r"(?:una\s++|un\s++|a\s++)?",
+    "A-ZÁÉÍÓÚa-záéíóú", "con|with|en|at", re.IGNORECASE,
+)
+
+# Date keywords, checked in this order
+DATE_KEYWORDS = MappingProxyType({
+    "hoy": "today",
+    "mañana": "tomorrow",
+    "pasado mañana": "day_after_tomorrow",
+    "próximo": "next",
+    "próxima": "next",
+    "próximos": "next",
+    "próximas": "next",
+    "semana": "week",
+    "mes": "month",
+    "año": "year",
+    "lunes": "monday",
+    "martes": "tuesday",
+    "miércoles": "wednesday",
+    "jueves": "thursday",
+    "viernes": "friday",
+    "sábado": "saturday",
+    "domingo": "sunday",
+})
+# Service keywords, checked in this order
+SERVICE_KEYWORDS = ("consulta", "chequeo", "laboratorio", "radiografía", "ecografía", "revisión")
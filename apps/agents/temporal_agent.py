@@ -7,15 +7,180 @@ Responsible for:
 - Converting "próxima semana" to specific dates
 - Handling timezone conversions
 - Validating times are in business hours
+
+For a given day, the relative dates ParsingAgent extracts ("hoy", "mañana",
+"próxima semana", the weekday names, "day_24") always resolve the same way.
+``relative_dates`` keeps them resolved in a table per local date, built on
+the first request of the day in any timezone, so resolving one is a dict
+lookup; other references go through ``resolve_date``. Timezones are looked
+up once per process (``user_tz``).
 """
 
 import re
+import threading
 from typing import Any, Dict, Optional, Tuple
-from datetime import datetime, timedelta, time
+from datetime import date, datetime, timedelta, time
 import pytz
 import time as time_module
 
 from .base import BaseAgent, AgentResult
+from .prompt_patterns import DATE_KEYWORDS
+
+DEFAULT_TIMEZONE = "America/Mexico_City"
+
+ISO_DATE_PATTERN = re.compile(r"\d{4}-\d{2}-\d{2}")
+DMY_DATE_PATTERN = re.compile(r"(\d{2})[-/](\d{2})[-/](\d{4})")
+DAY_NUMBER_PATTERN = re.compile(r"(?:el\s+)?(\d{1,2})")
+CLOCK_TIME_PATTERN = re.compile(r"\d{1,2}:\d{2}")
+AM_PM_TIME_PATTERN = re.compile(r"(\d{1,2}):?(\d{0,2})\s*(am|pm|AM|PM)?")
+
+# Weekday names (próximo lunes, este viernes, etc.), checked in this order
+WEEKDAYS = {
+    "lunes": 0,
+    "martes": 1,
+    "miércoles": 2,
+    "miercoles": 2,
+    "jueves": 3,
+    "viernes": 4,
+    "sábado": 5,
+    "sabado": 5,
+    "domingo": 6,
+}
+
+# References resolved ahead in the per-day tables: what ParsingAgent extracts, plus the spellings checked here
+RELATIVE_DATES = tuple(dict.fromkeys([
+    *DATE_KEYWORDS,
+    "pasadomañana",
+    "próxima semana",
+    "proxima semana",
+    *WEEKDAYS,
+    *(f"day_{n}" for n in range(1, 32)),
+]))
+
+# Tables kept per process: the local dates in use around the world at once, with room to spare
+MAX_DATE_TABLES = 4
+
+# pytz timezones by name, looked up once per process
+_timezones: Dict[str, Any] = {}
+
+
+def user_tz(user_timezone: str):
+    """The timezone dates are resolved in (unknown names fall back to Mexico City)."""
+    tz = _timezones.get(user_timezone)
+    if tz is None:
+        try:
+            tz = _timezones[user_timezone] = pytz.timezone(user_timezone)
+        except pytz.exceptions.UnknownTimeZoneError:
+            # Not cached: the names come from requests
+            tz = user_tz(DEFAULT_TIMEZONE)
+    return tz
+
+
+def resolve_date(fecha_raw: str, today: date) -> Optional[str]:
+    """
+    Resolve a date reference to YYYY-MM-DD format.
+
+    Args:
+        fecha_raw: Raw date string (e.g., "mañana", "2026-01-24")
+        today: Current date in user's timezone
+
+    Returns:
+        Date in YYYY-MM-DD format or None
+    """
+    fecha_lower = fecha_raw.lower().strip()
+
+    # Explicit date format (YYYY-MM-DD)
+    if ISO_DATE_PATTERN.match(fecha_raw):
+        return fecha_raw
+
+    # DD/MM/YYYY or DD-MM-YYYY
+    date_match = DMY_DATE_PATTERN.match(fecha_raw)
+    if date_match:
+        day, month, year = date_match.groups()
+        try:
+            dt = datetime(int(year), int(month), int(day))
+            return dt.strftime("%Y-%m-%d")
+        except ValueError:
+            return None
+
+    # Relative date keywords
+    if "hoy" in fecha_lower:
+        return today.strftime("%Y-%m-%d")
+
+    if "mañana" in fecha_lower:
+        return (today + timedelta(days=1)).strftime("%Y-%m-%d")
+
+    if "pasado mañana" in fecha_lower or "pasadomañana" in fecha_lower:
+        return (today + timedelta(days=2)).strftime("%Y-%m-%d")
+
+    # Week relative (próxima semana)
+    if "próxima semana" in fecha_lower or "proxima semana" in fecha_lower:
+        # First day of next week (Monday)
+        days_ahead = 0 - today.weekday() + 7  # Monday = 0
+        return (today + timedelta(days=days_ahead)).strftime("%Y-%m-%d")
+
+    # Specific weekday (próximo lunes, este viernes, etc.)
+    for day_name, day_num in WEEKDAYS.items():
+        if day_name in fecha_lower:
+            # Find next occurrence of this weekday
+            days_ahead = day_num - today.weekday()
+            if days_ahead <= 0:  # Target day already happened this week
+                days_ahead += 7
+            return (today + timedelta(days=days_ahead)).strftime("%Y-%m-%d")
+
+    # Day number (el 24, day 25, etc.)
+    day_match = DAY_NUMBER_PATTERN.search(fecha_raw)
+    if day_match:
+        day_num = int(day_match.group(1))
+        # Assume same month or next month
+        try:
+            dt = datetime(today.year, today.month, day_num)
+            if dt.date() < today:
+                # Try next month
+                if today.month == 12:
+                    dt = datetime(today.year + 1, 1, day_num)
+                else:
+                    dt = datetime(today.year, today.month + 1, day_num)
+            return dt.strftime("%Y-%m-%d")
+        except ValueError:
+            return None
+
+    return None
+
+
+class RelativeDateTables:
+    """Per-process tables of ``RELATIVE_DATES`` resolved by ``resolve_date``, one per local date."""
+
+    def __init__(self, max_tables: int = MAX_DATE_TABLES):
+        self.max_tables = max_tables
+        self.builds = 0
+        self._tables: Dict[date, Dict[str, Optional[str]]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, today: date) -> Dict[str, Optional[str]]:
+        """The table for ``today``, built on its first use (a new local date somewhere)."""
+        table = self._tables.get(today)
+        if table is not None:
+            return table
+        table = {reference: resolve_date(reference, today) for reference in RELATIVE_DATES}
+        with self._lock:
+            self._tables[today] = table
+            self.builds += 1
+            while len(self._tables) > self.max_tables:
+                del self._tables[min(self._tables)]
+        return table
+
+    def clear(self):
+        """Drop all tables."""
+        with self._lock:
+            self._tables.clear()
+
+
+# Shared by every TemporalReasoningAgent in this process
+relative_dates = RelativeDateTables()
+
+# Marks a reference missing from a table
+_UNRESOLVED = object()
 
 
 class TemporalReasoningAgent(BaseAgent):
@@ -49,7 +214,7 @@ class TemporalReasoningAgent(BaseAgent):
         try:
             fecha_raw = input_data.get("fecha_raw")
             hora_raw = input_data.get("hora_raw")
-            user_timezone = input_data.get("user_timezone", "America/Mexico_City")
+            user_timezone = input_data.get("user_timezone", DEFAULT_TIMEZONE)
             current_datetime_str = input_data.get("current_datetime")
 
             if not fecha_raw or not hora_raw:
@@ -121,10 +286,7 @@ class TemporalReasoningAgent(BaseAgent):
         self, timezone_str: str, current_datetime_str: Optional[str] = None
     ) -> datetime:
         """Get current datetime in specified timezone."""
-        try:
-            tz = pytz.timezone(timezone_str)
-        except pytz.exceptions.UnknownTimeZoneError:
-            tz = pytz.timezone("America/Mexico_City")
+        tz = user_tz(timezone_str)
 
         if current_datetime_str:
             # Parse ISO 8601 datetime
@@ -148,78 +310,12 @@ class TemporalReasoningAgent(BaseAgent):
         Returns:
             Date in YYYY-MM-DD format or None
         """
-        fecha_lower = fecha_raw.lower().strip()
         today = current_dt.date()
-
-        # Explicit date format (YYYY-MM-DD)
-        if re.match(r"\d{4}-\d{2}-\d{2}", fecha_raw):
-            return fecha_raw
-
-        # DD/MM/YYYY or DD-MM-YYYY
-        date_match = re.match(r"(\d{2})[-/](\d{2})[-/](\d{4})", fecha_raw)
-        if date_match:
-            day, month, year = date_match.groups()
-            try:
-                dt = datetime(int(year), int(month), int(day))
-                return dt.strftime("%Y-%m-%d")
-            except ValueError:
-                return None
-
-        # Relative date keywords
-        if "hoy" in fecha_lower:
-            return today.strftime("%Y-%m-%d")
-
-        if "mañana" in fecha_lower:
-            return (today + timedelta(days=1)).strftime("%Y-%m-%d")
-
-        if "pasado mañana" in fecha_lower or "pasadomañana" in fecha_lower:
-            return (today + timedelta(days=2)).strftime("%Y-%m-%d")
-
-        # Week relative (próxima semana)
-        if "próxima semana" in fecha_lower or "proxima semana" in fecha_lower:
-            # First day of next week (Monday)
-            days_ahead = 0 - today.weekday() + 7  # Monday = 0
-            return (today + timedelta(days=days_ahead)).strftime("%Y-%m-%d")
-
-        # Specific weekday (próximo lunes, este viernes, etc.)
-        weekdays = {
-            "lunes": 0,
-            "martes": 1,
-            "miércoles": 2,
-            "miercoles": 2,
-            "jueves": 3,
-            "viernes": 4,
-            "sábado": 5,
-            "sabado": 5,
-            "domingo": 6,
-        }
-
-        for day_name, day_num in weekdays.items():
-            if day_name in fecha_lower:
-                # Find next occurrence of this weekday
-                days_ahead = day_num - today.weekday()
-                if days_ahead <= 0:  # Target day already happened this week
-                    days_ahead += 7
-                return (today + timedelta(days=days_ahead)).strftime("%Y-%m-%d")
-
-        # Day number (el 24, day 25, etc.)
-        day_match = re.search(r"(?:el\s+)?(\d{1,2})", fecha_raw)
-        if day_match:
-            day_num = int(day_match.group(1))
-            # Assume same month or next month
-            try:
-                dt = datetime(today.year, today.month, day_num)
-                if dt.date() < today:
-                    # Try next month
-                    if today.month == 12:
-                        dt = datetime(today.year + 1, 1, day_num)
-                    else:
-                        dt = datetime(today.year, today.month + 1, day_num)
-                return dt.strftime("%Y-%m-%d")
-            except ValueError:
-                return None
-
-        return None
+        # resolve_date() answers any spelling of a table key (case, surrounding blanks) as it answers the key
+        fecha = relative_dates.get(today).get(fecha_raw.lower().strip(), _UNRESOLVED)
+        if fecha is _UNRESOLVED:
+            fecha = resolve_date(fecha_raw, today)
+        return fecha
 
     def _resolve_time(self, hora_raw: str, current_dt: datetime) -> Optional[Dict[str, str]]:
         """
@@ -235,7 +331,7 @@ class TemporalReasoningAgent(BaseAgent):
         hora_lower = hora_raw.lower().strip()
 
         # Explicit time format (HH:MM)
-        if re.match(r"\d{1,2}:\d{2}", hora_raw):
+        if CLOCK_TIME_PATTERN.match(hora_raw):
             hora = hora_raw
             # Add one hour for end time
             h, m = map(int, hora.split(":"))
@@ -244,7 +340,7 @@ class TemporalReasoningAgent(BaseAgent):
             return {"hora": hora, "hora_fin": hora_fin}
 
         # Time with am/pm (10am, 3pm, 14:30pm)
-        time_match = re.match(r"(\d{1,2}):?(\d{0,2})\s*(am|pm|AM|PM)?", hora_raw)
+        time_match = AM_PM_TIME_PATTERN.match(hora_raw)
         if time_match:
             hour = int(time_match.group(1))
             minute = int(time_match.group(2)) if time_match.group(2) else 0
@@ -4,18 +4,29 @@ Tests for AI agents.
 Covers unit tests for individual agents and integration tests for the orchestrator.
 """
 
+import asyncio
+import random
+import re
 import unittest
 from datetime import datetime, timedelta
+from difflib import SequenceMatcher
 from unittest.mock import Mock, patch, MagicMock
 
+from django.test import TestCase
+
 from .base import AgentResult, BaseAgent
 from .parsing_agent import ParsingAgent
-from .temporal_agent import TemporalReasoningAgent
+from . import prompt_patterns, temporal_agent
+from .temporal_agent import RELATIVE_DATES, RelativeDateTables, TemporalReasoningAgent, resolve_date
 from .geo_agent import GeoReasoningAgent
+from .location_matcher import LocationMatcher, LocationMatcherCache
 from .validation_agent import ValidationAgent
 from .availability_agent import AvailabilityAgent
 from .negotiation_agent import NegotiationAgent
 from .orchestrator import AgentOrchestrator, DecisionTrace
+from .prompt_cache import PromptCache, normalize_prompt, user_tz
+from .pipeline import Stage, StageGraph, StopPipeline
+from data.names import ContactNameIndex
 
 
 class TestParsingAgent(unittest.TestCase):
@@ -67,6 +78,149 @@ class TestParsingAgent(unittest.TestCase):
         self.assertTrue(result.is_error())
 
 
+# (prompt, (contacto_nombre, fecha_raw, hora_raw, ubicacion, servicio)) as
+# extracted before the patterns moved to prompt_patterns.py: typical
+# requests plus the patterns' corner cases (keywords inside words,
+# uppercase triggers, digits the day and time patterns pick up, phrases)
+PARSING_CORPUS = [
+    ('cita mañana 10am con Dr. Pérez',
+     ('Pérez', 'mañana', '10:00', None, None)),
+    ('Necesito una cita mañana a las 10am con Dr. Pérez en Clínica Norte para una consulta',
+     ('Pérez', 'mañana', '10:00', 'Norte para una consulta', 'consulta')),
+    ('agendar consulta el 24 de enero a las 14:30 con la Dra. García',
+     (None, 'day_24', '24:00', None, 'consulta')),
+    ('quiero ver al doctor lópez el próximo lunes por la tarde en consultorio 3',
+     (None, 'próximo', '3:00', 'consultorio 3', None)),
+    ('CITA CON DR. RAMÍREZ EN LA CLÍNICA SUR EL VIERNES A LAS 9',
+     ('RAMÍREZ', 'viernes', '9:00', 'SUR', None)),
+    ('Con Ana López pasado mañana',
+     (None, 'mañana', None, None, None)),
+    ('with Dr. Smith at Main Office tomorrow 3pm for a checkup',
+     ('Smith', None, '3:00', 'Main Office tomorrow 3pm for a checkup', 'checkup')),
+    ('reservar para un chequeo con doctora Ruiz en Hospital Central (sede 2)',
+     ('Ruiz', None, '2:00', 'Hospital Central', 'chequeo')),
+    ('el 5 de marzo 16h con el médico de guardia',
+     (None, 'day_5', '5:00', None, None)),
+    ('cita el 2026-03-15 a las 08:00 con Dra. Núñez',
+     ('Dra', '2026-03-15', '20:26', None, None)),
+    ('cita el 15/03/2026 con Dr. Ortiz en Consultorio 4 los martes',
+     ('Ortiz', 'martes', '15:00', 'Consultorio 4', None)),
+    ('el 10:00 de la mañana',
+     (None, 'mañana', '10:00', None, None)),
+    ('tengo 2 preguntas para la recepción',
+     (None, 'day_2', '2:00', None, 'la recepción')),
+    ('radiografía en la madrugada con Dr. Vega',
+     ('Vega', None, 'early_morning', None, 'radiografía')),
+    ('quiero ecografía y revisión la semana que viene',
+     (None, 'semana', None, None, 'ecografía')),
+    ('los próximos días en la noche',
+     (None, 'próximo', 'evening', 'noche', None)),
+    ('en  dos  semanas   con   Dr.   Paz',
+     ('Paz', 'semana', None, None, None)),
+    ('hoy',
+     (None, 'hoy', None, None, None)),
+    ('mes de mayo, con Lucía Torres, consulta en Roma',
+     ('Lucía Torres', 'mes', None, 'Roma', 'consulta')),
+    ('citaen centro 12 con Dra. Fe',
+     ('Fe', 'day_12', '12:00', None, None)),
+    ('Tienen hueco el martes? Gracias',
+     (None, 'martes', None, 'hueco', None)),
+    ('para con',
+     (None, None, None, None, 'con')),
+    ('consultorio 7 at 7',
+     (None, 'day_7', '7:00', '7', None)),
+    ('agenda a las 7 y 45 en la sede 12 el 3',
+     (None, 'day_7', '7:00', 'sede 12', None)),
+    ('año nuevo para revisión de laboratorio con Dr. Año',
+     ('Dr', 'año', None, None, 'revisión de laboratorio')),
+    ("WITH DR. O'BRIEN AT ST. MARY",
+     (None, None, None, None, None)),
+    ('cita 24 25 26',
+     (None, 'day_24', '24:00', None, None)),
+    ('Dra. Pérez el miércoles tempranito',
+     (None, 'miércoles', None, None, None)),
+    ('señor Gómez con Dr. Íñiguez en Clínica Ñuñoa a las 11am',
+     ('Dr', None, '11:00', None, None)),
+    ('cita mañana 10am con Dr. İnce en Clínica Sur',
+     ('İnce', 'mañana', '10:00', 'Sur', None)),
+]
+
+
+class TestParsingCorpus(unittest.TestCase):
+    """Tests that ParsingAgent extracts the recorded entities from the prompt corpus."""
+
+    def test_corpus(self):
+        """Test every corpus prompt against its recorded extraction."""
+        agent = ParsingAgent()
+        for prompt, expected in PARSING_CORPUS:
+            data = agent.run({"prompt": prompt}).data
+            extracted = tuple(data[key] for key in ("contacto_nombre", "fecha_raw", "hora_raw", "ubicacion", "servicio"))
+            self.assertEqual(extracted, expected, prompt)
+
+
+class TestPhrasePattern(unittest.TestCase):
+    """Tests for the linear-time contact, location and service patterns."""
+
+    # The lazy patterns PhrasePattern replaced
+    PREVIOUS = {
+        "CONTACT_PATTERN": re.compile(
+            r"(?:con|with)\s+(?:dr\.?|dra\.?|doctor|doctora|médico|médica)\.?\s+([A-ZÁÉÍÓÚa-záéíóú\s]+?)(?:\s+(?:en|en la|at|at the)|$)",
+            re.IGNORECASE,
+        ),
+        "LOCATION_PATTERN": re.compile(
+            r"(?:en|at)\s+(?:la\s+)?(?:clínica\s+)?([A-ZÁÉÍÓÚa-záéíóú\s\d]+?)(?:\s+(?:el|la|los|las|\()|$)",
+            re.IGNORECASE,
+        ),
+        "SERVICE_PATTERN": re.compile(
+            r"(?:para|for)\s+(?:una\s+|un\s+|a\s+)?([A-ZÁÉÍÓÚa-záéíóú\s]+?)(?:\s+(?:con|with|en|at)|$)",
+            re.IGNORECASE,
+        ),
+    }
+    WORDS = ["con", "with", "Dr.", "dra", "doctora", "Pérez", "García", "x", "en", "EN", "la", "el",
+             "clínica", "(x)", "para", "una", "un", "a", "at", "for", "12", "Norte", "consulta,", "!"]
+    SEPARATORS = [" ", " ", "  ", "\n", " \t "]
+
+    def test_matches_previous_patterns(self):
+        """Test that random prompts match where and as the lazy patterns did."""
+        rng = random.Random(21)
+        for _ in range(5000):
+            prompt = "".join(rng.choice(self.WORDS) + rng.choice(self.SEPARATORS) for _ in range(rng.randint(1, 10)))
+            prompt = prompt.rstrip() if rng.random() < 0.5 else prompt
+            for name, previous in self.PREVIOUS.items():
+                old = previous.search(prompt)
+                new = getattr(prompt_patterns, name).search(prompt)
+                if old and not old.group(1).strip():
+                    continue  # whitespace-only capture: no longer matched
+                self.assertEqual(
+                    (old.start(), old.group(1).strip()) if old else None,
+                    (new.start(), new.group(1).strip()) if new else None,
+                    f"{name}: {prompt!r}",
+                )
+
+    def test_long_phrases(self):
+        """Test 10 KB phrases with and without a stop word."""
+        spaces = " " * 10000
+        self.assertIsNone(prompt_patterns.CONTACT_PATTERN.search("con dr a" + spaces + "!"))
+        self.assertIsNone(prompt_patterns.LOCATION_PATTERN.search("en a " * 2000 + "!"))
+        self.assertIsNone(prompt_patterns.SERVICE_PATTERN.search("para a" + spaces + "!"))
+        match = prompt_patterns.CONTACT_PATTERN.search("con Dr. Pérez" + spaces + "en Norte")
+        self.assertEqual(match.group(1), "Pérez")
+
+    def test_prompt_too_long(self):
+        """Test that ParsingAgent rejects prompts over MAX_PROMPT_LENGTH."""
+        agent = ParsingAgent()
+        self.assertFalse(agent.run({"prompt": "x" * prompt_patterns.MAX_PROMPT_LENGTH}).is_error())
+        result = agent.run({"prompt": "x" * (prompt_patterns.MAX_PROMPT_LENGTH + 1)})
+        self.assertTrue(result.is_error())
+        self.assertIn("too long", result.message)
+
+    def test_time_budget(self):
+        """Test that the watchdog abandons a prompt past the time budget."""
+        result = ParsingAgent(time_budget_ms=-1).run({"prompt": "cita mañana con Dr. Pérez"})
+        self.assertTrue(result.is_error())
+        self.assertEqual(result.errors, ["parsing_timeout"])
+
+
 class TestTemporalReasoningAgent(unittest.TestCase):
     """Tests for TemporalReasoningAgent."""
 
@@ -116,6 +270,111 @@ class TestTemporalReasoningAgent(unittest.TestCase):
         # Should succeed but with warning about business hours
         self.assertTrue(result.status in ["success", "warning"])
 
+    def test_relative_date_tables_match_resolution(self):
+        """Test that the per-day tables resolve every reference as the keyword checks do."""
+        references = [*RELATIVE_DATES, "MAÑANA", " Lunes ", "Day_31", "el 24", "próximo viernes", "2026-03-05",
+                      "15/03/2026", "31-02-2026", "algún día"]
+        tables = RelativeDateTables(max_tables=2)
+        with patch.object(temporal_agent, "relative_dates", tables):
+            for offset in range(70):
+                today = datetime(2026, 11, 25) + timedelta(days=offset)
+                for reference in references:
+                    self.assertEqual(self.agent._resolve_date(reference, today), resolve_date(reference, today.date()),
+                                     f"{reference!r} on {today:%Y-%m-%d}")
+        self.assertEqual(tables.builds, 70)
+        self.assertEqual(len(tables._tables), 2)
+
+    def test_relative_date_table_per_local_date(self):
+        """Test that a timezone moves to the next day's table at its local midnight."""
+        def tomorrow(current_datetime, user_timezone="America/Mexico_City"):
+            return self.agent.run({"fecha_raw": "mañana", "hora_raw": "10:00", "user_timezone": user_timezone,
+                                   "current_datetime": current_datetime}).data["fecha"]
+
+        tables = RelativeDateTables()
+        with patch.object(temporal_agent, "relative_dates", tables):
+            self.assertEqual(tomorrow("2026-03-02T23:59:00-06:00"), "2026-03-03")
+            self.assertEqual(tomorrow("2026-03-03T00:00:00-06:00"), "2026-03-04")
+            # Already 2026-03-03 in Tokyo: same table as Mexico City after its midnight
+            self.assertEqual(tomorrow("2026-03-02T23:59:00-06:00", "Asia/Tokyo"), "2026-03-04")
+        self.assertEqual(tables.builds, 2)
+        self.assertIs(user_tz("Asia/Tokyo"), user_tz("Asia/Tokyo"))
+        self.assertIs(user_tz("Mars/Olympus_Mons"), user_tz("America/Mexico_City"))
+
+
+class TestPromptCache(unittest.TestCase):
+    """Tests for PromptCache (per-day cache of parsing and temporal results)."""
+
+    TZ = "America/Mexico_City"
+
+    def setUp(self):
+        """Set up a cache on a clock set to 2026-03-02 23:59 in Mexico City."""
+        self.now = user_tz(self.TZ).localize(datetime(2026, 3, 2, 23, 59)).timestamp()
+        self.cache = PromptCache(max_entries=2, ttl=3600, clock=lambda: self.now)
+        self.result = AgentResult(status="success", data={"fecha": "2026-03-03"}, message="ok")
+
+    def test_hits_misses_and_lru_eviction(self):
+        """Test that lookups are counted and the least recently used prompt is evicted."""
+        first, second, third = (self.cache.key(prompt, self.TZ) for prompt in ("a", "b", "c"))
+        self.assertIsNone(self.cache.get(first, "parsing"))
+        self.cache.put(first, "parsing", self.result)
+        self.cache.put(second, "parsing", self.result)
+        self.assertIs(self.cache.get(first, "parsing"), self.result)
+        self.cache.put(third, "parsing", self.result)
+
+        self.assertIsNone(self.cache.get(second, "parsing"))
+        self.assertIs(self.cache.get(first, "parsing"), self.result)
+        stats = self.cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["entries"], stats["evicted"]), (2, 2, 2, 1))
+        self.assertEqual(stats["hit_rate"], 0.5)
+        self.assertEqual(stats["stages"]["parsing"]["hit_rate"], 0.5)
+
+    def test_expires_at_local_midnight(self):
+        """Test that a result is not served after the local midnight ending its date."""
+        key = self.cache.key("cita mañana 10am", self.TZ)
+        self.assertEqual(str(key.local_date), "2026-03-02")
+        self.cache.put(key, "temporal_reasoning", self.result)
+        self.assertIs(self.cache.get(key, "temporal_reasoning"), self.result)
+
+        self.now += 61
+        self.assertIsNone(self.cache.get(key, "temporal_reasoning"))
+        self.assertEqual(str(self.cache.key("cita mañana 10am", self.TZ).local_date), "2026-03-03")
+        self.assertEqual(self.cache.stats()["expired"], 1)
+
+    def test_keeps_nothing_computed_after_midnight_or_failed(self):
+        """Test that results put after the key's midnight, errors and results past the TTL are not served."""
+        key = self.cache.key("cita mañana 10am", self.TZ)
+        self.now += 61
+        self.cache.put(key, "temporal_reasoning", self.result)
+        self.assertEqual(self.cache.stats()["entries"], 0)
+
+        key = self.cache.key("cita mañana 10am", self.TZ)
+        self.cache.put(key, "parsing", AgentResult(status="error", data={}, message="Parsing timed out"))
+        self.assertEqual(self.cache.stats()["entries"], 0)
+
+        self.cache.put(key, "parsing", self.result)
+        self.now += 3601
+        self.assertIsNone(self.cache.get(key, "parsing"))
+
+    def test_normalize_prompt(self):
+        """Test that prompts differing in whitespace or Unicode composition share a key."""
+        self.assertEqual(normalize_prompt("  cita  man\u0303ana\n10am "), "cita mañana 10am")
+
+    def test_orchestrator_reuses_results_for_the_day(self):
+        """Test that a repeated prompt skips parsing and temporal reasoning until the date changes."""
+        orchestrator = AgentOrchestrator(max_workers=0, prompt_cache_size=10)
+        orchestrator.prompt_cache._clock = lambda: self.now
+        stores = {"contact_store": None}
+        with patch.object(orchestrator.parsing_agent, "run", wraps=orchestrator.parsing_agent.run) as parsing, \
+                patch.object(orchestrator.temporal_agent, "run", wraps=orchestrator.temporal_agent.run) as temporal:
+            first = orchestrator.process_appointment_prompt("cita mañana 10am con Dr. Pérez", stores=stores)
+            again = orchestrator.process_appointment_prompt(" cita  mañana 10am con Dr. Pérez", stores=stores)
+            self.assertEqual((parsing.call_count, temporal.call_count), (1, 1))
+            self.assertEqual(again["trace"].agents, first["trace"].agents)
+
+            self.now += 61
+            orchestrator.process_appointment_prompt("cita mañana 10am con Dr. Pérez", stores=stores)
+            self.assertEqual((parsing.call_count, temporal.call_count), (2, 2))
+        self.assertEqual(orchestrator.prompt_cache.stats()["hit_rate"], round(2 / 6, 4))
 
 class TestGeoReasoningAgent(unittest.TestCase):
     """Tests for GeoReasoningAgent."""
@@ -166,6 +425,47 @@ class TestGeoReasoningAgent(unittest.TestCase):
         # Should use default location
         self.assertTrue(result.is_success())
 
+    def test_low_confidence_match_has_suggestions(self):
+        """Test that a weak fuzzy match comes back as a warning with the closest locations."""
+        result = self.agent.run({
+            "ubicacion_raw": "consultorio sur",
+            "contacto_id": "contact_1",
+            "available_locations": self.sample_locations
+        })
+        self.assertEqual(result.status, "warning")
+        self.assertEqual([s["id"] for s in result.data["suggestions"]][0], result.data["location_id"])
+
+    def test_matcher_same_result_as_full_scan(self):
+        """Test that the pruned search picks the location a SequenceMatcher scan over all names picks."""
+        words = ["Clínica", "Consultorio", "Hospital", "Centro", "Norte", "Sur", "Polanco", "Roma",
+                 "Del Valle", "Coyoacán", "San Ángel", "Santa Fe", "Condesa", "Narvarte", "Juárez"]
+        locations = [
+            {"id": f"loc_{i}", "nombre": f"{words[i % 4]} {words[4 + i % 11]} {i // 44 or ''}".strip()}
+            for i in range(300)
+        ]
+        matcher = LocationMatcher(locations)
+        for query in ["clinica polanko", "hospital rroma 2", "centro sn angel", "norte", "xyz", "cons del vale 5"]:
+            lowered = query.lower().strip()
+            scores = [SequenceMatcher(None, lowered, loc["nombre"].lower()).ratio() for loc in locations]
+            expected = max(range(len(locations)), key=lambda i: (scores[i], -i))
+            match = matcher.fuzzy(query)
+            self.assertEqual(match["location_id"], locations[expected]["id"], query)
+            self.assertAlmostEqual(match["confidence"], scores[expected])
+            ranked = sorted(range(len(locations)), key=lambda i: (-scores[i], i))[:3]
+            self.assertEqual([s["id"] for s in matcher.suggestions(query)], [locations[i]["id"] for i in ranked])
+
+    def test_matcher_rebuilt_when_locations_change(self):
+        """Test that the cached matcher is reused until the contact's locations change."""
+        cache = LocationMatcherCache()
+        first = cache.get("contact_1", self.sample_locations)
+        self.assertIs(cache.get("contact_1", [dict(loc) for loc in self.sample_locations]), first)
+
+        renamed = [self.sample_locations[0], {"id": "loc_2", "nombre": "Clínica Sur"}]
+        second = cache.get("contact_1", renamed)
+        self.assertIsNot(second, first)
+        self.assertEqual(second.exact("clinica sur")["location_id"], "loc_2")
+        self.assertIsNone(second.exact("clinica norte"))
+
 
 class TestValidationAgent(unittest.TestCase):
     """Tests for ValidationAgent."""
@@ -219,6 +519,40 @@ class TestValidationAgent(unittest.TestCase):
         self.assertTrue(result.is_error())
 
 
+class TestNegotiationAgent(unittest.TestCase):
+    """Tests for NegotiationAgent."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.agent = NegotiationAgent()
+        self.apt_store = MagicMock()
+        self.contact_store = MagicMock()
+        self.contact_store.check_availability.return_value = (True, None)
+
+    def test_suggestions_are_computed_in_minutes(self):
+        """Test that candidates reach the stores as minutes and leave as HH:MM."""
+        # Every same-day slot conflicts, so the next weekdays are tried
+        self.apt_store.check_conflicts_many.side_effect = lambda candidates, exclude_id=None: [
+            [{"type": "full_overlap"}] if c["fecha"] == "2026-03-06" else [] for c in candidates
+        ]
+        result = self.agent.run({
+            "contacto_id": "contact_123",
+            "fecha": "2026-03-06",  # Friday
+            "hora_inicio": "10:30",
+            "stores": {"appointment_store": self.apt_store, "contact_store": self.contact_store},
+        })
+
+        self.assertTrue(result.is_success())
+        same_day, next_days = [call.args[0] for call in self.apt_store.check_conflicts_many.call_args_list]
+        self.assertEqual(same_day[0]["hora_inicio"], 8 * 60)
+        self.assertNotIn(10 * 60 + 30, [c["hora_inicio"] for c in same_day])
+        self.assertEqual([c["fecha"] for c in next_days], ["2026-03-09"])
+        self.assertEqual(
+            [(s["fecha"], s["hora_inicio"], s["hora_fin"]) for s in result.data["suggestions"]],
+            [("2026-03-09", "10:30", "11:30")]
+        )
+
+
 class TestAgentResult(unittest.TestCase):
     """Tests for AgentResult data class."""
 
@@ -258,6 +592,124 @@ class TestAgentResult(unittest.TestCase):
         self.assertEqual(result_dict["message"], "Success")
 
 
+class TestStageGraph(unittest.TestCase):
+    """Tests for the stage dependency graph runner."""
+
+    def setUp(self):
+        """Set up a thread pool for concurrent stages."""
+        from concurrent.futures import ThreadPoolExecutor
+
+        self.executor = ThreadPoolExecutor(max_workers=4)
+        self.addCleanup(self.executor.shutdown)
+
+    def _sleep(self, seconds, value=None):
+        import time as time_module
+
+        def stage(context):
+            time_module.sleep(seconds)
+            return value
+        return stage
+
+    def test_independent_stages_run_concurrently(self):
+        """Test that sibling stages overlap, so the run takes the longest branch."""
+        import time as time_module
+
+        graph = StageGraph([
+            Stage("root", lambda context: 1),
+            Stage("a", self._sleep(0.05, "a"), ("root",)),
+            Stage("b", self._sleep(0.05, "b"), ("root",)),
+            Stage("c", self._sleep(0.05, "c"), ("root",)),
+            Stage("join", lambda context: context["a"] + context["b"] + context["c"], ("a", "b", "c")),
+        ])
+        start = time_module.perf_counter()
+        run = graph.run({}, self.executor)
+        elapsed = time_module.perf_counter() - start
+
+        self.assertEqual(run.outputs["join"], "abc")
+        self.assertLess(elapsed, 0.12)
+        self.assertEqual(run.critical_path()[0], "root")
+        self.assertEqual(run.critical_path()[-1], "join")
+        self.assertEqual(len(run.critical_path()), 3)
+
+    def test_critical_path_follows_longest_branch(self):
+        """Test that the critical path goes through the slowest dependency."""
+        graph = StageGraph([
+            Stage("root", lambda context: None),
+            Stage("fast", self._sleep(0.0), ("root",)),
+            Stage("slow", self._sleep(0.03), ("root",)),
+            Stage("join", lambda context: None, ("fast", "slow")),
+        ])
+        run = graph.run({}, self.executor)
+        self.assertEqual(run.critical_path(), ["root", "slow", "join"])
+        summary = {stage["stage"]: stage for stage in run.stages()}
+        self.assertGreaterEqual(summary["slow"]["duration_ms"], 25)
+        self.assertEqual(summary["join"]["depends_on"], ["fast", "slow"])
+
+    def test_stop_skips_dependents_and_reports_earliest_stage(self):
+        """Test that a stop skips downstream stages and the earliest declared stop wins."""
+        def stop(message):
+            def stage(context):
+                raise StopPipeline({"message": message})
+            return stage
+
+        graph = StageGraph([
+            Stage("root", lambda context: None),
+            Stage("first", self._sleep(0.02), ("root",)),
+            Stage("first_stop", stop("first"), ("first",)),
+            Stage("second_stop", stop("second"), ("root",)),
+            Stage("after", lambda context: None, ("second_stop",)),
+            Stage("join", lambda context: None, ("first_stop", "after")),
+        ])
+        run = graph.run({}, self.executor)
+
+        self.assertEqual(run.first_error().response["message"], "first")
+        self.assertEqual(run.status["after"], "skipped")
+        self.assertEqual(run.status["join"], "skipped")
+        self.assertNotIn("after", run.timings)
+
+    def test_sequential_run_without_executor(self):
+        """Test that stages run in dependency order in the caller without an executor."""
+        order = []
+        graph = StageGraph([
+            Stage("a", lambda context: order.append("a")),
+            Stage("b", lambda context: order.append("b"), ("a",)),
+            Stage("c", lambda context: order.append("c"), ("a",)),
+        ])
+        graph.run({})
+        self.assertEqual(order, ["a", "b", "c"])
+
+    def test_async_run_matches_threaded_run(self):
+        """Test that arun overlaps sibling stages and skips the dependents of a stop."""
+        import time as time_module
+
+        def stop(context):
+            raise StopPipeline({"message": "stop"})
+
+        graph = StageGraph([
+            Stage("root", lambda context: 1),
+            Stage("a", self._sleep(0.05, "a"), ("root",)),
+            Stage("b", self._sleep(0.05, "b"), ("root",)),
+            Stage("join", lambda context: context["a"] + context["b"], ("a", "b")),
+            Stage("halt", stop, ("root",)),
+            Stage("after", lambda context: None, ("halt",)),
+        ])
+        start = time_module.perf_counter()
+        run = asyncio.run(graph.arun({}, self.executor))
+        elapsed = time_module.perf_counter() - start
+
+        self.assertEqual(run.outputs["join"], "ab")
+        self.assertLess(elapsed, 0.09)
+        self.assertEqual(run.first_error().response["message"], "stop")
+        self.assertEqual(run.status["after"], "skipped")
+
+    def test_invalid_graphs_raise(self):
+        """Test that unknown dependencies and cycles are rejected."""
+        with self.assertRaises(ValueError):
+            StageGraph([Stage("a", lambda context: None, ("missing",))])
+        with self.assertRaises(ValueError):
+            StageGraph([Stage("a", lambda context: None, ("b",)), Stage("b", lambda context: None, ("a",))])
+
+
 class TestAgentOrchestrator(unittest.TestCase):
     """Tests for AgentOrchestrator."""
 
@@ -289,7 +741,14 @@ class TestAgentOrchestrator(unittest.TestCase):
                 {"id": "loc_1", "nombre": "Clínica Centro"}
             ]
         }
+        names = ContactNameIndex()
+        names.build([(c["id"], c["nombre"], c["activo"]) for c in self.mock_contact_store.list_all.return_value])
+        self.mock_contact_store.search_by_name.side_effect = names.search
         self.mock_apt_store.check_conflicts.return_value = []
+        self.mock_apt_store.find_overlaps.return_value = []
+        self.mock_apt_store.check_conflicts_many.side_effect = lambda candidates, exclude_id=None: [
+            [] for _ in candidates
+        ]
         self.mock_contact_store.check_availability.return_value = (True, None)
 
         self.stores = {
@@ -320,6 +779,358 @@ class TestAgentOrchestrator(unittest.TestCase):
         self.assertEqual(trace.final_status, "pending")
         self.assertIsInstance(trace.agents, list)
 
+    def test_trace_records_stage_timings_and_critical_path(self):
+        """Test that the trace lists every stage with its wall time and the critical path."""
+        result = self.orchestrator.process_appointment_prompt(
+            "cita mañana 10am con Dr. Pérez", stores=self.stores
+        )
+        trace = result["trace"]
+
+        self.assertEqual(result["status"], "success")
+        self.assertEqual([stage["stage"] for stage in trace.stages], [name for name, _, _ in AgentOrchestrator.STAGES])
+        self.assertTrue(all(stage["status"] == "ok" for stage in trace.stages))
+        self.assertEqual(trace.critical_path[0], "parsing")
+        self.assertEqual(trace.critical_path[-1], "negotiation")
+        self.assertEqual(
+            [agent["agent"] for agent in trace.agents],
+            ["parsing", "temporal_reasoning", "geo_reasoning", "validation", "availability"],
+        )
+
+    def test_earliest_failing_stage_is_reported(self):
+        """Test that a date error wins over a contact error raised by a concurrent stage."""
+        result = self.orchestrator.process_appointment_prompt("cita con Dr. Desconocido", stores=self.stores)
+        statuses = {stage["stage"]: stage["status"] for stage in result["trace"].stages}
+
+        self.assertTrue(result["message"].startswith("Could not resolve date/time"))
+        self.assertEqual(statuses["temporal_reasoning"], "stopped")
+        self.assertEqual(statuses["validation"], "skipped")
+
+    def test_async_pipeline_matches_sync(self):
+        """Test that aprocess_appointment_prompt gives the same outcome as the sync pipeline."""
+        prompts = [
+            "cita mañana 10am con Dr. Pérez",
+            "cita con Dr. Desconocido",
+            "cita mañana 10am con Dr. Desconocido",
+        ]
+
+        def outcome(result):
+            data = dict(result["data"] or {})
+            data.pop("trace_id", None)
+            return result["status"], result["message"], data, result["trace"].final_status
+
+        for prompt in prompts:
+            expected = outcome(self.orchestrator.process_appointment_prompt(prompt, stores=self.stores))
+            actual = outcome(asyncio.run(self.orchestrator.aprocess_appointment_prompt(prompt, stores=self.stores)))
+            self.assertEqual(actual, expected, prompt)
+
+    def test_structured_request_skips_parsing_and_temporal(self):
+        """Test that a structured request matches the prompt path without running parsing or temporal."""
+        tomorrow = (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d")
+        prompt_result = self.orchestrator.process_appointment_prompt(
+            "cita mañana 10am con Dr. Pérez", stores=self.stores
+        )
+        result = self.orchestrator.process_structured_request(
+            "contact_dr_perez", tomorrow, "10:00", prompt="desde n8n", stores=self.stores
+        )
+        trace = result["trace"]
+
+        self.assertEqual(result["status"], "success")
+        for key in ("contacto_id", "fecha", "hora_inicio", "hora_fin", "ubicacion_id"):
+            self.assertEqual(result["data"][key], prompt_result["data"][key], key)
+        self.assertEqual(result["data"]["contacto_nombre"], "Dr. Pérez")
+        self.assertEqual(trace.input_mode, "structured")
+        self.assertEqual(trace.input_prompt, "desde n8n")
+        self.assertEqual(trace.input_fields["contacto_id"], "contact_dr_perez")
+        self.assertEqual(
+            [stage["stage"] for stage in trace.stages],
+            ["contact_resolution", "service_lookup", "geo_reasoning", "validation", "availability", "negotiation"],
+        )
+        self.assertEqual([agent["agent"] for agent in trace.agents], ["validation", "availability"])
+
+    def test_structured_request_unknown_contact_and_conflict(self):
+        """Test that a structured request reports unknown contacts and conflicts like the prompt path."""
+        self.mock_contact_store.get_by_id.return_value = None
+        result = self.orchestrator.process_structured_request(
+            "contact_nadie", "2027-03-10", "9:00", stores=self.stores
+        )
+        self.assertEqual(result["status"], "error")
+        self.assertEqual(result["message"], "Could not find contact: contact_nadie")
+        self.assertEqual(result["trace"].final_status, "error")
+
+        self.mock_contact_store.get_by_id.return_value = {"id": "contact_dr_perez", "nombre": "Dr. Pérez", "activo": True}
+        self.mock_contact_store.check_availability.return_value = (False, "Outside working hours")
+        result = asyncio.run(self.orchestrator.aprocess_structured_request(
+            "contact_dr_perez", "2027-03-10", "9:00", hora_fin="9:30", stores=self.stores
+        ))
+        self.assertEqual(result["status"], "conflict")
+        self.assertEqual(result["trace"].stages[-1]["status"], "stopped")
+
+    def test_instance_is_shared_across_threads(self):
+        """Test that instance() builds a single orchestrator under concurrent first use."""
+        from concurrent.futures import ThreadPoolExecutor
+
+        with patch.object(AgentOrchestrator, "_instance", None):
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                instances = list(pool.map(lambda _: AgentOrchestrator.instance(), range(32)))
+        self.assertEqual(len({id(instance) for instance in instances}), 1)
+
+    def test_pool_stages_recycle_connections(self):
+        """Test that stages on the pool drop stale connections before and after running, the caller's are kept."""
+        import threading
+
+        orchestrator = AgentOrchestrator(max_workers=2)
+        self.addCleanup(orchestrator.executor.shutdown)
+        threads = []
+        with patch("django.db.close_old_connections", side_effect=lambda: threads.append(threading.current_thread())):
+            result = orchestrator.process_appointment_prompt("cita mañana 10am con Dr. Pérez", stores=self.stores)
+
+        self.assertEqual(result["status"], "success")
+        self.assertTrue(threads)
+        self.assertNotIn(threading.current_thread(), threads)
+        self.assertTrue(all(thread.name.startswith("agent-stage") for thread in threads))
+        self.assertEqual(len(threads) % 2, 0)
+
+    def test_health_check_does_not_build_instance(self):
+        """Test that /health/ reports no prompt cache before the orchestrator is built, without building it."""
+        from django.core.cache import cache
+        from django.test import Client
+
+        # The class the view imports (this module may be loaded under another package name)
+        from apps.agents import AgentOrchestrator as ServedOrchestrator
+
+        cache.clear()
+        with patch.object(ServedOrchestrator, "_instance", None), \
+                patch.object(ServedOrchestrator, "__init__", side_effect=AssertionError("built")):
+            response = Client().get("/api/v1/health/")
+            self.assertIsNone(ServedOrchestrator._instance)
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(response.json()["prompt_cache"])
+
+        with patch.object(ServedOrchestrator, "_instance", ServedOrchestrator(max_workers=0, prompt_cache_size=10)):
+            response = Client().get("/api/v1/health/")
+        self.assertEqual(response.json()["prompt_cache"]["max_entries"], 10)
+
+    def test_shared_instance_keeps_no_request_state(self):
+        """Test that concurrent requests on one orchestrator match serial runs and leave agents unchanged."""
+        from concurrent.futures import ThreadPoolExecutor
+
+        prompts = [
+            "cita mañana 10am con Dr. Pérez",
+            "cita el 2027-03-10 a las 15:30 con Dr. Pérez en Clínica Centro",
+            "cita con Dr. Desconocido",
+        ] * 10
+        agents = [
+            self.orchestrator.parsing_agent, self.orchestrator.temporal_agent, self.orchestrator.geo_agent,
+            self.orchestrator.validation_agent, self.orchestrator.availability_agent,
+            self.orchestrator.negotiation_agent,
+        ]
+        before = [dict(vars(agent)) for agent in agents]
+
+        def outcome(prompt):
+            result = self.orchestrator.process_appointment_prompt(prompt, stores=self.stores)
+            data = dict(result["data"] or {})
+            data.pop("trace_id", None)
+            return result["status"], result["message"], data
+
+        serial = [outcome(prompt) for prompt in prompts]
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            concurrent = list(pool.map(outcome, prompts))
+
+        self.assertEqual(concurrent, serial)
+        self.assertEqual([dict(vars(agent)) for agent in agents], before)
+
 
 if __name__ == '__main__':
     unittest.main()
+
+
+class TestPrefetchQueries(TestCase):
+    """Tests that a booking loads its contact and service once (database round trips)."""
+
+    def setUp(self):
+        """Set up a contact and a service in the database and a booked slot in a temporary store."""
+        import json
+        import os
+        import shutil
+        import tempfile
+
+        from apps.contacts.models import Contact
+        from apps.services.models import Service
+        from data.names import contact_name_index
+        from data.schedules import schedule_cache
+        from data.stores import AppointmentStore, ContactStore, ServiceStore
+
+        # The process-wide name index outlives the test transaction
+        contact_name_index.clear()
+        self.addCleanup(contact_name_index.clear)
+
+        Contact.objects.create(
+            id="contact_dr_perez", nombre="Dr. Pérez", activo=True,
+            ubicaciones=[{"id": "loc_centro", "nombre": "Clínica Centro", "disponible": True,
+                          "horario": {"inicio": "08:00", "fin": "18:00", "dias_laborales": [1, 2, 3, 4, 5, 6, 7]}}],
+        )
+        Service.objects.create(id="service_consulta", nombre="Consulta general", duracion_minutos=60)
+
+        self.tomorrow = (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d")
+        data_dir = tempfile.mkdtemp()
+        with open(os.path.join(data_dir, "appointments.json"), "w", encoding="utf-8") as f:
+            json.dump({"metadata": {"total_appointments": 1}, "appointments": [{
+                "id": "apt_busy", "fecha": self.tomorrow, "hora_inicio": "10:00", "hora_fin": "11:00",
+                "status": "confirmed", "contacto_id": "contact_dr_perez",
+            }]}, f)
+        self.addCleanup(shutil.rmtree, data_dir)
+        self.addCleanup(AppointmentStore._indexes.clear)
+        self.addCleanup(schedule_cache.invalidate)
+
+        apt_store = AppointmentStore(mode="journal", data_dir=data_dir)
+        self.stores = {
+            "appointment_store": apt_store,
+            "contact_store": ContactStore(appointment_store=apt_store),
+            "service_store": ServiceStore(),
+        }
+        # Stages in this thread: the test transaction and the query counter are per connection
+        self.orchestrator = AgentOrchestrator(max_workers=0)
+        # Built once per process, before the first booking
+        self.stores["contact_store"].search_by_name("warm up")
+
+    def test_prompt_booking_queries(self):
+        """Test that a prompt booking costs one contact query, also when negotiation runs."""
+        with self.assertNumQueries(1):
+            result = self.orchestrator.process_appointment_prompt("cita mañana 11am con Dr. Pérez", stores=self.stores)
+        self.assertEqual(result["status"], "success")
+
+        with self.assertNumQueries(1):
+            result = self.orchestrator.process_appointment_prompt("cita mañana 10am con Dr. Pérez", stores=self.stores)
+        self.assertEqual(result["status"], "conflict")
+        self.assertTrue(result["suggestions"])
+
+    def test_structured_booking_queries(self):
+        """Test that a structured booking costs one query for the contact and one for the service."""
+        with self.assertNumQueries(2):
+            result = self.orchestrator.process_structured_request(
+                "contact_dr_perez", self.tomorrow, "10:00", servicio_id="service_consulta", stores=self.stores
+            )
+        self.assertEqual(result["status"], "conflict")
+
+        with self.assertNumQueries(2):
+            result = self.orchestrator.process_structured_request(
+                "contact_dr_perez", self.tomorrow, "12:00", servicio_id="service_consulta", stores=self.stores
+            )
+        self.assertEqual(result["status"], "success")
+        self.assertEqual(result["data"]["servicio_id"], "service_consulta")
+
+
+    def test_batch_books_in_order(self):
+        """Test that process_batch() checks each request against the ones booked before it."""
+        import os
+
+        from data.stores import AppointmentStore, ContactStore, PendingAppointmentStore
+
+        data_dir = os.path.dirname(self.stores["appointment_store"].file_path)
+        pending = PendingAppointmentStore(mode="journal", data_dir=data_dir)
+        stores = dict(self.stores, appointment_store=pending, contact_store=ContactStore(appointment_store=pending))
+        requests = [
+            {"contacto_id": "contact_dr_perez", "fecha": self.tomorrow, "hora_inicio": "12:00"},
+            {"prompt": "cita mañana 12pm con Dr. Pérez"},
+            {"prompt": "cita mañana 11am con Dr. Pérez"},
+        ]
+        results = self.orchestrator.process_batch(requests, stores)
+
+        self.assertEqual([result["status"] for result in results], ["success", "conflict", "success"])
+        self.assertNotIn("appointment", results[1])
+        stored = AppointmentStore(mode="journal", data_dir=data_dir)
+        self.assertEqual(stored.find_overlaps("contact_dr_perez", self.tomorrow, "11:00", "13:00"), [])
+
+        written = pending.flush()
+        self.assertEqual([apt["id"] for apt in written], [results[0]["appointment"]["id"], results[2]["appointment"]["id"]])
+        self.assertEqual(
+            sorted(stored.find_overlaps("contact_dr_perez", self.tomorrow, "11:00", "13:00")),
+            sorted(apt["id"] for apt in written),
+        )
+
+    def test_batch_pool_matches_caller(self):
+        """Test that a batch gives the same results with its pure-compute agents in worker processes."""
+        import os
+
+        from data.stores import ContactStore, PendingAppointmentStore
+
+        requests = [{"prompt": f"cita mañana {hour}:00 con Dr. Pérez en clinica centro"} for hour in (10, 12, 12, 14)]
+        requests += [
+            {"prompt": "cita mañana 15:00 con Dr. Nadie"},
+            {"contacto_id": "contact_dr_perez", "fecha": self.tomorrow, "hora_inicio": "16:00"},
+        ]
+
+        def outcomes(orchestrator):
+            data_dir = os.path.dirname(self.stores["appointment_store"].file_path)
+            pending = PendingAppointmentStore(mode="journal", data_dir=data_dir)
+            stores = dict(self.stores, appointment_store=pending, contact_store=ContactStore(appointment_store=pending))
+            results = orchestrator.process_batch(requests, stores)
+            for result in results:
+                (result["data"] or {}).pop("trace_id", None)
+            return [(result["status"], result["message"], result["data"], result["suggestions"]) for result in results]
+
+        pooled = AgentOrchestrator(max_workers=0, batch_processes=2)
+        self.addCleanup(pooled.batch_pool.shutdown)
+        with patch.object(AgentOrchestrator, "BATCH_POOL_MIN_PROMPTS", 1), \
+                patch.object(pooled.parsing_agent, "run") as parsing, \
+                patch.object(pooled.temporal_agent, "run") as temporal, \
+                patch.object(pooled.geo_agent, "run") as geo:
+            actual = outcomes(pooled)
+
+        self.assertEqual(actual, outcomes(self.orchestrator))
+        self.assertEqual(
+            [outcome[0] for outcome in actual], ["conflict", "success", "conflict", "success", "error", "success"]
+        )
+        self.assertEqual(actual[1][2]["ubicacion_id"], "loc_centro")
+        for agent_run in (parsing, temporal, geo):
+            agent_run.assert_not_called()
+
+
+class TestContactResolution(TestCase):
+    """Tests for name-index contact resolution against the database."""
+
+    def setUp(self):
+        """Set up two contacts sharing a surname."""
+        from apps.contacts.models import Contact
+        from data.names import contact_name_index
+        from data.stores import ContactStore
+
+        contact_name_index.clear()
+        self.addCleanup(contact_name_index.clear)
+        for contact_id, nombre in (("contact_ana_garcia", "Dra. Ana García"), ("contact_luis_garcia", "Dr. Luis García")):
+            Contact.objects.create(id=contact_id, nombre=nombre, activo=True)
+        self.contact_store = ContactStore()
+        self.orchestrator = AgentOrchestrator(max_workers=0)
+
+    def _resolve(self, prompt):
+        context = {"prompt": prompt, "user_timezone": "America/Mexico_City", "agent_results": {},
+                   "stores": {"contact_store": self.contact_store}}
+        context["parsing"] = self.orchestrator._run_parsing(context)
+        return self.orchestrator._resolve_contact(context)
+
+    def test_ambiguous_name_asks_for_clarification(self):
+        """Test that a surname shared by two contacts stops with both as suggestions."""
+        with self.assertRaises(StopPipeline) as stop:
+            self._resolve("cita mañana 10am con Dr. Garcia")
+        ambiguity = stop.exception.response["ambiguities"][0]
+        self.assertEqual(ambiguity["field"], "contacto")
+        self.assertEqual(
+            sorted(s["id"] for s in ambiguity["suggestions"]), ["contact_ana_garcia", "contact_luis_garcia"]
+        )
+        self.assertEqual(self._resolve("cita mañana 10am con Dra. Ana Garcia")["contacto_id"], "contact_ana_garcia")
+
+    def test_index_follows_contact_writes(self):
+        """Test that creates, renames and deletes reach the built index through the model signals."""
+        from apps.contacts.models import Contact
+
+        self.assertEqual(self.contact_store.search_by_name("Zapata"), [])
+        Contact.objects.create(id="contact_zapata", nombre="Dr. Emilio Zapata", activo=True)
+        self.assertEqual(self.contact_store.search_by_name("Zapata")[0]["id"], "contact_zapata")
+
+        contact = Contact.objects.get(id="contact_ana_garcia")
+        contact.nombre = "Dra. Ana Ruiz"
+        contact.save()
+        self.assertEqual([c["id"] for c in self.contact_store.search_by_name("Dr. Garcia")], ["contact_luis_garcia"])
+
+        Contact.objects.filter(id="contact_zapata").delete()
+        self.assertEqual(self.contact_store.search_by_name("Zapata"), [])
@@ -10,10 +10,14 @@ Responsible for:
 """
 
 import re
+from types import MappingProxyType
 from typing import Any, Dict, List, Optional
 import time
 
+from data.timeutils import to_minutes
+
 from .base import BaseAgent, AgentResult
+from .prefetch import PrefetchContext
 
 
 class ValidationAgent(BaseAgent):
@@ -23,14 +27,14 @@ class ValidationAgent(BaseAgent):
         """Initialize ValidationAgent."""
         super().__init__("validation", version="1.0.0")
 
-        # Regex patterns for validation
-        self.patterns = {
+        # Regex patterns for validation (read-only: shared by concurrent requests)
+        self.patterns = MappingProxyType({
             "date": r"^\d{4}-\d{2}-\d{2}$",  # YYYY-MM-DD
             "time": r"^\d{2}:\d{2}$",  # HH:MM
             "id": r"^[a-z_]+_[a-zA-Z0-9_]+$",  # semantic_id format
             "contact_id": r"^contact_",
             "service_id": r"^service_",
-        }
+        })
 
     def run(self, input_data: Dict[str, Any]) -> AgentResult:
         """
@@ -45,6 +49,7 @@ class ValidationAgent(BaseAgent):
                 "hora_fin": str (HH:MM),
                 "ubicacion_id": str (optional),
                 "servicio_id": str (optional),
+                "prefetch": PrefetchContext (optional, contact/service already loaded),
                 "stores": dict (AppointmentStore, ContactStore, ServiceStore)
             }
 
@@ -86,9 +91,11 @@ class ValidationAgent(BaseAgent):
             else:
                 validated_data["hora_fin"] = hora_fin
 
-            # Validate time logic (start < end)
+            # Validate time logic (start < end), on minutes converted once
             if hora_inicio and hora_fin:
-                if not self._validate_time_range(hora_inicio, hora_fin):
+                start = to_minutes(hora_inicio) if "hora_inicio" in validated_data else None
+                end = to_minutes(hora_fin) if "hora_fin" in validated_data else None
+                if not self._validate_time_range(start, end):
                     errors.append(f"Invalid time range: {hora_inicio} must be before {hora_fin}")
 
             # Validate contact
@@ -122,10 +129,11 @@ class ValidationAgent(BaseAgent):
             if stores:
                 contact_store = stores.get("contact_store")
                 service_store = stores.get("service_store")
+                prefetch = input_data.get("prefetch") or PrefetchContext()
+                contact = prefetch.contact_for(contact_store, contacto_id) if contacto_id and contact_store else None
 
                 # Verify contact exists
                 if contacto_id and contact_store:
-                    contact = contact_store.get_by_id(contacto_id)
                     if not contact:
                         errors.append(f"Contact not found: {contacto_id}")
                     elif not contact.get("activo", True):
@@ -133,7 +141,7 @@ class ValidationAgent(BaseAgent):
 
                 # Verify service exists
                 if servicio_id and service_store:
-                    service = service_store.get_by_id(servicio_id)
+                    service = prefetch.service_for(service_store, servicio_id)
                     if not service:
                         errors.append(f"Service not found: {servicio_id}")
                     elif not service.get("activo", True):
@@ -141,7 +149,6 @@ class ValidationAgent(BaseAgent):
 
                 # Verify location exists for contact
                 if contacto_id and ubicacion_id and contact_store:
-                    contact = contact_store.get_by_id(contacto_id)
                     if contact:
                         locations = contact.get("ubicaciones", [])
                         location_ids = [loc.get("id") for loc in locations]
@@ -196,24 +203,17 @@ class ValidationAgent(BaseAgent):
         pattern = self.patterns[field_type]
         return bool(re.match(pattern, value))
 
-    def _validate_time_range(self, hora_inicio: str, hora_fin: str) -> bool:
+    def _validate_time_range(self, start_minutes: Optional[int], end_minutes: Optional[int]) -> bool:
         """
         Validate that start time is before end time.
 
         Args:
-            hora_inicio: Start time (HH:MM)
-            hora_fin: End time (HH:MM)
+            start_minutes: Start time (minutes since midnight, None if malformed)
+            end_minutes: End time (minutes since midnight, None if malformed)
 
         Returns:
             True if start < end, False otherwise
         """
-        try:
-            start_parts = hora_inicio.split(":")
-            end_parts = hora_fin.split(":")
-
-            start_minutes = int(start_parts[0]) * 60 + int(start_parts[1])
-            end_minutes = int(end_parts[0]) * 60 + int(end_parts[1])
-
-            return start_minutes < end_minutes
-        except (ValueError, IndexError):
+        if start_minutes is None or end_minutes is None:
             return False
+        return start_minutes < end_minutes
@@ -0,0 +1,72 @@
+"""
+Async appointment views for ASGI deployments.
+
+Same endpoints and responses as AppointmentViewSet, but ``create`` and
+``availability`` are coroutines: the agent pipeline and the stores run in
+worker threads while the event loop keeps serving other requests, and the
+trace and the appointment are persisted concurrently. The remaining
+actions are the sync ones, run in a thread by adrf.
+
+Routed instead of AppointmentViewSet when APPOINTMENTS_ASYNC_VIEWS is on
+(the default under config/asgi.py). Requires the ``adrf`` package.
+"""
+
+import asyncio
+
+from adrf.viewsets import ViewSet as AsyncViewSet
+from rest_framework.decorators import action
+
+from .views import AppointmentViewSet
+
+
+class AsyncAppointmentViewSet(AsyncViewSet, AppointmentViewSet):
+    """AppointmentViewSet with async create and availability."""
+
+    async def create(self, request):
+        """Create a new appointment from a natural language prompt (see AppointmentViewSet.create)."""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        from apps.agents import AgentOrchestrator
+
+        stores, trace_store = self._pipeline_stores()
+        orchestrator = AgentOrchestrator.instance()
+        if serializer.is_structured():
+            result = await orchestrator.aprocess_structured_request(
+                **self._structured_arguments(serializer), stores=stores
+            )
+        else:
+            result = await orchestrator.aprocess_appointment_prompt(**self._prompt_arguments(serializer), stores=stores)
+
+        # Trace and appointment are independent writes
+        writes = []
+        if 'trace' in result:
+            writes.append(trace_store.acreate(result['trace'].to_dict()))
+        if result['status'] == 'success' and result['data']:
+            writes.append(stores['appointment_store'].acreate(result['data']))
+        written = await asyncio.gather(*writes)
+
+        appointment = written[-1] if result['status'] == 'success' and result['data'] else None
+        return self._create_response(result, appointment)
+
+    @action(detail=True, methods=['get'])
+    async def availability(self, request, pk=None):
+        """Get available slots for rescheduling this appointment (see AppointmentViewSet.availability)."""
+        from data.stores import AppointmentStore, ContactStore
+
+        store = AppointmentStore()
+        appointment = await store.aget_by_id(pk)
+        if not appointment:
+            return self._appointment_not_found(pk)
+
+        contact_id = self._provider_id(appointment)
+        if not contact_id:
+            return self._no_provider()
+
+        duration = appointment.get('duracion_minutos', 60)
+        available_slots = await ContactStore(appointment_store=store).aget_available_slots(
+            contact_id,
+            days_ahead=int(request.query_params.get('dias_adelante', 7)),
+            duration_minutes=duration,
+        )
+        return self._availability_response(pk, contact_id, available_slots, duration)
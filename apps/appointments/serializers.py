@@ -3,6 +3,7 @@ Serializers for Appointments API.
 Handles request/response validation and transformation based on OpenAPI contracts.
 """
 
+from django.conf import settings
 from rest_framework import serializers
 from datetime import datetime, time
 from config.constants import (
@@ -190,14 +191,49 @@ class AppointmentDetailSerializer(serializers.Serializer):
 
 class AppointmentCreateSerializer(serializers.Serializer):
     """
-    Simplified serializer for appointment creation from natural language.
-    Used when user provides a prompt.
+    Simplified serializer for appointment creation.
+
+    Accepts either a natural language prompt or the structured fields
+    (contacto_id, fecha, hora_inicio and optionally hora_fin, servicio_id,
+    ubicacion_id) when the caller already knows them. Structured fields
+    take precedence; a prompt sent along is only recorded in the trace.
     """
 
     prompt = serializers.CharField(
         max_length=500,
+        required=False,
         help_text="Natural language description of the appointment"
     )
+    contacto_id = serializers.CharField(
+        max_length=100,
+        required=False,
+        help_text="Contact ID (structured request)"
+    )
+    fecha = serializers.CharField(
+        validators=[validate_date_format],
+        required=False,
+        help_text="Appointment date (YYYY-MM-DD, structured request)"
+    )
+    hora_inicio = serializers.CharField(
+        validators=[validate_time_format],
+        required=False,
+        help_text="Start time (HH:MM, structured request)"
+    )
+    hora_fin = serializers.CharField(
+        validators=[validate_time_format],
+        required=False,
+        help_text="End time (HH:MM, default one hour after the start)"
+    )
+    servicio_id = serializers.CharField(
+        max_length=100,
+        required=False,
+        help_text="Service ID (structured request)"
+    )
+    ubicacion_id = serializers.CharField(
+        max_length=100,
+        required=False,
+        help_text="Location ID (default the contact's primary location)"
+    )
     user_timezone = serializers.CharField(
         validators=[validate_timezone],
         default='America/Mexico_City',
@@ -209,6 +245,48 @@ class AppointmentCreateSerializer(serializers.Serializer):
         help_text="User ID for reference"
     )
 
+    STRUCTURED_FIELDS = ('contacto_id', 'fecha', 'hora_inicio')
+
+    def validate(self, data):
+        """Require a prompt or every structured field."""
+        given = [name for name in self.STRUCTURED_FIELDS if data.get(name)]
+        if given and len(given) < len(self.STRUCTURED_FIELDS):
+            raise serializers.ValidationError({
+                name: 'Este campo es requerido para una solicitud estructurada'
+                for name in self.STRUCTURED_FIELDS if name not in given
+            })
+        if not given and not data.get('prompt'):
+            raise serializers.ValidationError({
+                'prompt': 'Se requiere un prompt o los campos contacto_id, fecha y hora_inicio'
+            })
+        return data
+
+    def is_structured(self):
+        """Whether the validated request carries the structured fields."""
+        return bool(self.validated_data.get('contacto_id'))
+
+
+class AppointmentBatchSerializer(serializers.Serializer):
+    """
+    Batch of appointment creation requests (POST /appointments/batch/).
+
+    Each item is what AppointmentCreateSerializer accepts; the view
+    validates them one by one so an invalid item only fails itself.
+    """
+
+    items = serializers.ListField(
+        child=serializers.DictField(),
+        allow_empty=False,
+        help_text="Appointment requests, each as accepted by POST /appointments/"
+    )
+
+    def validate_items(self, items):
+        """Cap the batch at APPOINTMENT_BATCH_MAX_ITEMS requests."""
+        max_items = getattr(settings, 'APPOINTMENT_BATCH_MAX_ITEMS', 1000)
+        if len(items) > max_items:
+            raise serializers.ValidationError(f'Se aceptan como máximo {max_items} solicitudes por lote')
+        return items
+
 
 class AppointmentRescheduleSerializer(serializers.Serializer):
     """Serializer for rescheduling an appointment."""
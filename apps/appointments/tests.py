@@ -0,0 +1,153 @@
+"""
+Tests for the appointments API.
+
+Covers the appointment endpoints through the test client, against contacts
+in the test database and appointments in a temporary data directory.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+from datetime import date, timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from apps.contacts.models import Contact
+from data.schedules import schedule_cache
+from data.stores import AppointmentStore, PendingAppointmentStore
+
+HOURS = {"inicio": "08:00", "fin": "23:59", "dias_laborales": [1, 2, 3, 4, 5, 6, 7]}
+
+
+class AppointmentAPITestCase(TestCase):
+    """Base test case: Dr. Pérez in the database, booked tomorrow 10:00-12:00."""
+
+    def setUp(self):
+        """Set up the contact, a temporary appointments store and an API client."""
+        from data.names import contact_name_index
+
+        # The process-wide name index outlives the test transaction
+        contact_name_index.clear()
+        self.addCleanup(contact_name_index.clear)
+        Contact.objects.create(
+            id="contact_dr_perez", nombre="Dr. Pérez", activo=True,
+            ubicaciones=[{"id": "loc_centro", "nombre": "Clínica Centro", "disponible": True, "horario": HOURS}],
+        )
+        self.tomorrow = (date.today() + timedelta(days=1)).isoformat()
+        self.data_dir = tempfile.mkdtemp()
+        with open(os.path.join(self.data_dir, "appointments.json"), "w", encoding="utf-8") as f:
+            json.dump({"metadata": {"total_appointments": 1}, "appointments": [{
+                "id": "apt_busy", "fecha": self.tomorrow, "hora_inicio": "10:00", "hora_fin": "12:00",
+                "status": "confirmed", "contacto_id": "contact_dr_perez",
+                "created_at": "2026-01-01T00:00:00", "updated_at": "2026-01-01T00:00:00",
+            }]}, f)
+        with open(os.path.join(self.data_dir, "traces.json"), "w", encoding="utf-8") as f:
+            json.dump({"metadata": {"total_traces": 0}, "traces": []}, f)
+        self.addCleanup(shutil.rmtree, self.data_dir)
+        self.addCleanup(AppointmentStore._indexes.clear)
+        self.addCleanup(schedule_cache.invalidate)
+
+        settings = override_settings(STORE_DATA_DIR=self.data_dir, APPOINTMENT_STORE_MODE="rewrite")
+        settings.enable()
+        self.addCleanup(settings.disable)
+        # Throttling counts live in the cache
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user("api", password="api"))
+
+    def stored(self, apt_id):
+        return AppointmentStore(data_dir=self.data_dir).get_by_id(apt_id)
+
+    def booked(self):
+        """IDs of the appointments stored for tomorrow."""
+        return sorted(apt["id"] for apt in AppointmentStore(data_dir=self.data_dir).list_all()
+                      if apt["fecha"] == self.tomorrow)
+
+
+class TestReschedule(AppointmentAPITestCase):
+    """Tests for POST /appointments/{id}/reschedule/."""
+
+    def reschedule(self, **body):
+        return self.client.post("/api/v1/appointments/apt_busy/reschedule/", {"fecha": self.tomorrow, **body},
+                                format="json")
+
+    def test_keeps_duration(self):
+        """Test that without hora_fin the appointment keeps its duration."""
+        response = self.reschedule(hora_inicio="14:00")
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual((self.stored("apt_busy")["hora_inicio"], self.stored("apt_busy")["hora_fin"]),
+                         ("14:00", "16:00"))
+
+    def test_rejects_window_past_midnight(self):
+        """Test that a window ending at or after midnight is rejected and nothing is saved."""
+        for hora_inicio in ("23:00", "22:00"):
+            with self.subTest(hora_inicio=hora_inicio):
+                response = self.reschedule(hora_inicio=hora_inicio)
+                self.assertEqual(response.status_code, 400, response.content)
+                self.assertIn("hora_fin", json.dumps(response.json()))
+        self.assertEqual(self.stored("apt_busy")["hora_inicio"], "10:00")
+
+        self.assertEqual(self.reschedule(hora_inicio="21:30").status_code, 200)
+        self.assertEqual(self.stored("apt_busy")["hora_fin"], "23:30")
+
+    def test_rejects_end_before_start(self):
+        """Test that an explicit hora_fin must be later than hora_inicio."""
+        for hora_fin in ("13:00", "14:00"):
+            with self.subTest(hora_fin=hora_fin):
+                response = self.reschedule(hora_inicio="14:00", hora_fin=hora_fin)
+                self.assertEqual(response.status_code, 400, response.content)
+        self.assertEqual(self.stored("apt_busy")["hora_inicio"], "10:00")
+
+
+class TestBatch(AppointmentAPITestCase):
+    """Tests for POST /appointments/batch/."""
+
+    def item(self, hora_inicio, **extra):
+        return {"contacto_id": "contact_dr_perez", "fecha": self.tomorrow, "hora_inicio": hora_inicio, **extra}
+
+    def batch(self, items):
+        return self.client.post("/api/v1/appointments/batch/", {"items": items}, format="json")
+
+    def results(self, items):
+        response = self.batch(items)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()["data"]
+
+    def test_per_item_results(self):
+        """Test that invalid and conflicting items only fail themselves."""
+        data = self.results([self.item("14:00"), {"contacto_id": "contact_dr_perez"}, self.item("10:00")])
+
+        self.assertEqual([result["index"] for result in data["results"]], [0, 1, 2])
+        self.assertEqual([result["status_code"] for result in data["results"]], [201, 400, 409])
+        self.assertEqual(data["summary"], {"total": 3, "created": 1, "conflict": 1, "error": 1})
+        created = data["results"][0]["data"]["id"]
+        self.assertEqual(self.booked(), sorted(["apt_busy", created]))
+
+    def test_conflicting_items_book_once(self):
+        """Test that of two items for the same slot only the first is booked."""
+        data = self.results([self.item("15:00"), self.item("15:30")])
+
+        self.assertEqual([result["status_code"] for result in data["results"]], [201, 409])
+        self.assertEqual(self.booked(), sorted(["apt_busy", data["results"][0]["data"]["id"]]))
+
+    def test_max_items(self):
+        """Test that a batch over APPOINTMENT_BATCH_MAX_ITEMS is rejected as a whole."""
+        with override_settings(APPOINTMENT_BATCH_MAX_ITEMS=2):
+            response = self.batch([self.item("14:00"), self.item("16:00"), self.item("18:00")])
+            self.assertEqual(response.status_code, 400, response.content)
+            self.assertEqual(self.results([self.item("14:00"), self.item("16:00")])["summary"]["created"], 2)
+        self.assertEqual(len(self.booked()), 3)
+
+    def test_write_failure_is_not_reported_as_created(self):
+        """Test that items whose appointments were not written get a 500."""
+        with mock.patch.object(PendingAppointmentStore, "flush", side_effect=RuntimeError("disk full")):
+            data = self.results([self.item("14:00"), self.item("10:00")])
+
+        self.assertEqual([result["status_code"] for result in data["results"]], [500, 409])
+        self.assertEqual(data["summary"]["created"], 0)
+        self.assertEqual(self.booked(), ["apt_busy"])
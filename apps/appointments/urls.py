@@ -3,14 +3,20 @@ URL configuration for appointments API.
 Endpoints for appointment CRUD, rescheduling, and availability checks.
 """
 
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from . import views
 
 app_name = 'appointments'
 
+if getattr(settings, 'APPOINTMENTS_ASYNC_VIEWS', False):
+    from .async_views import AsyncAppointmentViewSet as AppointmentViewSet
+else:
+    AppointmentViewSet = views.AppointmentViewSet
+
 router = DefaultRouter()
-router.register(r'appointments', views.AppointmentViewSet, basename='appointment')
+router.register(r'appointments', AppointmentViewSet, basename='appointment')
 
 urlpatterns = [
     path('', include(router.urls)),
@@ -12,6 +12,7 @@ from rest_framework.pagination import PageNumberPagination
 from .serializers import (
     AppointmentDetailSerializer,
     AppointmentCreateSerializer,
+    AppointmentBatchSerializer,
     AppointmentRescheduleSerializer,
     AppointmentListSerializer,
     AppointmentSuccessResponseSerializer,
@@ -34,6 +35,7 @@ class AppointmentViewSet(viewsets.ViewSet):
     Handles:
     - list: Get all appointments (with filtering)
     - create: Create new appointment from natural language prompt
+    - batch: Create appointments from a list of prompts or structured requests
     - retrieve: Get appointment details
     - update: Update appointment (full)
     - partial_update: Partial appointment update
@@ -50,6 +52,8 @@ class AppointmentViewSet(viewsets.ViewSet):
         """Dynamically select serializer based on action."""
         if self.action == 'create':
             return AppointmentCreateSerializer(*args, **kwargs)
+        elif self.action == 'batch':
+            return AppointmentBatchSerializer(*args, **kwargs)
         elif self.action == 'reschedule':
             return AppointmentRescheduleSerializer(*args, **kwargs)
         elif self.action in ['list']:
@@ -113,39 +117,186 @@ class AppointmentViewSet(viewsets.ViewSet):
             "user_timezone": "America/Mexico_City",
             "user_id": "user123"  # optional
         }
+
+        When the caller already knows the fields (e.g. n8n), it can send
+        them instead of a prompt; parsing and temporal reasoning are then
+        skipped and the pipeline starts at contact lookup and validation:
+        {
+            "contacto_id": "contact_dr_perez",
+            "fecha": "2026-03-10",
+            "hora_inicio": "10:00",
+            "hora_fin": "11:00",  # optional, default +1 hour
+            "servicio_id": "service_consulta",  # optional
+            "ubicacion_id": "loc_centro"  # optional
+        }
         """
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
-        from data.stores import AppointmentStore, ContactStore, ServiceStore, TraceStore
         from apps.agents import AgentOrchestrator
 
-        # Initialize stores and orchestrator
-        appointment_store = AppointmentStore()
-        contact_store = ContactStore()
-        service_store = ServiceStore()
-        trace_store = TraceStore()
-        orchestrator = AgentOrchestrator()
+        stores, trace_store = self._pipeline_stores()
+
+        # Process request through agent pipeline
+        orchestrator = AgentOrchestrator.instance()
+        if serializer.is_structured():
+            result = orchestrator.process_structured_request(**self._structured_arguments(serializer), stores=stores)
+        else:
+            result = orchestrator.process_appointment_prompt(**self._prompt_arguments(serializer), stores=stores)
+
+        # Save trace for observability
+        if 'trace' in result:
+            trace_store.create(result['trace'].to_dict())
+
+        appointment = None
+        if result['status'] == 'success' and result['data']:
+            # Create appointment from processed data
+            appointment = stores['appointment_store'].create(result['data'])
+
+        return self._create_response(result, appointment)
+
+    @action(detail=False, methods=['post'])
+    def batch(self, request):
+        """
+        Create appointments from a list of requests (e.g. a replayed backlog).
+
+        Expected input:
+        {
+            "items": [
+                {"prompt": "cita mañana 10am con Dr. Pérez", "user_id": "whatsapp:5215512345678"},
+                {"contacto_id": "contact_dr_perez", "fecha": "2026-03-10", "hora_inicio": "11:00"}
+            ]
+        }
+
+        Every item is a POST /appointments/ body and goes through the same
+        pipeline, in order, against the appointments booked by the items
+        before it. The stores and their caches are shared by the whole
+        batch, and its appointments and traces are written once at the end.
+        An appointment whose slot another request booked in the meantime is
+        not written and its item gets a 409; if the write fails, the items
+        that would have been created get a 500.
+
+        Returns 200 with one result per item, in order: the body that
+        POST /appointments/ would have returned for it, plus its "index"
+        and the "status_code" it would have had (201, 400, 409 or 500).
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        from apps.agents import AgentOrchestrator
+        from data.stores import PendingAppointmentStore
+
+        items = [AppointmentCreateSerializer(data=item) for item in serializer.validated_data['items']]
+        valid = [item for item in items if item.is_valid()]
+        requests = [
+            self._structured_arguments(item) if item.is_structured() else self._prompt_arguments(item)
+            for item in valid
+        ]
+
+        stores, trace_store = self._pipeline_stores(PendingAppointmentStore())
+        results = AgentOrchestrator.instance().process_batch(requests, stores)
+
+        # One write for every appointment of the batch and one for every trace
+        apt_store = stores['appointment_store']
+        try:
+            apt_store.flush()
+            write_error = None
+        except RuntimeError as e:
+            write_error = str(e)
+        trace_store.create_many([result['trace'].to_dict() for result in results if 'trace' in result])
+
+        pending = iter(results)
+        responses = []
+        for index, item in enumerate(items):
+            if item.errors:
+                response = self._invalid_item_response(item.errors)
+            else:
+                response = self._batch_item_response(next(pending), apt_store, write_error)
+            responses.append({'index': index, 'status_code': response.status_code, **response.data})
+
+        return Response({
+            'status': 'success',
+            'data': {
+                'results': responses,
+                'summary': {
+                    'total': len(responses),
+                    'created': sum(r['status_code'] == status.HTTP_201_CREATED for r in responses),
+                    'conflict': sum(r['status_code'] == status.HTTP_409_CONFLICT for r in responses),
+                    'error': sum(r['status_code'] not in (status.HTTP_201_CREATED, status.HTTP_409_CONFLICT)
+                                 for r in responses),
+                },
+            },
+            'message': f'Processed {len(responses)} appointment requests',
+        })
+
+    def _batch_item_response(self, result, apt_store, write_error):
+        """Response for a batch result once flush() has written its appointment, or not."""
+        appointment = result.get('appointment')
+        if appointment is not None and write_error is not None:
+            return Response({
+                'status': 'error',
+                'code': 'INTERNAL_ERROR',
+                'message': 'Appointment could not be saved',
+                'details': write_error,
+                'trace_id': result.get('trace_id'),
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        conflicts = apt_store.rejected.get(appointment['id']) if appointment is not None else None
+        if conflicts:
+            # Booked by another request while the batch ran
+            result = {
+                **result,
+                'status': 'conflict',
+                'message': 'Requested time was booked while the batch was processed',
+                'error_detail': {'conflicts': conflicts},
+                'suggestions': [],
+            }
+            appointment = None
+        return self._create_response(result, appointment)
+
+    def _invalid_item_response(self, errors):
+        """The response a batch item failing validation would have had on its own."""
+        from rest_framework.exceptions import ValidationError
+
+        return self.get_exception_handler()(ValidationError(errors), self.get_exception_handler_context())
 
-        # Prepare stores for agents
+    @staticmethod
+    def _pipeline_stores(appointment_store=None):
+        """Stores handed to the agent pipeline, and the trace store."""
+        from data.stores import AppointmentStore, ContactStore, ServiceStore, TraceStore
+
+        # Stores are thin handles over process-wide caches; the pipeline is
+        # built once per worker and shared by every request
+        appointment_store = appointment_store or AppointmentStore()
         stores = {
             'appointment_store': appointment_store,
-            'contact_store': contact_store,
-            'service_store': service_store,
+            'contact_store': ContactStore(appointment_store=appointment_store),
+            'service_store': ServiceStore(),
+        }
+        return stores, TraceStore()
+
+    @staticmethod
+    def _prompt_arguments(serializer):
+        return {
+            'prompt': serializer.validated_data['prompt'],
+            'user_timezone': serializer.validated_data.get('user_timezone', 'America/Mexico_City'),
+            'user_id': serializer.validated_data.get('user_id', 'anonymous'),
         }
 
-        # Process prompt through agent pipeline
-        result = orchestrator.process_appointment_prompt(
-            prompt=serializer.validated_data['prompt'],
+    @staticmethod
+    def _structured_arguments(serializer):
+        fields = ('contacto_id', 'fecha', 'hora_inicio', 'hora_fin', 'servicio_id', 'ubicacion_id')
+        arguments = {name: serializer.validated_data.get(name) for name in fields}
+        arguments.update(
+            prompt=serializer.validated_data.get('prompt', ''),
             user_timezone=serializer.validated_data.get('user_timezone', 'America/Mexico_City'),
             user_id=serializer.validated_data.get('user_id', 'anonymous'),
-            stores=stores,
         )
+        return arguments
 
-        # Save trace for observability
-        if 'trace' in result:
-            trace_store.create(result['trace'].to_dict())
-
+    @staticmethod
+    def _create_response(result, appointment):
+        """Response for an orchestrator result (appointment is the stored one on success)."""
         # Handle orchestrator results
         if result['status'] == 'error':
             response_data = {
@@ -176,13 +327,9 @@ class AppointmentViewSet(viewsets.ViewSet):
             }
             return Response(response_data, status=status.HTTP_409_CONFLICT)
 
-        # Success - create appointment
-        if result['status'] == 'success' and result['data']:
+        # Success - appointment created
+        if appointment is not None:
             apt_data = result['data']
-
-            # Create appointment from processed data
-            appointment = appointment_store.create(apt_data)
-
             return Response({
                 'status': 'success',
                 'data': AppointmentDetailSerializer(appointment).data,
@@ -311,7 +458,10 @@ class AppointmentViewSet(viewsets.ViewSet):
             "notas": "Conflicto con otra cita"
         }
         """
+        from rest_framework.exceptions import ValidationError
+
         from data.stores import AppointmentStore
+        from data.timeutils import DAY_MINUTES, DEFAULT_DURATION_MINUTES, format_minutes, to_minutes
 
         store = AppointmentStore()
         appointment = store.get_by_id(pk)
@@ -325,14 +475,32 @@ class AppointmentViewSet(viewsets.ViewSet):
 
         serializer = AppointmentRescheduleSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
+        validated = serializer.validated_data
+
+        # Store format: YYYY-MM-DD / HH:MM strings; keep the duration if no end time is given
+        inicio = to_minutes(validated['hora_inicio'])
+        if validated.get('hora_fin'):
+            fin = to_minutes(validated['hora_fin'])
+        elif appointment.get('hora_inicio') and appointment.get('hora_fin'):
+            fin = inicio + to_minutes(appointment['hora_fin']) - to_minutes(appointment['hora_inicio'])
+        else:
+            fin = inicio + DEFAULT_DURATION_MINUTES
+        if fin >= DAY_MINUTES:
+            # "HH:MM" cannot hold 24:00: the end would wrap to before the start
+            raise ValidationError({'hora_fin': 'La cita debe terminar antes de medianoche'})
+        if fin <= inicio:
+            raise ValidationError({'hora_fin': 'La hora de fin debe ser posterior a la hora de inicio'})
 
         # Prepare new appointment data
         apt_data = {
             **appointment,
-            **serializer.validated_data
+            **validated,
+            'fecha': validated['fecha'].isoformat(),
+            'hora_inicio': format_minutes(inicio),
+            'hora_fin': format_minutes(fin),
         }
 
-        # Check for conflicts with new time
+        # Check for conflicts with new time (interval index, excluding this appointment)
         conflicts = store.check_conflicts(apt_data, exclude_id=pk)
 
         if conflicts:
@@ -368,43 +536,54 @@ class AppointmentViewSet(viewsets.ViewSet):
 
         store = AppointmentStore()
         appointment = store.get_by_id(pk)
-
         if not appointment:
-            return Response({
-                'status': 'error',
-                'code': 'NOT_FOUND',
-                'message': f'Appointment {pk} not found'
-            }, status=status.HTTP_404_NOT_FOUND)
-
-        dias_adelante = int(request.query_params.get('dias_adelante', 7))
-
-        # Get contact to check availability
-        contact_id = None
-        for participant in appointment.get('participantes', []):
-            if participant.get('rol') == 'prestador':
-                contact_id = participant.get('id')
-                break
+            return self._appointment_not_found(pk)
 
+        contact_id = self._provider_id(appointment)
         if not contact_id:
-            return Response({
-                'status': 'error',
-                'code': 'NOT_FOUND',
-                'message': 'No provider found for this appointment'
-            }, status=status.HTTP_400_BAD_REQUEST)
+            return self._no_provider()
 
-        contact_store = ContactStore()
-        available_slots = contact_store.get_available_slots(
+        duration = appointment.get('duracion_minutos', 60)
+        available_slots = ContactStore(appointment_store=store).get_available_slots(
             contact_id,
-            days_ahead=dias_adelante
+            days_ahead=int(request.query_params.get('dias_adelante', 7)),
+            duration_minutes=duration,
         )
+        return self._availability_response(pk, contact_id, available_slots, duration)
+
+    @staticmethod
+    def _appointment_not_found(pk):
+        return Response({
+            'status': 'error',
+            'code': 'NOT_FOUND',
+            'message': f'Appointment {pk} not found'
+        }, status=status.HTTP_404_NOT_FOUND)
+
+    @staticmethod
+    def _no_provider():
+        return Response({
+            'status': 'error',
+            'code': 'NOT_FOUND',
+            'message': 'No provider found for this appointment'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    @staticmethod
+    def _provider_id(appointment):
+        """Contact to check availability for: the 'prestador' participant, else contacto_id."""
+        for participant in appointment.get('participantes', []):
+            if participant.get('rol') == 'prestador':
+                return participant.get('id')
+        return appointment.get('contacto_id')
 
+    @staticmethod
+    def _availability_response(pk, contact_id, available_slots, duration):
         return Response({
             'status': 'success',
             'data': {
                 'appointment_id': pk,
                 'provider_id': contact_id,
                 'available_slots': available_slots,
-                'duration_minutes': appointment.get('duracion_minutos', 60)
+                'duration_minutes': duration
             },
             '_links': {
                 'self': f'/api/v1/appointments/{pk}/availability/',
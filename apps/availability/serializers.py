@@ -0,0 +1,74 @@
+"""
+Serializers for Availability API.
+Validates and bounds the slot search requests.
+"""
+
+from rest_framework import serializers
+from config.constants import (
+    DEFAULT_MAX_DAYS_IN_ADVANCE,
+    MAX_APPOINTMENT_DURATION,
+    MAX_JOINT_PARTICIPANTS,
+    MAX_SUGGESTED_SLOTS,
+)
+
+
+class SuggestTimesSerializer(serializers.Serializer):
+    """Serializer for suggested time slots (POST /availability/suggest/)."""
+
+    contacto_id = serializers.CharField(max_length=100)
+    servicio_id = serializers.CharField(max_length=100, required=False)
+    ubicacion_id = serializers.CharField(max_length=100, required=False)
+    fecha_preferida = serializers.DateField(
+        required=False,
+        help_text="Search starts here (default: today)"
+    )
+    hora_preferida = serializers.TimeField(
+        required=False,
+        help_text="Closer slots rank higher"
+    )
+    dias_adelante = serializers.IntegerField(min_value=1, max_value=DEFAULT_MAX_DAYS_IN_ADVANCE, default=7)
+    duracion_minutos = serializers.IntegerField(
+        min_value=1,
+        max_value=MAX_APPOINTMENT_DURATION,
+        default=60,
+        help_text="Ignored when servicio_id is given (the service's duration is used)"
+    )
+    limite = serializers.IntegerField(min_value=1, max_value=MAX_SUGGESTED_SLOTS, default=10)
+
+
+class JointAvailabilitySerializer(serializers.Serializer):
+    """Serializer for common free windows (POST /availability/joint/)."""
+
+    participantes = serializers.ListField(
+        child=serializers.CharField(max_length=100),
+        min_length=1,
+        max_length=MAX_JOINT_PARTICIPANTS,
+        help_text="Contact IDs that must all be free"
+    )
+    ubicacion_id = serializers.CharField(
+        max_length=100,
+        required=False,
+        help_text="Location that must also be free"
+    )
+    fecha_inicio = serializers.DateField(required=False, help_text="First day (default: today)")
+    dias_adelante = serializers.IntegerField(min_value=1, max_value=DEFAULT_MAX_DAYS_IN_ADVANCE, default=7)
+    duracion_minutos = serializers.IntegerField(
+        min_value=1,
+        max_value=MAX_APPOINTMENT_DURATION,
+        default=30,
+        help_text="Shortest window to return"
+    )
+
+
+class EarliestBySpecialtySerializer(serializers.Serializer):
+    """Serializer for the earliest slots of a specialty (POST /availability/earliest/)."""
+
+    especialidad = serializers.CharField(max_length=100)
+    servicio_id = serializers.CharField(
+        max_length=100,
+        required=False,
+        help_text="Sets the duration from the service"
+    )
+    duracion_minutos = serializers.IntegerField(min_value=1, max_value=MAX_APPOINTMENT_DURATION, default=60)
+    dias_adelante = serializers.IntegerField(min_value=1, max_value=DEFAULT_MAX_DAYS_IN_ADVANCE, default=30)
+    limite = serializers.IntegerField(min_value=1, max_value=MAX_SUGGESTED_SLOTS, default=5)
@@ -0,0 +1,195 @@
+"""
+Tests for the availability API.
+
+Covers the availability endpoints through the test client, against contacts
+in the test database and appointments in a temporary data directory.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+from datetime import date, datetime, time, timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.contacts.models import Contact
+from config.constants import MAX_JOINT_PARTICIPANTS
+from data.schedules import schedule_cache
+from data.stores import AppointmentStore
+
+HOURS = {"inicio": "08:00", "fin": "18:00", "dias_laborales": [1, 2, 3, 4, 5, 6, 7]}
+
+
+class AvailabilityAPITestCase(TestCase):
+    """Base test case: Dr. Pérez in the database, booked tomorrow 10:00-11:00."""
+
+    def setUp(self):
+        """Set up the contact, a temporary appointments store and an API client."""
+        Contact.objects.create(
+            id="contact_dr_perez", nombre="Dr. Pérez", activo=True,
+            ubicaciones=[{"id": "loc_centro", "nombre": "Clínica Centro", "disponible": True, "horario": HOURS}],
+        )
+        self.tomorrow = (date.today() + timedelta(days=1)).isoformat()
+        data_dir = tempfile.mkdtemp()
+        with open(os.path.join(data_dir, "appointments.json"), "w", encoding="utf-8") as f:
+            json.dump({"metadata": {"total_appointments": 1}, "appointments": [{
+                "id": "apt_busy", "fecha": self.tomorrow, "hora_inicio": "10:00", "hora_fin": "11:00",
+                "status": "confirmed", "contacto_id": "contact_dr_perez",
+            }]}, f)
+        self.addCleanup(shutil.rmtree, data_dir)
+        self.addCleanup(AppointmentStore._indexes.clear)
+        self.addCleanup(schedule_cache.invalidate)
+
+        settings = override_settings(STORE_DATA_DIR=data_dir)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        # Throttling counts live in the cache
+        cache.clear()
+        self.client = APIClient()
+
+
+class TestCheckAvailability(AvailabilityAPITestCase):
+    """Tests for POST /availability/check/."""
+
+    def check(self, hora_inicio, **extra):
+        response = self.client.post("/api/v1/availability/check/", {
+            "contacto_id": "contact_dr_perez", "fecha": self.tomorrow, "hora_inicio": hora_inicio, **extra,
+        }, format="json")
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()["data"]
+
+    def test_booking_starting_at_requested_time_without_end(self):
+        """Test that a request without hora_fin sees a booking that starts exactly then."""
+        data = self.check("10:00")
+        self.assertFalse(data["disponible"])
+        self.assertEqual(data["razon"], "Horario ocupado por otra cita")
+        self.assertEqual([conflict["existing_appointment_id"] for conflict in data["conflictos"]], ["apt_busy"])
+
+    def test_free_slot_without_end(self):
+        """Test that the default-length window ending when the booking starts is free."""
+        data = self.check("09:00")
+        self.assertTrue(data["disponible"])
+        self.assertNotIn("conflictos", data)
+
+
+
+class TestSuggestTimes(AvailabilityAPITestCase):
+    """Tests for POST /availability/suggest/."""
+
+    def suggest(self, **extra):
+        return self.client.post("/api/v1/availability/suggest/", {
+            "contacto_id": "contact_dr_perez", "fecha_preferida": self.tomorrow, "dias_adelante": 1, **extra,
+        }, format="json")
+
+    def test_slots_closest_to_preferred_time(self):
+        """Test that slots around the booking rank by distance to hora_preferida, then chronologically."""
+        response = self.suggest(hora_preferida="10:00", limite=3)
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual([slot["hora_inicio"] for slot in response.json()["data"]["slots_sugeridos"]],
+                         ["09:00", "11:00", "08:30"])
+
+    def test_invalid_input_is_rejected(self):
+        """Test that malformed or out-of-range fields are a 400, not a 500."""
+        for field, value in (("hora_preferida", "25:00"), ("hora_preferida", "abc"), ("dias_adelante", "x"),
+                             ("dias_adelante", 10 ** 6), ("dias_adelante", 0), ("duracion_minutos", "x"),
+                             ("duracion_minutos", 10 ** 6), ("limite", "x"), ("limite", 10 ** 6),
+                             ("fecha_preferida", "2026-13-40")):
+            with self.subTest(field=field, value=value):
+                response = self.suggest(**{field: value})
+                self.assertEqual(response.status_code, 400, response.content)
+                self.assertIn(field, json.dumps(response.json()))
+
+class TestJointAvailability(AvailabilityAPITestCase):
+    """Tests for POST /availability/joint/."""
+
+    def joint(self, participantes, **extra):
+        return self.client.post("/api/v1/availability/joint/", {
+            "participantes": participantes, "fecha_inicio": self.tomorrow, "dias_adelante": 1, **extra,
+        }, format="json")
+
+    def test_common_windows(self):
+        """Test that windows are free for every participant, around the booking."""
+        Contact.objects.create(
+            id="resource_sala", nombre="Sala 1", tipo="resource", activo=True,
+            ubicaciones=[{"id": "loc_centro", "nombre": "Clínica Centro", "disponible": True,
+                          "horario": {**HOURS, "inicio": "09:00", "fin": "12:00"}}],
+        )
+        response = self.joint(["contact_dr_perez", "resource_sala"])
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(
+            [(w["fecha"], w["hora_inicio"], w["hora_fin"]) for w in response.json()["data"]["ventanas"]],
+            [(self.tomorrow, "09:00", "10:00"), (self.tomorrow, "11:00", "12:00")],
+        )
+
+        windows = self.joint(["contact_dr_perez", "resource_sala"], duracion_minutos=90).json()["data"]["ventanas"]
+        self.assertEqual(windows, [])
+
+    def test_invalid_participants(self):
+        """Test that an empty or too long list is a 400 and an unknown participant a 404."""
+        self.assertEqual(self.joint([]).status_code, 400)
+        self.assertEqual(self.joint("contact_dr_perez").status_code, 400)
+        self.assertEqual(self.joint(["contact_dr_perez"] * (MAX_JOINT_PARTICIPANTS + 1)).status_code, 400)
+        response = self.joint(["contact_dr_perez", "contact_nadie"])
+        self.assertEqual(response.status_code, 404)
+        self.assertIn("contact_nadie", response.json()["message"])
+
+    def test_invalid_input_is_rejected(self):
+        """Test that malformed or out-of-range fields are a 400, not a 500."""
+        for field, value in (("dias_adelante", "x"), ("dias_adelante", 10 ** 6), ("dias_adelante", 0),
+                             ("duracion_minutos", "x"), ("duracion_minutos", 10 ** 6), ("fecha_inicio", "mañana")):
+            with self.subTest(field=field, value=value):
+                response = self.joint(["contact_dr_perez"], **{field: value})
+                self.assertEqual(response.status_code, 400, response.content)
+                self.assertIn(field, json.dumps(response.json()))
+
+
+class TestEarliestBySpecialty(AvailabilityAPITestCase):
+    """Tests for POST /availability/earliest/."""
+
+    def setUp(self):
+        """Add a second cardiologist, starting at 09:00, and a pediatrician."""
+        super().setUp()
+        Contact.objects.filter(id="contact_dr_perez").update(especialidades=["Cardiología"])
+        for contact_id, especialidad in (("contact_dra_lopez", "cardiología"), ("contact_dr_ruiz", "Pediatría")):
+            Contact.objects.create(
+                id=contact_id, nombre=contact_id, activo=True, especialidades=[especialidad],
+                ubicaciones=[{"id": "loc_centro", "nombre": "Clínica Centro", "disponible": True,
+                              "horario": {**HOURS, "inicio": "09:00"}}],
+            )
+
+    def earliest(self, **body):
+        # Late today: the search starts tomorrow
+        now = timezone.make_aware(datetime.combine(date.today(), time(23, 30)))
+        with mock.patch("django.utils.timezone.localtime", return_value=now):
+            return self.client.post("/api/v1/availability/earliest/", body, format="json")
+
+    def test_earliest_slots_across_providers(self):
+        """Test that slots of every provider of the specialty are merged in time order."""
+        response = self.earliest(especialidad="Cardiología", limite=5)
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(
+            [(slot["contacto_id"], slot["fecha"], slot["hora_inicio"]) for slot in response.json()["data"]["slots"]],
+            [("contact_dr_perez", self.tomorrow, "08:00"), ("contact_dr_perez", self.tomorrow, "08:30"),
+             ("contact_dr_perez", self.tomorrow, "09:00"), ("contact_dra_lopez", self.tomorrow, "09:00"),
+             ("contact_dra_lopez", self.tomorrow, "09:30")],
+        )
+
+    def test_requires_specialty(self):
+        """Test that a missing especialidad is a 400 and an unknown service a 404."""
+        self.assertEqual(self.earliest().status_code, 400)
+        self.assertEqual(self.earliest(especialidad="  ").status_code, 400)
+        self.assertEqual(self.earliest(especialidad="Cardiología", servicio_id="service_nada").status_code, 404)
+
+    def test_invalid_input_is_rejected(self):
+        """Test that malformed or out-of-range fields are a 400, not a 500."""
+        for field, value in (("duracion_minutos", "x"), ("duracion_minutos", 10 ** 6), ("dias_adelante", "x"),
+                             ("dias_adelante", 10 ** 6), ("limite", "x"), ("limite", 10 ** 6), ("limite", 0)):
+            with self.subTest(field=field, value=value):
+                response = self.earliest(especialidad="Cardiología", **{field: value})
+                self.assertEqual(response.status_code, 400, response.content)
+                self.assertIn(field, json.dumps(response.json()))
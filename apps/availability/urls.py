@@ -11,5 +11,7 @@ app_name = 'availability'
 urlpatterns = [
     path('availability/check/', views.check_availability, name='check-availability'),
     path('availability/suggest/', views.suggest_times, name='suggest-times'),
+    path('availability/joint/', views.joint_availability, name='joint-availability'),
+    path('availability/earliest/', views.earliest_by_specialty, name='earliest-by-specialty'),
     path('availability/schedule/<str:contacto_id>/', views.get_contact_schedule, name='get-schedule'),
 ]
@@ -9,6 +9,7 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 
 from apps.contacts.serializers import ContactAvailabilitySerializer
+from .serializers import EarliestBySpecialtySerializer, JointAvailabilitySerializer, SuggestTimesSerializer
 
 
 @api_view(['POST'])
@@ -29,6 +30,7 @@ def check_availability(request):
     Returns available slots if requested time is not available.
     """
     from data.stores import ContactStore, ServiceStore, AppointmentStore
+    from data.timeutils import DAY_MINUTES, DEFAULT_DURATION_MINUTES, to_minutes
 
     # Validate input
     serializer = ContactAvailabilitySerializer(data=request.data)
@@ -71,12 +73,13 @@ def check_availability(request):
         ubicacion_id
     )
 
-    # Check for appointment conflicts
+    # Check for appointment conflicts (no hora_fin: a default-length appointment)
+    start = to_minutes(hora_inicio)
     apt_store = AppointmentStore()
     apt_data = {
         'fecha': fecha,
-        'hora_inicio': hora_inicio,
-        'hora_fin': hora_fin or hora_inicio,
+        'hora_inicio': start,
+        'hora_fin': to_minutes(hora_fin) if hora_fin else min(start + DEFAULT_DURATION_MINUTES, DAY_MINUTES),
         'participantes': [{'id': contacto_id}]
     }
     conflicts = apt_store.check_conflicts(apt_data)
@@ -117,21 +120,33 @@ def suggest_times(request):
     {
         "contacto_id": "contact_dr_perez",
         "servicio_id": "service_consulta",
-        "fecha_preferida": "2026-01-25",  # optional
+        "fecha_preferida": "2026-01-25",  # optional, search starts here (default: today)
+        "hora_preferida": "10:00",  # optional, closer slots rank higher
         "dias_adelante": 7,  # optional, default: 7
         "duracion_minutos": 60,  # optional, default from service
+        "limite": 10,  # optional, default: 10
         "ubicacion_id": "loc_consultorio_1"  # optional
     }
 
     Returns list of suggested time slots with confidence scores.
     """
+    from datetime import date
     from data.stores import ContactStore, ServiceStore
 
-    contacto_id = request.data.get('contacto_id')
-    servicio_id = request.data.get('servicio_id')
-    dias_adelante = int(request.data.get('dias_adelante', 7))
-    duracion_minutos = int(request.data.get('duracion_minutos', 60))
-    ubicacion_id = request.data.get('ubicacion_id')
+    # Validate input (bounds the days and slots searched)
+    serializer = SuggestTimesSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+
+    contacto_id = serializer.validated_data['contacto_id']
+    servicio_id = serializer.validated_data.get('servicio_id')
+    dias_adelante = serializer.validated_data['dias_adelante']
+    duracion_minutos = serializer.validated_data['duracion_minutos']
+    limite = serializer.validated_data['limite']
+    hora_preferida = serializer.validated_data.get('hora_preferida')
+    ubicacion_id = serializer.validated_data.get('ubicacion_id')
+
+    # Never search in the past
+    fecha_inicio = max(serializer.validated_data.get('fecha_preferida') or date.today(), date.today())
 
     # Verify contact exists
     contact_store = ContactStore()
@@ -161,7 +176,10 @@ def suggest_times(request):
         contacto_id,
         days_ahead=dias_adelante,
         duration_minutes=duracion_minutos,
-        location_id=ubicacion_id
+        location_id=ubicacion_id,
+        start_date=fecha_inicio,
+        preferred_time=hora_preferida,
+        limit=limite
     )
 
     return Response({
@@ -178,6 +196,132 @@ def suggest_times(request):
     })
 
 
+@api_view(['POST'])
+def joint_availability(request):
+    """
+    Find common free windows for several participants and an optional location.
+
+    Expected input:
+    {
+        "participantes": ["contact_dr_perez", "resource_sala_rayos_x"],
+        "ubicacion_id": "loc_consultorio_1",  # optional
+        "fecha_inicio": "2026-01-25",  # optional, default: today
+        "dias_adelante": 7,  # optional, default: 7
+        "duracion_minutos": 30  # optional, shortest window, default: 30
+    }
+
+    Returns the windows where every participant and the location are free.
+    """
+    from datetime import date, timedelta
+    from data.stores import ContactStore
+
+    # Validate input (bounds the participants and days searched)
+    serializer = JointAvailabilitySerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+
+    participantes = serializer.validated_data['participantes']
+    ubicacion_id = serializer.validated_data.get('ubicacion_id')
+    fecha_inicio = serializer.validated_data.get('fecha_inicio') or date.today()
+    dias_adelante = serializer.validated_data['dias_adelante']
+    duracion_minutos = serializer.validated_data['duracion_minutos']
+
+    # Verify all participants exist (single query)
+    contact_store = ContactStore()
+    contacts = contact_store.get_by_ids(participantes)
+    missing = [contact_id for contact_id in participantes if contact_id not in contacts]
+    if missing:
+        return Response({
+            'status': 'error',
+            'code': 'NOT_FOUND',
+            'message': f"Contacts not found: {', '.join(missing)}"
+        }, status=status.HTTP_404_NOT_FOUND)
+
+    ventanas = contact_store.find_joint_windows(
+        participantes,
+        fecha_inicio,
+        days_ahead=dias_adelante,
+        ubicacion_id=ubicacion_id,
+        min_minutes=duracion_minutos
+    )
+
+    return Response({
+        'status': 'success',
+        'data': {
+            'participantes': participantes,
+            'ubicacion_id': ubicacion_id,
+            'fecha_inicio': fecha_inicio.isoformat(),
+            'fecha_fin': (fecha_inicio + timedelta(days=dias_adelante - 1)).isoformat(),
+            'ventanas': ventanas,
+        },
+        '_links': {
+            'self': '/api/v1/availability/joint/',
+        }
+    })
+
+
+@api_view(['POST'])
+def earliest_by_specialty(request):
+    """
+    Find the earliest free slots among all providers of a specialty.
+
+    Expected input:
+    {
+        "especialidad": "Cardiología",
+        "servicio_id": "service_consulta",  # optional, sets the duration
+        "duracion_minutos": 60,  # optional, default: 60
+        "dias_adelante": 30,  # optional, default: 30
+        "limite": 5  # optional, default: 5
+    }
+
+    Returns the k globally earliest slots, each with its provider.
+    """
+    from django.utils import timezone
+    from data.stores import ContactStore, ServiceStore
+
+    # Validate input (bounds the days and slots searched)
+    serializer = EarliestBySpecialtySerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+
+    especialidad = serializer.validated_data['especialidad']
+    servicio_id = serializer.validated_data.get('servicio_id')
+    duracion_minutos = serializer.validated_data['duracion_minutos']
+    dias_adelante = serializer.validated_data['dias_adelante']
+    limite = serializer.validated_data['limite']
+
+    if servicio_id:
+        service = ServiceStore().get_by_id(servicio_id)
+        if not service:
+            return Response({
+                'status': 'error',
+                'code': 'NOT_FOUND',
+                'message': f'Service {servicio_id} not found'
+            }, status=status.HTTP_404_NOT_FOUND)
+        duracion_minutos = service.get('duracion_minutos', duracion_minutos)
+
+    # Only slots from now on (local time)
+    now = timezone.localtime()
+    slots = ContactStore().earliest_by_specialty(
+        especialidad,
+        now.date(),
+        limit=limite,
+        days_ahead=dias_adelante,
+        duration_minutes=duracion_minutos,
+        not_before=now.hour * 60 + now.minute
+    )
+
+    return Response({
+        'status': 'success',
+        'data': {
+            'especialidad': especialidad,
+            'duracion_minutos': duracion_minutos,
+            'slots': slots,
+        },
+        '_links': {
+            'self': '/api/v1/availability/earliest/',
+        }
+    })
+
+
 @api_view(['GET'])
 def get_contact_schedule(request, contacto_id):
     """
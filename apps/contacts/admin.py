@@ -20,6 +20,9 @@ class ContactAdmin(admin.ModelAdmin):
         ('Especialidades', {
             'fields': ('especialidades',)
         }),
+        ('Horario', {
+            'fields': ('ubicaciones', 'excepciones')
+        }),
         ('Estado', {
             'fields': ('activo',)
         }),
@@ -15,4 +15,4 @@ class ContactsConfig(AppConfig):
 
     def ready(self):
         """Initialize app when Django starts."""
-        pass
+        from . import signals  # noqa: F401
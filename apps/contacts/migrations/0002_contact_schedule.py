@@ -0,0 +1,23 @@
+# Generated by Django 4.2.27 on 2026-10-16 23:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contacts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contact',
+            name='excepciones',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AddField(
+            model_name='contact',
+            name='ubicaciones',
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
@@ -2,6 +2,7 @@
 Contacts models for Smart-Sync Concierge.
 """
 
+from django.core.exceptions import ValidationError
 from django.db import models
 
 
@@ -21,6 +22,8 @@ class Contact(models.Model):
     telefono = models.CharField(max_length=20, null=True, blank=True)
     tipo = models.CharField(max_length=20, choices=TYPE_CHOICES, default='prestador')
     especialidades = models.JSONField(default=list, blank=True)
+    ubicaciones = models.JSONField(default=list, blank=True)
+    excepciones = models.JSONField(default=list, blank=True)
     activo = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -32,3 +35,12 @@ class Contact(models.Model):
 
     def __str__(self):
         return self.nombre
+
+    def clean(self):
+        """Ensure schedules and exceptions compile (the admin saves them without the API serializer)."""
+        from data.schedules import validate_schedule
+
+        try:
+            validate_schedule(self.ubicaciones, self.excepciones)
+        except ValueError as e:
+            raise ValidationError(str(e))
@@ -87,6 +87,14 @@ class ContactDetailSerializer(serializers.Serializer):
         required=False,
         help_text="List of specialties"
     )
+    ubicaciones = serializers.ListField(
+        required=False,
+        help_text="Locations with their working hours"
+    )
+    excepciones = serializers.ListField(
+        required=False,
+        help_text="Dated closures and extra openings"
+    )
     activo = serializers.BooleanField(
         default=True,
         help_text="Whether the contact is active"
@@ -123,6 +131,16 @@ class ContactCreateUpdateSerializer(serializers.Serializer):
         child=serializers.CharField(),
         allow_empty=True
     )
+    ubicaciones = serializers.ListField(
+        required=False,
+        child=serializers.DictField(),
+        allow_empty=True
+    )
+    excepciones = serializers.ListField(
+        required=False,
+        child=serializers.DictField(),
+        allow_empty=True
+    )
     activo = serializers.BooleanField(default=True)
 
     def validate_tipo(self, value):
@@ -134,6 +152,16 @@ class ContactCreateUpdateSerializer(serializers.Serializer):
             )
         return value
 
+    def validate(self, attrs):
+        """Ensure schedules and exceptions compile."""
+        from data.schedules import validate_schedule
+
+        try:
+            validate_schedule(attrs.get('ubicaciones', []), attrs.get('excepciones', []))
+        except ValueError as e:
+            raise serializers.ValidationError({'horario': str(e)})
+        return attrs
+
 
 class ContactListSerializer(serializers.Serializer):
     """Simplified serializer for contact list responses."""
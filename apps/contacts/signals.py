@@ -0,0 +1,46 @@
+"""
+Signal handlers for contacts.
+
+Drop a contact's compiled schedule whenever the model is saved or deleted
+outside ContactStore (e.g. from the admin), and keep the name index used
+for contact resolution (data/names.py) in step with creates, renames and
+deletes. Deleted contacts also drop their cached location matcher
+(apps/agents/location_matcher.py); edits are caught by its own check.
+"""
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Contact
+
+
+@receiver([post_save, post_delete], sender=Contact)
+def invalidate_schedule(sender, instance, **kwargs):
+    """Invalidate the cached schedule of the changed contact."""
+    from data.schedules import schedule_cache
+
+    schedule_cache.invalidate(instance.pk)
+
+
+@receiver(post_save, sender=Contact)
+def index_name(sender, instance, **kwargs):
+    """Index the name of a created or updated contact."""
+    from data.names import contact_name_index
+
+    contact_name_index.update(instance.pk, instance.nombre, instance.activo)
+
+
+@receiver(post_delete, sender=Contact)
+def unindex_name(sender, instance, **kwargs):
+    """Drop a deleted contact from the name index."""
+    from data.names import contact_name_index
+
+    contact_name_index.remove(instance.pk)
+
+
+@receiver(post_delete, sender=Contact)
+def drop_location_matcher(sender, instance, **kwargs):
+    """Forget the location matcher of a deleted contact."""
+    from apps.agents.location_matcher import location_matchers
+
+    location_matchers.invalidate(instance.pk)
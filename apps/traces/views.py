@@ -58,7 +58,7 @@ class TracesViewSet(viewsets.ViewSet):
             traces = [t for t in traces if t.get('user_id') == user_id_filter]
 
         # Sort by newest first
-        traces.sort(key=lambda x: x.get('timestamp', ''), reverse=True)
+        traces = sorted(traces, key=lambda x: x.get('timestamp', ''), reverse=True)
 
         # Paginate
         paginator = self.pagination_class()
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Benchmark: a backlog of prompts as single POST /appointments/ requests vs POST /appointments/batch/.
+
+Builds a throw-away project state in a temporary directory (SQLite database
+with --contacts providers and an API token, empty appointments/traces JSON
+stores) and books a corpus of --prompts prompts ("cita a las <hora> el
+<fecha> con <contacto>") over the next days, about one in ten asking for
+an already requested slot. The corpus goes through the Django test client,
+with token authentication, throttling and middleware:
+
+- single: one POST /api/v1/appointments/ per prompt, in order,
+- batch: POST /api/v1/appointments/batch/ with --batch-size prompts each.
+
+Each mode starts from empty stores. Both must reach the same outcome for
+every prompt; reports the elapsed time, prompts/s and the speedup.
+
+Usage:
+    python benchmarks/bench_appointment_batch.py
+    python benchmarks/bench_appointment_batch.py --prompts 1000 --batch-size 250 --mode journal
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from data.stores import AppointmentStore  # noqa: E402
+
+SETTINGS = '''
+from config.settings.local import *  # noqa: F401,F403
+
+DEBUG = False
+ALLOWED_HOSTS = ['*']
+DATABASES = {{'default': {{'ENGINE': 'django.db.backends.sqlite3', 'NAME': {db!r}}}}}
+APPOINTMENT_STORE_MODE = {mode!r}
+LOGGING = {{'version': 1, 'disable_existing_loggers': False}}
+'''
+
+FIRST = ['Ana', 'Luis', 'María', 'José', 'Sofía', 'Andrés', 'Lucía', 'Inés', 'Ramón', 'Elena']
+LAST = ['Pérez', 'García', 'López', 'Martínez', 'Sánchez', 'Gómez', 'Díaz', 'Torres', 'Ruiz', 'Ortiz']
+
+
+def setup_django(work_dir, mode):
+    with open(os.path.join(work_dir, 'bench_settings.py'), 'w', encoding='utf-8') as f:
+        f.write(SETTINGS.format(db=os.path.join(work_dir, 'db.sqlite3'), mode=mode))
+    sys.path.insert(0, work_dir)
+    os.environ['DJANGO_SETTINGS_MODULE'] = 'bench_settings'
+
+    import django
+    from django.core.management import call_command
+
+    django.setup()
+    call_command('migrate', verbosity=0)
+
+
+def seed_database(contacts):
+    """Create the providers and the API user; return the contact names and the token."""
+    from django.contrib.auth.models import User
+    from rest_framework.authtoken.models import Token
+
+    from apps.contacts.models import Contact
+
+    names = [f"Dr. {first} {last}" for first in FIRST for last in LAST][:contacts]
+    for i, nombre in enumerate(names):
+        Contact.objects.create(
+            id=f'contact_{i}', nombre=nombre, activo=True,
+            ubicaciones=[{'id': 'loc_centro', 'nombre': 'Clínica Centro', 'disponible': True,
+                          'horario': {'inicio': '08:00', 'fin': '18:00', 'dias_laborales': [1, 2, 3, 4, 5, 6, 7]}}],
+        )
+    user = User.objects.create_user('bench', password='bench')
+    return names, Token.objects.create(user=user).key
+
+
+def corpus(names, size, rng):
+    """Prompts for distinct slots, with about one in ten repeating an earlier slot."""
+    start = date.today() + timedelta(days=1)
+    slots = [(day, hour, nombre) for day in range(30) for hour in range(8, 18) for nombre in names]
+    rng.shuffle(slots)
+    chosen = slots[:size]
+    for i in range(9, size, 10):
+        chosen[i] = rng.choice(chosen[:i])
+    return [
+        f"cita a las {hour:02d}:00 el {(start + timedelta(days=day)).isoformat()} con {nombre}"
+        for day, hour, nombre in chosen
+    ]
+
+
+def empty_stores(data_dir):
+    os.makedirs(data_dir)
+    stores = {
+        'appointments.json': {'metadata': {'total_appointments': 0}, 'appointments': []},
+        'traces.json': {'metadata': {'total_traces': 0}, 'traces': []},
+    }
+    for name, content in stores.items():
+        with open(os.path.join(data_dir, name), 'w', encoding='utf-8') as f:
+            json.dump(content, f)
+
+
+def run_single(client, prompts, batch_size):
+    return [
+        client.post('/api/v1/appointments/', {'prompt': prompt}, content_type='application/json').status_code
+        for prompt in prompts
+    ]
+
+
+def run_batch(client, prompts, batch_size):
+    statuses = []
+    for i in range(0, len(prompts), batch_size):
+        items = [{'prompt': prompt} for prompt in prompts[i:i + batch_size]]
+        response = client.post('/api/v1/appointments/batch/', {'items': items}, content_type='application/json')
+        assert response.status_code == 200, response.content
+        statuses.extend(result['status_code'] for result in response.json()['data']['results'])
+    return statuses
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--prompts', type=int, default=1000)
+    parser.add_argument('--contacts', type=int, default=20)
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--mode', choices=['rewrite', 'journal'], default='rewrite', help='appointment store mode')
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp()
+    try:
+        setup_django(work_dir, args.mode)
+
+        from django.test import Client, override_settings
+
+        names, token = seed_database(args.contacts)
+        prompts = corpus(names, args.prompts, random.Random(22))
+        client = Client(HTTP_AUTHORIZATION=f'Token {token}')
+
+        print(f"{args.prompts} prompts, {args.contacts} contacts, store mode {args.mode}\n")
+        print(f"{'path':<8} {'seconds':>8} {'prompts/s':>10} {'created':>8} {'conflict':>9}")
+        rates, outcomes = {}, {}
+        for name, run in (('single', run_single), ('batch', run_batch)):
+            data_dir = os.path.join(work_dir, name)
+            empty_stores(data_dir)
+            with override_settings(STORE_DATA_DIR=data_dir):
+                start = time.perf_counter()
+                outcomes[name] = run(client, prompts, args.batch_size)
+                elapsed = time.perf_counter() - start
+            rates[name] = len(prompts) / elapsed
+            print(f"{name:<8} {elapsed:>8.2f} {rates[name]:>10.1f} {outcomes[name].count(201):>8}"
+                  f" {outcomes[name].count(409):>9}")
+        assert outcomes['single'] == outcomes['batch'], 'batch outcomes differ from single requests'
+        print(f"\nspeedup: {rates['batch'] / rates['single']:.1f}x")
+    finally:
+        AppointmentStore._indexes.clear()
+        shutil.rmtree(work_dir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Benchmark: AppointmentStore lookups, linear scan vs secondary indexes.
+
+Seeds a temporary appointments.json with N appointments and measures
+get_by_id(), list_by_contact() and check_conflicts() against the linear
+scans they replaced. The one-off index build cost is reported separately.
+
+Usage:
+    python benchmarks/bench_appointment_indexes.py
+    python benchmarks/bench_appointment_indexes.py --sizes 1000 1000000 --queries 200
+"""
+
+import argparse
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_appointment_journal import seed  # noqa: E402
+from data.stores import AppointmentStore  # noqa: E402
+
+CONTACTS = 50
+
+
+def scan_get_by_id(appointments, apt_id):
+    """Lookup as implemented before the indexes."""
+    for apt in appointments:
+        if apt.get('id') == apt_id:
+            return apt
+    return None
+
+
+def scan_list_by_contact(appointments, contact_id):
+    return [
+        apt for apt in appointments
+        if any(p.get('id') == contact_id for p in apt.get('participantes', []))
+    ]
+
+
+def scan_check_conflicts(appointments, apt_data):
+    participant_ids = [p.get('id') for p in apt_data['participantes']]
+    conflicts = []
+    for apt in appointments:
+        if apt.get('status') == 'cancelled' or apt.get('fecha') != apt_data['fecha']:
+            continue
+        if AppointmentStore._times_overlap(
+            apt_data['hora_inicio'], apt_data['hora_fin'], apt.get('hora_inicio'), apt.get('hora_fin')
+        ):
+            apt_participants = [p.get('id') for p in apt.get('participantes', [])]
+            if any(pid in apt_participants for pid in participant_ids):
+                conflicts.append(apt.get('id'))
+    return conflicts
+
+
+def timed(fn, args_list):
+    """Return the median latency of fn over args_list in milliseconds."""
+    latencies = []
+    for args in args_list:
+        start = time.perf_counter()
+        fn(*args)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return statistics.median(latencies)
+
+
+def bench(size, queries):
+    data_dir = tempfile.mkdtemp()
+    try:
+        seed(data_dir, size)
+        store = AppointmentStore(mode='rewrite', data_dir=data_dir)
+        appointments = store.list_all()
+
+        start = time.perf_counter()
+        store.get_by_id('apt_seed_0')  # builds the index
+        build_ms = (time.perf_counter() - start) * 1000
+
+        rng = random.Random(size)
+        ids = [(f'apt_seed_{rng.randrange(size)}',) for _ in range(queries)]
+        contacts = [(f'contact_{rng.randrange(CONTACTS)}',) for _ in range(queries)]
+        candidates = [
+            ({
+                'fecha': f'2026-{rng.randrange(12) + 1:02d}-{rng.randrange(28) + 1:02d}',
+                'hora_inicio': '10:30',
+                'hora_fin': '11:30',
+                'participantes': [{'id': f'contact_{rng.randrange(CONTACTS)}'}],
+            },)
+            for _ in range(queries)
+        ]
+
+        return build_ms, [
+            ('get_by_id',
+             timed(lambda a: scan_get_by_id(appointments, a), ids), timed(store.get_by_id, ids)),
+            ('list_by_contact',
+             timed(lambda c: scan_list_by_contact(appointments, c), contacts), timed(store.list_by_contact, contacts)),
+            ('check_conflicts',
+             timed(lambda d: scan_check_conflicts(appointments, d), candidates), timed(store.check_conflicts, candidates)),
+        ]
+    finally:
+        AppointmentStore._indexes.clear()
+        shutil.rmtree(data_dir)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 100_000, 1_000_000])
+    parser.add_argument('--queries', type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'size':>10} {'operation':>16} {'scan ms':>10} {'index ms':>10} {'speedup':>9}")
+    for size in args.sizes:
+        build_ms, rows = bench(size, args.queries)
+        print(f"{size:>10} {'index build':>16} {'':>10} {build_ms:>10.1f}")
+        for name, scan_ms, index_ms in rows:
+            print(f"{size:>10} {name:>16} {scan_ms:>10.3f} {index_ms:>10.3f} {scan_ms / index_ms:>8.0f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Benchmark: AppointmentStore write latency, full-rewrite vs append-only journal.
+
+Seeds a temporary appointments.json with N appointments and measures the
+latency of AppointmentStore.create() in each persistence mode.
+
+Usage:
+    python benchmarks/bench_appointment_journal.py
+    python benchmarks/bench_appointment_journal.py --sizes 1000 100000 1000000 --writes 50
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data.stores import AppointmentStore  # noqa: E402
+
+
+def seed(data_dir, size):
+    """Write a snapshot with `size` synthetic appointments."""
+    appointments = [
+        {
+            'id': f'apt_seed_{i}',
+            'fecha': f'2026-{(i % 12) + 1:02d}-{(i % 28) + 1:02d}',
+            'hora_inicio': f'{8 + i % 10:02d}:00',
+            'hora_fin': f'{9 + i % 10:02d}:00',
+            'status': 'confirmed',
+            'participantes': [{'id': f'contact_{i % 50}', 'nombre': 'Dr. Seed', 'rol': 'prestador'}],
+        }
+        for i in range(size)
+    ]
+    with open(os.path.join(data_dir, 'appointments.json'), 'w', encoding='utf-8') as f:
+        json.dump({'metadata': {'total_appointments': size}, 'appointments': appointments}, f)
+
+
+def bench(mode, size, writes):
+    """Return per-write latencies in milliseconds."""
+    data_dir = tempfile.mkdtemp()
+    try:
+        seed(data_dir, size)
+        store = AppointmentStore(mode=mode, data_dir=data_dir)
+        store.list_all()  # warm up: journal mode loads the snapshot once per process
+
+        latencies = []
+        for i in range(writes):
+            start = time.perf_counter()
+            store.create({
+                'fecha': '2026-06-01',
+                'hora_inicio': '10:00',
+                'hora_fin': '11:00',
+                'participantes': [{'id': f'contact_bench_{i}', 'nombre': 'Dr. Bench', 'rol': 'prestador'}],
+            })
+            latencies.append((time.perf_counter() - start) * 1000)
+        return latencies
+    finally:
+        shutil.rmtree(data_dir)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 100_000])
+    parser.add_argument('--writes', type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'size':>10} {'mode':>8} {'p50 ms':>10} {'p99 ms':>10}")
+    for size in args.sizes:
+        for mode in AppointmentStore.MODES:
+            latencies = sorted(bench(mode, size, args.writes))
+            p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+            print(f"{size:>10} {mode:>8} {statistics.median(latencies):>10.3f} {p99:>10.3f}")
+
+
+if __name__ == '__main__':
+    main()
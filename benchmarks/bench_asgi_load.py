@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Load test: gunicorn sync workers (WSGI) vs uvicorn workers (ASGI, async views).
+
+For each server mode the script builds a throw-away project state in a
+temporary directory (SQLite database with one provider and an API token,
+empty appointments/traces JSON stores in journal mode), starts the server
+on a free local port and fires a mix of requests from --concurrency
+concurrent clients:
+
+- POST /api/v1/appointments/ with natural language prompts (created,
+  conflicting and unknown-contact outcomes),
+- GET /api/v1/appointments/<id>/availability/ for a seeded booking.
+
+Reports requests/s, p50 and p99 per mode. Both modes run the same number
+of worker processes (default 1: how many in-flight requests one process
+can carry). Requires gunicorn, uvicorn and adrf (see requirements.txt).
+
+Usage:
+    python benchmarks/bench_asgi_load.py
+    python benchmarks/bench_asgi_load.py --requests 600 --concurrency 32 --workers 1
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SETTINGS = '''
+from config.settings.local import *  # noqa: F401,F403
+
+DEBUG = False
+ALLOWED_HOSTS = ['*']
+DATABASES = {{'default': {{'ENGINE': 'django.db.backends.sqlite3', 'NAME': {db!r}}}}}
+STORE_DATA_DIR = {data_dir!r}
+APPOINTMENT_STORE_MODE = 'journal'
+LOGGING = {{'version': 1, 'disable_existing_loggers': False}}
+SILENCED_SYSTEM_CHECKS = ['staticfiles.W004']
+'''
+
+SETUP = '''
+from django.contrib.auth.models import User
+from rest_framework.authtoken.models import Token
+from apps.contacts.models import Contact
+
+user = User.objects.create_user('bench', password='bench')
+Contact.objects.create(
+    id='contact_bench', nombre='Dr. Bench', activo=True,
+    ubicaciones=[{'id': 'loc_centro', 'nombre': 'Clínica Centro', 'disponible': True,
+                  'horario': {'inicio': '08:00', 'fin': '18:00', 'dias_laborales': [1, 2, 3, 4, 5, 6, 7]}}],
+)
+print(Token.objects.create(user=user).key)
+'''
+
+PROMPTS = [
+    'cita mañana {hour}:00 con Dr. Bench',
+    'cita mañana {hour}:30 con Dr. Bench en Clínica Centro',
+    'cita mañana 10am con Dr. Bench',
+    'cita mañana {hour}:00 con Dr. Nadie',
+]
+
+SERVERS = {
+    'gunicorn sync (WSGI)': ['gunicorn', 'config.wsgi:application'],
+    'uvicorn (ASGI)': ['gunicorn', 'config.asgi:application', '-k', 'uvicorn.workers.UvicornWorker'],
+}
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def prepare(work_dir):
+    """Create settings, database, token and stores; return (env, token)."""
+    data_dir = os.path.join(work_dir, 'data')
+    os.makedirs(data_dir)
+    tomorrow = (date.today() + timedelta(days=1)).isoformat()
+    stores = {
+        'appointments.json': {'metadata': {'total_appointments': 1}, 'appointments': [{
+            'id': 'apt_seed', 'fecha': tomorrow, 'hora_inicio': '10:00', 'hora_fin': '11:00',
+            'status': 'confirmed', 'contacto_id': 'contact_bench',
+        }]},
+        'traces.json': {'metadata': {'total_traces': 0}, 'traces': []},
+    }
+    for name, content in stores.items():
+        with open(os.path.join(data_dir, name), 'w', encoding='utf-8') as f:
+            json.dump(content, f)
+    with open(os.path.join(work_dir, 'bench_settings.py'), 'w', encoding='utf-8') as f:
+        f.write(SETTINGS.format(db=os.path.join(work_dir, 'db.sqlite3'), data_dir=data_dir))
+
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([work_dir, ROOT]), DJANGO_SETTINGS_MODULE='bench_settings')
+    manage = [sys.executable, os.path.join(ROOT, 'manage.py')]
+    subprocess.run(manage + ['migrate', '-v', '0'], env=env, cwd=ROOT, check=True)
+    token = subprocess.run(manage + ['shell', '-c', SETUP], env=env, cwd=ROOT, check=True,
+                           capture_output=True, text=True).stdout.strip().splitlines()[-1]
+    return env, token
+
+
+def wait_ready(port, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if httpx.get(f'http://127.0.0.1:{port}/api/v1/health/', timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError('server did not start')
+
+
+async def load(port, token, requests, concurrency):
+    headers = {'Authorization': f'Token {token}'}
+    latencies, statuses = [], {}
+    counter = iter(range(requests))
+
+    async def client(http):
+        for i in counter:
+            if i % 3 == 2:
+                call = http.get('/api/v1/appointments/apt_seed/availability/?dias_adelante=14')
+            else:
+                prompt = PROMPTS[i % len(PROMPTS)].format(hour=10 + i % 8)
+                call = http.post('/api/v1/appointments/', json={'prompt': prompt})
+            start = time.perf_counter()
+            response = await call
+            latencies.append((time.perf_counter() - start) * 1000)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=f'http://127.0.0.1:{port}', headers=headers,
+                                 limits=limits, timeout=60) as http:
+        start = time.perf_counter()
+        await asyncio.gather(*(client(http) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    latencies.sort()
+    return requests / elapsed, statistics.median(latencies), latencies[int(len(latencies) * 0.99) - 1], statuses
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=600)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--workers', type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"{'server':<22} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8}  statuses")
+    for name, command in SERVERS.items():
+        work_dir = tempfile.mkdtemp()
+        server = None
+        try:
+            env, token = prepare(work_dir)
+            port = free_port()
+            server = subprocess.Popen(
+                command + ['--workers', str(args.workers), '--bind', f'127.0.0.1:{port}', '--log-level', 'warning'],
+                env=env, cwd=ROOT,
+            )
+            wait_ready(port)
+            rps, p50, p99, statuses = asyncio.run(load(port, token, args.requests, args.concurrency))
+            print(f"{name:<22} {rps:>8.1f} {p50:>8.1f} {p99:>8.1f}  {dict(sorted(statuses.items()))}")
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
+            shutil.rmtree(work_dir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Benchmark: materialized free-slot view behind the availability endpoints.
+
+Seeds a temporary appointments.json for one provider with bookings on
+every day and times ContactStore.get_available_slots() when:
+
+- cold: the view is dropped before every read (every day is recomputed),
+- warm: every day is already materialized,
+- write: one booking is created and cancelled between reads, so only the
+  touched day is recomputed.
+
+Usage:
+    python benchmarks/bench_availability_view.py
+    python benchmarks/bench_availability_view.py --days 7 30 90 --per-day 16
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data.stores import AppointmentStore, ContactStore  # noqa: E402
+from data.timeutils import format_minutes  # noqa: E402
+
+CONTACT = 'contact_busy'
+START = date(2026, 3, 2)
+
+
+def seed(data_dir, days, per_day):
+    rng = random.Random(days * per_day)
+    appointments = []
+    for d in range(days):
+        fecha = (START + timedelta(days=d)).isoformat()
+        for i in range(per_day):
+            start = 8 * 60 + rng.randrange(0, 600, 5)
+            appointments.append({
+                'id': f'apt_{d}_{i}',
+                'fecha': fecha,
+                'hora_inicio': format_minutes(start),
+                'hora_fin': format_minutes(start + rng.choice([15, 30, 45])),
+                'status': 'confirmed',
+                'contacto_id': CONTACT,
+            })
+    with open(os.path.join(data_dir, 'appointments.json'), 'w', encoding='utf-8') as f:
+        json.dump({'metadata': {'total_appointments': len(appointments)}, 'appointments': appointments}, f)
+
+
+def median_ms(fn, repeat, before=None):
+    latencies = []
+    for _ in range(repeat):
+        if before is not None:
+            before()
+        start = time.perf_counter()
+        fn()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return statistics.median(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--days', type=int, nargs='+', default=[7, 30, 90])
+    parser.add_argument('--per-day', type=int, default=16)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'days':>6} {'cold ms':>10} {'warm ms':>10} {'write ms':>10} {'speedup':>8}")
+    for days in args.days:
+        data_dir = tempfile.mkdtemp()
+        try:
+            seed(data_dir, days, args.per_day)
+            store = AppointmentStore(mode='journal', data_dir=data_dir)
+            contact_store = ContactStore(appointment_store=store)
+
+            def search():
+                return contact_store.get_available_slots(
+                    CONTACT, days_ahead=days, duration_minutes=45, start_date=START, limit=10,
+                )
+
+            def drop_view():
+                store._index().intervals.clear_free_slots()
+
+            booked = store.create({'fecha': START.isoformat(), 'hora_inicio': '07:00',
+                                   'hora_fin': '07:30', 'contacto_id': CONTACT})
+
+            def touch_one_day():
+                status = 'cancelled' if store.get_by_id(booked['id']).get('status') != 'cancelled' else 'confirmed'
+                store.update(booked['id'], {'status': status})
+
+            expected = search()
+            cold_ms = median_ms(search, args.repeat, before=drop_view)
+            search()
+            warm_ms = median_ms(search, args.repeat)
+            write_ms = median_ms(search, args.repeat, before=touch_one_day)
+            assert search() == expected
+            print(f"{days:>6} {cold_ms:>10.3f} {warm_ms:>10.3f} {write_ms:>10.3f} {cold_ms / warm_ms:>7.1f}x")
+        finally:
+            AppointmentStore._indexes.clear()
+            shutil.rmtree(data_dir)
+
+
+if __name__ == '__main__':
+    main()
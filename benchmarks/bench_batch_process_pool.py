@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Benchmark: AgentOrchestrator.process_batch() with its pure-compute agents in 0..N worker processes.
+
+Books a corpus of --prompts prompts ("cita a las <hora> el <fecha> con
+<contacto> en <ubicación>", the location written exactly, unaccented or
+misspelled so geo reasoning also fuzzy-matches) against --contacts
+contacts with --locations locations each, into a PendingAppointmentStore
+(nothing is written). For each process count (0: no pool, everything in
+the caller) reports:
+
+- pool s: time in the workers' rounds (parsing, then temporal and geo
+  reasoning) including the parent's contact prefetch,
+- total s and prompts/s: the whole batch, booking included,
+- pool speedup against one process, total speedup against the first run
+  (no pool by default).
+
+Pools are started and warmed up before timing (spawn start-up is reported
+apart). Every run must give the same outcome for every prompt. The
+contacts are served from memory, so the numbers exclude database queries.
+
+Usage:
+    python benchmarks/bench_batch_process_pool.py
+    python benchmarks/bench_batch_process_pool.py --prompts 10000 --processes 0 1 2 4 8
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from apps.agents.batch_pool import run_agents  # noqa: E402
+from apps.agents.orchestrator import AgentOrchestrator  # noqa: E402
+from data.names import ContactNameIndex  # noqa: E402
+from data.stores import AppointmentStore, ContactStore, PendingAppointmentStore  # noqa: E402
+
+FIRST = ['Ana', 'Luis', 'María', 'José', 'Sofía', 'Andrés', 'Lucía', 'Inés', 'Ramón', 'Elena']
+LAST = ['Pérez', 'García', 'López', 'Martínez', 'Sánchez', 'Gómez', 'Díaz', 'Torres', 'Ruiz', 'Ortiz']
+PLACES = ['Norte', 'Sur', 'Centro', 'Oriente', 'Poniente', 'Polanco', 'Coyoacán', 'Tlalpan', 'Roma', 'Condesa',
+          'Del Valle', 'Satélite']
+HOURS = {'inicio': '08:00', 'fin': '18:00', 'dias_laborales': [1, 2, 3, 4, 5, 6, 7]}
+
+
+class InMemoryContactStore(ContactStore):
+    """ContactStore over a fixed directory instead of the database."""
+
+    def __init__(self, contacts, **kwargs):
+        super().__init__(**kwargs)
+        self.contacts = {contact['id']: contact for contact in contacts}
+        self.index = ContactNameIndex()
+        self.index.build((contact['id'], contact['nombre'], True) for contact in contacts)
+
+    def get_by_id(self, contact_id):
+        return self.contacts.get(contact_id)
+
+    def get_by_ids(self, contact_ids):
+        return {contact_id: self.contacts[contact_id] for contact_id in contact_ids if contact_id in self.contacts}
+
+    def search_by_name(self, nombre, limit=5):
+        return self.index.search(nombre, limit)
+
+
+def directory(size, locations):
+    names = [f"Dr. {first} {last}" for first in FIRST for last in LAST][:size]
+    return [{
+        'id': f'contact_{i}', 'nombre': nombre, 'activo': True, 'updated_at': 'bench',
+        'ubicaciones': [{'id': f'loc_{j}', 'nombre': f'Clínica {place}', 'disponible': True, 'horario': HOURS}
+                        for j, place in enumerate(PLACES[:locations])],
+    } for i, nombre in enumerate(names)]
+
+
+def corpus(contacts, size, rng):
+    unaccent = str.maketrans('áéíóúÁÉÍÓÚ', 'aeiouAEIOU')
+    start = date.today() + timedelta(days=1)
+    prompts = []
+    for i in range(size):
+        contact = rng.choice(contacts)
+        place = rng.choice(contact['ubicaciones'])['nombre']
+        # Exact, unaccented lowercase, or a letter dropped
+        place = [place, place.translate(unaccent).lower(), place[:-2] + place[-1]][i % 3]
+        day = start + timedelta(days=rng.randrange(60))
+        prompts.append(f"cita a las {rng.randrange(8, 18):02d}:00 el {day.isoformat()} con {contact['nombre']}"
+                       f" en {place}")
+    return prompts
+
+
+def run(orchestrator, requests, stores):
+    precompute = AgentOrchestrator._precompute_batch
+    timing = {'pool': 0.0}
+
+    def timed(self, *args):
+        start = time.perf_counter()
+        try:
+            return precompute(self, *args)
+        finally:
+            timing['pool'] = time.perf_counter() - start
+
+    with mock.patch.object(AgentOrchestrator, '_precompute_batch', timed):
+        start = time.perf_counter()
+        results = orchestrator.process_batch(requests, stores)
+        total = time.perf_counter() - start
+    outcomes = [(result['status'], (result['data'] or {}).get('ubicacion_id')) for result in results]
+    return timing['pool'], total, outcomes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--prompts', type=int, default=10000)
+    parser.add_argument('--contacts', type=int, default=50)
+    parser.add_argument('--locations', type=int, default=12)
+    parser.add_argument('--processes', type=int, nargs='+', default=[0, 1, 2, 4, 8])
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp()
+    try:
+        with open(os.path.join(data_dir, 'appointments.json'), 'w', encoding='utf-8') as f:
+            json.dump({'metadata': {'total_appointments': 0}, 'appointments': []}, f)
+        contacts = directory(args.contacts, args.locations)
+        requests = [{'prompt': prompt} for prompt in corpus(contacts, args.prompts, random.Random(23))]
+
+        print(f"{args.prompts} prompts, {len(contacts)} contacts x {args.locations} locations,"
+              f" {os.cpu_count()} CPUs\n")
+        print(f"{'processes':>9} {'start-up s':>10} {'pool s':>8} {'total s':>8} {'prompts/s':>10}"
+              f" {'pool speedup':>13} {'total speedup':>14}")
+        total_base = pool_base = expected = None
+        for processes in args.processes:
+            orchestrator = AgentOrchestrator(max_workers=0, batch_processes=processes)
+            startup = 0.0
+            if orchestrator.batch_pool:
+                start = time.perf_counter()
+                orchestrator.batch_pool.map(run_agents, [('parsing', {'prompt': 'hola'})] * processes)
+                startup = time.perf_counter() - start
+            try:
+                apt_store = PendingAppointmentStore(mode='rewrite', data_dir=data_dir)
+                stores = {
+                    'appointment_store': apt_store,
+                    'contact_store': InMemoryContactStore(contacts, appointment_store=apt_store),
+                    'service_store': None,
+                }
+                pool, total, outcomes = run(orchestrator, requests, stores)
+            finally:
+                if orchestrator.batch_pool:
+                    orchestrator.batch_pool.shutdown()
+
+            if expected is None:
+                expected = outcomes
+            assert outcomes == expected, f'{processes} processes: outcomes differ'
+            total_base = total_base or total
+            pool_base = pool_base or (pool if orchestrator.batch_pool else None)
+            pool_speedup = f"{pool_base / pool:.2f}x" if orchestrator.batch_pool else '-'
+            print(f"{processes:>9} {startup:>10.2f} {pool:>8.2f} {total:>8.2f} {args.prompts / total:>10.0f}"
+                  f" {pool_speedup:>13} {total_base / total:>13.2f}x")
+
+        statuses = [status for status, _ in expected]
+        print(f"\noutcomes: {statuses.count('success')} success, {statuses.count('conflict')} conflict,"
+              f" {statuses.count('error')} error")
+    finally:
+        AppointmentStore._indexes.clear()
+        shutil.rmtree(data_dir)
+
+
+if __name__ == '__main__':
+    main()
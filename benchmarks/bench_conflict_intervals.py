@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Benchmark: conflict checks on busy days, date scan vs interval index.
+
+Seeds a temporary appointments.json where every appointment falls on the
+same date (a busy clinic day: 40 x 15-minute appointments per provider)
+and measures check_conflicts() through the per-(participant, fecha)
+interval index against the previous scan of every appointment on that
+date with "HH:MM" string parsing.
+
+Usage:
+    python benchmarks/bench_conflict_intervals.py
+    python benchmarks/bench_conflict_intervals.py --per-day 100 10000 --queries 500
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data.indexes import participant_ids  # noqa: E402
+from data.stores import AppointmentStore  # noqa: E402
+
+FECHA = '2026-06-01'
+PER_PROVIDER = 40
+
+
+def seed(data_dir, per_day):
+    """Write a snapshot with `per_day` appointments on FECHA."""
+    appointments = []
+    for i in range(per_day):
+        start = 8 * 60 + (i % PER_PROVIDER) * 15
+        appointments.append({
+            'id': f'apt_seed_{i}',
+            'fecha': FECHA,
+            'hora_inicio': f'{start // 60:02d}:{start % 60:02d}',
+            'hora_fin': f'{(start + 15) // 60:02d}:{(start + 15) % 60:02d}',
+            'status': 'confirmed',
+            'participantes': [{'id': f'contact_{i // PER_PROVIDER}', 'rol': 'prestador'}],
+        })
+    with open(os.path.join(data_dir, 'appointments.json'), 'w', encoding='utf-8') as f:
+        json.dump({'metadata': {'total_appointments': per_day}, 'appointments': appointments}, f)
+
+
+def scan_check_conflicts(store, apt_data):
+    """check_conflicts as implemented before the interval index (date bucket scan)."""
+    requested = participant_ids(apt_data)
+    conflicts = []
+    for apt in store.list_by_date(apt_data['fecha']):
+        if apt.get('status') == 'cancelled':
+            continue
+        if AppointmentStore._times_overlap(
+            apt_data['hora_inicio'], apt_data['hora_fin'], apt.get('hora_inicio'), apt.get('hora_fin')
+        ) and requested & participant_ids(apt):
+            conflicts.append(apt.get('id'))
+    return conflicts
+
+
+def timed(fn, candidates):
+    latencies = []
+    for candidate in candidates:
+        start = time.perf_counter()
+        fn(candidate)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return statistics.median(latencies)
+
+
+def bench(per_day, queries):
+    data_dir = tempfile.mkdtemp()
+    try:
+        seed(data_dir, per_day)
+        store = AppointmentStore(mode='rewrite', data_dir=data_dir)
+        store.list_by_date(FECHA)  # warm up: parse + build indexes
+
+        rng = random.Random(per_day)
+        providers = max(1, per_day // PER_PROVIDER)
+        candidates = []
+        for _ in range(queries):
+            start = 8 * 60 + rng.randrange(40) * 15
+            candidates.append({
+                'fecha': FECHA,
+                'hora_inicio': f'{start // 60:02d}:{start % 60:02d}',
+                'hora_fin': f'{(start + 30) // 60:02d}:{(start + 30) % 60:02d}',
+                'participantes': [{'id': f'contact_{rng.randrange(providers)}'}],
+            })
+
+        return (
+            timed(lambda c: scan_check_conflicts(store, c), candidates),
+            timed(store.check_conflicts, candidates),
+        )
+    finally:
+        AppointmentStore._indexes.clear()
+        shutil.rmtree(data_dir)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--per-day', type=int, nargs='+', default=[100, 1_000, 10_000, 100_000])
+    parser.add_argument('--queries', type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'per day':>10} {'scan ms':>10} {'interval ms':>12} {'speedup':>9}")
+    for per_day in args.per_day:
+        scan_ms, index_ms = bench(per_day, args.queries)
+        print(f"{per_day:>10} {scan_ms:>10.3f} {index_ms:>12.4f} {scan_ms / index_ms:>8.0f}x")
+
+
+if __name__ == '__main__':
+    main()
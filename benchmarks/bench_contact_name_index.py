@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Benchmark: contact resolution by substring scan vs the folded trigram name index.
+
+Builds a synthetic directory of --contacts names ("Dr./Dra. <first> <last>
+<last>") and resolves a mix of queries: exact names, surnames, unaccented
+and misspelled names. Reports per query:
+
+- scan: the old resolution, a case-sensitive-folded substring test over
+  every contact dict (excludes the ORM query of list_all() it also paid),
+- index: ContactNameIndex.search() (data/names.py),
+
+plus the index build time and how many queries each approach resolved.
+
+Usage:
+    python benchmarks/bench_contact_name_index.py
+    python benchmarks/bench_contact_name_index.py --contacts 1000 10000 50000 --queries 2000
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data.names import ContactNameIndex  # noqa: E402
+
+FIRST = ['Ana', 'Luis', 'María', 'José', 'Sofía', 'Andrés', 'Lucía', 'Jesús', 'Inés', 'Ramón',
+         'Elena', 'Tomás', 'Julia', 'Víctor', 'Carmen', 'Raúl', 'Paula', 'Óscar', 'Irene', 'Martín']
+LAST = ['Pérez', 'García', 'López', 'Martínez', 'Sánchez', 'Gómez', 'Díaz', 'Hernández', 'Núñez',
+        'Álvarez', 'Jiménez', 'Ruiz', 'Muñoz', 'Ortiz', 'Castañeda', 'Ibáñez', 'Peña', 'Domínguez',
+        'Vázquez', 'Fernández', 'Rodríguez', 'Morales', 'Gutiérrez', 'Ríos', 'Méndez', 'Aguilar']
+
+
+def directory(size, rng):
+    contacts = []
+    for i in range(size):
+        honorific = rng.choice(['Dr.', 'Dra.'])
+        nombre = f"{honorific} {rng.choice(FIRST)} {rng.choice(LAST)} {rng.choice(LAST)}"
+        contacts.append({'id': f'contact_{i}', 'nombre': nombre, 'activo': True})
+    return contacts
+
+
+def queries(contacts, count, rng):
+    unaccent = str.maketrans('áéíóúñÁÉÍÓÚÑ', 'aeiounAEIOUN')
+    result = []
+    for i in range(count):
+        nombre = rng.choice(contacts)['nombre']
+        kind = i % 4
+        if kind == 0:
+            result.append(nombre)  # exact
+        elif kind == 1:
+            result.append(' '.join(nombre.split()[:1] + nombre.split()[2:3]))  # "Dr. Pérez"
+        elif kind == 2:
+            result.append(nombre.translate(unaccent).lower())  # unaccented, lowercase
+        else:
+            parts = nombre.split()
+            result.append(' '.join(parts[1:3])[:-1])  # first name and surname, last letter dropped
+    return result
+
+
+def scan(contacts, query):
+    """The previous resolution: first contact whose name contains the query."""
+    query = query.lower()
+    for contact in contacts:
+        if query in contact.get('nombre', '').lower():
+            return contact['id']
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--contacts', type=int, nargs='+', default=[1000, 10000, 50000])
+    parser.add_argument('--queries', type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    print(f"{'contacts':>8} {'build ms':>9} {'scan p50 us':>12} {'index p50 us':>13} {'index p99 us':>13}"
+          f" {'scan found':>11} {'index found':>12}")
+    for size in args.contacts:
+        contacts = directory(size, rng)
+        sample = queries(contacts, args.queries, rng)
+
+        start = time.perf_counter()
+        index = ContactNameIndex()
+        index.build((c['id'], c['nombre'], c['activo']) for c in contacts)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        results = {}
+        for name, resolve in (('scan', lambda q: scan(contacts, q)),
+                              ('index', lambda q: (index.search(q) or [{}])[0].get('id'))):
+            latencies, found = [], 0
+            for query in sample:
+                start = time.perf_counter()
+                found += resolve(query) is not None
+                latencies.append((time.perf_counter() - start) * 1e6)
+            latencies.sort()
+            results[name] = (statistics.median(latencies), latencies[int(len(latencies) * 0.99) - 1], found)
+
+        print(f"{size:>8} {build_ms:>9.1f} {results['scan'][0]:>12.1f} {results['index'][0]:>13.1f}"
+              f" {results['index'][1]:>13.1f} {results['scan'][2]:>11} {results['index'][2]:>12}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Benchmark: "first free provider of a specialty", per-provider search vs heap merge.
+
+Seeds a temporary appointments.json where every provider is booked solid
+for a random number of days, then compares:
+  - per provider: get_available_slots() for each one, then sort (what a
+    client calling /availability/suggest/ per contact does),
+  - ContactStore.earliest_by_specialty(): lazy per-provider streams merged
+    through a heap, stopping after k slots.
+
+The provider list is served from memory so the numbers exclude the
+contacts query.
+
+Usage:
+    python benchmarks/bench_earliest_provider.py
+    python benchmarks/bench_earliest_provider.py --providers 10 100 1000 --k 5
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data.stores import AppointmentStore, ContactStore  # noqa: E402
+
+START = date(2026, 3, 2)
+
+
+class InMemoryContactStore(ContactStore):
+    """ContactStore with a fixed provider list instead of the database."""
+
+    def __init__(self, providers, appointment_store):
+        super().__init__(appointment_store=appointment_store)
+        self.providers = providers
+
+    def list_by_specialty(self, especialidad, tipo='prestador'):
+        return self.providers
+
+
+def seed(data_dir, providers, days):
+    """Book each provider 08:00-18:00 for 0..days-1 days."""
+    rng = random.Random(providers)
+    appointments = []
+    for p in range(providers):
+        for d in range(rng.randrange(days)):
+            appointments.append({
+                'id': f'apt_{p}_{d}',
+                'fecha': (START + timedelta(days=d)).isoformat(),
+                'hora_inicio': '08:00',
+                'hora_fin': '18:00',
+                'status': 'confirmed',
+                'contacto_id': f'provider_{p}',
+            })
+    with open(os.path.join(data_dir, 'appointments.json'), 'w', encoding='utf-8') as f:
+        json.dump({'metadata': {'total_appointments': len(appointments)}, 'appointments': appointments}, f)
+
+
+def per_provider(contact_store, providers, k, days):
+    slots = []
+    for provider in providers:
+        for slot in contact_store.get_available_slots(provider['id'], days_ahead=days, start_date=START, limit=k):
+            slots.append((slot['fecha'], slot['hora_inicio'], provider['id']))
+    return sorted(slots)[:k]
+
+
+def median_ms(fn, repeat):
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return statistics.median(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--providers', type=int, nargs='+', default=[10, 100, 1000])
+    parser.add_argument('--k', type=int, default=5)
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"{'providers':>10} {'per-provider ms':>16} {'heap merge ms':>14}")
+    for count in args.providers:
+        data_dir = tempfile.mkdtemp()
+        try:
+            seed(data_dir, count, args.days)
+            store = AppointmentStore(mode='rewrite', data_dir=data_dir)
+            store.list_all()
+            providers = [{'id': f'provider_{p}', 'nombre': f'Provider {p}'} for p in range(count)]
+            contact_store = InMemoryContactStore(providers, store)
+
+            def merged():
+                return contact_store.earliest_by_specialty('cardiología', START, limit=args.k, days_ahead=args.days)
+
+            expected = per_provider(contact_store, providers, args.k, args.days)
+            assert [(s['fecha'], s['hora_inicio'], s['contacto_id']) for s in merged()] == expected
+
+            loop_ms = median_ms(lambda: per_provider(contact_store, providers, args.k, args.days), args.repeat)
+            heap_ms = median_ms(merged, args.repeat)
+            print(f"{count:>10} {loop_ms:>16.2f} {heap_ms:>14.2f}")
+        finally:
+            AppointmentStore._indexes.clear()
+            shutil.rmtree(data_dir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Benchmark: GeoReasoningAgent location matching, full scan vs precomputed matcher.
+
+Builds contacts with --locations locations each ("Clínica Polanco 3",
+"Consultorio Roma Norte", ...) and resolves a mix of references: exact
+names, unaccented names, misspellings and references matching nothing
+well (which also build suggestions). Reports p50/p99 per reference for:
+
+- scan: the previous agent code, normalizing every name and running
+  SequenceMatcher against every location (twice for suggestions),
+- matcher: GeoReasoningAgent.run() with the per-contact LocationMatcher
+  (apps/agents/location_matcher.py), cached across requests,
+
+per kind of reference, plus the time to build a matcher, and checks both
+pick the same location.
+
+Usage:
+    python benchmarks/bench_location_matcher.py
+    python benchmarks/bench_location_matcher.py --locations 100 300 1000 --queries 1000
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from difflib import SequenceMatcher
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from apps.agents.geo_agent import GeoReasoningAgent  # noqa: E402
+from apps.agents.location_matcher import LocationMatcher, location_matchers, normalize_location_name  # noqa: E402
+
+KINDS = ['Clínica', 'Consultorio', 'Hospital', 'Centro Médico', 'Oficina']
+AREAS = ['Polanco', 'Roma', 'Condesa', 'Del Valle', 'Coyoacán', 'San Ángel', 'Santa Fe', 'Narvarte',
+         'Juárez', 'Tlalpan', 'Lindavista', 'Satélite', 'Interlomas', 'Mixcoac', 'Napoles']
+SIDES = ['', 'Norte', 'Sur', 'Oriente', 'Poniente']
+
+
+def locations(count, rng):
+    names = set()
+    while len(names) < count:
+        names.add(' '.join(filter(None, [rng.choice(KINDS), rng.choice(AREAS), rng.choice(SIDES),
+                                         str(rng.randint(1, 20))])))
+    return [{'id': f'loc_{i}', 'nombre': nombre} for i, nombre in enumerate(sorted(names))]
+
+
+KINDS_OF_REFERENCE = ('exact', 'unaccented', 'misspelled', 'weak')
+
+
+def references(locs, count, rng):
+    """{kind: [reference, ...]} with ``count`` references of each kind."""
+    unaccent = str.maketrans('áéíóúÁÉÍÓÚ', 'aeiouAEIOU')
+    result = {kind: [] for kind in KINDS_OF_REFERENCE}
+    for _ in range(count):
+        nombre = rng.choice(locs)['nombre']
+        cut = rng.randrange(1, len(nombre) - 1)
+        result['exact'].append(nombre)
+        result['unaccented'].append(nombre.translate(unaccent).lower())
+        result['misspelled'].append(nombre[:cut] + nombre[cut + 1:])  # one letter missing
+        result['weak'].append(rng.choice(['la del centro', 'consultorio sur', 'hospital nuevo']))
+    return result
+
+
+def scan(ubicacion_raw, locs):
+    """The previous GeoReasoningAgent resolution: returns the location id."""
+    lowered = ubicacion_raw.lower().strip()
+    for loc in locs:
+        if loc['nombre'].lower().strip() == lowered:
+            return loc['id']
+        if normalize_location_name(ubicacion_raw) == normalize_location_name(loc['nombre']):
+            return loc['id']
+    best, best_ratio = None, 0.0
+    for loc in locs:
+        ratio = SequenceMatcher(None, lowered, loc['nombre'].lower().strip()).ratio()
+        if ratio > best_ratio:
+            best, best_ratio = loc['id'], ratio
+    if best_ratio <= 0.7:
+        # Suggestions were scored again over every location
+        sorted((SequenceMatcher(None, lowered, loc['nombre'].lower()).ratio() for loc in locs), reverse=True)
+    return best
+
+
+def percentiles(latencies):
+    latencies = sorted(latencies)
+    return statistics.median(latencies), latencies[int(len(latencies) * 0.99) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--locations', type=int, nargs='+', default=[100, 300, 1000])
+    parser.add_argument('--queries', type=int, default=300, help='references of each kind')
+    args = parser.parse_args()
+
+    rng = random.Random(11)
+    agent = GeoReasoningAgent()
+    print(f"{'locations':>9} {'reference':<11} {'scan p50 us':>12} {'scan p99 us':>12}"
+          f" {'matcher p50 us':>15} {'matcher p99 us':>15} {'speedup':>8}")
+    for size in args.locations:
+        locs = locations(size, rng)
+        sample = references(locs, args.queries, rng)
+        contacto_id = f'contact_{size}'
+
+        start = time.perf_counter()
+        LocationMatcher(locs)
+        print(f"{size:>9} {'(build)':<11} {'':>12} {'':>12} {(time.perf_counter() - start) * 1e6:>15.1f}")
+
+        def resolve(query):
+            result = agent.run({'ubicacion_raw': query, 'contacto_id': contacto_id, 'available_locations': locs})
+            return result.data.get('location_id')
+
+        for kind, queries in sample.items():
+            for query in queries[:50]:
+                assert resolve(query) == scan(query, locs), query
+
+            results = {}
+            for name, run in (('scan', lambda q: scan(q, locs)), ('matcher', resolve)):
+                latencies = []
+                for query in queries:
+                    start = time.perf_counter()
+                    run(query)
+                    latencies.append((time.perf_counter() - start) * 1e6)
+                results[name] = percentiles(latencies)
+
+            print(f"{size:>9} {kind:<11} {results['scan'][0]:>12.1f} {results['scan'][1]:>12.1f}"
+                  f" {results['matcher'][0]:>15.1f} {results['matcher'][1]:>15.1f}"
+                  f" {results['scan'][0] / results['matcher'][0]:>7.1f}x")
+    location_matchers.invalidate()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Benchmark: conflict and suggestion loops with "HH:MM" strings vs integer minutes.
+
+Seeds a temporary appointments.json for one provider and times:
+  - conflict loop: one day's candidates tested against the day's bookings,
+    comparing "HH:MM" strings split per comparison vs minutes parsed once,
+  - AppointmentStore.check_conflicts_many() and get_suggestions(),
+  - ValidationAgent / AvailabilityAgent / NegotiationAgent .run() on a
+    conflicting request (the negotiation path of POST /appointments/).
+
+The contact is served from memory so the numbers exclude the contacts query.
+
+Usage:
+    python benchmarks/bench_minute_times.py
+    python benchmarks/bench_minute_times.py --per-day 32 --repeat 2000
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from apps.agents.availability_agent import AvailabilityAgent  # noqa: E402
+from apps.agents.negotiation_agent import NegotiationAgent  # noqa: E402
+from apps.agents.validation_agent import ValidationAgent  # noqa: E402
+from data.stores import AppointmentStore, ContactStore  # noqa: E402
+from data.timeutils import format_minutes, to_minutes  # noqa: E402
+
+CONTACT = 'contact_busy'
+FECHA = date(2026, 3, 2).isoformat()
+
+
+class InMemoryContactStore(ContactStore):
+    """ContactStore with a fixed contact instead of the database."""
+
+    def get_by_id(self, contact_id):
+        return {'id': contact_id, 'nombre': 'Dr. Busy', 'activo': True, 'updated_at': 'bench'}
+
+
+def seed(data_dir, per_day):
+    rng = random.Random(per_day)
+    appointments = []
+    for i in range(per_day):
+        start = 8 * 60 + rng.randrange(0, 600, 5)
+        appointments.append({
+            'id': f'apt_{i}',
+            'fecha': FECHA,
+            'hora_inicio': format_minutes(start),
+            'hora_fin': format_minutes(start + rng.choice([15, 30, 45])),
+            'status': 'confirmed',
+            'contacto_id': CONTACT,
+        })
+    with open(os.path.join(data_dir, 'appointments.json'), 'w', encoding='utf-8') as f:
+        json.dump({'metadata': {'total_appointments': len(appointments)}, 'appointments': appointments}, f)
+    return appointments
+
+
+def string_loop(candidates, appointments):
+    """Every comparison splits and int()s four "HH:MM" strings."""
+    def minutes(value):
+        h, m = value.split(':')
+        return int(h) * 60 + int(m)
+
+    return [
+        [apt['id'] for apt in appointments
+         if minutes(hora_inicio) < minutes(apt['hora_fin']) and minutes(apt['hora_inicio']) < minutes(hora_fin)]
+        for hora_inicio, hora_fin in candidates
+    ]
+
+
+def minute_loop(candidates, appointments):
+    """Times are converted once at the boundary, then compared as integers."""
+    windows = [(to_minutes(hora_inicio), to_minutes(hora_fin)) for hora_inicio, hora_fin in candidates]
+    intervals = [(to_minutes(apt['hora_inicio']), to_minutes(apt['hora_fin']), apt['id']) for apt in appointments]
+    return [[apt_id for s, e, apt_id in intervals if start < e and s < end] for start, end in windows]
+
+
+def median_us(fn, repeat):
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        latencies.append((time.perf_counter() - start) * 1e6)
+    return statistics.median(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--per-day', type=int, default=16)
+    parser.add_argument('--repeat', type=int, default=500)
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp()
+    try:
+        appointments = seed(data_dir, args.per_day)
+        apt_store = AppointmentStore(mode='rewrite', data_dir=data_dir)
+        stores = {'appointment_store': apt_store, 'contact_store': InMemoryContactStore(appointment_store=apt_store)}
+        candidates = [(format_minutes(m), format_minutes(m + 60)) for m in range(8 * 60, 18 * 60, 30)]
+        store_candidates = [{'fecha': FECHA, 'hora_inicio': s, 'hora_fin': e, 'contacto_id': CONTACT}
+                            for s, e in candidates]
+        request = {'contacto_id': CONTACT, 'fecha': FECHA, 'hora_inicio': appointments[0]['hora_inicio'],
+                   'hora_fin': format_minutes(to_minutes(appointments[0]['hora_inicio']) + 60), 'stores': stores}
+
+        assert string_loop(candidates, appointments) == minute_loop(candidates, appointments)
+        rows = [
+            ('conflict loop (strings)', lambda: string_loop(candidates, appointments)),
+            ('conflict loop (minutes)', lambda: minute_loop(candidates, appointments)),
+            ('check_conflicts_many x20', lambda: apt_store.check_conflicts_many(store_candidates)),
+            ('get_suggestions', lambda: apt_store.get_suggestions(
+                {'fecha': FECHA, 'contacto_id': CONTACT, 'duracion_minutos': 60})),
+            ('ValidationAgent.run', lambda: ValidationAgent().run(request)),
+            ('AvailabilityAgent.run', lambda: AvailabilityAgent().run(request)),
+            ('NegotiationAgent.run', lambda: NegotiationAgent().run(request)),
+        ]
+
+        print(f"{'loop':<28} {'median us':>10}")
+        for name, fn in rows:
+            fn()
+            print(f"{name:<28} {median_us(fn, args.repeat):>10.1f}")
+    finally:
+        AppointmentStore._indexes.clear()
+        shutil.rmtree(data_dir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Benchmark: 5-minute occupancy bitmaps vs "HH:MM" string-compare loops.
+
+Builds the appointment index for one busy provider over a year and
+measures:
+  - the memory taken by the occupancy bitmaps per provider-year,
+  - a single availability check (mask AND vs loop over the day),
+  - free-slot enumeration for a day (zero-run scan vs testing every
+    30-minute start against every appointment).
+
+Usage:
+    python benchmarks/bench_occupancy.py
+    python benchmarks/bench_occupancy.py --per-day 30 --repeat 2000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data.indexes import AppointmentIndex  # noqa: E402
+from data.occupancy import FULL_DAY, SLOT_MINUTES, SLOTS_PER_DAY, grid_mask, iter_bits, run_starts  # noqa: E402
+from data.stores import AppointmentStore  # noqa: E402
+from data.timeutils import format_minutes  # noqa: E402
+
+CONTACT = 'contact_busy'
+
+
+def build(per_day):
+    """Index a year of appointments: `per_day` random 15/30/45-minute bookings per day."""
+    rng = random.Random(per_day)
+    appointments = []
+    day = date(2026, 1, 1)
+    for d in range(365):
+        fecha = (day + timedelta(days=d)).isoformat()
+        for i in range(per_day):
+            start = 8 * 60 + rng.randrange(0, 600, 5)
+            appointments.append({
+                'id': f'apt_{d}_{i}',
+                'fecha': fecha,
+                'hora_inicio': format_minutes(start),
+                'hora_fin': format_minutes(start + rng.choice([15, 30, 45])),
+                'status': 'confirmed',
+                'contacto_id': CONTACT,
+            })
+    return appointments, AppointmentIndex(appointments)
+
+
+def loop_is_free(day_appointments, hora_inicio, hora_fin):
+    """Pre-bitmap check: compare against every appointment of the day."""
+    return not any(
+        AppointmentStore._times_overlap(hora_inicio, hora_fin, apt['hora_inicio'], apt['hora_fin'])
+        for apt in day_appointments
+    )
+
+
+def loop_free_slots(day_appointments, duration):
+    """Pre-bitmap enumeration: every 30-minute start (8-18) against every appointment."""
+    slots = []
+    for hour in range(8, 18):
+        for minute in (0, 30):
+            hora = f"{hour:02d}:{minute:02d}"
+            if loop_is_free(day_appointments, hora, AppointmentStore._add_minutes(hora, duration)):
+                slots.append(hora)
+    return slots
+
+
+def mask_free_slots(busy, duration):
+    starts = run_starts(FULL_DAY & ~busy, -(-duration // SLOT_MINUTES)) & grid_mask(8 * 60, 18 * 60, 30)
+    return [format_minutes(slot * SLOT_MINUTES) for slot in iter_bits(starts)]
+
+
+def per_call_us(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--per-day', type=int, nargs='+', default=[8, 16, 32])
+    parser.add_argument('--repeat', type=int, default=1000)
+    args = parser.parse_args()
+
+    for per_day in args.per_day:
+        appointments, index = build(per_day)
+        days = {key[1]: day for key, day in index.intervals.days.items()}
+        masks = [day.mask for day in days.values()]
+        bitmap_bytes = sum(sys.getsizeof(mask) for mask in masks)
+
+        fecha = '2026-06-01'
+        day_appointments = index.on_date(fecha)
+        busy = index.intervals.occupancy(CONTACT, fecha)
+        assert mask_free_slots(busy, 60) == loop_free_slots(day_appointments, 60)
+
+        check_loop = per_call_us(lambda: loop_is_free(day_appointments, '12:00', '13:00'), args.repeat)
+        check_mask = per_call_us(lambda: index.intervals.overlapping(CONTACT, fecha, 720, 780), args.repeat)
+        slots_loop = per_call_us(lambda: loop_free_slots(day_appointments, 60), args.repeat // 10 or 1)
+        slots_mask = per_call_us(lambda: mask_free_slots(busy, 60), args.repeat)
+
+        print(f"appointments/day: {per_day} ({len(appointments)} per provider-year)")
+        print(f"  bitmap memory per provider-year: {bitmap_bytes / 1024:.1f} KiB "
+              f"({len(masks)} days; raw {SLOTS_PER_DAY // 8} bytes/day = {365 * SLOTS_PER_DAY // 8 / 1024:.1f} KiB)")
+        print(f"  availability check:  loop {check_loop:8.2f} us   bitmap {check_mask:8.2f} us")
+        print(f"  free slots (1 day):  loop {slots_loop:8.2f} us   bitmap {slots_mask:8.2f} us")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Benchmark: AgentOrchestrator built per request vs one shared per worker.
+
+Runs the POST /appointments/ pipeline (process_appointment_prompt) on a mix
+of free and conflicting prompts against a temporary appointments.json and
+reports, per request:
+
+- construction cost of AgentOrchestrator() (what every request paid before),
+- p50/p99 of the whole request when the orchestrator is built per request
+  vs taken from AgentOrchestrator.instance(),
+- the same with N threads sharing the worker (gunicorn gthread).
+
+The contact is served from memory so the numbers exclude the contacts query.
+
+Usage:
+    python benchmarks/bench_orchestrator_singleton.py
+    python benchmarks/bench_orchestrator_singleton.py --requests 5000 --threads 4
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from apps.agents.orchestrator import AgentOrchestrator  # noqa: E402
+from data.stores import AppointmentStore, ContactStore  # noqa: E402
+
+CONTACT = {
+    'id': 'contact_busy',
+    'nombre': 'Dr. Busy',
+    'activo': True,
+    'updated_at': 'bench',
+    'ubicaciones': [{'id': 'loc_centro', 'nombre': 'Clínica Centro', 'disponible': True,
+                     'horario': {'inicio': '08:00', 'fin': '18:00', 'dias_laborales': [1, 2, 3, 4, 5, 6, 7]}}],
+}
+PROMPTS = [
+    'cita mañana 10am con Dr. Busy',
+    'cita mañana 11am con Dr. Busy',
+    'cita mañana 16:00 con Dr. Busy en Clínica Centro',
+    'cita con Dr. Nadie',
+]
+
+
+class InMemoryContactStore(ContactStore):
+    """ContactStore with a fixed contact instead of the database."""
+
+    def get_by_id(self, contact_id):
+        return CONTACT if contact_id == CONTACT['id'] else None
+
+    def list_all(self, filters=None):
+        return [CONTACT]
+
+
+def seed(data_dir):
+    # Tomorrow at 10:00 is booked, so the first prompt goes through negotiation
+    fecha = (date.today() + timedelta(days=1)).isoformat()
+    appointments = [{
+        'id': 'apt_busy', 'fecha': fecha, 'hora_inicio': '10:00', 'hora_fin': '11:00',
+        'status': 'confirmed', 'contacto_id': CONTACT['id'],
+    }]
+    with open(os.path.join(data_dir, 'appointments.json'), 'w', encoding='utf-8') as f:
+        json.dump({'metadata': {'total_appointments': len(appointments)}, 'appointments': appointments}, f)
+
+
+def percentiles(latencies):
+    latencies = sorted(latencies)
+    return statistics.median(latencies), latencies[int(len(latencies) * 0.99) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--threads', type=int, default=4)
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp()
+    try:
+        seed(data_dir)
+
+        def request(orchestrator_for, prompt):
+            start = time.perf_counter()
+            apt_store = AppointmentStore(mode='journal', data_dir=data_dir)
+            stores = {'appointment_store': apt_store,
+                      'contact_store': InMemoryContactStore(appointment_store=apt_store)}
+            result = orchestrator_for().process_appointment_prompt(prompt, stores=stores)
+            elapsed = (time.perf_counter() - start) * 1000
+            return elapsed, result['status']
+
+        statuses = [request(AgentOrchestrator.instance, prompt)[1] for prompt in PROMPTS]
+        assert statuses == [request(AgentOrchestrator, prompt)[1] for prompt in PROMPTS]
+        print(f"prompt outcomes: {', '.join(statuses)}")
+
+        construct = []
+        for _ in range(args.requests):
+            start = time.perf_counter()
+            AgentOrchestrator()
+            construct.append((time.perf_counter() - start) * 1e6)
+        print(f"AgentOrchestrator() construction: {statistics.median(construct):.1f} us/request\n")
+
+        prompts = [PROMPTS[i % len(PROMPTS)] for i in range(args.requests)]
+        print(f"{'mode':<22} {'threads':>7} {'p50 ms':>8} {'p99 ms':>8}")
+        for threads in (1, args.threads):
+            for name, orchestrator_for in (('per request', AgentOrchestrator),
+                                           ('shared instance()', AgentOrchestrator.instance)):
+                with ThreadPoolExecutor(max_workers=threads) as pool:
+                    latencies = [ms for ms, _ in pool.map(lambda p: request(orchestrator_for, p), prompts)]
+                p50, p99 = percentiles(latencies)
+                print(f"{name:<22} {threads:>7} {p50:>8.3f} {p99:>8.3f}")
+    finally:
+        AppointmentStore._indexes.clear()
+        shutil.rmtree(data_dir)
+
+
+if __name__ == '__main__':
+    main()
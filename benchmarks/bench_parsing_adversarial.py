@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Benchmark: ParsingAgent on adversarial prompts, with a per-prompt time ceiling.
+
+Builds --size character prompts (10 KB by default) that made the previous
+lazy contact, location and service patterns backtrack: long runs of spaces
+after a name, many lead-ins ("con dr", "en", "para") whose phrase never
+reaches a stop word, digits and day numbers. For each prompt it reports the
+median of --repeats runs of:
+
+- previous: the three lazy patterns with re.search() (skip: --no-previous),
+- extract: every ParsingAgent._extract_* step on the whole prompt, i.e.
+  the patterns without the MAX_PROMPT_LENGTH cap,
+- run: ParsingAgent.run(), which rejects the prompt as too long,
+
+and exits with status 1 if any extract or run time is over --ceiling-ms.
+
+Usage:
+    python benchmarks/bench_parsing_adversarial.py
+    python benchmarks/bench_parsing_adversarial.py --size 100000 --ceiling-ms 100 --no-previous
+"""
+
+import argparse
+import os
+import re
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from apps.agents.parsing_agent import ParsingAgent  # noqa: E402
+
+PREVIOUS = [
+    re.compile(r"(?:con|with)\s+(?:dr\.?|dra\.?|doctor|doctora|médico|médica)\.?\s+([A-ZÁÉÍÓÚa-záéíóú\s]+?)(?:\s+(?:en|en la|at|at the)|$)", re.IGNORECASE),
+    re.compile(r"(?:en|at)\s+(?:la\s+)?(?:clínica\s+)?([A-ZÁÉÍÓÚa-záéíóú\s\d]+?)(?:\s+(?:el|la|los|las|\()|$)", re.IGNORECASE),
+    re.compile(r"(?:para|for)\s+(?:una\s+|un\s+|a\s+)?([A-ZÁÉÍÓÚa-záéíóú\s]+?)(?:\s+(?:con|with|en|at)|$)", re.IGNORECASE),
+]
+
+
+def prompts(size):
+    """Adversarial prompts of ``size`` characters, by name."""
+    def fill(head, unit, tail="!"):
+        return (head + unit * size)[:size - len(tail)] + tail
+
+    return {
+        "contact spaces": fill("cita con dr Pérez", " "),
+        "contact lead-ins": fill("", "con dr a "),
+        "location spaces": fill("cita en Norte", " "),
+        "location lead-ins": fill("", "en a "),
+        "service spaces": fill("cita para consulta", " "),
+        "service lead-ins": fill("", "para una a "),
+        "words no stop": fill("con dr. Pérez en la clínica norte para una ", "consulta "),
+        "digits": fill("el ", "1 2 de "),
+    }
+
+
+def median_ms(func, text, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func(text)
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', type=int, default=10240)
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--ceiling-ms', type=float, default=50.0)
+    parser.add_argument('--no-previous', action='store_true')
+    args = parser.parse_args()
+
+    agent = ParsingAgent()
+
+    def extract(text):
+        lower = text.lower()
+        agent._extract_contact(text)
+        agent._extract_date(lower)
+        agent._extract_time(lower)
+        agent._extract_location(text)
+        agent._extract_service(text)
+
+    def previous(text):
+        for pattern in PREVIOUS:
+            pattern.search(text)
+
+    def run(text):
+        assert agent.run({'prompt': text}).is_error()
+
+    over = []
+    print(f"{'prompt':<18} {'previous ms':>12} {'extract ms':>11} {'run ms':>8}")
+    for name, text in prompts(args.size).items():
+        before = "-" if args.no_previous else f"{median_ms(previous, text, 1):.1f}"
+        extract_ms = median_ms(extract, text, args.repeats)
+        run_ms = median_ms(run, text, args.repeats)
+        print(f"{name:<18} {before:>12} {extract_ms:>11.2f} {run_ms:>8.3f}")
+        if max(extract_ms, run_ms) > args.ceiling_ms:
+            over.append(name)
+
+    if over:
+        print(f"over the {args.ceiling_ms:g} ms ceiling: {', '.join(over)}")
+        sys.exit(1)
+    print(f"every prompt under the {args.ceiling_ms:g} ms ceiling")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Benchmark: ParsingAgent throughput in prompts/s.
+
+Parses a corpus of booking prompts with ParsingAgent.run() and with a
+subclass that extracts entities the previous way (``re.search`` with
+pattern strings, looked up in the ``re`` module cache on every call),
+for prompts with keyword dates ("mañana", "el viernes") and with numeric
+dates ("2026-03-02", "el 14"), which also go through the date patterns.
+Each figure is the best of --rounds alternating rounds; both agents are
+checked to extract the same entities first.
+
+Usage:
+    python benchmarks/bench_parsing_extraction.py
+    python benchmarks/bench_parsing_extraction.py --prompts 50000 --rounds 7
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from apps.agents.parsing_agent import ParsingAgent  # noqa: E402
+
+TEMPLATES = [
+    "cita {when} a las {hour} con Dr. {name} en Clínica {place}",
+    "Necesito una cita {when} a las {hour} con Dra. {name} en {place} para una consulta",
+    "agendar chequeo {when} a las {hour} con la Dra. {name}",
+    "quiero ver al doctor {name} {when} por la tarde en consultorio {room}",
+    "reservar para una revisión con {name} {when}",
+]
+KEYWORD_DATES = ["mañana", "hoy", "el próximo lunes", "pasado mañana", "el viernes", "la próxima semana"]
+NUMERIC_DATES = ["el 2026-03-02", "el 15/03/2026", "el 14", "el 3 de abril", "el 21"]
+HOURS = ["10am", "3pm", "14:30", "09:00", "16h", "11"]
+NAMES = ["Pérez", "García", "López", "Ramírez", "Núñez", "Torres"]
+PLACES = ["Norte", "Sur", "Centro", "Polanco", "Roma"]
+
+
+# The patterns as the previous code passed them to re.search()
+PREVIOUS = {
+    "contact": (r"(?:con|with)\s+(?:dr\.?|dra\.?|doctor|doctora|médico|médica)\.?\s+([A-ZÁÉÍÓÚa-záéíóú\s]+?)(?:\s+(?:en|en la|at|at the)|$)", re.IGNORECASE),
+    "contact_fallback": (r"con\s+([A-Z][a-záéíóú]+(?:\s+[A-Z][a-záéíóú]+)?)", 0),
+    "date": (r"(\d{4}-\d{2}-\d{2}|\d{2}/\d{2}/\d{4}|\d{2}-\d{2}-\d{4})", 0),
+    "day": (r"(?:el\s+)?(\d{1,2})\s+(?:de\s+)?(?:enero|febrero|marzo|abril|mayo|junio|julio|agosto|septiembre|octubre|noviembre|diciembre)?", 0),
+    "time": (r"(\d{1,2}):?(\d{0,2})\s*(?:am|pm|AM|PM|h)?|(\d{1,2})\s*(?:am|pm|AM|PM)", 0),
+    "location": (r"(?:en|at)\s+(?:la\s+)?(?:clínica\s+)?([A-ZÁÉÍÓÚa-záéíóú\s\d]+?)(?:\s+(?:el|la|los|las|\()|$)", re.IGNORECASE),
+    "service": (r"(?:para|for)\s+(?:una\s+|un\s+|a\s+)?([A-ZÁÉÍÓÚa-záéíóú\s]+?)(?:\s+(?:con|with|en|at)|$)", re.IGNORECASE),
+}
+
+
+def search(name, text):
+    """What the previous code did: re.search() with the pattern string."""
+    pattern, flags = PREVIOUS[name]
+    return re.search(pattern, text, flags)
+
+
+class PreviousParsingAgent(ParsingAgent):
+    """ParsingAgent with the previous per-call pattern lookups."""
+
+    def _extract_contact(self, prompt):
+        match = search("contact", prompt) or search("contact_fallback", prompt)
+        return match.group(1).strip() if match else None
+
+    def _extract_date(self, prompt_lower):
+        for keyword in self.date_keywords:
+            if keyword in prompt_lower:
+                return keyword
+        match = search("date", prompt_lower)
+        if match:
+            return match.group(1)
+        match = search("day", prompt_lower)
+        return f"day_{match.group(1)}" if match else None
+
+    def _extract_time(self, prompt_lower):
+        match = search("time", prompt_lower)
+        if match:
+            if match.group(1):
+                return f"{match.group(1)}:{match.group(2) or '00'}"
+            return f"{match.group(3)}:00 {prompt_lower[match.end() - 2:match.end()]}"
+        if "temprano" in prompt_lower or "madrugada" in prompt_lower:
+            return "early_morning"
+        if "tarde" in prompt_lower:
+            return "afternoon"
+        if "noche" in prompt_lower:
+            return "evening"
+        return None
+
+    def _extract_location(self, prompt):
+        match = search("location", prompt)
+        if match:
+            location = re.sub(r"\s+\($", "", match.group(1).strip())
+            return location if location else None
+        return None
+
+    def _extract_service(self, prompt):
+        match = search("service", prompt)
+        if match:
+            return match.group(1).strip() or None
+        for service in ["consulta", "chequeo", "laboratorio", "radiografía", "ecografía", "revisión"]:
+            if service in prompt.lower():
+                return service
+        return None
+
+
+def corpus(count, dates, rng):
+    return [
+        rng.choice(TEMPLATES).format(when=rng.choice(dates), hour=rng.choice(HOURS), name=rng.choice(NAMES),
+                                     place=rng.choice(PLACES), room=rng.randint(1, 20))
+        for _ in range(count)
+    ]
+
+
+def throughput(agent, prompts):
+    start = time.perf_counter()
+    for prompt in prompts:
+        agent.run({'prompt': prompt})
+    return len(prompts) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--prompts', type=int, default=20000)
+    parser.add_argument('--rounds', type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(20)
+    agents = {'previous': PreviousParsingAgent(), 'current': ParsingAgent()}
+    print(f"{'dates':<8} {'previous/s':>11} {'current/s':>10} {'speedup':>8}")
+    for label, dates in (('keyword', KEYWORD_DATES), ('numeric', NUMERIC_DATES)):
+        prompts = corpus(args.prompts, dates, rng)
+        for prompt in prompts[:1000]:
+            outputs = [agent.run({'prompt': prompt}).data for agent in agents.values()]
+            assert outputs[0] == outputs[1], prompt
+
+        best = dict.fromkeys(agents, 0.0)
+        for _ in range(args.rounds):
+            for name, agent in agents.items():
+                best[name] = max(best[name], throughput(agent, prompts))
+        print(f"{label:<8} {best['previous']:>11.0f} {best['current']:>10.0f}"
+              f" {best['current'] / best['previous']:>7.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Benchmark: POST /appointments/ pipeline with and without the prompt cache.
+
+Sends --requests prompts drawn from --unique distinct ones with a Zipf-like
+skew (a few prompts resent often, as n8n retries and impatient users do),
+through AgentOrchestrator.process_appointment_prompt() with the cache
+disabled and enabled (apps/agents/prompt_cache.py). Reports per request:
+
+- stages ms: time in the parsing and temporal reasoning stages (p50),
+- p50/p99 ms of the whole pipeline,
+
+plus the cache hit rate and entries. Both runs must give the same outcome
+for every request. Contacts are served from memory, nothing is booked.
+
+Usage:
+    python benchmarks/bench_prompt_cache.py
+    python benchmarks/bench_prompt_cache.py --requests 20000 --unique 500 --size 100
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from apps.agents.orchestrator import AgentOrchestrator  # noqa: E402
+from data.names import ContactNameIndex  # noqa: E402
+from data.stores import AppointmentStore, ContactStore  # noqa: E402
+
+NAMES = ['Dr. Ana Pérez', 'Dra. Lucía García', 'Dr. Luis López', 'Dra. Elena Ruiz', 'Dr. José Ortiz']
+DATES = ['mañana', 'hoy', 'pasado mañana', 'el lunes', 'el viernes', 'próxima semana']
+HOURS = {'inicio': '08:00', 'fin': '18:00', 'dias_laborales': [1, 2, 3, 4, 5, 6, 7]}
+CONTACTS = [{
+    'id': f'contact_{i}', 'nombre': nombre, 'activo': True, 'updated_at': 'bench',
+    'ubicaciones': [{'id': 'loc_centro', 'nombre': 'Clínica Centro', 'disponible': True, 'horario': HOURS},
+                    {'id': 'loc_norte', 'nombre': 'Clínica Norte', 'disponible': True, 'horario': HOURS}],
+} for i, nombre in enumerate(NAMES)]
+STAGES = ('parsing', 'temporal_reasoning')
+
+
+class InMemoryContactStore(ContactStore):
+    """ContactStore over a fixed directory instead of the database."""
+
+    index = ContactNameIndex()
+    index.build((contact['id'], contact['nombre'], True) for contact in CONTACTS)
+
+    def get_by_id(self, contact_id):
+        return next((contact for contact in CONTACTS if contact['id'] == contact_id), None)
+
+    def search_by_name(self, nombre, limit=5):
+        return self.index.search(nombre, limit)
+
+
+def corpus(unique, size, rng):
+    prompts = [
+        f"cita {rng.choice(DATES)} a las {rng.randrange(8, 18)}:{rng.choice(['00', '30'])} con {rng.choice(NAMES)}"
+        f" en clínica {rng.choice(['centro', 'norte'])} para una consulta {i}"
+        for i in range(unique)
+    ]
+    # Zipf-like: the k-th prompt is resent about 1/k as often as the first
+    weights = [1 / (k + 1) for k in range(unique)]
+    return rng.choices(prompts, weights, k=size)
+
+
+def run(orchestrator, requests, stores):
+    stage_ms, latencies, outcomes = [], [], []
+    for prompt in requests:
+        start = time.perf_counter()
+        result = orchestrator.process_appointment_prompt(prompt, stores=stores)
+        latencies.append((time.perf_counter() - start) * 1000)
+        stage_ms.append(sum(s['duration_ms'] for s in result['trace'].stages if s['stage'] in STAGES))
+        data = result['data'] or {}
+        outcomes.append((result['status'], data.get('fecha'), data.get('hora_inicio')))
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    return statistics.median(stage_ms), statistics.median(latencies), p99, outcomes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=10000)
+    parser.add_argument('--unique', type=int, default=1000)
+    parser.add_argument('--size', type=int, default=10000, help='prompt cache entries')
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp()
+    try:
+        with open(os.path.join(data_dir, 'appointments.json'), 'w', encoding='utf-8') as f:
+            json.dump({'metadata': {'total_appointments': 0}, 'appointments': []}, f)
+        apt_store = AppointmentStore(mode='journal', data_dir=data_dir)
+        stores = {'appointment_store': apt_store, 'contact_store': InMemoryContactStore(appointment_store=apt_store)}
+        requests = corpus(args.unique, args.requests, random.Random(24))
+
+        print(f"{args.requests} requests over {args.unique} distinct prompts, cache size {args.size}\n")
+        print(f"{'cache':<8} {'stages ms':>10} {'p50 ms':>8} {'p99 ms':>8} {'hit rate':>9} {'entries':>8}")
+        outcomes = {}
+        for name, size in (('off', 0), ('on', args.size)):
+            orchestrator = AgentOrchestrator(max_workers=0, prompt_cache_size=size)
+            stages, p50, p99, outcomes[name] = run(orchestrator, requests, stores)
+            stats = orchestrator.prompt_cache.stats() if orchestrator.prompt_cache else {'hit_rate': 0, 'entries': 0}
+            print(f"{name:<8} {stages:>10.3f} {p50:>8.3f} {p99:>8.3f} {stats['hit_rate']:>9.2%} {stats['entries']:>8}")
+        assert outcomes['off'] == outcomes['on'], 'cached results differ'
+    finally:
+        AppointmentStore._indexes.clear()
+        shutil.rmtree(data_dir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Benchmark: /availability/suggest/ slot search over many days.
+
+Seeds a temporary appointments.json for one provider with bookings on
+every day and compares ContactStore.get_available_slots() (per-day
+bitmap search, top-k by score) against a per-day loop testing
+every 30-minute start against every appointment of that day.
+
+Usage:
+    python benchmarks/bench_slot_finder.py
+    python benchmarks/bench_slot_finder.py --days 30 90 365 --duration 45 --per-day 16
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data.stores import AppointmentStore, ContactStore  # noqa: E402
+from data.timeutils import format_minutes  # noqa: E402
+
+CONTACT = 'contact_busy'
+START = date(2026, 3, 2)
+
+
+def seed(data_dir, days, per_day):
+    rng = random.Random(days * per_day)
+    appointments = []
+    for d in range(days):
+        fecha = (START + timedelta(days=d)).isoformat()
+        for i in range(per_day):
+            start = 8 * 60 + rng.randrange(0, 600, 5)
+            appointments.append({
+                'id': f'apt_{d}_{i}',
+                'fecha': fecha,
+                'hora_inicio': format_minutes(start),
+                'hora_fin': format_minutes(start + rng.choice([15, 30, 45])),
+                'status': 'confirmed',
+                'contacto_id': CONTACT,
+            })
+    with open(os.path.join(data_dir, 'appointments.json'), 'w', encoding='utf-8') as f:
+        json.dump({'metadata': {'total_appointments': len(appointments)}, 'appointments': appointments}, f)
+
+
+def loop_slots(store, days, duration):
+    """Per-day, per-start, per-appointment string-compare search."""
+    slots = []
+    for d in range(days):
+        day = START + timedelta(days=d)
+        if day.weekday() >= 5:
+            continue
+        day_appointments = store.list_by_date(day.isoformat())
+        for hour in range(8, 18):
+            for minute in (0, 30):
+                hora = f"{hour:02d}:{minute:02d}"
+                hora_fin = AppointmentStore._add_minutes(hora, duration)
+                if hora_fin > '18:00' or hora_fin < hora:
+                    continue
+                if not any(
+                    AppointmentStore._times_overlap(hora, hora_fin, apt['hora_inicio'], apt['hora_fin'])
+                    for apt in day_appointments
+                ):
+                    slots.append((day.isoformat(), hora))
+    return slots
+
+
+def median_ms(fn, repeat):
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return statistics.median(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--days', type=int, nargs='+', default=[7, 30, 90, 365])
+    parser.add_argument('--duration', type=int, default=45)
+    parser.add_argument('--per-day', type=int, default=16)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'days':>6} {'loop ms':>10} {'top-10 ms':>10} {'all ms':>10} {'slots':>7}")
+    for days in args.days:
+        data_dir = tempfile.mkdtemp()
+        try:
+            seed(data_dir, days, args.per_day)
+            store = AppointmentStore(mode='rewrite', data_dir=data_dir)
+            contact_store = ContactStore(appointment_store=store)
+            store.list_by_date(START.isoformat())  # warm up: parse + build indexes
+
+            def search(limit):
+                return contact_store.get_available_slots(
+                    CONTACT, days_ahead=days, duration_minutes=args.duration,
+                    start_date=START, preferred_time='10:00', limit=limit,
+                )
+
+            every = search(100_000)
+            expected = loop_slots(store, days, args.duration)
+            assert sorted((s['fecha'], s['hora_inicio']) for s in every) == expected
+
+            loop_ms = median_ms(lambda: loop_slots(store, days, args.duration), max(1, args.repeat // 5))
+            top_ms = median_ms(lambda: search(10), args.repeat)
+            all_ms = median_ms(lambda: search(100_000), args.repeat)
+            print(f"{days:>6} {loop_ms:>10.2f} {top_ms:>10.2f} {all_ms:>10.2f} {len(every):>7}")
+        finally:
+            AppointmentStore._indexes.clear()
+            shutil.rmtree(data_dir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Benchmark: agent pipeline stages in sequence vs as a concurrent dependency graph.
+
+Runs AgentOrchestrator.process_appointment_prompt() with max_workers=0
+(every stage in the calling thread, the old sequential pipeline) and with
+a thread pool (temporal reasoning, contact resolution and service lookup
+run side by side). Contact and service stores sleep for --latency-ms per
+call to stand in for database round trips; at 0 ms the numbers show the
+pure overhead of handing stages to the pool.
+
+Also prints the per-stage wall times and critical path of one traced run.
+
+Usage:
+    python benchmarks/bench_stage_graph.py
+    python benchmarks/bench_stage_graph.py --latency-ms 0 1 3 --requests 300
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from apps.agents.orchestrator import AgentOrchestrator  # noqa: E402
+from data.stores import AppointmentStore, ContactStore  # noqa: E402
+
+CONTACT = {
+    'id': 'contact_busy',
+    'nombre': 'Dr. Busy',
+    'activo': True,
+    'updated_at': 'bench',
+    'ubicaciones': [{'id': 'loc_centro', 'nombre': 'Clínica Centro', 'disponible': True,
+                     'horario': {'inicio': '08:00', 'fin': '18:00', 'dias_laborales': [1, 2, 3, 4, 5, 6, 7]}}],
+}
+SERVICE = {'id': 'service_consulta', 'nombre': 'Consulta general', 'activo': True}
+PROMPTS = [
+    'cita mañana 10am para una consulta con Dr. Busy',
+    'cita mañana 11am para una consulta con Dr. Busy',
+    'cita mañana 16:00 con Dr. Busy en Clínica Centro',
+]
+
+
+class SlowContactStore(ContactStore):
+    """In-memory contact with a fixed delay per call (a database round trip)."""
+
+    latency = 0.0
+
+    def get_by_id(self, contact_id):
+        time.sleep(self.latency)
+        return CONTACT if contact_id == CONTACT['id'] else None
+
+    def list_all(self, filters=None):
+        time.sleep(self.latency)
+        return [CONTACT]
+
+
+class SlowServiceStore:
+    """In-memory service catalog with the same delay per call."""
+
+    latency = 0.0
+
+    def get_by_id(self, service_id):
+        time.sleep(self.latency)
+        return SERVICE if service_id == SERVICE['id'] else None
+
+    def list_all(self):
+        time.sleep(self.latency)
+        return [SERVICE]
+
+
+def seed(data_dir):
+    # Tomorrow at 10:00 is booked, so the first prompt goes through negotiation
+    fecha = (date.today() + timedelta(days=1)).isoformat()
+    appointments = [{
+        'id': 'apt_busy', 'fecha': fecha, 'hora_inicio': '10:00', 'hora_fin': '11:00',
+        'status': 'confirmed', 'contacto_id': CONTACT['id'],
+    }]
+    with open(os.path.join(data_dir, 'appointments.json'), 'w', encoding='utf-8') as f:
+        json.dump({'metadata': {'total_appointments': len(appointments)}, 'appointments': appointments}, f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--latency-ms', type=float, nargs='+', default=[0, 1, 3])
+    parser.add_argument('--requests', type=int, default=300)
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp()
+    try:
+        seed(data_dir)
+        apt_store = AppointmentStore(mode='journal', data_dir=data_dir)
+        stores = {'appointment_store': apt_store,
+                  'contact_store': SlowContactStore(appointment_store=apt_store),
+                  'service_store': SlowServiceStore()}
+        sequential = AgentOrchestrator(max_workers=0)
+        concurrent = AgentOrchestrator(max_workers=4)
+
+        outcomes = [sequential.process_appointment_prompt(p, stores=stores)['status'] for p in PROMPTS]
+        assert outcomes == [concurrent.process_appointment_prompt(p, stores=stores)['status'] for p in PROMPTS]
+        print(f"prompt outcomes: {', '.join(outcomes)}\n")
+
+        print(f"{'latency ms':>10} {'sequential p50':>15} {'graph p50':>10} {'speedup':>8}")
+        for latency_ms in args.latency_ms:
+            SlowContactStore.latency = SlowServiceStore.latency = latency_ms / 1000
+            medians = []
+            for orchestrator in (sequential, concurrent):
+                latencies = []
+                for i in range(args.requests):
+                    start = time.perf_counter()
+                    orchestrator.process_appointment_prompt(PROMPTS[i % len(PROMPTS)], stores=stores)
+                    latencies.append((time.perf_counter() - start) * 1000)
+                medians.append(statistics.median(latencies))
+            print(f"{latency_ms:>10.1f} {medians[0]:>15.3f} {medians[1]:>10.3f} {medians[0] / medians[1]:>7.2f}x")
+
+        trace = concurrent.process_appointment_prompt(PROMPTS[1], stores=stores)['trace']
+        print(f"\nstages at {args.latency_ms[-1]} ms latency (start / duration ms):")
+        for stage in trace.stages:
+            if stage['start_ms'] is not None:
+                print(f"  {stage['stage']:<20} {stage['start_ms']:>8.3f} {stage['duration_ms']:>8.3f}")
+        print(f"critical path: {' -> '.join(trace.critical_path)}")
+    finally:
+        AppointmentStore._indexes.clear()
+        shutil.rmtree(data_dir)
+
+
+if __name__ == '__main__':
+    main()
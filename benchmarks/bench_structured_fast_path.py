@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Benchmark: POST /appointments/ pipeline from a prompt vs from structured fields.
+
+Runs the same bookings through AgentOrchestrator.process_appointment_prompt()
+(parsing, temporal reasoning, contact matching by name, service lookup) and
+through process_structured_request() with the contact id, date and time
+already known (as sent by n8n), and reports p50/p99 per request and the
+speedup. Both paths see the same outcomes: a free slot and a conflicting
+one that goes through negotiation.
+
+The contact is served from memory so the numbers exclude the contacts query.
+
+Usage:
+    python benchmarks/bench_structured_fast_path.py
+    python benchmarks/bench_structured_fast_path.py --requests 5000 --workers 0
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from apps.agents.orchestrator import AgentOrchestrator  # noqa: E402
+from data.stores import AppointmentStore, ContactStore  # noqa: E402
+
+CONTACT = {
+    'id': 'contact_busy',
+    'nombre': 'Dr. Busy',
+    'activo': True,
+    'updated_at': 'bench',
+    'ubicaciones': [{'id': 'loc_centro', 'nombre': 'Clínica Centro', 'disponible': True,
+                     'horario': {'inicio': '08:00', 'fin': '18:00', 'dias_laborales': [1, 2, 3, 4, 5, 6, 7]}}],
+}
+TOMORROW = (date.today() + timedelta(days=1)).isoformat()
+# (prompt, structured fields) pairs describing the same booking
+REQUESTS = [
+    ('cita mañana 10am con Dr. Busy', {'contacto_id': 'contact_busy', 'fecha': TOMORROW, 'hora_inicio': '10:00'}),
+    ('cita mañana 11am con Dr. Busy', {'contacto_id': 'contact_busy', 'fecha': TOMORROW, 'hora_inicio': '11:00'}),
+    ('cita mañana 16:00 con Dr. Busy en Clínica Centro',
+     {'contacto_id': 'contact_busy', 'fecha': TOMORROW, 'hora_inicio': '16:00', 'ubicacion_id': 'loc_centro'}),
+]
+
+
+class InMemoryContactStore(ContactStore):
+    """ContactStore with a fixed contact instead of the database."""
+
+    def get_by_id(self, contact_id):
+        return CONTACT if contact_id == CONTACT['id'] else None
+
+    def list_all(self, filters=None):
+        return [CONTACT]
+
+
+def seed(data_dir):
+    # Tomorrow at 10:00 is booked, so the first booking goes through negotiation
+    appointments = [{
+        'id': 'apt_busy', 'fecha': TOMORROW, 'hora_inicio': '10:00', 'hora_fin': '11:00',
+        'status': 'confirmed', 'contacto_id': CONTACT['id'],
+    }]
+    with open(os.path.join(data_dir, 'appointments.json'), 'w', encoding='utf-8') as f:
+        json.dump({'metadata': {'total_appointments': len(appointments)}, 'appointments': appointments}, f)
+
+
+def percentiles(latencies):
+    latencies = sorted(latencies)
+    return statistics.median(latencies), latencies[int(len(latencies) * 0.99) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--workers', type=int, default=4, help='stage threads (0: every stage in the caller)')
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp()
+    try:
+        seed(data_dir)
+        apt_store = AppointmentStore(mode='journal', data_dir=data_dir)
+        stores = {'appointment_store': apt_store, 'contact_store': InMemoryContactStore(appointment_store=apt_store)}
+        orchestrator = AgentOrchestrator(max_workers=args.workers)
+
+        paths = {
+            'prompt': lambda prompt, fields: orchestrator.process_appointment_prompt(prompt, stores=stores),
+            'structured': lambda prompt, fields: orchestrator.process_structured_request(**fields, stores=stores),
+        }
+        outcomes = {name: [run(*request)['status'] for request in REQUESTS] for name, run in paths.items()}
+        assert outcomes['prompt'] == outcomes['structured'], outcomes
+        print(f"outcomes: {', '.join(outcomes['prompt'])}\n")
+
+        print(f"{'path':<12} {'p50 ms':>8} {'p99 ms':>8}")
+        medians = {}
+        for name, run in paths.items():
+            latencies = []
+            for i in range(args.requests):
+                start = time.perf_counter()
+                run(*REQUESTS[i % len(REQUESTS)])
+                latencies.append((time.perf_counter() - start) * 1000)
+            medians[name], p99 = percentiles(latencies)
+            print(f"{name:<12} {medians[name]:>8.3f} {p99:>8.3f}")
+        print(f"\nspeedup (p50): {medians['prompt'] / medians['structured']:.2f}x")
+    finally:
+        AppointmentStore._indexes.clear()
+        shutil.rmtree(data_dir)
+
+
+if __name__ == '__main__':
+    main()
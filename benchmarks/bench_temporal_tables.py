@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Benchmark: TemporalReasoningAgent per-call latency with and without the per-day tables.
+
+Resolves a corpus of --calls date references as ParsingAgent extracts them
+("hoy", "mañana", "próxima", weekday names, "day_24", explicit dates) with
+times, in --timezones timezones, through:
+
+- previous: a pytz lookup per call, the chain of pattern and keyword
+  checks for every date and per-call pattern lookups for times,
+- tables: cached timezones and the per-day tables of
+  apps/agents/temporal_agent.py (explicit dates still go through the
+  checks).
+
+Reports the best of --repeat runs in microseconds per call, for the date
+resolution alone and for the whole run(), per kind of reference and
+overall. Both agents must give the same result for every call.
+
+Usage:
+    python benchmarks/bench_temporal_tables.py
+    python benchmarks/bench_temporal_tables.py --calls 50000 --repeat 7
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+import pytz
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from apps.agents.prompt_patterns import DATE_KEYWORDS  # noqa: E402
+from apps.agents.temporal_agent import TemporalReasoningAgent  # noqa: E402
+
+TIMEZONES = ['America/Mexico_City', 'America/Bogota', 'America/Argentina/Buenos_Aires', 'Europe/Madrid',
+             'America/Lima', 'America/Santiago', 'America/New_York', 'Asia/Tokyo']
+TIMES = ['10am', '3pm', '09:30', '12:00', '17:00']
+KINDS = {
+    'keyword': list(DATE_KEYWORDS),
+    'day': [f'day_{n}' for n in range(1, 32)],
+    'explicit': [(date.today() + timedelta(days=n)).isoformat() for n in range(1, 60)] + ['15/12/2030'],
+}
+WEEKDAYS = {"lunes": 0, "martes": 1, "miércoles": 2, "miercoles": 2, "jueves": 3, "viernes": 4, "sábado": 5,
+            "sabado": 5, "domingo": 6}
+
+
+class PreviousTemporalReasoningAgent(TemporalReasoningAgent):
+    """TemporalReasoningAgent with the previous per-call timezone lookup and date checks."""
+
+    def _get_current_datetime(self, timezone_str, current_datetime_str=None):
+        try:
+            tz = pytz.timezone(timezone_str)
+        except pytz.exceptions.UnknownTimeZoneError:
+            tz = pytz.timezone("America/Mexico_City")
+        return datetime.now(tz)
+
+    def _resolve_date(self, fecha_raw, current_dt):
+        fecha_lower = fecha_raw.lower().strip()
+        today = current_dt.date()
+        if re.match(r"\d{4}-\d{2}-\d{2}", fecha_raw):
+            return fecha_raw
+        date_match = re.match(r"(\d{2})[-/](\d{2})[-/](\d{4})", fecha_raw)
+        if date_match:
+            day, month, year = date_match.groups()
+            try:
+                return datetime(int(year), int(month), int(day)).strftime("%Y-%m-%d")
+            except ValueError:
+                return None
+        if "hoy" in fecha_lower:
+            return today.strftime("%Y-%m-%d")
+        if "mañana" in fecha_lower:
+            return (today + timedelta(days=1)).strftime("%Y-%m-%d")
+        if "pasado mañana" in fecha_lower or "pasadomañana" in fecha_lower:
+            return (today + timedelta(days=2)).strftime("%Y-%m-%d")
+        if "próxima semana" in fecha_lower or "proxima semana" in fecha_lower:
+            return (today + timedelta(days=7 - today.weekday())).strftime("%Y-%m-%d")
+        for day_name, day_num in WEEKDAYS.items():
+            if day_name in fecha_lower:
+                days_ahead = day_num - today.weekday()
+                if days_ahead <= 0:
+                    days_ahead += 7
+                return (today + timedelta(days=days_ahead)).strftime("%Y-%m-%d")
+        day_match = re.search(r"(?:el\s+)?(\d{1,2})", fecha_raw)
+        if day_match:
+            day_num = int(day_match.group(1))
+            try:
+                dt = datetime(today.year, today.month, day_num)
+                if dt.date() < today:
+                    if today.month == 12:
+                        dt = datetime(today.year + 1, 1, day_num)
+                    else:
+                        dt = datetime(today.year, today.month + 1, day_num)
+                return dt.strftime("%Y-%m-%d")
+            except ValueError:
+                return None
+        return None
+
+    def _resolve_time(self, hora_raw, current_dt):
+        if re.match(r"\d{1,2}:\d{2}", hora_raw):
+            h, m = map(int, hora_raw.split(":"))
+            return {"hora": hora_raw, "hora_fin": f"{(h + 1) % 24:02d}:{m:02d}"}
+        time_match = re.match(r"(\d{1,2}):?(\d{0,2})\s*(am|pm|AM|PM)?", hora_raw)
+        if time_match:
+            return super()._resolve_time(hora_raw, current_dt)
+        return None
+
+
+def corpus(kind, size, timezones, rng):
+    return [{'fecha_raw': rng.choice(KINDS[kind]), 'hora_raw': rng.choice(TIMES),
+             'user_timezone': rng.choice(timezones)} for _ in range(size)]
+
+
+def best_us(fn, inputs, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for agent_input in inputs:
+            fn(agent_input)
+        best = min(best, time.perf_counter() - start)
+    return best / len(inputs) * 1e6
+
+
+def measure(agent, inputs, repeat):
+    def resolve(agent_input):
+        current_dt = agent._get_current_datetime(agent_input['user_timezone'])
+        return agent._resolve_date(agent_input['fecha_raw'], current_dt)
+
+    return best_us(resolve, inputs, repeat), best_us(agent.run, inputs, repeat)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--calls', type=int, default=20000)
+    parser.add_argument('--timezones', type=int, default=4)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(25)
+    timezones = TIMEZONES[:args.timezones]
+    agents = {'previous': PreviousTemporalReasoningAgent(), 'tables': TemporalReasoningAgent()}
+    corpora = {kind: corpus(kind, args.calls, timezones, rng) for kind in KINDS}
+    corpora['all'] = rng.sample([item for inputs in corpora.values() for item in inputs], args.calls)
+
+    print(f"{args.calls} calls per kind, {len(timezones)} timezones, best of {args.repeat}\n")
+    print(f"{'references':<10} {'agent':<9} {'date µs':>8} {'run µs':>8} {'date speedup':>13} {'run speedup':>12}")
+    for kind, inputs in corpora.items():
+        outcomes = {name: [(r.status, r.data) for r in map(agent.run, inputs)] for name, agent in agents.items()}
+        assert outcomes['previous'] == outcomes['tables'], f'{kind}: results differ'
+        base = None
+        for name, agent in agents.items():
+            resolve, run = measure(agent, inputs, args.repeat)
+            base = base or (resolve, run)
+            print(f"{kind:<10} {name:<9} {resolve:>8.2f} {run:>8.2f} {base[0] / resolve:>12.2f}x"
+                  f" {base[1] / run:>11.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings.production')
+# Async create/availability views; the pipeline waits on stores without holding a worker
+os.environ.setdefault('APPOINTMENTS_ASYNC_VIEWS', 'True')
 
 application = get_asgi_application()
@@ -263,6 +263,16 @@ DEFAULT_MAX_DAYS_IN_ADVANCE = 90
 DEFAULT_WORKING_HOURS_START = 8  # 8:00 AM
 DEFAULT_WORKING_HOURS_END = 18   # 6:00 PM
 
+# ============================================================================
+# AVAILABILITY SEARCH
+# ============================================================================
+
+# Most slots a search endpoint returns (days searched are capped by DEFAULT_MAX_DAYS_IN_ADVANCE)
+MAX_SUGGESTED_SLOTS = 50
+
+# Most participants in one joint availability search (one busy stream each)
+MAX_JOINT_PARTICIPANTS = 10
+
 # ============================================================================
 # REGEX PATTERNS
 # ============================================================================
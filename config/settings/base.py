@@ -299,6 +299,35 @@ if not LOGS_DIR.exists():
 # Data directory for JSON storage
 DATA_DIR = BASE_DIR / 'data'
 
+# Appointment persistence: 'rewrite' rewrites appointments.json on every write,
+# 'journal' appends to appointments.journal.jsonl and compacts in background
+APPOINTMENT_STORE_MODE = os.environ.get('APPOINTMENT_STORE_MODE', 'rewrite')
+APPOINTMENT_JOURNAL_COMPACT_THRESHOLD = int(os.environ.get('APPOINTMENT_JOURNAL_COMPACT_THRESHOLD', 1000))
+
+# Threads per worker for agent pipeline stages that can run concurrently
+# (temporal reasoning, contact resolution, service lookup); 0 runs them in sequence
+AGENT_PIPELINE_WORKERS = int(os.environ.get('AGENT_PIPELINE_WORKERS', 4))
+
+# Worker processes for parsing, temporal and geo reasoning of large
+# POST /appointments/batch/ requests (apps/agents/batch_pool.py); 0 runs them in the worker
+AGENT_BATCH_PROCESSES = int(os.environ.get('AGENT_BATCH_PROCESSES', 0))
+
+# Prompts whose parsing and temporal results are cached per worker (0 disables
+# the cache) and seconds they are kept at most; entries always expire at the
+# user's local midnight (apps/agents/prompt_cache.py)
+AGENT_PROMPT_CACHE_SIZE = int(os.environ.get('AGENT_PROMPT_CACHE_SIZE', 10000))
+AGENT_PROMPT_CACHE_TTL = int(os.environ.get('AGENT_PROMPT_CACHE_TTL', 3600))
+
+# Most requests accepted by POST /api/v1/appointments/batch/
+APPOINTMENT_BATCH_MAX_ITEMS = int(os.environ.get('APPOINTMENT_BATCH_MAX_ITEMS', 1000))
+
+# Serve appointment create/availability with async views (adrf); config/asgi.py
+# turns this on, so WSGI workers keep the sync views
+APPOINTMENTS_ASYNC_VIEWS = os.environ.get('APPOINTMENTS_ASYNC_VIEWS', 'False') == 'True'
+
+# Directory of the JSON stores (default: the data/ package)
+STORE_DATA_DIR = os.environ.get('STORE_DATA_DIR') or None
+
 # API Version
 API_VERSION = 'v1'
 
@@ -313,6 +342,7 @@ APPOINTMENT_MIN_HOURS_IN_ADVANCE = 1
 CONTACT_DEFAULT_AVAILABILITY_HOURS_START = 8  # 8:00 AM
 CONTACT_DEFAULT_AVAILABILITY_HOURS_END = 18   # 6:00 PM
 CONTACT_DEFAULT_WORKING_DAYS = [1, 2, 3, 4, 5]  # Monday to Friday
+CONTACT_HOLIDAYS = []  # 'YYYY-MM-DD' dates closed for every contact
 
 # Service settings
 SERVICE_MAX_CATEGORIES = 6
@@ -59,13 +59,22 @@ def api_root(request):
 def health_check(request):
     """
     Health check endpoint.
-    Returns 200 if the API is running.
+    Returns 200 if the API is running, plus this worker's store and prompt cache counters
+    (the prompt cache's are None until the worker has built its agent pipeline).
     """
+    from apps.agents import AgentOrchestrator
+    from data.stores import BaseStore
+
+    # A liveness probe must not build the pipeline (agents, thread and process pools)
+    orchestrator = AgentOrchestrator.current()
+    prompt_cache = orchestrator.prompt_cache if orchestrator else None
     return Response({
         'status': 'healthy',
         'message': 'Smart-Sync Concierge API is running',
         'version': '0.1.0',
         'timestamp': None,
+        'store_cache': BaseStore.cache_stats(),
+        'prompt_cache': prompt_cache.stats() if prompt_cache else None,
     })
 
 
@@ -4,7 +4,7 @@ Provides validation functions for common data types and formats.
 """
 
 import re
-from datetime import datetime, time
+from datetime import date, datetime, time
 from django.core.exceptions import ValidationError
 from rest_framework import serializers
 from .constants import (
@@ -78,7 +78,9 @@ def validate_email(value):
 # ============================================================================
 
 def validate_date_format(value):
-    """Validate date format (YYYY-MM-DD)."""
+    """Validate date format (YYYY-MM-DD); a DateField's already parsed date passes."""
+    if isinstance(value, date):
+        return value
     if not re.match(PATTERN_DATE, value):
         raise serializers.ValidationError(
             f"Formato de fecha inválido. Debe ser YYYY-MM-DD"
@@ -93,7 +95,9 @@ def validate_date_format(value):
 
 
 def validate_time_format(value):
-    """Validate time format (HH:MM)."""
+    """Validate time format (HH:MM); a TimeField's already parsed time passes."""
+    if isinstance(value, time):
+        return value
     if not re.match(PATTERN_TIME, value):
         raise serializers.ValidationError(
             f"Formato de hora inválido. Debe ser HH:MM (24h)"
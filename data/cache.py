@@ -0,0 +1,159 @@
+"""
+In-process read cache for JSON data stores.
+
+Each worker process keeps one parsed copy per data file. The copy is reused
+while the file's (st_mtime_ns, st_size, st_ino) signature is unchanged and is
+replaced when the store itself writes the file. Cached data is handed out as
+read-only views (FrozenDict / FrozenList) so callers cannot corrupt it; use
+``thaw()`` to get a mutable deep copy.
+"""
+
+import os
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+class FrozenDict(dict):
+    """Read-only dict view of cached store data."""
+
+    __slots__ = ()
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("Store data is read-only; copy it (dict(...) or thaw()) before modifying")
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __reduce__(self):
+        return (FrozenDict, (dict(self),))
+
+
+class FrozenList(list):
+    """Read-only list view of cached store data."""
+
+    __slots__ = ()
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("Store data is read-only; copy it (list(...) or thaw()) before modifying")
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _readonly
+    append = extend = insert = remove = pop = clear = sort = reverse = _readonly
+
+    def __reduce__(self):
+        return (FrozenList, (list(self),))
+
+
+def freeze(value: Any) -> Any:
+    """Recursively convert parsed JSON into read-only views."""
+    if isinstance(value, (FrozenDict, FrozenList)):
+        return value
+    if isinstance(value, dict):
+        return FrozenDict((k, freeze(v)) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return FrozenList(freeze(v) for v in value)
+    return value
+
+
+def thaw(value: Any) -> Any:
+    """Recursively convert read-only views into plain mutable dicts/lists."""
+    if isinstance(value, dict):
+        return {k: thaw(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [thaw(v) for v in value]
+    return value
+
+
+def file_signature(path_or_fd) -> Optional[Tuple[int, int, int]]:
+    """Return (st_mtime_ns, st_size, st_ino) for a path or open fd, or None if missing."""
+    try:
+        st = os.fstat(path_or_fd) if isinstance(path_or_fd, int) else os.stat(path_or_fd)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+class ReadCache:
+    """Per-process cache of parsed data files with hit/miss counters."""
+
+    def __init__(self):
+        self._entries: Dict[str, Tuple[Any, Any]] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, path: str, loader: Callable[[], Any]) -> Any:
+        """
+        Get the cached data for path, loading it on a miss.
+
+        Args:
+            path: Data file path
+            loader: Callable that parses the file
+
+        Returns:
+            Read-only view of the parsed data
+        """
+        # Stat before loading: a concurrent write can only make the entry stale-looking
+        signature = file_signature(path)
+        entry = self._entries.get(path)
+        if entry is not None and entry[0] == signature:
+            self.record(path, hit=True)
+            return entry[1]
+
+        self.record(path, hit=False)
+        data = freeze(loader())
+        with self._lock:
+            self._entries[path] = (signature, data)
+        return data
+
+    def put(self, path: str, data: Any, signature: Optional[Tuple[int, int, int]]) -> Any:
+        """
+        Store data just written by this process, avoiding a re-parse.
+
+        Args:
+            path: Data file path
+            data: Data that was written
+            signature: File signature taken right after the write (before close)
+        """
+        frozen = freeze(data)
+        with self._lock:
+            self._entries[path] = (signature, frozen)
+        return frozen
+
+    def invalidate(self, path: str):
+        """Drop the cached copy of path."""
+        with self._lock:
+            self._entries.pop(path, None)
+
+    def record(self, path: str, hit: bool):
+        """Count a cache hit or miss for path."""
+        with self._lock:
+            stats = self._stats.setdefault(path, {'hits': 0, 'misses': 0})
+            stats['hits' if hit else 'misses'] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters per file plus totals for this process."""
+        files: Dict[str, Dict[str, int]] = {}
+        with self._lock:
+            for path, stats in self._stats.items():
+                merged = files.setdefault(os.path.basename(path), {'hits': 0, 'misses': 0})
+                merged['hits'] += stats['hits']
+                merged['misses'] += stats['misses']
+        hits = sum(s['hits'] for s in files.values())
+        misses = sum(s['misses'] for s in files.values())
+        total = hits + misses
+        return {
+            'pid': os.getpid(),
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / total, 4) if total else 0.0,
+            'files': files,
+        }
+
+    def clear(self):
+        """Drop all cached data and counters."""
+        with self._lock:
+            self._entries.clear()
+            self._stats.clear()
+
+
+# Shared by every store instance in this process
+store_cache = ReadCache()
@@ -0,0 +1,283 @@
+"""
+In-memory secondary indexes for AppointmentStore.
+
+The index is built once from the cached appointment list and then updated
+incrementally on create/update/cancel, so lookups by id, by fecha and by
+participant are O(1) / O(k) instead of a scan over every appointment.
+Overlap queries use a sorted interval list per (participant, fecha), with a
+5-minute occupancy bitmap (see data/occupancy.py) as an O(1) pre-check.
+Free start times per (participant, fecha) are materialized on first read
+and dropped only for the days a write touches.
+"""
+
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from .occupancy import SLOT_MINUTES, iter_bits, run_starts, window_mask
+from .timeutils import to_minutes
+
+
+def participant_ids(appointment: Dict[str, Any]) -> Set[str]:
+    """
+    IDs of everyone booked by an appointment.
+
+    Agent-created appointments carry ``contacto_id`` instead of a
+    ``participantes`` list, so both are considered.
+    """
+    ids = {p.get('id') for p in appointment.get('participantes', []) if p.get('id')}
+    if appointment.get('contacto_id'):
+        ids.add(appointment['contacto_id'])
+    return ids
+
+
+def location_key(ubicacion_id: str) -> str:
+    """Interval-index key for a location (kept apart from contact ids)."""
+    return f"ubicacion:{ubicacion_id}"
+
+
+def interval_keys(appointment: Dict[str, Any]) -> Set[str]:
+    """Interval-index keys an appointment occupies: its participants and its location."""
+    keys = participant_ids(appointment)
+    if appointment.get('ubicacion_id'):
+        keys.add(location_key(appointment['ubicacion_id']))
+    return keys
+
+
+class DayIntervals:
+    """
+    Sorted [start, end) intervals of one participant on one day.
+
+    Intervals are kept sorted by start together with the longest duration
+    seen, so an overlap query only inspects intervals starting in
+    (start - longest, end): O(log n + k) for k overlapping intervals.
+    ``mask`` is the day's occupancy bitmap; a window whose mask does not
+    intersect it is free without looking at the intervals.
+    """
+
+    __slots__ = ('starts', 'items', 'longest', 'mask')
+
+    def __init__(self):
+        self.starts: List[int] = []
+        self.items: List[Tuple[int, int, str]] = []
+        self.longest = 0
+        self.mask = 0
+
+    def __len__(self):
+        return len(self.items)
+
+    def add(self, start: int, end: int, apt_id: str):
+        """Insert an interval."""
+        item = (start, end, apt_id)
+        i = bisect_right(self.items, item)
+        self.items.insert(i, item)
+        self.starts.insert(i, start)
+        self.longest = max(self.longest, end - start)
+        self.mask |= window_mask(start, end)
+
+    def remove(self, start: int, end: int, apt_id: str):
+        """Remove an interval (no-op if absent)."""
+        i = bisect_left(self.items, (start, end, apt_id))
+        if i < len(self.items) and self.items[i] == (start, end, apt_id):
+            del self.items[i]
+            del self.starts[i]
+            if end - start >= self.longest:
+                self.longest = max((e - s for s, e, _ in self.items), default=0)
+            # Other intervals may share slots with the removed one
+            mask = 0
+            for s, e, _ in self.items:
+                mask |= window_mask(s, e)
+            self.mask = mask
+
+    def overlapping(self, start: int, end: int) -> List[str]:
+        """IDs of intervals overlapping [start, end), ordered by start."""
+        if not self.mask & window_mask(start, end):
+            return []
+        lo = bisect_right(self.starts, start - self.longest)
+        hi = bisect_left(self.starts, end)
+        return [apt_id for s, e, apt_id in self.items[lo:hi] if e > start]
+
+
+class IntervalIndex:
+    """Active appointment intervals keyed by (participant id or location key, fecha)."""
+
+    # Materialized free-slot lists, over every day and variant, kept before
+    # the cache is reset (a request picks the duration, hence the variant)
+    MAX_FREE_SLOT_ENTRIES = 50_000
+
+    def __init__(self):
+        self.days: Dict[Tuple[str, str], DayIntervals] = {}
+        # (key, fecha) -> {(working mask, length, grid): free start minutes}
+        self.free_slots: Dict[Tuple[str, str], Dict[Tuple[int, int, int], List[int]]] = {}
+        self.free_slot_entries = 0
+        self.versions: Dict[Tuple[str, str], int] = {}
+
+    def _touch(self, key: Tuple[str, str]):
+        """Drop the materialized free slots of a day that just changed."""
+        self.versions[key] = self.versions.get(key, 0) + 1
+        dropped = self.free_slots.pop(key, None)
+        if dropped:
+            self.free_slot_entries -= len(dropped)
+
+    def clear_free_slots(self):
+        """Drop every materialized free-slot list."""
+        self.free_slots.clear()
+        self.free_slot_entries = 0
+
+    @staticmethod
+    def _interval(appointment: Dict[str, Any]) -> Optional[Tuple[int, int]]:
+        """(start, end) in minutes for an active appointment, else None."""
+        if appointment.get('status') == 'cancelled':
+            return None
+        try:
+            start = to_minutes(appointment.get('hora_inicio'))
+            end = to_minutes(appointment.get('hora_fin'))
+        except ValueError:
+            return None
+        if start is None or end is None:
+            return None
+        return start, end
+
+    def add(self, appointment: Dict[str, Any]):
+        """Index an appointment's interval for each participant and its location."""
+        interval = self._interval(appointment)
+        if interval is None:
+            return
+        for pid in interval_keys(appointment):
+            key = (pid, appointment.get('fecha'))
+            self.days.setdefault(key, DayIntervals()).add(*interval, appointment.get('id'))
+            self._touch(key)
+
+    def remove(self, appointment: Dict[str, Any]):
+        """Remove an appointment's interval for each participant and its location."""
+        interval = self._interval(appointment)
+        if interval is None:
+            return
+        for pid in interval_keys(appointment):
+            key = (pid, appointment.get('fecha'))
+            day = self.days.get(key)
+            if day is not None:
+                day.remove(*interval, appointment.get('id'))
+                if not day:
+                    del self.days[key]
+            self._touch(key)
+
+    def overlapping(self, contact_id: str, fecha: str, start: int, end: int) -> List[str]:
+        """IDs of active appointments of contact_id overlapping [start, end) on fecha."""
+        day = self.days.get((contact_id, fecha))
+        if day is None:
+            return []
+        return day.overlapping(start, end)
+
+    def intervals_on(self, key: str, fecha: str) -> List[Tuple[int, int, str]]:
+        """(start, end, id) intervals of a key on fecha, sorted by start."""
+        day = self.days.get((key, fecha))
+        return day.items if day is not None else []
+
+    def occupancy(self, contact_id: str, fecha: str) -> int:
+        """Occupancy bitmap of contact_id on fecha (0 if free all day)."""
+        day = self.days.get((contact_id, fecha))
+        return day.mask if day is not None else 0
+
+    def free_starts(self, contact_id: str, fecha: str, working: int, length: int, grid: int) -> List[int]:
+        """
+        Free start minutes of contact_id on fecha, from the materialized view.
+
+        Args:
+            contact_id: Participant ID
+            fecha: Date (YYYY-MM-DD)
+            working: Working-hours mask of that day
+            length: Required run of free slots
+            grid: Mask of allowed start slots
+
+        Returns:
+            Start minutes in order (shared list; do not modify)
+        """
+        key = (contact_id, fecha)
+        variant = (working, length, grid)
+        cached = self.free_slots.get(key)
+        if cached is not None and variant in cached:
+            return cached[variant]
+
+        version = self.versions.get(key, 0)
+        starts = [
+            slot * SLOT_MINUTES
+            for slot in iter_bits(run_starts(working & ~self.occupancy(contact_id, fecha), length) & grid)
+        ]
+
+        # Only publish if no write touched the day meanwhile
+        if self.versions.get(key, 0) == version:
+            if self.free_slot_entries >= self.MAX_FREE_SLOT_ENTRIES:
+                self.clear_free_slots()
+            self.free_slots.setdefault(key, {})[variant] = starts
+            self.free_slot_entries += 1
+        return starts
+
+
+class AppointmentIndex:
+    """Hash indexes over appointments: by id, by fecha and by participant id."""
+
+    def __init__(self, appointments: Iterable[Dict[str, Any]] = ()):
+        """Build indexes from an appointment list."""
+        self.reset(appointments)
+
+    def reset(self, appointments: Iterable[Dict[str, Any]]):
+        """Rebuild every index from scratch."""
+        self.by_id: Dict[str, Dict[str, Any]] = {}
+        self.by_fecha: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self.by_participant: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self.intervals = IntervalIndex()
+        for appointment in appointments:
+            self.add(appointment)
+
+    def apply(self, old: Optional[Dict[str, Any]], new: Optional[Dict[str, Any]]):
+        """Apply a single change (create: old=None, update: old and new)."""
+        if old is not None and new is not None:
+            # Drop only the buckets the appointment left; re-adding keeps list order
+            apt_id = old.get('id')
+            if old.get('fecha') != new.get('fecha'):
+                self._discard(self.by_fecha, old.get('fecha'), apt_id)
+            for pid in participant_ids(old) - participant_ids(new):
+                self._discard(self.by_participant, pid, apt_id)
+            self.intervals.remove(old)
+        elif old is not None:
+            self.remove(old)
+        if new is not None:
+            self.add(new)
+
+    def add(self, appointment: Dict[str, Any]):
+        """Index an appointment."""
+        apt_id = appointment.get('id')
+        self.by_id[apt_id] = appointment
+        self.by_fecha.setdefault(appointment.get('fecha'), {})[apt_id] = appointment
+        for pid in participant_ids(appointment):
+            self.by_participant.setdefault(pid, {})[apt_id] = appointment
+        self.intervals.add(appointment)
+
+    def remove(self, appointment: Dict[str, Any]):
+        """Remove an appointment from every index."""
+        apt_id = appointment.get('id')
+        self.by_id.pop(apt_id, None)
+        self._discard(self.by_fecha, appointment.get('fecha'), apt_id)
+        for pid in participant_ids(appointment):
+            self._discard(self.by_participant, pid, apt_id)
+        self.intervals.remove(appointment)
+
+    @staticmethod
+    def _discard(index: Dict[str, Dict[str, Any]], key: Any, apt_id: str):
+        bucket = index.get(key)
+        if bucket is not None:
+            bucket.pop(apt_id, None)
+            if not bucket:
+                del index[key]
+
+    def get(self, apt_id: str) -> Optional[Dict[str, Any]]:
+        """Appointment by ID."""
+        return self.by_id.get(apt_id)
+
+    def on_date(self, fecha: str) -> List[Dict[str, Any]]:
+        """Appointments on a given date."""
+        return list(self.by_fecha.get(fecha, {}).values())
+
+    def for_participant(self, contact_id: str) -> List[Dict[str, Any]]:
+        """Appointments booking a given participant."""
+        return list(self.by_participant.get(contact_id, {}).values())
@@ -0,0 +1,417 @@
+"""
+Append-only journal for JSON data stores.
+
+Log-structured persistence for stores whose write cost would otherwise grow
+with the total history. Each mutation is appended as one compact JSON line
+to a journal next to the snapshot file::
+
+    data/appointments.json            <- snapshot (same format as before)
+    data/appointments.journal.jsonl   <- one mutation per line
+    data/appointments.json.lock       <- cross-process lock
+
+Readers load the snapshot once per process, replay the journal and then only
+replay the new tail on later reads. A background thread folds the journal
+back into the snapshot once it grows past a threshold.
+
+Journal records are idempotent (``put`` replaces a record, ``patch`` sets
+fields), so replaying a record twice after a crash mid-compaction is harmless.
+Records are kept as read-only views (see data/cache.py) and reads are counted
+in the shared store cache statistics. Observers (e.g. secondary indexes) are
+notified of every applied change so they never need a full rebuild.
+"""
+
+import json
+import os
+import threading
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from .cache import FrozenDict, freeze, store_cache
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms
+    fcntl = None
+
+
+class _JournalState:
+    """In-process materialized view of snapshot + journal."""
+
+    def __init__(self, data: Dict[str, Any], snapshot_sig: Tuple, journal_ino: Optional[int]):
+        self.data = data
+        self.positions: Dict[str, int] = {}
+        self.snapshot_sig = snapshot_sig
+        self.journal_ino = journal_ino
+        self.offset = 0
+        self.pending = 0
+
+
+class StoreJournal:
+    """
+    Append-only journal backing a single JSON collection.
+
+    One instance is shared per snapshot path within a process (see
+    ``StoreJournal.for_path``), so stores created per request reuse the
+    already-materialized state instead of re-reading the files.
+    """
+
+    _instances: Dict[str, 'StoreJournal'] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(
+        self,
+        snapshot_path: str,
+        collection: str,
+        metadata_key: Optional[str] = None,
+        id_field: str = 'id',
+        compact_threshold: int = 1000,
+    ):
+        """
+        Initialize journal.
+
+        Args:
+            snapshot_path: Path of the JSON snapshot file
+            collection: Key of the record list inside the snapshot
+            metadata_key: Metadata counter updated on compaction (e.g. "total_appointments")
+            id_field: Record field used as identifier
+            compact_threshold: Journal records that trigger background compaction
+        """
+        self.snapshot_path = snapshot_path
+        self.journal_path = os.path.splitext(snapshot_path)[0] + '.journal.jsonl'
+        self.lock_path = snapshot_path + '.lock'
+        self.collection = collection
+        self.metadata_key = metadata_key
+        self.id_field = id_field
+        self.compact_threshold = compact_threshold
+
+        self._lock = threading.RLock()
+        self._state: Optional[_JournalState] = None
+        self._compacting = False
+        self._compact_lock = threading.Lock()
+        self._observers = []
+
+    @classmethod
+    def for_path(cls, snapshot_path: str, collection: str, **kwargs) -> 'StoreJournal':
+        """Get the process-wide journal for a snapshot path."""
+        with cls._instances_lock:
+            journal = cls._instances.get(snapshot_path)
+            if journal is None:
+                journal = cls(snapshot_path, collection, **kwargs)
+                cls._instances[snapshot_path] = journal
+            return journal
+
+    def add_observer(self, observer):
+        """
+        Register an observer of applied changes.
+
+        The observer must implement ``reset(records)`` (called after a full
+        load) and ``apply(old, new)`` (called for every applied entry).
+        """
+        with self._lock:
+            self._observers.append(observer)
+            if self._state is not None:
+                observer.reset(self._state.data[self.collection])
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def read(self) -> Dict[str, Any]:
+        """Return the current materialized data (snapshot + journal)."""
+        with self._lock:
+            return self._sync(track=True).data
+
+    def get(self, record_id: str) -> Optional[Dict[str, Any]]:
+        """Get a record by ID in O(1)."""
+        with self._lock:
+            state = self._sync(track=True)
+            position = state.positions.get(record_id)
+            if position is None:
+                return None
+            return state.data[self.collection][position]
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def put(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """Append a new (or replacement) record."""
+        return self.put_many([record])[0]
+
+    def put_many(
+        self,
+        records: List[Dict[str, Any]],
+        select: Optional[Callable[[List[Dict[str, Any]]], List[Dict[str, Any]]]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Append several new (or replacement) records with a single write.
+
+        ``select``, if given, is called under the cross-process lock once the
+        state has caught up with every worker's writes, and returns the
+        records to append (e.g. those that still fit), so the check and the
+        write cannot interleave with another writer.
+        """
+        with self._lock:
+            with self._file_lock():
+                if select is not None:
+                    self._sync()
+                    records = select(records)
+                entries = [{'op': 'put', 'id': record[self.id_field], 'record': record} for record in records]
+                should_compact = bool(entries) and self._append_locked(entries)
+
+            if should_compact:
+                threading.Thread(target=self._compact_in_background, daemon=True).start()
+            return [self.get(record[self.id_field]) for record in records]
+
+    def patch(self, record_id: str, fields: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Append a partial update for an existing record."""
+        with self._lock:
+            if record_id not in self._sync().positions:
+                return None
+            self._append({'op': 'patch', 'id': record_id, 'fields': fields})
+            return self.get(record_id)
+
+    def _append(self, *entries: Dict[str, Any]):
+        """Serialize, append and apply journal entries (one write for all of them)."""
+        with self._lock, self._file_lock():
+            should_compact = self._append_locked(entries)
+
+        if should_compact:
+            threading.Thread(target=self._compact_in_background, daemon=True).start()
+
+    def _append_locked(self, entries: Sequence[Dict[str, Any]]) -> bool:
+        """_append() under both locks; returns whether to start a compaction once they are released."""
+        # Serialize first so a non-JSON value never leaves a partial line behind
+        lines = b''.join(
+            (json.dumps(entry, ensure_ascii=False, separators=(',', ':')) + '\n').encode('utf-8')
+            for entry in entries
+        )
+
+        state = self._sync()
+        try:
+            with open(self.journal_path, 'ab') as f:
+                f.write(lines)
+                f.flush()
+                state.offset = f.tell()
+                state.journal_ino = os.fstat(f.fileno()).st_ino
+        except IOError as e:
+            raise RuntimeError(f"Error writing to {self.journal_path}: {str(e)}")
+
+        for entry in entries:
+            self._apply(state, entry)
+        state.pending += len(entries)
+        should_compact = state.pending >= self.compact_threshold and not self._compacting
+        if should_compact:
+            self._compacting = True
+        return should_compact
+
+    # ------------------------------------------------------------------
+    # Compaction
+    # ------------------------------------------------------------------
+
+    def compact(self):
+        """Fold the journal into the snapshot synchronously."""
+        with self._lock:
+            self._compacting = True
+        self._compact_in_background()
+
+    def _compact_in_background(self):
+        """Write a new snapshot without blocking appends for its whole duration."""
+        try:
+            with self._compact_lock:
+                self._compact()
+        finally:
+            with self._lock:
+                self._compacting = False
+
+    def _compact(self):
+        with self._lock, self._file_lock():
+            state = self._sync()
+            cut_offset = state.offset
+            cut_sig = (state.snapshot_sig, state.journal_ino)
+            snapshot = dict(state.data)
+            snapshot[self.collection] = list(state.data[self.collection])
+
+        if cut_offset == 0:
+            return
+
+        if self.metadata_key and 'metadata' in snapshot:
+            snapshot['metadata'] = {
+                **snapshot['metadata'],
+                self.metadata_key: len(snapshot[self.collection]),
+                'last_updated': datetime.utcnow().isoformat(),
+            }
+
+        tmp_snapshot = f"{self.snapshot_path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_snapshot, 'w', encoding='utf-8') as f:
+                json.dump(snapshot, f, indent=2, ensure_ascii=False)
+        except IOError as e:
+            raise RuntimeError(f"Error writing to {tmp_snapshot}: {str(e)}")
+
+        with self._lock, self._file_lock():
+            state = self._sync()
+            if (state.snapshot_sig, state.journal_ino) != cut_sig:
+                # Another worker compacted in the meantime; its snapshot wins
+                os.remove(tmp_snapshot)
+                return
+
+            # Keep whatever was appended while the snapshot was being written
+            with open(self.journal_path, 'rb') as f:
+                f.seek(cut_offset)
+                tail = f.read()
+
+            os.replace(tmp_snapshot, self.snapshot_path)
+            tmp_journal = f"{self.journal_path}.{os.getpid()}.tmp"
+            with open(tmp_journal, 'wb') as f:
+                f.write(tail)
+            os.replace(tmp_journal, self.journal_path)
+
+            state.snapshot_sig = self._snapshot_signature()
+            state.journal_ino = os.stat(self.journal_path).st_ino
+            state.offset = len(tail)
+            state.pending = tail.count(b'\n')
+
+    # ------------------------------------------------------------------
+    # Recovery / replay
+    # ------------------------------------------------------------------
+
+    def _sync(self, track: bool = False) -> _JournalState:
+        """
+        Bring the in-memory state up to date with the files on disk.
+
+        Args:
+            track: Count this call as a cache hit/miss in the store statistics
+        """
+        snapshot_sig = self._snapshot_signature()
+        journal_stat = self._journal_stat()
+        journal_ino = journal_stat.st_ino if journal_stat else None
+        journal_size = journal_stat.st_size if journal_stat else 0
+
+        state = self._state
+        if (
+            state is None
+            or state.snapshot_sig != snapshot_sig
+            or (journal_ino is not None and state.journal_ino not in (None, journal_ino))
+            or journal_size < state.offset
+        ):
+            state = self._load(snapshot_sig, journal_ino)
+            self._state = state
+            hit = False
+        elif journal_size > state.offset:
+            self._replay_tail(state)
+            hit = False
+        else:
+            hit = True
+
+        if track:
+            store_cache.record(self.snapshot_path, hit=hit)
+        return state
+
+    def _load(self, snapshot_sig: Tuple, journal_ino: Optional[int]) -> _JournalState:
+        """Recover state from snapshot + full journal replay."""
+        try:
+            with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (IOError, json.JSONDecodeError) as e:
+            raise RuntimeError(f"Error reading {self.snapshot_path}: {str(e)}")
+
+        data.setdefault(self.collection, [])
+        data = FrozenDict((key, freeze(value)) for key, value in data.items())
+        state = _JournalState(data, snapshot_sig, journal_ino)
+        for i, record in enumerate(data[self.collection]):
+            state.positions[record.get(self.id_field)] = i
+        for observer in self._observers:
+            observer.reset(data[self.collection])
+
+        self._replay_tail(state)
+        return state
+
+    def _replay_tail(self, state: _JournalState):
+        """Apply journal entries appended after ``state.offset``."""
+        if not os.path.exists(self.journal_path):
+            return
+
+        with open(self.journal_path, 'rb') as f:
+            f.seek(state.offset)
+            chunk = f.read()
+
+        # Only consume complete lines; a concurrent writer may be mid-append
+        end = chunk.rfind(b'\n') + 1
+        for raw_line in chunk[:end].splitlines():
+            if not raw_line.strip():
+                continue
+            try:
+                entry = json.loads(raw_line)
+            except json.JSONDecodeError:
+                continue
+            self._apply(state, entry)
+            state.pending += 1
+
+        state.offset += end
+
+    def _apply(self, state: _JournalState, entry: Dict[str, Any]):
+        """Apply a single journal entry to the in-memory state."""
+        records = state.data[self.collection]
+        record_id = entry.get('id')
+        position = state.positions.get(record_id)
+
+        old = records[position] if position is not None else None
+
+        # Records list is a read-only view for callers; mutate it through list itself
+        if entry.get('op') == 'put':
+            record = freeze(entry['record'])
+            if position is None:
+                state.positions[record_id] = len(records)
+                list.append(records, record)
+            else:
+                list.__setitem__(records, position, record)
+        elif entry.get('op') == 'patch' and position is not None:
+            # Replace instead of mutating so snapshots being written stay consistent
+            record = FrozenDict({**old, **freeze(entry.get('fields', {}))})
+            list.__setitem__(records, position, record)
+        else:
+            return
+
+        for observer in self._observers:
+            observer.apply(old, record)
+
+    # ------------------------------------------------------------------
+    # File helpers
+    # ------------------------------------------------------------------
+
+    def _snapshot_signature(self) -> Tuple:
+        try:
+            st = os.stat(self.snapshot_path)
+        except OSError:
+            raise FileNotFoundError(f"Data file not found: {self.snapshot_path}")
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def _journal_stat(self):
+        try:
+            return os.stat(self.journal_path)
+        except OSError:
+            return None
+
+    def _file_lock(self):
+        return _FileLock(self.lock_path)
+
+
+class _FileLock:
+    """Exclusive advisory lock shared by all worker processes."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._fd = None
+
+    def __enter__(self):
+        if fcntl is not None:
+            self._fd = open(self.path, 'a')
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._fd is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            self._fd.close()
+            self._fd = None
@@ -0,0 +1,270 @@
+"""
+Accent- and case-folded name index for contact resolution.
+
+Names are folded ("Dra. Pérez" -> "dra perez"), split into tokens and the
+tokens into padded trigrams ("perez" -> "$$p $pe per ere rez ez$").
+Inverted indexes map every token and every trigram to the contacts whose
+name contains it. A query whose tokens all appear whole is answered by
+intersecting token postings; typos and partial tokens fall back to the
+trigrams, reading only the postings of the rarest ones that any match
+must share. Either way a query never scans the directory.
+
+Candidates are ranked by the share of the query's trigrams found in the
+name (1.0 when every query token appears in the name, as with the old
+substring match) and then by how close the name is to the query overall,
+so "Dr. Pérez" prefers "Dr. Pérez" over "Dr. Pérez Gómez". Honorifics
+(Dr., Dra., Lic., ...) are ignored when a name has other tokens.
+
+The index is built from the database on first use and updated from the
+Contact signals (see apps/contacts/signals.py). Other worker processes
+apply their writes to their own index only, so a query without any match
+first checks the contacts table version and rebuilds if it moved.
+"""
+
+import heapq
+import math
+import threading
+import unicodedata
+from collections import Counter
+from typing import AbstractSet, Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+HONORIFICS = frozenset({
+    'dr', 'dra', 'doctor', 'doctora', 'lic', 'licenciado', 'licenciada',
+    'ing', 'sr', 'sra', 'srta', 'mtro', 'mtra', 'psic', 'enf',
+})
+
+# Share of the query's trigrams a name must contain to be a candidate
+MIN_SCORE = 0.6
+# Candidates this close to the best one make the query ambiguous
+AMBIGUITY_MARGIN = 0.05
+
+
+def fold(text: str) -> str:
+    """Lowercase, strip accents and turn punctuation into spaces ("Dra. Núñez" -> "dra nunez")."""
+    decomposed = unicodedata.normalize('NFKD', text or '')
+    stripped = ''.join(ch for ch in decomposed if not unicodedata.combining(ch)).casefold()
+    return ' '.join(''.join(ch if ch.isalnum() else ' ' for ch in stripped).split())
+
+
+def name_tokens(text: str) -> Tuple[str, ...]:
+    """Folded tokens of a name, without honorifics unless they are all there is."""
+    tokens = tuple(fold(text).split())
+    significant = tuple(token for token in tokens if token not in HONORIFICS)
+    return significant or tokens
+
+
+def trigrams(tokens: Iterable[str]) -> Set[str]:
+    """Padded trigrams of every token."""
+    grams = set()
+    for token in tokens:
+        padded = f"$${token}$"
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class _IndexState(NamedTuple):
+    # folded token -> contact ids, trigram -> contact ids
+    tokens: Dict[str, AbstractSet[str]]
+    grams: Dict[str, AbstractSet[str]]
+    # contact id -> (nombre, tokens, trigrams, activo)
+    entries: Dict[str, Tuple[str, Tuple[str, ...], frozenset, bool]]
+    # contact id -> rank among names with the same score: active, shorter (closer) first
+    order: Dict[str, Tuple[bool, int, str]]
+
+
+_EMPTY = _IndexState({}, {}, {}, {})
+
+
+class ContactNameIndex:
+    """
+    Per-process token and trigram index over contact names.
+
+    Searches take no lock: they read one immutable state snapshot, and
+    writers (builds, contact saves) swap in a new one. A single contact
+    write copies the dicts, which is cheap next to a database save.
+    """
+
+    def __init__(self):
+        self._state = _EMPTY
+        self._version: Any = None
+        self._built = False
+        self._lock = threading.Lock()
+
+    def build(self, rows: Iterable[Tuple[str, str, bool]], version: Any = None):
+        """Replace the index with (id, nombre, activo) rows."""
+        # Private until swapped in, so the sets can be filled in place
+        state = _IndexState({}, {}, {}, {})
+        for contact_id, nombre, activo in rows:
+            entry = state.entries[contact_id] = self._entry(nombre, activo)
+            state.order[contact_id] = (not entry[3], len(entry[2]), contact_id)
+            for token in entry[1]:
+                state.tokens.setdefault(token, set()).add(contact_id)
+            for gram in entry[2]:
+                state.grams.setdefault(gram, set()).add(contact_id)
+        with self._lock:
+            self._state = state
+            self._version = version
+            self._built = True
+
+    def ensure(self, loader: Callable[[], Tuple[Iterable[Tuple[str, str, bool]], Any]]):
+        """Build from ``loader()`` -> (rows, version) unless already built."""
+        if not self._built:
+            rows, version = loader()
+            self.build(rows, version)
+
+    def refresh(self, version: Any, loader: Callable[[], Tuple[Iterable[Tuple[str, str, bool]], Any]]) -> bool:
+        """Rebuild if ``version`` differs from the one the index was built at; True if rebuilt."""
+        if self._built and version == self._version:
+            return False
+        rows, version = loader()
+        self.build(rows, version)
+        return True
+
+    def update(self, contact_id: str, nombre: str, activo: bool = True):
+        """Index a created or renamed contact (no-op until the index is built)."""
+        self._write(contact_id, self._entry(nombre, activo))
+
+    def remove(self, contact_id: str):
+        """Drop a deleted contact."""
+        self._write(contact_id, None)
+
+    def clear(self):
+        """Forget everything; the next search rebuilds."""
+        with self._lock:
+            self._state = _EMPTY
+            self._version = None
+            self._built = False
+
+    @property
+    def built(self) -> bool:
+        return self._built
+
+    def search(self, query: str, limit: int = 5) -> List[Dict[str, Any]]:
+        """
+        Ranked candidates for a (partial, unaccented, misspelled) name.
+
+        Args:
+            query: Name as written by the user
+            limit: Maximum number of candidates
+
+        Returns:
+            Candidates ({"id", "nombre", "score", "exact", "activo"}) best
+            first; active contacts rank before inactive ones with the same
+            score. ``exact`` means the name has the same tokens as the query.
+        """
+        query_tokens = set(name_tokens(query))
+        wanted = frozenset(trigrams(query_tokens))
+        if not wanted:
+            return []
+        state = self._state
+        grams = state.grams
+
+        whole = [token for token in query_tokens if token in state.tokens]
+        pool = self._with_tokens(state, whole)
+        if pool and len(whole) == len(query_tokens):
+            # Every query token is a whole token of the name: score 1.0, and
+            # the shortest names are the closest (precomputed sort key)
+            return [self._candidate(state, c, len(wanted), len(wanted))
+                    for c in heapq.nsmallest(limit, pool, key=state.order.__getitem__)]
+
+        # Typos and partial tokens: a name must share ``needed`` trigrams.
+        # Names holding the query's whole tokens share their trigrams, so
+        # only the others are counted; without whole tokens, a match holds
+        # one of the k - needed + 1 rarest query trigrams (prefix
+        # filtering), so only their postings are read.
+        needed = math.ceil(MIN_SCORE * len(wanted))
+        if pool:
+            known_grams = trigrams(whole)
+            candidates, known, rest = pool, len(wanted & known_grams), wanted - known_grams
+        else:
+            rarest = sorted(wanted, key=lambda gram: len(grams.get(gram, ())))
+            candidates = set().union(*(grams.get(gram, ()) for gram in rarest[:len(wanted) - needed + 1]))
+            known, rest = 0, wanted
+
+        counts = Counter()
+        for gram in rest:
+            counts.update(grams.get(gram, frozenset()) & candidates)
+        matched = candidates if known >= needed else counts
+        hits = {c: known + counts[c] for c in matched if known + counts[c] >= needed}
+
+        best = heapq.nsmallest(limit, hits, key=lambda c: (-hits[c], state.order[c]))
+        return [self._candidate(state, c, hits[c], len(wanted)) for c in best]
+
+    @staticmethod
+    def ambiguous(candidates: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Candidates tied with the best one, if the query cannot pick one contact.
+
+        A name that matches the query exactly (after folding) is never
+        ambiguous; otherwise every active candidate within
+        AMBIGUITY_MARGIN of the best score is returned (empty if only one).
+        """
+        if len(candidates) < 2:
+            return []
+        best = candidates[0]
+        if best['exact'] and not candidates[1]['exact']:
+            return []
+        tied = [c for c in candidates if c['activo'] and c['score'] >= best['score'] - AMBIGUITY_MARGIN]
+        return tied if len(tied) > 1 else []
+
+    @staticmethod
+    def _with_tokens(state: _IndexState, tokens: List[str]) -> AbstractSet[str]:
+        """Contacts whose name has every one of ``tokens`` (rarest posting first)."""
+        postings = sorted((state.tokens[token] for token in tokens), key=len)
+        if not postings:
+            return frozenset()
+        pool = postings[0]
+        for ids in postings[1:]:
+            pool = pool & ids
+            if not pool:
+                break
+        return pool
+
+    @staticmethod
+    def _candidate(state: _IndexState, contact_id: str, hits: int, wanted: int) -> Dict[str, Any]:
+        nombre, _, grams, activo = state.entries[contact_id]
+        return {'id': contact_id, 'nombre': nombre, 'score': round(hits / wanted, 3),
+                'exact': hits == wanted == len(grams), 'activo': activo}
+
+    @staticmethod
+    def _entry(nombre: str, activo: bool) -> Tuple[str, Tuple[str, ...], frozenset, bool]:
+        tokens = name_tokens(nombre)
+        return nombre, tokens, frozenset(trigrams(tokens)), bool(activo)
+
+    def _write(self, contact_id: str, entry: Optional[Tuple]):
+        """Swap in a state with ``contact_id`` replaced by ``entry`` (None removes it)."""
+        with self._lock:
+            if not self._built:
+                return
+            # Posting sets are shared with the previous state: replace, never mutate
+            state = _IndexState(*(dict(part) for part in self._state))
+            old = state.entries.pop(contact_id, None)
+            state.order.pop(contact_id, None)
+            if old is not None:
+                _unpost(state.tokens, old[1], contact_id)
+                _unpost(state.grams, old[2], contact_id)
+            if entry is not None:
+                state.entries[contact_id] = entry
+                state.order[contact_id] = (not entry[3], len(entry[2]), contact_id)
+                _post(state.tokens, entry[1], contact_id)
+                _post(state.grams, entry[2], contact_id)
+            self._state = state
+            self._version = None
+
+
+def _post(postings: Dict[str, AbstractSet[str]], keys: Iterable[str], contact_id: str):
+    for key in keys:
+        postings[key] = postings.get(key, frozenset()) | {contact_id}
+
+
+def _unpost(postings: Dict[str, AbstractSet[str]], keys: Iterable[str], contact_id: str):
+    for key in keys:
+        ids = postings.get(key, frozenset()) - {contact_id}
+        if ids:
+            postings[key] = ids
+        else:
+            postings.pop(key, None)
+
+
+# Shared by every ContactStore in this process
+contact_name_index = ContactNameIndex()
@@ -0,0 +1,75 @@
+"""
+Day occupancy bitmaps at 5-minute granularity.
+
+A day is 288 slots; bit i covers minutes [5*i, 5*i + 5). A window maps to
+every slot it touches, so masks are conservative for times off the
+5-minute grid: a zero AND proves a window is free, a non-zero AND is
+confirmed against the exact intervals (see data/indexes.py).
+"""
+
+from typing import Iterator, List, Tuple
+
+SLOT_MINUTES = 5
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES
+FULL_DAY = (1 << SLOTS_PER_DAY) - 1
+
+
+def window_mask(start: int, end: int) -> int:
+    """
+    Mask of the slots touched by [start, end) (minutes since midnight).
+
+    Empty or inverted windows map to the slot containing ``start``, matching
+    the point-in-interval semantics of the conflict check.
+    """
+    first = max(start, 0) // SLOT_MINUTES
+    last = -(-min(max(end, start + 1), 24 * 60) // SLOT_MINUTES)  # ceil
+    if last <= first:
+        last = first + 1
+    return ((1 << (last - first)) - 1) << first
+
+
+def run_starts(free: int, length: int) -> int:
+    """
+    Mask of slots where ``length`` consecutive free slots begin.
+
+    Uses log2(length) shift-AND steps instead of testing each start.
+    """
+    if length <= 0:
+        return free
+    starts = free
+    span = 1
+    while span < length:
+        step = min(span, length - span)
+        starts &= starts >> step
+        span += step
+    return starts
+
+
+def iter_bits(mask: int) -> Iterator[int]:
+    """Yield the indexes of set bits, lowest first."""
+    # One pass over the binary string instead of clearing the lowest bit per step
+    bits = bin(mask)[:1:-1]
+    i = bits.find('1')
+    while i >= 0:
+        yield i
+        i = bits.find('1', i + 1)
+
+
+def grid_mask(start: int, end: int, every: int) -> int:
+    """Mask of slots at ``every`` minutes from ``start`` up to (excluding) ``end``."""
+    mask = 0
+    for minute in range(start, end, every):
+        mask |= 1 << (minute // SLOT_MINUTES)
+    return mask
+
+
+def mask_runs(mask: int) -> List[Tuple[int, int]]:
+    """Runs of set bits as [first, last + 1) slot pairs, lowest first."""
+    runs = []
+    while mask:
+        first = (mask & -mask).bit_length() - 1
+        length = ((mask >> first) ^ ((mask >> first) + 1)).bit_length() - 1
+        runs.append((first, first + length))
+        mask &= ~(((1 << length) - 1) << first)
+    return runs
+
@@ -0,0 +1,242 @@
+"""
+Compiled weekly schedules for contacts.
+
+Working hours are described per location (``ubicaciones[].horario``), with
+dated exceptions on the contact (``excepciones``) and global holidays
+(``CONTACT_HOLIDAYS`` setting). A schedule is compiled once per contact
+version into seven weekday masks per location (5-minute slots, see
+data/occupancy.py) plus a resolved mask per exceptional date, so asking
+"does the contact work at this time" is a dict lookup and an AND.
+
+Two ``horario`` formats are accepted: the contract format
+``{"inicio", "fin", "dias_laborales": [1..7]}`` and the serializer format
+``{"lunes": {"hora_inicio", "hora_fin"}, ...}`` (a day may hold a list of
+shifts). Exceptions look like::
+
+    {"fecha": "2026-12-24", "hora_inicio": "14:00", "hora_fin": "18:00"}  # closed that afternoon
+    {"fecha": "2026-12-25"}                                              # closed all day
+    {"fecha": "2026-03-07", "hora_inicio": "09:00", "hora_fin": "13:00",
+     "disponible": true, "ubicacion_id": "loc_1"}                        # extra opening
+
+Exceptions without ``ubicacion_id`` apply to every location. A contact
+whose schedule does not compile is logged and treated as never working,
+so one bad record cannot turn its availability checks into errors.
+"""
+
+import logging
+import threading
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .occupancy import window_mask
+from .timeutils import to_date_str, to_minutes
+
+WEEKDAY_NAMES = ('lunes', 'martes', 'miercoles', 'jueves', 'viernes', 'sabado', 'domingo')
+NO_DAYS = (0,) * 7
+
+Week = Tuple[int, ...]
+
+# What compiling a malformed horario or exception raises (e.g. a list
+# where a dict is expected, a missing fecha, an inverted time range)
+SCHEDULE_ERRORS = (AttributeError, KeyError, TypeError, ValueError)
+
+logger = logging.getLogger(__name__)
+
+
+def _setting(name: str, default: Any) -> Any:
+    from django.conf import settings
+    from django.core.exceptions import ImproperlyConfigured
+
+    try:
+        return getattr(settings, name, default)
+    except ImproperlyConfigured:
+        return default
+
+
+def default_week() -> Week:
+    """Weekday masks from the CONTACT_DEFAULT_* settings (8-18, Monday to Friday)."""
+    hours = window_mask(
+        _setting('CONTACT_DEFAULT_AVAILABILITY_HOURS_START', 8) * 60,
+        _setting('CONTACT_DEFAULT_AVAILABILITY_HOURS_END', 18) * 60,
+    )
+    days = set(_setting('CONTACT_DEFAULT_WORKING_DAYS', [1, 2, 3, 4, 5]))
+    return tuple(hours if weekday + 1 in days else 0 for weekday in range(7))
+
+
+def _window(start: Any, end: Any) -> int:
+    """Mask of [start, end); raises ValueError on missing or inverted times."""
+    start, end = to_minutes(start), to_minutes(end)
+    if start is None or end is None or end <= start:
+        raise ValueError("Horario inválido: hora_fin debe ser posterior a hora_inicio")
+    return window_mask(start, end)
+
+
+def compile_week(horario: Dict[str, Any]) -> Week:
+    """
+    Compile a location ``horario`` into seven weekday masks (Monday first).
+
+    Raises:
+        ValueError: If a time range is malformed
+    """
+    week = [0] * 7
+    if 'inicio' in horario or 'fin' in horario:
+        hours = _window(horario.get('inicio'), horario.get('fin'))
+        for day in horario.get('dias_laborales', [1, 2, 3, 4, 5]):
+            if not 1 <= int(day) <= 7:
+                raise ValueError(f"Día laboral inválido: {day}")
+            week[int(day) - 1] |= hours
+
+    for weekday, name in enumerate(WEEKDAY_NAMES):
+        shifts = horario.get(name) or []
+        if isinstance(shifts, dict):
+            shifts = [shifts]
+        for shift in shifts:
+            week[weekday] |= _window(shift.get('hora_inicio'), shift.get('hora_fin'))
+    return tuple(week)
+
+
+class CompiledSchedule:
+    """Weekly recurrence plus dated overrides of one contact version."""
+
+    __slots__ = ('version', 'weekly', 'dated', 'anywhere')
+
+    def __init__(self, version: Any, weekly: Dict[Optional[str], Week], dated: Dict[date, Dict[Optional[str], int]]):
+        """
+        Args:
+            version: Contact version the schedule was compiled from (updated_at)
+            weekly: Weekday masks per location id; None is the union of all locations
+            dated: Resolved masks per exceptional date and location id
+        """
+        self.version = version
+        self.weekly = weekly
+        self.dated = dated
+        # Contacts without locations work their hours at any location
+        self.anywhere = len(weekly) == 1
+
+    def mask(self, day: date, ubicacion_id: Optional[str] = None) -> int:
+        """Working slots on a day, at one location or at any (0 if closed or unknown)."""
+        if self.anywhere:
+            ubicacion_id = None
+        overrides = self.dated.get(day)
+        if overrides is not None:
+            return overrides.get(ubicacion_id, 0)
+        return self.weekly.get(ubicacion_id, NO_DAYS)[day.weekday()]
+
+
+def compile_schedule(contact: Dict[str, Any], holidays: Optional[Iterable[Any]] = None) -> CompiledSchedule:
+    """
+    Compile a contact's locations, exceptions and holidays.
+
+    Locations without ``horario`` use the default week; a contact without
+    locations works the default week anywhere. Locations marked
+    ``disponible: false`` never contribute hours.
+
+    Args:
+        contact: Contact dict (see ContactStore._model_to_dict)
+        holidays: Dates closed for everyone (default: CONTACT_HOLIDAYS setting)
+
+    Raises:
+        ValueError: If a horario or exception is malformed
+    """
+    weekly: Dict[Optional[str], Week] = {}
+    for location in contact.get('ubicaciones') or []:
+        if not location.get('disponible'):
+            weekly[location.get('id')] = NO_DAYS
+        elif location.get('horario'):
+            weekly[location.get('id')] = compile_week(location['horario'])
+        else:
+            weekly[location.get('id')] = default_week()
+    if weekly:
+        weekly[None] = tuple(_union(week[weekday] for week in weekly.values()) for weekday in range(7))
+    else:
+        weekly[None] = default_week()
+
+    if holidays is None:
+        holidays = _setting('CONTACT_HOLIDAYS', [])
+    closed_days = {date.fromisoformat(to_date_str(day)) for day in holidays}
+
+    # (day, location or None for all) -> [opened mask, closed mask]
+    changes: Dict[date, Dict[Optional[str], List[int]]] = {}
+    for day in closed_days:
+        changes.setdefault(day, {})
+    for exception in contact.get('excepciones') or []:
+        day = date.fromisoformat(to_date_str(exception['fecha']))
+        if exception.get('hora_inicio') or exception.get('hora_fin'):
+            hours = _window(exception.get('hora_inicio'), exception.get('hora_fin'))
+        else:
+            hours = window_mask(0, 24 * 60)
+        change = changes.setdefault(day, {}).setdefault(exception.get('ubicacion_id'), [0, 0])
+        change[0 if exception.get('disponible') else 1] |= hours
+
+    dated: Dict[date, Dict[Optional[str], int]] = {}
+    for day, day_changes in changes.items():
+        everywhere = day_changes.get(None, [0, 0])
+        resolved = {}
+        for location_id, week in weekly.items():
+            if location_id is None:
+                continue
+            base = 0 if day in closed_days else week[day.weekday()]
+            opened, closed = day_changes.get(location_id, [0, 0])
+            resolved[location_id] = (base | opened | everywhere[0]) & ~(closed | everywhere[1])
+        if resolved:
+            resolved[None] = _union(resolved.values())
+        else:
+            base = 0 if day in closed_days else weekly[None][day.weekday()]
+            resolved[None] = (base | everywhere[0]) & ~everywhere[1]
+        dated[day] = resolved
+
+    return CompiledSchedule(contact.get('updated_at'), weekly, dated)
+
+
+def validate_schedule(ubicaciones: Any, excepciones: Any):
+    """
+    Check that locations and exceptions compile, as the API and the admin save them.
+
+    Raises:
+        ValueError: With the reason, if a horario or exception is malformed
+    """
+    try:
+        compile_schedule({'ubicaciones': ubicaciones or [], 'excepciones': excepciones or []}, holidays=[])
+    except SCHEDULE_ERRORS as e:
+        raise ValueError(str(e)) from e
+
+
+def _union(masks: Iterable[int]) -> int:
+    result = 0
+    for mask in masks:
+        result |= mask
+    return result
+
+
+class ScheduleCache:
+    """Per-process compiled schedules, keyed by contact id and checked against the contact version."""
+
+    def __init__(self):
+        self._entries: Dict[str, CompiledSchedule] = {}
+        self._lock = threading.Lock()
+
+    def get(self, contact: Dict[str, Any]) -> CompiledSchedule:
+        """Compiled schedule of a contact, compiling it on a miss or a newer version."""
+        schedule = self._entries.get(contact['id'])
+        if schedule is not None and schedule.version == contact.get('updated_at'):
+            return schedule
+        try:
+            schedule = compile_schedule(contact)
+        except SCHEDULE_ERRORS as e:
+            logger.warning("Schedule of contact %s does not compile, treating it as closed: %r", contact['id'], e)
+            schedule = CompiledSchedule(contact.get('updated_at'), {None: NO_DAYS}, {})
+        with self._lock:
+            self._entries[contact['id']] = schedule
+        return schedule
+
+    def invalidate(self, contact_id: Optional[str] = None):
+        """Drop one contact's schedule, or all of them."""
+        with self._lock:
+            if contact_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(contact_id, None)
+
+
+# Shared by every ContactStore in this process
+schedule_cache = ScheduleCache()
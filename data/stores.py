@@ -7,45 +7,116 @@ Stores data in JSON files instead of a database for MVP.
 Production migration path: PostgreSQL in v0.3.0
 """
 
+from bisect import bisect_left
+import heapq
 import json
 import os
+import threading
 from datetime import datetime, date, timedelta
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 import uuid
 import re
 
+from asgiref.sync import sync_to_async
+
+from .cache import file_signature, store_cache, thaw
+from .indexes import AppointmentIndex, location_key, participant_ids
+from .journal import StoreJournal
+from .names import contact_name_index
+from .schedules import CompiledSchedule, schedule_cache
+from .occupancy import SLOT_MINUTES, FULL_DAY, grid_mask, mask_runs, window_mask
+from .sweep import free_windows
+from .timeutils import DAY_MINUTES, DEFAULT_DURATION_MINUTES, format_minutes, to_date_str, to_minutes, to_ordinal
+
+
+def _get_setting(name: str, default: Any) -> Any:
+    """Read a Django setting, falling back to default outside a configured project."""
+    from django.conf import settings
+    from django.core.exceptions import ImproperlyConfigured
+
+    try:
+        return getattr(settings, name, default)
+    except ImproperlyConfigured:
+        return default
+
 
 class BaseStore:
-    """Base class for JSON data stores."""
+    """
+    Base class for JSON data stores.
 
-    def __init__(self, file_name: str):
-        """Initialize store with JSON file path."""
+    Every store also exposes ``alist_all``/``aget_by_id``/``acreate``/
+    ``aupdate`` for async views, following Django's ``aget`` convention:
+    the blocking call runs in a worker thread so the event loop keeps
+    serving other requests. ORM-backed stores keep Django's thread-sensitive
+    default; file stores guard their own writes and run on any thread.
+    """
+
+    thread_sensitive = False
+
+    def __init__(self, file_name: str, data_dir: Optional[str] = None):
+        """Initialize store with JSON file path (data_dir defaults to STORE_DATA_DIR, then data/)."""
         self.file_path = os.path.join(
-            os.path.dirname(__file__),
+            data_dir or _get_setting('STORE_DATA_DIR', None) or os.path.dirname(__file__),
             file_name
         )
         self._ensure_file_exists()
 
+    def _to_async(self, method):
+        return sync_to_async(method, thread_sensitive=self.thread_sensitive)
+
+    async def alist_all(self) -> List[Dict[str, Any]]:
+        """Async list_all()."""
+        return await self._to_async(self.list_all)()
+
+    async def aget_by_id(self, item_id: str) -> Optional[Dict[str, Any]]:
+        """Async get_by_id()."""
+        return await self._to_async(self.get_by_id)(item_id)
+
+    async def acreate(self, item_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Async create()."""
+        return await self._to_async(self.create)(item_data)
+
+    async def aupdate(self, item_id: str, update_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Async update()."""
+        return await self._to_async(self.update)(item_id, update_data)
+
     def _ensure_file_exists(self):
         """Ensure JSON file exists with proper structure."""
         if not os.path.exists(self.file_path):
             raise FileNotFoundError(f"Data file not found: {self.file_path}")
 
     def _read_data(self) -> Dict[str, Any]:
-        """Read data from JSON file."""
+        """Read data from JSON file (read-only view cached per process)."""
+        return store_cache.get(self.file_path, self._load_file)
+
+    def _read_data_for_update(self) -> Dict[str, Any]:
+        """Read a mutable copy of the data for a read-modify-write cycle."""
+        return thaw(self._read_data())
+
+    def _load_file(self) -> Dict[str, Any]:
+        """Parse the JSON file from disk."""
         try:
             with open(self.file_path, 'r', encoding='utf-8') as f:
                 return json.load(f)
         except (IOError, json.JSONDecodeError) as e:
             raise RuntimeError(f"Error reading {self.file_path}: {str(e)}")
 
-    def _write_data(self, data: Dict[str, Any]):
-        """Write data to JSON file."""
+    def _write_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Write data to JSON file and refresh the process cache (returns the cached view)."""
         try:
             with open(self.file_path, 'w', encoding='utf-8') as f:
                 json.dump(data, f, indent=2, ensure_ascii=False)
+                f.flush()
+                signature = file_signature(f.fileno())
         except IOError as e:
+            store_cache.invalidate(self.file_path)
             raise RuntimeError(f"Error writing to {self.file_path}: {str(e)}")
+        return store_cache.put(self.file_path, data, signature)
+
+    @staticmethod
+    def cache_stats() -> Dict[str, Any]:
+        """Read cache hit/miss counters for this worker process."""
+        return store_cache.stats()
 
     def _generate_id(self, prefix: str) -> str:
         """Generate unique ID with prefix."""
@@ -60,10 +131,81 @@ class BaseStore:
 
 
 class AppointmentStore(BaseStore):
-    """Store for appointment data."""
+    """
+    Store for appointment data.
+
+    Supports two persistence modes (setting ``APPOINTMENT_STORE_MODE``):
+    - "rewrite": every write rewrites the whole appointments.json (default)
+    - "journal": writes are appended to appointments.journal.jsonl and folded
+      into appointments.json by background compaction (see data/journal.py)
+
+    Lookups by id, fecha and participant go through per-process secondary
+    indexes (see data/indexes.py) that are updated incrementally on writes.
+    """
+
+    MODES = ('rewrite', 'journal')
+
+    # (mode, file_path) -> (data the index reflects, index)
+    _indexes: Dict[Tuple[str, str], Tuple[Any, AppointmentIndex]] = {}
+    _indexes_lock = threading.Lock()
+    # Serializes read-modify-write cycles of this process in rewrite mode
+    _write_lock = threading.RLock()
+
+    def __init__(self, mode: Optional[str] = None, data_dir: Optional[str] = None):
+        super().__init__('appointments.json', data_dir=data_dir)
+        self.mode = mode or _get_setting('APPOINTMENT_STORE_MODE', 'rewrite')
+        if self.mode not in self.MODES:
+            raise ValueError(f"Unknown appointment store mode: {self.mode}")
+
+        self.journal = None
+        if self.mode == 'journal':
+            self.journal = StoreJournal.for_path(
+                self.file_path,
+                'appointments',
+                metadata_key='total_appointments',
+                compact_threshold=_get_setting('APPOINTMENT_JOURNAL_COMPACT_THRESHOLD', 1000),
+            )
+            with self._indexes_lock:
+                if ('journal', self.file_path) not in self._indexes:
+                    index = AppointmentIndex()
+                    self.journal.add_observer(index)
+                    self._indexes[('journal', self.file_path)] = (self.journal, index)
 
-    def __init__(self):
-        super().__init__('appointments.json')
+    def _read_data(self) -> Dict[str, Any]:
+        """Read data from snapshot + journal in journal mode, else from JSON file."""
+        if self.journal:
+            return self.journal.read()
+        return super()._read_data()
+
+    def compact(self):
+        """Fold the journal into appointments.json (journal mode only)."""
+        if self.journal:
+            self.journal.compact()
+
+    def _index(self) -> AppointmentIndex:
+        """Get the secondary indexes, in sync with the current data."""
+        if self.journal:
+            # Syncing the journal notifies the index of every new entry
+            self.journal.read()
+            return self._indexes[('journal', self.file_path)][1]
+
+        data = self._read_data()
+        key = ('rewrite', self.file_path)
+        entry = self._indexes.get(key)
+        if entry is None or entry[0] is not data:
+            # First use, or the file was rewritten by another process
+            entry = (data, AppointmentIndex(data.get('appointments', [])))
+            self._indexes[key] = entry
+        return entry[1]
+
+    def _reindex(self, base: Dict[str, Any], written: Dict[str, Any], changes: List[Tuple[Any, Any]]):
+        """Carry the rewrite-mode index over to data this process just wrote ((old, new) per change)."""
+        key = ('rewrite', self.file_path)
+        entry = self._indexes.get(key)
+        if entry is not None and entry[0] is base:
+            for old, new in changes:
+                entry[1].apply(old, new)
+            self._indexes[key] = (written, entry[1])
 
     def list_all(self) -> List[Dict[str, Any]]:
         """Get all appointments."""
@@ -72,164 +214,290 @@ class AppointmentStore(BaseStore):
 
     def list_by_contact(self, contact_id: str) -> List[Dict[str, Any]]:
         """Get appointments for a specific contact."""
-        appointments = self.list_all()
-        return [
-            apt for apt in appointments
-            if any(p.get('id') == contact_id for p in apt.get('participantes', []))
-        ]
+        return self._index().for_participant(contact_id)
+
+    def list_by_date(self, fecha: str) -> List[Dict[str, Any]]:
+        """Get appointments on a specific date (YYYY-MM-DD)."""
+        return self._index().on_date(fecha)
 
     def get_by_id(self, appointment_id: str) -> Optional[Dict[str, Any]]:
         """Get appointment by ID."""
-        appointments = self.list_all()
-        for apt in appointments:
-            if apt.get('id') == appointment_id:
-                return apt
-        return None
+        return self._index().get(appointment_id)
 
     def create(self, appointment_data: Dict[str, Any]) -> Dict[str, Any]:
         """Create new appointment."""
-        data = self._read_data()
-        appointments = data.get('appointments', [])
+        return self._insert([self._new_appointment(appointment_data)])[0]
+
+    def create_many(self, appointments_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Create several appointments with a single write (one file rewrite or journal append)."""
+        return self._insert([self._new_appointment(data) for data in appointments_data])
 
+    def _new_appointment(self, appointment_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Appointment record with a new ID and timestamps."""
         # Generate ID with date
         fecha = appointment_data.get('fecha', date.today().isoformat())
         fecha_str = fecha.replace('-', '')
         appointment_id = f"apt_{fecha_str}_{self._generate_id('').split('_')[1]}"
 
-        appointment = {
+        return {
             **appointment_data,
             'id': appointment_id,
             'created_at': datetime.utcnow().isoformat(),
             'updated_at': datetime.utcnow().isoformat(),
         }
 
-        appointments.append(appointment)
-        data['appointments'] = appointments
-        self._update_metadata(data, 'total_appointments', len(appointments))
-        self._write_data(data)
-
-        return appointment
+    def _insert(self, appointments: List[Dict[str, Any]], select=None) -> List[Dict[str, Any]]:
+        """
+        Persist new appointment records.
+
+        ``select(appointments)``, if given, is called under the write lock
+        (the cross-process one in journal mode) with the current data
+        loaded, and returns the appointments to write.
+        """
+        if self.journal:
+            return self.journal.put_many(appointments, select=select)
+
+        with self._write_lock:
+            base = self._read_data()
+            if select is not None:
+                appointments = select(appointments)
+                if not appointments:
+                    return []
+            data = thaw(base)
+            records = data.get('appointments', [])
+            records.extend(appointments)
+            data['appointments'] = records
+            self._update_metadata(data, 'total_appointments', len(records))
+            written = self._write_data(data)
+            added = written['appointments'][len(records) - len(appointments):]
+            self._reindex(base, written, [(None, new) for new in added])
+
+        return appointments
 
     def update(self, appointment_id: str, update_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Update existing appointment."""
-        data = self._read_data()
-        appointments = data.get('appointments', [])
-
-        for i, apt in enumerate(appointments):
-            if apt.get('id') == appointment_id:
-                apt.update(update_data)
-                apt['updated_at'] = datetime.utcnow().isoformat()
-                appointments[i] = apt
-                data['appointments'] = appointments
-                self._write_data(data)
-                return apt
+        if self.journal:
+            return self.journal.patch(
+                appointment_id,
+                {**update_data, 'updated_at': datetime.utcnow().isoformat()}
+            )
+
+        with self._write_lock:
+            base = self._read_data()
+            data = thaw(base)
+            appointments = data.get('appointments', [])
+
+            for i, apt in enumerate(appointments):
+                if apt.get('id') == appointment_id:
+                    apt.update(update_data)
+                    apt['updated_at'] = datetime.utcnow().isoformat()
+                    appointments[i] = apt
+                    data['appointments'] = appointments
+                    written = self._write_data(data)
+                    self._reindex(base, written, [(base['appointments'][i], written['appointments'][i])])
+                    return apt
 
         return None
 
-    def check_conflicts(
+    def find_overlaps(
         self,
-        appointment_data: Dict[str, Any],
+        contact_id: str,
+        fecha: Any,
+        hora_inicio: Any,
+        hora_fin: Any,
         exclude_id: Optional[str] = None
-    ) -> List[Dict[str, Any]]:
-        """Check for appointment conflicts with given time and participants."""
-        appointments = self.list_all()
-        conflicts = []
+    ) -> List[str]:
+        """
+        Find active appointments of a contact overlapping [hora_inicio, hora_fin).
+
+        Uses the per-(participant, fecha) interval index: O(log n + k).
+
+        Args:
+            contact_id: Participant ID
+            fecha: Date (YYYY-MM-DD, date or ordinal)
+            hora_inicio: Start time (HH:MM, time or minutes)
+            hora_fin: End time (HH:MM, time or minutes)
+            exclude_id: Appointment ID to ignore (e.g. the one being rescheduled)
+
+        Returns:
+            IDs of the overlapping appointments, ordered by start time
+        """
+        start = to_minutes(hora_inicio)
+        end = to_minutes(hora_fin)
+        if start is None or end is None:
+            return []
 
-        fecha = appointment_data.get('fecha')
-        hora_inicio = appointment_data.get('hora_inicio')
-        hora_fin = appointment_data.get('hora_fin')
-        participantes = appointment_data.get('participantes', [])
+        overlapping = self._index().intervals.overlapping(contact_id, to_date_str(fecha), start, end)
+        return [apt_id for apt_id in overlapping if apt_id != exclude_id]
 
-        if not fecha or not hora_inicio:
-            return []
+    def occupancy(self, contact_id: str, fechas: List[Any]) -> List[int]:
+        """
+        Occupancy bitmaps of a contact (5-minute slots, see data/occupancy.py).
 
-        # Get participant IDs
-        participant_ids = [p.get('id') for p in participantes if p.get('id')]
+        Args:
+            contact_id: Participant ID
+            fechas: Dates (YYYY-MM-DD or date)
 
-        for apt in appointments:
-            if exclude_id and apt.get('id') == exclude_id:
-                continue
+        Returns:
+            One bitmap per date, in the same order
+        """
+        intervals = self._index().intervals
+        return [intervals.occupancy(contact_id, to_date_str(fecha)) for fecha in fechas]
 
-            if apt.get('status') == 'cancelled':
-                continue
+    def free_starts(
+        self,
+        contact_id: str,
+        fechas: List[Any],
+        working_masks: List[int],
+        length: int,
+        grid: int
+    ) -> List[List[int]]:
+        """
+        Free start minutes of a contact per day, from the materialized view.
+
+        Each day is computed on first read and kept until a write touches
+        that contact on that day (see IntervalIndex.free_starts).
+
+        Args:
+            contact_id: Participant ID
+            fechas: Dates (YYYY-MM-DD or date)
+            working_masks: Working-hours mask of each date
+            length: Required run of free 5-minute slots
+            grid: Mask of allowed start slots
+
+        Returns:
+            One ordered list of start minutes per date (shared; do not modify)
+        """
+        intervals = self._index().intervals
+        return [
+            intervals.free_starts(contact_id, to_date_str(fecha), working, length, grid)
+            for fecha, working in zip(fechas, working_masks)
+        ]
 
-            apt_fecha = apt.get('fecha')
-            apt_hora_inicio = apt.get('hora_inicio')
-            apt_hora_fin = apt.get('hora_fin')
+    def busy_intervals(
+        self,
+        contact_id: Optional[str],
+        fechas: List[Any],
+        ubicacion_id: Optional[str] = None
+    ) -> List[Tuple[int, int]]:
+        """
+        Busy intervals of a contact (or a location) over consecutive days.
+
+        Args:
+            contact_id: Participant ID (ignored if ubicacion_id is given)
+            fechas: Consecutive dates (YYYY-MM-DD or date)
+            ubicacion_id: Location ID
+
+        Returns:
+            (start, end) in minutes from the first day's midnight, sorted by start
+        """
+        intervals = self._index().intervals
+        key = location_key(ubicacion_id) if ubicacion_id else contact_id
+        busy = []
+        for offset, fecha in enumerate(fechas):
+            base = offset * 24 * 60
+            busy.extend((base + start, base + end) for start, end, _ in intervals.intervals_on(key, to_date_str(fecha)))
+        return busy
 
-            # Check if dates match
-            if apt_fecha != fecha:
+    def check_conflicts(
+        self,
+        appointment_data: Dict[str, Any],
+        exclude_id: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Check for appointment conflicts with given time and participants."""
+        return self.check_conflicts_many([appointment_data], exclude_id=exclude_id)[0]
+
+    def check_conflicts_many(
+        self,
+        candidates: List[Dict[str, Any]],
+        exclude_id: Optional[str] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Check a batch of candidate windows against a single read of the store.
+
+        Args:
+            candidates: Appointment-like dicts (fecha, hora_inicio, hora_fin,
+                participantes and/or contacto_id)
+            exclude_id: Appointment ID to ignore (e.g. the one being rescheduled)
+
+        Returns:
+            One conflict list per candidate, in the same order
+        """
+        return self._conflicts_many(self._index().intervals, candidates, exclude_id)
+
+    @classmethod
+    def _conflicts_many(cls, intervals, candidates: List[Dict[str, Any]],
+                        exclude_id: Optional[str] = None) -> List[List[Dict[str, Any]]]:
+        """check_conflicts_many() against the given interval index."""
+        results = []
+        for candidate in candidates:
+            fecha = to_date_str(candidate.get('fecha'))
+            start = to_minutes(candidate.get('hora_inicio'))
+            end = to_minutes(candidate.get('hora_fin'))
+            if not fecha or start is None or end is None:
+                results.append([])
                 continue
+            # Participants include contacto_id
+            results.append(cls._conflicts(intervals, sorted(participant_ids(candidate)), fecha, start, end, exclude_id))
 
-            # Check if times overlap
-            if self._times_overlap(hora_inicio, hora_fin, apt_hora_inicio, apt_hora_fin):
-                # Check if any participant matches
-                apt_participants = [p.get('id') for p in apt.get('participantes', [])]
-                for pid in participant_ids:
-                    if pid in apt_participants:
-                        conflicts.append({
-                            'type': 'full_overlap',
-                            'existing_appointment_id': apt.get('id'),
-                            'message': f"Conflict with appointment {apt.get('id')}"
-                        })
-                        break
-
-        return conflicts
+        return results
+
+    @staticmethod
+    def _conflicts(intervals, pids: List[str], fecha: str, start: int, end: int,
+                   exclude_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Conflicts of one window in minutes: one per existing appointment."""
+        conflicting_ids: Dict[str, None] = {}
+        for pid in pids:
+            for apt_id in intervals.overlapping(pid, fecha, start, end):
+                if apt_id != exclude_id:
+                    conflicting_ids[apt_id] = None
+
+        return [
+            {
+                'type': 'full_overlap',
+                'existing_appointment_id': apt_id,
+                'message': f"Conflict with appointment {apt_id}"
+            }
+            for apt_id in conflicting_ids
+        ]
 
     def get_suggestions(self, appointment_data: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Get alternative time slot suggestions."""
         suggestions = []
-        fecha = appointment_data.get('fecha')
+        day = to_ordinal(appointment_data.get('fecha'))
         duracion = appointment_data.get('duracion_minutos', 60)
 
-        if not fecha:
+        if not day:
             return suggestions
 
-        # Suggest same day at different times
-        for hour in range(8, 18):
-            for minute in [0, 30]:
-                hora = f"{hour:02d}:{minute:02d}"
-                hora_fin = self._add_minutes(hora, duracion)
-
-                test_apt = {
-                    **appointment_data,
-                    'hora_inicio': hora,
-                    'hora_fin': hora_fin
-                }
-
-                if not self.check_conflicts(test_apt):
-                    suggestions.append({
-                        'fecha': fecha,
-                        'hora_inicio': hora,
-                        'hora_fin': hora_fin,
-                        'confidence': 0.9,
-                        'reason': f"Available slot on same day"
-                    })
-                    if len(suggestions) >= 3:
-                        break
-            if len(suggestions) >= 3:
-                break
-
-        # Suggest next few days
+        # Candidates are compared in minutes and only formatted when suggested
+        intervals = self._index().intervals
+        pids = sorted(participant_ids(appointment_data))
+        fecha = to_date_str(day)
+
+        # Same day every 30 minutes (8-18)
+        for start in range(8 * 60, 18 * 60, 30):
+            if not self._conflicts(intervals, pids, fecha, start, start + duracion):
+                suggestions.append({
+                    'fecha': fecha,
+                    'hora_inicio': format_minutes(start),
+                    'hora_fin': format_minutes(start + duracion),
+                    'confidence': 0.9,
+                    'reason': f"Available slot on same day"
+                })
+                if len(suggestions) >= 3:
+                    break
+
+        # Suggest next few days at 10:00
         if len(suggestions) < 3:
-            fecha_obj = datetime.strptime(fecha, '%Y-%m-%d')
+            start = 10 * 60
             for days_ahead in range(1, 4):
-                next_fecha = (fecha_obj + timedelta(days=days_ahead)).strftime('%Y-%m-%d')
-                hora = "10:00"
-                hora_fin = self._add_minutes(hora, duracion)
-
-                test_apt = {
-                    **appointment_data,
-                    'fecha': next_fecha,
-                    'hora_inicio': hora,
-                    'hora_fin': hora_fin
-                }
-
-                if not self.check_conflicts(test_apt):
+                next_fecha = to_date_str(day + days_ahead)
+                if not self._conflicts(intervals, pids, next_fecha, start, start + duracion):
                     suggestions.append({
                         'fecha': next_fecha,
-                        'hora_inicio': hora,
-                        'hora_fin': hora_fin,
+                        'hora_inicio': format_minutes(start),
+                        'hora_fin': format_minutes(start + duracion),
                         'confidence': 0.85 - (days_ahead * 0.05),
                         'reason': f"Available on {next_fecha}"
                     })
@@ -242,33 +510,101 @@ class AppointmentStore(BaseStore):
         if not all([start1, end1, start2, end2]):
             return False
 
-        def time_to_minutes(time_str: str) -> int:
-            h, m = map(int, time_str.split(':'))
-            return h * 60 + m
-
-        start1_min = time_to_minutes(start1)
-        end1_min = time_to_minutes(end1) if end1 else start1_min + 60
-        start2_min = time_to_minutes(start2)
-        end2_min = time_to_minutes(end2) if end2 else start2_min + 60
-
-        return not (end1_min <= start2_min or end2_min <= start1_min)
+        return to_minutes(start1) < to_minutes(end2) and to_minutes(start2) < to_minutes(end1)
 
     @staticmethod
     def _add_minutes(time_str: str, minutes: int) -> str:
         """Add minutes to a time string."""
-        h, m = map(int, time_str.split(':'))
-        total_minutes = h * 60 + m + minutes
-        new_h = (total_minutes // 60) % 24
-        new_m = total_minutes % 60
-        return f"{new_h:02d}:{new_m:02d}"
+        return format_minutes(to_minutes(time_str) + minutes)
+
+
+class PendingAppointmentStore(AppointmentStore):
+    """
+    AppointmentStore that keeps new appointments in memory until flush().
+
+    Reads go through a private copy of the indexes holding the stored
+    appointments plus the pending ones, so every conflict and availability
+    check sees the appointments created before it, as if each had been
+    written. flush() then writes all of them at once (see create_many()).
+    Used by batch booking; the copy is built once per instance.
+    """
+
+    def __init__(self, mode: Optional[str] = None, data_dir: Optional[str] = None):
+        super().__init__(mode=mode, data_dir=data_dir)
+        self.pending: List[Dict[str, Any]] = []
+        self.rejected: Dict[str, List[Dict[str, Any]]] = {}
+        self._pending_index = AppointmentIndex(super().list_all())
+
+    def _index(self) -> AppointmentIndex:
+        return self._pending_index
+
+    def list_all(self) -> List[Dict[str, Any]]:
+        """Get all appointments, pending ones last."""
+        return list(super().list_all()) + self.pending
+
+    def create(self, appointment_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Create a pending appointment (written by flush())."""
+        appointment = self._new_appointment(appointment_data)
+        self.pending.append(appointment)
+        self._pending_index.add(appointment)
+        return appointment
+
+    def update(self, appointment_id: str, update_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Update a pending appointment in memory, or a stored one in the store."""
+        for i, apt in enumerate(self.pending):
+            if apt.get('id') == appointment_id:
+                self.pending[i] = updated = {**apt, **update_data, 'updated_at': datetime.utcnow().isoformat()}
+                self._pending_index.apply(apt, updated)
+                return updated
+
+        old = self._pending_index.get(appointment_id)
+        updated = super().update(appointment_id, update_data)
+        if updated is not None:
+            self._pending_index.apply(old, updated)
+        return updated
+
+    def flush(self) -> List[Dict[str, Any]]:
+        """
+        Write the pending appointments that still fit with a single write and return them.
+
+        Other requests and workers may have booked while the batch ran:
+        under the write lock, each pending appointment is checked again
+        against the stored ones, and those now in conflict are not written
+        but kept in ``rejected`` (appointment ID -> conflicts).
+        """
+        pending, self.pending = self.pending, []
+        self.rejected = {}
+
+        def still_free(appointments):
+            stored = AppointmentStore._index(self).intervals
+            kept = []
+            for apt, conflicts in zip(appointments, self._conflicts_many(stored, appointments)):
+                if conflicts:
+                    self.rejected[apt['id']] = conflicts
+                    self._pending_index.apply(apt, None)
+                else:
+                    kept.append(apt)
+            return kept
+
+        return self._insert(pending, select=still_free) if pending else []
 
 
 class ContactStore(BaseStore):
     """Store for contact (doctor/staff/resource) data using Django ORM."""
 
-    def __init__(self):
+    thread_sensitive = True
+
+    def __init__(self, appointment_store: Optional[AppointmentStore] = None):
         # Don't call parent __init__ since we're using Django ORM
         self.file_path = None
+        self._appointment_store = appointment_store
+
+    @property
+    def appointment_store(self) -> AppointmentStore:
+        """AppointmentStore used for occupancy checks (created on first use)."""
+        if self._appointment_store is None:
+            self._appointment_store = AppointmentStore()
+        return self._appointment_store
 
     def list_all(self) -> List[Dict[str, Any]]:
         """Get all contacts."""
@@ -287,6 +623,62 @@ class ContactStore(BaseStore):
         except Contact.DoesNotExist:
             return None
 
+    def search_by_name(self, nombre: str, limit: int = 5) -> List[Dict[str, Any]]:
+        """
+        Ranked contacts whose name matches ``nombre`` (accents and case ignored).
+
+        Served from the process-wide name index (see data/names.py), built
+        on first use. When nothing matches, the contacts table version is
+        checked once so contacts created by other processes are found.
+
+        Args:
+            nombre: Name as written by the user (may be partial or misspelled)
+            limit: Maximum number of candidates
+
+        Returns:
+            Candidates ({"id", "nombre", "score", "exact", "activo"}) best first
+        """
+        contact_name_index.ensure(self._name_rows)
+        candidates = contact_name_index.search(nombre, limit)
+        if not candidates and contact_name_index.refresh(self._name_version(), self._name_rows):
+            candidates = contact_name_index.search(nombre, limit)
+        return candidates
+
+    @classmethod
+    def _name_rows(cls) -> Tuple[List[Tuple[str, str, bool]], Any]:
+        from apps.contacts.models import Contact
+
+        version = cls._name_version()
+        return list(Contact.objects.values_list('id', 'nombre', 'activo')), version
+
+    @staticmethod
+    def _name_version() -> Tuple[int, Any]:
+        from apps.contacts.models import Contact
+        from django.db.models import Count, Max
+
+        stats = Contact.objects.aggregate(count=Count('id'), updated=Max('updated_at'))
+        return stats['count'], stats['updated']
+
+    def list_by_specialty(self, especialidad: str, tipo: Optional[str] = 'prestador') -> List[Dict[str, Any]]:
+        """Get active contacts offering a specialty (case-insensitive)."""
+        from apps.contacts.models import Contact
+
+        wanted = especialidad.strip().casefold()
+        queryset = Contact.objects.filter(activo=True)
+        if tipo:
+            queryset = queryset.filter(tipo=tipo)
+        # JSON list membership is filtered here: SQLite has no JSON contains lookup
+        return [
+            self._model_to_dict(contact) for contact in queryset
+            if any(str(e).strip().casefold() == wanted for e in contact.especialidades or [])
+        ]
+
+    def get_by_ids(self, contact_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get several contacts with one query, keyed by ID (missing IDs are absent)."""
+        from apps.contacts.models import Contact
+
+        return {contact.id: self._model_to_dict(contact) for contact in Contact.objects.filter(id__in=contact_ids)}
+
     def create(self, contact_data: Dict[str, Any]) -> Dict[str, Any]:
         """Create new contact."""
         from apps.contacts.models import Contact
@@ -322,6 +714,8 @@ class ContactStore(BaseStore):
             'telefono': contact.telefono,
             'tipo': contact.tipo,
             'especialidades': contact.especialidades,
+            'ubicaciones': contact.ubicaciones,
+            'excepciones': contact.excepciones,
             'activo': contact.activo,
             'created_at': contact.created_at.isoformat(),
             'updated_at': contact.updated_at.isoformat(),
@@ -330,20 +724,25 @@ class ContactStore(BaseStore):
     def check_availability(
         self,
         contact_id: str,
-        fecha: str,
-        hora_inicio: str,
-        hora_fin: Optional[str] = None,
-        ubicacion_id: Optional[str] = None
+        fecha: Any,
+        hora_inicio: Any,
+        hora_fin: Any = None,
+        ubicacion_id: Optional[str] = None,
+        contact: Optional[Dict[str, Any]] = None
     ) -> Tuple[bool, Optional[str]]:
-        """Check if contact is available at given time."""
-        contact = self.get_by_id(contact_id)
+        """
+        Check if contact is available at given time (strings, date/time objects or canonical integers).
+
+        ``contact`` is the contact dict if the caller already has it (saves the query).
+        """
+        contact = contact or self.get_by_id(contact_id)
         if not contact:
             return False, "Contacto no encontrado"
 
         if not contact.get('activo'):
             return False, "Contacto inactivo"
 
-        # Check location availability if specified
+        # Check location availability if specified (a location without 'disponible' is unavailable)
         if ubicacion_id:
             locations = contact.get('ubicaciones', [])
             location = next((loc for loc in locations if loc.get('id') == ubicacion_id), None)
@@ -352,47 +751,284 @@ class ContactStore(BaseStore):
             if not location.get('disponible'):
                 return False, "Ubicación no disponible"
 
-        # In MVP, assume all listed contacts are available during business hours
-        # TODO: Implement actual schedule checking logic
+        if not fecha:
+            return False, "Fecha requerida"
+
+        # Compiled weekly schedule: one dict lookup and one AND
+        start = to_minutes(hora_inicio)
+        end = to_minutes(hora_fin)
+        if end is None and start is not None:
+            # No end time: a default-length appointment, as conflicts assume
+            end = min(start + DEFAULT_DURATION_MINUTES, DAY_MINUTES)
+        day = date.fromordinal(to_ordinal(fecha))
+        working = schedule_cache.get(contact).mask(day, ubicacion_id)
+        if not working:
+            return False, "Día no laborable"
+        if start is not None and window_mask(start, end) & ~working:
+            return False, "Fuera del horario de atención"
+
+        # Occupancy bitmap AND; only a hit is confirmed against the exact intervals
+        if self.appointment_store.find_overlaps(contact_id, fecha, start, end):
+            return False, "Horario ocupado por otra cita"
+
         return True, None
 
-    def get_available_slots(
+    def schedule(self, contact_id: str, contact: Optional[Dict[str, Any]] = None) -> CompiledSchedule:
+        """
+        Compiled weekly schedule of a contact (see data/schedules.py).
+
+        Cached per contact and recompiled when the contact changes. Contacts
+        that only exist in appointments get the default working week.
+
+        Args:
+            contact_id: Contact ID
+            contact: Contact dict, if the caller already has it
+        """
+        contact = contact or self.get_by_id(contact_id) or {'id': contact_id}
+        return schedule_cache.get(contact)
+
+    def _off_hours(self, schedule: CompiledSchedule, days: List[date]) -> List[Tuple[int, int]]:
+        """Non-working time of a contact as busy intervals (minutes from the first day)."""
+        off = []
+        for offset, day in enumerate(days):
+            base = offset * 24 * 60
+            for first, last in mask_runs(FULL_DAY & ~schedule.mask(day)):
+                off.append((base + first * SLOT_MINUTES, base + last * SLOT_MINUTES))
+        return off
+
+    def find_joint_windows(
         self,
-        contact_id: str,
+        contact_ids: List[str],
+        start_date: date,
         days_ahead: int = 7,
+        ubicacion_id: Optional[str] = None,
+        min_minutes: int = 30
+    ) -> List[Dict[str, Any]]:
+        """
+        Find windows where every contact (and the location) is free.
+
+        Busy time of each contact (bookings and non-working hours) and of the
+        location is merged with a k-way sweep (see data/sweep.py).
+
+        Args:
+            contact_ids: Participants (providers, staff or resources)
+            start_date: First day of the range
+            days_ahead: Number of days in the range
+            ubicacion_id: Location that must also be free
+            min_minutes: Shortest window to return
+
+        Returns:
+            Free windows, split per day, in chronological order
+        """
+        days = [start_date + timedelta(days=offset) for offset in range(days_ahead)]
+        contacts = self.get_by_ids(contact_ids)
+        streams = []
+        for contact_id in contact_ids:
+            streams.append(self.appointment_store.busy_intervals(contact_id, days))
+            schedule = self.schedule(contact_id, contacts.get(contact_id) or {'id': contact_id})
+            streams.append(self._off_hours(schedule, days))
+        if ubicacion_id:
+            streams.append(self.appointment_store.busy_intervals(None, days, ubicacion_id=ubicacion_id))
+
+        windows = []
+        for start, end in free_windows(streams, 0, len(days) * 24 * 60, max(min_minutes, 1)):
+            # Split windows that run past midnight
+            while start < end:
+                day_index = start // (24 * 60)
+                day_end = min(end, (day_index + 1) * 24 * 60)
+                if day_end - start >= max(min_minutes, 1):
+                    windows.append({
+                        'fecha': days[day_index].isoformat(),
+                        'hora_inicio': format_minutes(start),
+                        'hora_fin': format_minutes(day_end) if day_end % (24 * 60) else '24:00',
+                        'duracion_minutos': day_end - start,
+                    })
+                start = day_end
+        return windows
+
+    @staticmethod
+    def _slot_score(day_offset: int, start_minute: int, preferred_minute: Optional[int] = None) -> float:
+        """Score a slot: sooner days and times closer to the preferred time rank higher."""
+        score = 0.95 - 0.01 * day_offset
+        if preferred_minute is not None:
+            score -= 0.02 * abs(start_minute - preferred_minute) / 60
+        return score
+
+    def iter_free_days(
+        self,
+        contact_id: str,
+        start_date: date,
+        days_ahead: int = 30,
+        duration_minutes: int = 60,
+        step_minutes: int = 30,
+        not_before: Optional[int] = None,
+        contact: Optional[Dict[str, Any]] = None
+    ) -> Iterator[Tuple[int, date, List[int]]]:
+        """
+        Lazily yield a contact's free start times, one day at a time.
+
+        A day's occupancy is only read when the consumer asks for that day.
+
+        Args:
+            contact_id: Contact ID
+            start_date: First day
+            days_ahead: Number of days to search
+            duration_minutes: Appointment duration
+            step_minutes: Spacing of candidate start times
+            not_before: Skip starts before this minute on start_date (e.g. now)
+            contact: Contact dict, if the caller already has it
+
+        Yields:
+            (day offset, day, free start minutes in order)
+        """
+        schedule = self.schedule(contact_id, contact)
+        grid = grid_mask(0, 24 * 60, max(step_minutes, SLOT_MINUTES))
+        length = -(-duration_minutes // SLOT_MINUTES)
+
+        for offset in range(days_ahead):
+            day = start_date + timedelta(days=offset)
+            starts = self.appointment_store.free_starts(contact_id, [day], [schedule.mask(day)], length, grid)[0]
+            if offset == 0 and not_before:
+                starts = starts[bisect_left(starts, not_before):]
+            yield offset, day, starts
+
+    def earliest_by_specialty(
+        self,
+        especialidad: str,
+        start_date: date,
+        limit: int = 5,
+        days_ahead: int = 30,
         duration_minutes: int = 60,
-        location_id: Optional[str] = None
+        not_before: Optional[int] = None
     ) -> List[Dict[str, Any]]:
-        """Get available time slots for a contact."""
-        slots = []
-        start_date = date.today()
+        """
+        Globally earliest free slots among the providers of a specialty.
+
+        Provider streams (see iter_free_days) are merged through one heap
+        holding slots and "next day" markers. A provider's next day is only
+        read when its marker reaches the top, i.e. when it could still hold
+        the next earliest slot, and the merge stops after ``limit`` slots.
+
+        Args:
+            especialidad: Specialty (matched against Contact.especialidades)
+            start_date: First day to search
+            limit: Number of slots to return (k)
+            days_ahead: Search horizon in days
+            duration_minutes: Appointment duration
+            not_before: Skip starts before this minute on start_date
+
+        Returns:
+            Slots in chronological order, each with its provider
+        """
+        providers = {contact['id']: contact for contact in self.list_by_specialty(especialidad)}
+        streams = {
+            contact_id: self.iter_free_days(
+                contact_id, start_date, days_ahead, duration_minutes, not_before=not_before, contact=contact
+            )
+            for contact_id, contact in providers.items()
+        }
 
-        for day_offset in range(days_ahead):
-            current_date = (start_date + timedelta(days=day_offset)).isoformat()
+        # (minutes from start_date, 0 = day marker / 1 = slot, contact_id, day)
+        heap = [(0, 0, contact_id, None) for contact_id in sorted(providers)]
+        heapq.heapify(heap)
 
-            # Skip weekends for now
-            if (start_date + timedelta(days=day_offset)).weekday() >= 5:
+        slots = []
+        while heap and len(slots) < limit:
+            minute, kind, contact_id, day = heapq.heappop(heap)
+            if kind == 1:
+                hora_inicio = format_minutes(minute)
+                slots.append({
+                    'contacto_id': contact_id,
+                    'nombre': providers[contact_id]['nombre'],
+                    'fecha': day.isoformat(),
+                    'hora_inicio': hora_inicio,
+                    'hora_fin': AppointmentStore._add_minutes(hora_inicio, duration_minutes),
+                })
                 continue
 
-            # Generate slots for business hours (8-18)
-            for hour in range(8, 18):
-                for minute in [0, 30]:
-                    hora_inicio = f"{hour:02d}:{minute:02d}"
-                    hora_fin = AppointmentStore._add_minutes(hora_inicio, duration_minutes)
-
-                    slots.append({
-                        'fecha': current_date,
-                        'hora_inicio': hora_inicio,
-                        'hora_fin': hora_fin,
-                        'disponible': True
-                    })
+            expanded = next(streams[contact_id], None)
+            if expanded is None:
+                continue
+            offset, day, starts = expanded
+            base = offset * 24 * 60
+            for start in starts:
+                heapq.heappush(heap, (base + start, 1, contact_id, day))
+            heapq.heappush(heap, (base + 24 * 60, 0, contact_id, None))
 
-        return slots[:10]  # Return top 10 slots
+        return slots
+
+    async def aget_available_slots(self, contact_id: str, **kwargs) -> List[Dict[str, Any]]:
+        """Async get_available_slots()."""
+        return await self._to_async(self.get_available_slots)(contact_id, **kwargs)
+
+    def get_available_slots(
+        self,
+        contact_id: str,
+        days_ahead: int = 7,
+        duration_minutes: int = 60,
+        location_id: Optional[str] = None,
+        start_date: Optional[date] = None,
+        preferred_time: Optional[str] = None,
+        step_minutes: int = 30,
+        limit: int = 10
+    ) -> List[Dict[str, Any]]:
+        """
+        Get the best available time slots for a contact.
+
+        Free start times per day come from the appointment store's
+        materialized view, so a repeated query only recomputes the days
+        whose bookings changed since the last read.
+
+        Args:
+            contact_id: Contact ID
+            days_ahead: Number of days to search from start_date
+            duration_minutes: Appointment duration
+            location_id: Only use the contact's hours at this location
+            start_date: First day to search (default: today)
+            preferred_time: Preferred start time (HH:MM); closer slots score higher
+            step_minutes: Spacing of candidate start times
+            limit: Maximum number of slots (top-k by score)
+
+        Returns:
+            Slots ordered by score, then chronologically
+        """
+        start_date = start_date or date.today()
+        days = [start_date + timedelta(days=offset) for offset in range(days_ahead)]
+        schedule = self.schedule(contact_id)
+        per_day = self.appointment_store.free_starts(
+            contact_id,
+            days,
+            [schedule.mask(day, location_id) for day in days],
+            -(-duration_minutes // SLOT_MINUTES),
+            grid_mask(0, 24 * 60, max(step_minutes, SLOT_MINUTES)),
+        )
+        starts = ((day_index, minute) for day_index, minutes in enumerate(per_day) for minute in minutes)
+
+        preferred_minute = to_minutes(preferred_time)
+        ranked = heapq.nsmallest(
+            limit,
+            starts,
+            key=lambda start: (-self._slot_score(start[0], start[1], preferred_minute), start)
+        )
+
+        slots = []
+        for day_index, minute in ranked:
+            hora_inicio = format_minutes(minute)
+            slots.append({
+                'fecha': days[day_index].isoformat(),
+                'hora_inicio': hora_inicio,
+                'hora_fin': AppointmentStore._add_minutes(hora_inicio, duration_minutes),
+                'disponible': True,
+                'confidence': round(max(self._slot_score(day_index, minute, preferred_minute), 0.5), 3),
+            })
+        return slots
 
 
 class ServiceStore(BaseStore):
     """Store for service/appointment-type catalog data using Django ORM."""
 
+    thread_sensitive = True
+
     def __init__(self):
         # Don't call parent __init__ since we're using Django ORM
         self.file_path = None
@@ -463,6 +1099,9 @@ class ServiceStore(BaseStore):
 class TraceStore(BaseStore):
     """Store for AI agent decision traces."""
 
+    # Serializes read-modify-write cycles of this process
+    _write_lock = threading.Lock()
+
     def __init__(self):
         """Initialize TraceStore."""
         super().__init__('traces.json')
@@ -485,22 +1124,27 @@ class TraceStore(BaseStore):
 
     def create(self, trace_data: Dict[str, Any]) -> Dict[str, Any]:
         """Create new trace."""
-        data = self._read_data()
-        traces = data.get('traces', [])
-
-        # Ensure trace has required fields
-        if 'trace_id' not in trace_data:
-            trace_data['trace_id'] = self._generate_id('trace')
-
-        trace_data['created_at'] = datetime.utcnow().isoformat()
-
-        traces.append(trace_data)
-        data['traces'] = traces
-        data['metadata']['total_traces'] = len(traces)
-        data['metadata']['last_updated'] = datetime.utcnow().isoformat()
+        return self.create_many([trace_data])[0]
+
+    def create_many(self, traces: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Create several traces with a single file rewrite."""
+        for trace_data in traces:
+            # Ensure trace has required fields
+            if 'trace_id' not in trace_data:
+                trace_data['trace_id'] = self._generate_id('trace')
+
+            trace_data['created_at'] = datetime.utcnow().isoformat()
+
+        with self._write_lock:
+            data = self._read_data_for_update()
+            stored = data.get('traces', [])
+            stored.extend(traces)
+            data['traces'] = stored
+            data['metadata']['total_traces'] = len(stored)
+            data['metadata']['last_updated'] = datetime.utcnow().isoformat()
 
-        self._write_data(data)
-        return trace_data
+            self._write_data(data)
+        return traces
 
     def list_by_user(self, user_id: str) -> List[Dict[str, Any]]:
         """Get traces for specific user."""
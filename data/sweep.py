@@ -0,0 +1,66 @@
+"""
+k-way sweep over busy intervals.
+
+Each participant (or location) contributes streams of busy [start, end)
+intervals already sorted by start, in minutes from the start of the search
+range. The streams are heap-merged (O(total intervals · log k)) and
+coalesced, and the gaps between busy blocks are the common free windows.
+"""
+
+import heapq
+from typing import Iterable, Iterator, List, Tuple
+
+Interval = Tuple[int, int]
+
+
+def merge_busy(streams: List[Iterable[Interval]]) -> Iterator[Interval]:
+    """
+    Merge sorted busy-interval streams into disjoint busy blocks.
+
+    Args:
+        streams: Iterables of (start, end) sorted by start
+
+    Yields:
+        Coalesced (start, end) blocks in order
+    """
+    current_start = current_end = None
+    for start, end in heapq.merge(*streams):
+        if current_end is not None and start <= current_end:
+            current_end = max(current_end, end)
+            continue
+        if current_end is not None:
+            yield current_start, current_end
+        current_start, current_end = start, end
+    if current_end is not None:
+        yield current_start, current_end
+
+
+def free_windows(
+    streams: List[Iterable[Interval]],
+    range_start: int,
+    range_end: int,
+    min_length: int = 1
+) -> List[Interval]:
+    """
+    Windows in [range_start, range_end) where no stream is busy.
+
+    Args:
+        streams: Iterables of (start, end) sorted by start
+        range_start: Start of the search range
+        range_end: End of the search range
+        min_length: Shortest window to report
+
+    Returns:
+        Free (start, end) windows in order
+    """
+    windows = []
+    cursor = range_start
+    for start, end in merge_busy(streams):
+        if start >= range_end:
+            break
+        if start - cursor >= min_length:
+            windows.append((cursor, start))
+        cursor = max(cursor, end)
+    if range_end - cursor >= min_length:
+        windows.append((cursor, range_end))
+    return windows
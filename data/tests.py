@@ -0,0 +1,985 @@
+"""
+Tests for JSON data stores.
+
+Covers the read cache, persistence modes and secondary indexes of
+AppointmentStore using temporary data directories.
+"""
+
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from .cache import FrozenDict, ReadCache, freeze, store_cache, thaw
+from .indexes import AppointmentIndex, DayIntervals
+from .journal import StoreJournal
+from .names import ContactNameIndex, fold
+from .occupancy import iter_bits, run_starts, window_mask
+from .schedules import compile_schedule, schedule_cache
+from .stores import AppointmentStore, ContactStore, PendingAppointmentStore, TraceStore
+from .sweep import free_windows, merge_busy
+
+
+def _write_appointments(data_dir, appointments):
+    """Write an appointments.json snapshot into data_dir."""
+    with open(os.path.join(data_dir, 'appointments.json'), 'w', encoding='utf-8') as f:
+        json.dump({
+            'metadata': {'version': '1.0.0', 'total_appointments': len(appointments)},
+            'appointments': appointments,
+        }, f)
+
+
+def _appointment(apt_id, fecha='2026-03-02', hora_inicio='10:00', hora_fin='11:00', contact_id='dr_perez'):
+    return {
+        'id': apt_id,
+        'fecha': fecha,
+        'hora_inicio': hora_inicio,
+        'hora_fin': hora_fin,
+        'status': 'confirmed',
+        'participantes': [{'id': contact_id, 'nombre': 'Dr. Pérez', 'rol': 'prestador'}],
+    }
+
+
+class StoreTestCase(unittest.TestCase):
+    """Base test case with a temporary data directory."""
+
+    def setUp(self):
+        """Set up temporary data directory."""
+        self.data_dir = tempfile.mkdtemp()
+        _write_appointments(self.data_dir, [_appointment('apt_1'), _appointment('apt_2', hora_inicio='12:00', hora_fin='13:00')])
+
+        # Participants of these appointments are not in the database: default schedule
+        for name, value in (('get_by_id', None), ('get_by_ids', {})):
+            patcher = mock.patch.object(ContactStore, name, return_value=value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        """Remove temporary data directory."""
+        file_path = os.path.join(self.data_dir, 'appointments.json')
+        StoreJournal._instances.pop(file_path, None)
+        for mode in AppointmentStore.MODES:
+            AppointmentStore._indexes.pop((mode, file_path), None)
+        store_cache.invalidate(file_path)
+        schedule_cache.invalidate()
+        shutil.rmtree(self.data_dir)
+
+
+class TestAppointmentJournal(StoreTestCase):
+    """Tests for the append-only journal mode of AppointmentStore."""
+
+    def setUp(self):
+        """Set up journal-mode store."""
+        super().setUp()
+        self.store = AppointmentStore(mode='journal', data_dir=self.data_dir)
+
+    def _read_snapshot(self):
+        with open(os.path.join(self.data_dir, 'appointments.json'), encoding='utf-8') as f:
+            return json.load(f)
+
+    def test_create_appends_to_journal(self):
+        """Test that create appends one line and leaves the snapshot untouched."""
+        created = self.store.create({'fecha': '2026-03-03', 'hora_inicio': '09:00', 'hora_fin': '10:00'})
+
+        self.assertEqual(len(self._read_snapshot()['appointments']), 2)
+        with open(self.store.journal.journal_path, encoding='utf-8') as f:
+            lines = f.readlines()
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(json.loads(lines[0])['id'], created['id'])
+        self.assertEqual(self.store.get_by_id(created['id'])['fecha'], '2026-03-03')
+        self.assertEqual(len(self.store.list_all()), 3)
+
+    def test_update_is_visible(self):
+        """Test that updates are applied on top of the snapshot."""
+        updated = self.store.update('apt_1', {'status': 'cancelled'})
+        self.assertEqual(updated['status'], 'cancelled')
+        self.assertEqual(self.store.get_by_id('apt_1')['status'], 'cancelled')
+        self.assertIsNone(self.store.update('apt_missing', {'status': 'cancelled'}))
+
+    def test_recovery_replays_journal(self):
+        """Test that a fresh process state replays snapshot + journal."""
+        created = self.store.create({'fecha': '2026-03-03', 'hora_inicio': '09:00', 'hora_fin': '10:00'})
+        self.store.update('apt_2', {'status': 'cancelled'})
+
+        # Simulate a new worker process
+        recovered = StoreJournal(self.store.file_path, 'appointments')
+        data = recovered.read()
+        by_id = {apt['id']: apt for apt in data['appointments']}
+        self.assertIn(created['id'], by_id)
+        self.assertEqual(by_id['apt_2']['status'], 'cancelled')
+
+    def test_compaction_folds_journal_into_snapshot(self):
+        """Test that compaction writes the snapshot and empties the journal."""
+        created = self.store.create({'fecha': '2026-03-03', 'hora_inicio': '09:00', 'hora_fin': '10:00'})
+        self.store.compact()
+
+        snapshot = self._read_snapshot()
+        self.assertEqual(len(snapshot['appointments']), 3)
+        self.assertEqual(snapshot['metadata']['total_appointments'], 3)
+        self.assertEqual(os.path.getsize(self.store.journal.journal_path), 0)
+        self.assertEqual(self.store.get_by_id(created['id'])['id'], created['id'])
+
+    def test_sees_writes_from_other_workers(self):
+        """Test that another process' appends are replayed incrementally."""
+        self.store.list_all()
+        other_worker = StoreJournal(self.store.file_path, 'appointments')
+        other_worker.put(_appointment('apt_other'))
+
+        self.assertIsNotNone(self.store.get_by_id('apt_other'))
+
+
+class TestAsyncStores(StoreTestCase):
+    """Tests for the async store variants used by the ASGI views."""
+
+    def test_async_variants_match_sync(self):
+        """Test that acreate/aget_by_id/aupdate/alist_all behave like their sync forms."""
+        store = AppointmentStore(mode='journal', data_dir=self.data_dir)
+
+        async def scenario():
+            created = await store.acreate(_appointment(None, hora_inicio='15:00', hora_fin='16:00'))
+            fetched = await store.aget_by_id(created['id'])
+            updated = await store.aupdate(created['id'], {'status': 'cancelled'})
+            return created, fetched, updated, await store.alist_all()
+
+        created, fetched, updated, listed = asyncio.run(scenario())
+        self.assertEqual(fetched['id'], created['id'])
+        self.assertEqual(updated['status'], 'cancelled')
+        self.assertEqual(store.get_by_id(created['id'])['status'], 'cancelled')
+        self.assertEqual(len(listed), 3)
+
+    def test_concurrent_trace_writes_are_not_lost(self):
+        """Test that traces written concurrently from the event loop all persist."""
+        with open(os.path.join(self.data_dir, 'traces.json'), 'w', encoding='utf-8') as f:
+            json.dump({'metadata': {'total_traces': 0}, 'traces': []}, f)
+        self.addCleanup(store_cache.invalidate, os.path.join(self.data_dir, 'traces.json'))
+
+        with mock.patch('data.stores._get_setting', side_effect=lambda name, default: (
+            self.data_dir if name == 'STORE_DATA_DIR' else default
+        )):
+            store = TraceStore()
+
+        async def scenario():
+            await asyncio.gather(*(store.acreate({'trace_id': f'trace_{i}'}) for i in range(20)))
+
+        asyncio.run(scenario())
+        self.assertEqual(sorted(t['trace_id'] for t in store.list_all()), sorted(f'trace_{i}' for i in range(20)))
+
+
+class TestReadCache(StoreTestCase):
+    """Tests for the per-process read cache."""
+
+    def setUp(self):
+        """Set up rewrite-mode store."""
+        super().setUp()
+        self.store = AppointmentStore(mode='rewrite', data_dir=self.data_dir)
+
+    def _stats(self):
+        return dict(store_cache._stats.get(self.store.file_path, {'hits': 0, 'misses': 0}))
+
+    def test_repeated_reads_hit_cache(self):
+        """Test that only the first read parses the file."""
+        first = self.store.list_all()
+        second = self.store.list_all()
+        self.assertIs(first, second)
+        self.assertEqual(self._stats(), {'hits': 1, 'misses': 1})
+
+    def test_external_change_invalidates(self):
+        """Test that a change on disk (another worker) is picked up."""
+        self.store.list_all()
+        _write_appointments(self.data_dir, [_appointment('apt_external')])
+        os.utime(self.store.file_path, ns=(0, 0))
+
+        self.assertEqual([apt['id'] for apt in self.store.list_all()], ['apt_external'])
+
+    def test_in_process_write_refreshes_cache(self):
+        """Test that a write through the store is visible without re-parsing."""
+        self.store.list_all()
+        created = self.store.create({'fecha': '2026-03-03', 'hora_inicio': '09:00', 'hora_fin': '10:00'})
+
+        self.assertIsNotNone(self.store.get_by_id(created['id']))
+        self.assertEqual(self._stats()['misses'], 1)
+
+    def test_views_are_read_only(self):
+        """Test that cached data cannot be mutated by callers."""
+        appointment = self.store.get_by_id('apt_1')
+        with self.assertRaises(TypeError):
+            appointment['status'] = 'cancelled'
+        with self.assertRaises(TypeError):
+            appointment['participantes'].append({'id': 'intruder'})
+        with self.assertRaises(TypeError):
+            self.store.list_all().sort(key=lambda apt: apt['id'])
+
+        self.assertEqual(self.store.get_by_id('apt_1')['status'], 'confirmed')
+
+    def test_freeze_thaw_round_trip(self):
+        """Test that thaw returns plain mutable copies."""
+        frozen = freeze({'a': [{'b': 1}]})
+        self.assertIsInstance(frozen, FrozenDict)
+        plain = thaw(frozen)
+        plain['a'][0]['b'] = 2
+        self.assertEqual(frozen['a'][0]['b'], 1)
+        self.assertEqual(json.loads(json.dumps(frozen)), {'a': [{'b': 1}]})
+
+    def test_stats_hit_rate(self):
+        """Test hit rate computation."""
+        cache = ReadCache()
+        cache.record('file.json', hit=True)
+        cache.record('file.json', hit=False)
+        self.assertEqual(cache.stats()['hit_rate'], 0.5)
+
+
+class TestAppointmentRewriteMode(StoreTestCase):
+    """Tests for the default full-rewrite mode of AppointmentStore."""
+
+    def test_create_rewrites_file(self):
+        """Test that create persists directly to appointments.json."""
+        store = AppointmentStore(mode='rewrite', data_dir=self.data_dir)
+        created = store.create({'fecha': '2026-03-03', 'hora_inicio': '09:00', 'hora_fin': '10:00'})
+
+        with open(store.file_path, encoding='utf-8') as f:
+            ids = [apt['id'] for apt in json.load(f)['appointments']]
+        self.assertIn(created['id'], ids)
+
+    def test_unknown_mode(self):
+        """Test that an unknown mode is rejected."""
+        with self.assertRaises(ValueError):
+            AppointmentStore(mode='sqlite', data_dir=self.data_dir)
+
+
+class TestBatchWrites(StoreTestCase):
+    """Tests for create_many() and PendingAppointmentStore."""
+
+    def _stored_ids(self):
+        return {apt['id'] for apt in AppointmentStore(mode='rewrite', data_dir=self.data_dir).list_all()}
+
+    def test_create_many_writes_once(self):
+        """Test that create_many() persists every appointment with one file rewrite."""
+        store = AppointmentStore(mode='rewrite', data_dir=self.data_dir)
+        with mock.patch.object(AppointmentStore, '_write_data', autospec=True,
+                               side_effect=AppointmentStore._write_data) as write:
+            created = store.create_many([
+                _appointment(None, hora_inicio=f'{hour}:00', hora_fin=f'{hour + 1}:00') for hour in (14, 15, 16)
+            ])
+        self.assertEqual(write.call_count, 1)
+        self.assertEqual(len({apt['id'] for apt in created}), 3)
+        self.assertTrue({apt['id'] for apt in created} <= self._stored_ids())
+        self.assertEqual(store.find_overlaps('dr_perez', '2026-03-02', '15:30', '16:30'),
+                         [created[1]['id'], created[2]['id']])
+
+    def test_pending_appointments_until_flush(self):
+        """Test that pending appointments are seen by conflict checks and only written by flush()."""
+        # One day per mode: the first mode's appointment is stored when the second runs
+        for mode, fecha in (('rewrite', '2026-03-03'), ('journal', '2026-03-04')):
+            with self.subTest(mode=mode):
+                store = PendingAppointmentStore(mode=mode, data_dir=self.data_dir)
+                created = store.create(_appointment(None, fecha, '14:00', '15:00'))
+
+                self.assertEqual(store.find_overlaps('dr_perez', fecha, '14:30', '15:30'), [created['id']])
+                self.assertEqual(len(store.check_conflicts(_appointment(None, fecha, '14:00', '15:00'))), 1)
+                self.assertEqual(store.get_by_id(created['id'])['hora_inicio'], '14:00')
+                self.assertNotIn(created['id'], self._stored_ids())
+
+                store.update(created['id'], {'hora_inicio': '16:00', 'hora_fin': '17:00'})
+                self.assertEqual(store.find_overlaps('dr_perez', fecha, '14:30', '15:30'), [])
+
+                written = store.flush()
+                self.assertEqual([apt['id'] for apt in written], [created['id']])
+                self.assertEqual(store.pending, [])
+                self.assertEqual(
+                    AppointmentStore(mode=mode, data_dir=self.data_dir).get_by_id(created['id'])['hora_inicio'], '16:00'
+                )
+
+
+    def test_flush_checks_appointments_booked_meanwhile(self):
+        """Test that flush() leaves out pending appointments whose slot was booked after the store was built."""
+        for mode, fecha in (('rewrite', '2026-03-03'), ('journal', '2026-03-04')):
+            with self.subTest(mode=mode):
+                store = PendingAppointmentStore(mode=mode, data_dir=self.data_dir)
+                late = store.create(_appointment(None, fecha, '14:30', '15:30'))
+                free = store.create(_appointment(None, fecha, '16:00', '17:00'))
+                # Another request books through its own store while the batch runs
+                other = AppointmentStore(mode=mode, data_dir=self.data_dir).create(_appointment(None, fecha, '14:00', '15:00'))
+
+                written = store.flush()
+                self.assertEqual([apt['id'] for apt in written], [free['id']])
+                self.assertEqual(list(store.rejected), [late['id']])
+                self.assertEqual([c['existing_appointment_id'] for c in store.rejected[late['id']]], [other['id']])
+                stored = AppointmentStore(mode=mode, data_dir=self.data_dir)
+                self.assertIsNone(stored.get_by_id(late['id']))
+                self.assertEqual(stored.find_overlaps('dr_perez', fecha, '14:00', '17:00'), [other['id'], free['id']])
+
+class TestAppointmentIndexes(StoreTestCase):
+    """Tests for the secondary indexes of AppointmentStore."""
+
+    def _assert_indexed(self, store):
+        created = store.create({
+            'fecha': '2026-03-03', 'hora_inicio': '09:00', 'hora_fin': '10:00',
+            'contacto_id': 'dr_lopez',
+        })
+        self.assertEqual(store.get_by_id(created['id'])['contacto_id'], 'dr_lopez')
+        self.assertEqual([apt['id'] for apt in store.list_by_contact('dr_lopez')], [created['id']])
+        self.assertEqual([apt['id'] for apt in store.list_by_date('2026-03-03')], [created['id']])
+
+        # Moving an appointment updates the date bucket
+        store.update(created['id'], {'fecha': '2026-03-02'})
+        self.assertEqual(store.list_by_date('2026-03-03'), [])
+        self.assertEqual(len(store.list_by_date('2026-03-02')), 3)
+
+        # Cancelled appointments stay indexed but no longer conflict
+        store.update('apt_1', {'status': 'cancelled'})
+        self.assertEqual(store.get_by_id('apt_1')['status'], 'cancelled')
+        self.assertEqual(
+            store.check_conflicts({
+                'fecha': '2026-03-02', 'hora_inicio': '10:30', 'hora_fin': '12:30',
+                'participantes': [{'id': 'dr_perez'}],
+            }),
+            [{
+                'type': 'full_overlap',
+                'existing_appointment_id': 'apt_2',
+                'message': 'Conflict with appointment apt_2',
+            }]
+        )
+
+    def test_rewrite_mode_indexes(self):
+        """Test that rewrite-mode indexes follow create/update/cancel."""
+        self._assert_indexed(AppointmentStore(mode='rewrite', data_dir=self.data_dir))
+
+    def test_journal_mode_indexes(self):
+        """Test that journal-mode indexes follow create/update/cancel."""
+        self._assert_indexed(AppointmentStore(mode='journal', data_dir=self.data_dir))
+
+    def test_contacto_id_conflicts(self):
+        """Test that appointments booked via contacto_id are seen as conflicts."""
+        store = AppointmentStore(mode='rewrite', data_dir=self.data_dir)
+        store.create({'fecha': '2026-03-04', 'hora_inicio': '09:00', 'hora_fin': '10:00', 'contacto_id': 'dr_lopez'})
+
+        conflicts = store.check_conflicts({
+            'fecha': '2026-03-04', 'hora_inicio': '09:30', 'hora_fin': '10:30', 'contacto_id': 'dr_lopez',
+        })
+        self.assertEqual(len(conflicts), 1)
+
+    def test_external_rewrite_rebuilds_index(self):
+        """Test that a file rewritten by another process rebuilds the index."""
+        store = AppointmentStore(mode='rewrite', data_dir=self.data_dir)
+        self.assertIsNotNone(store.get_by_id('apt_1'))
+        _write_appointments(self.data_dir, [_appointment('apt_external')])
+        os.utime(store.file_path, ns=(0, 0))
+
+        self.assertIsNone(store.get_by_id('apt_1'))
+        self.assertEqual([apt['id'] for apt in store.list_by_contact('dr_perez')], ['apt_external'])
+
+    def test_update_keeps_order(self):
+        """Test that updating an appointment keeps its position in the buckets."""
+        index = AppointmentIndex([_appointment('apt_1'), _appointment('apt_2')])
+        index.apply(index.get('apt_1'), {**index.get('apt_1'), 'status': 'cancelled'})
+
+        self.assertEqual([apt['id'] for apt in index.for_participant('dr_perez')], ['apt_1', 'apt_2'])
+        self.assertEqual(index.get('apt_1')['status'], 'cancelled')
+
+
+class TestIntervalIndex(StoreTestCase):
+    """Tests for the per-(participant, fecha) interval index."""
+
+    def test_day_intervals_overlap(self):
+        """Test overlap queries against a sorted interval list."""
+        day = DayIntervals()
+        day.add(600, 660, 'a')   # 10:00-11:00
+        day.add(540, 780, 'b')   # 09:00-13:00
+        day.add(720, 750, 'c')   # 12:00-12:30
+
+        self.assertEqual(day.overlapping(650, 700), ['b', 'a'])
+        self.assertEqual(day.overlapping(780, 840), [])
+        self.assertEqual(day.overlapping(480, 540), [])
+        self.assertEqual(day.overlapping(730, 730), ['b', 'c'])
+
+        day.remove(540, 780, 'b')
+        self.assertEqual(day.longest, 60)
+        self.assertEqual(day.overlapping(650, 700), ['a'])
+
+    def test_find_overlaps(self):
+        """Test that find_overlaps returns ids and honours exclude_id."""
+        store = AppointmentStore(mode='rewrite', data_dir=self.data_dir)
+
+        self.assertEqual(store.find_overlaps('dr_perez', '2026-03-02', '10:30', '12:30'), ['apt_1', 'apt_2'])
+        self.assertEqual(
+            store.find_overlaps('dr_perez', '2026-03-02', '10:30', '12:30', exclude_id='apt_1'), ['apt_2']
+        )
+        self.assertEqual(store.find_overlaps('dr_perez', '2026-03-02', '11:00', '12:00'), [])
+        self.assertEqual(store.find_overlaps('dr_lopez', '2026-03-02', '10:30', '12:30'), [])
+
+    def test_serializer_values_accepted(self):
+        """Test that date/time objects from serializers are accepted."""
+        from datetime import date, time
+
+        store = AppointmentStore(mode='rewrite', data_dir=self.data_dir)
+        self.assertEqual(store.find_overlaps('dr_perez', date(2026, 3, 2), time(10, 15), time(10, 45)), ['apt_1'])
+
+    def test_reschedule_and_cancel_update_intervals(self):
+        """Test that moved and cancelled appointments leave the interval index."""
+        store = AppointmentStore(mode='journal', data_dir=self.data_dir)
+        store.update('apt_1', {'hora_inicio': '15:00', 'hora_fin': '16:00'})
+        store.update('apt_2', {'status': 'cancelled'})
+
+        self.assertEqual(store.find_overlaps('dr_perez', '2026-03-02', '10:00', '13:00'), [])
+        self.assertEqual(store.find_overlaps('dr_perez', '2026-03-02', '15:30', '15:45'), ['apt_1'])
+
+
+class TestConflictBatch(StoreTestCase):
+    """Tests for AppointmentStore.check_conflicts_many."""
+
+    def setUp(self):
+        """Set up rewrite-mode store."""
+        super().setUp()
+        self.store = AppointmentStore(mode='rewrite', data_dir=self.data_dir)
+
+    def test_results_per_candidate(self):
+        """Test that each candidate gets its own conflict list, in order."""
+        results = self.store.check_conflicts_many([
+            {'fecha': '2026-03-02', 'hora_inicio': '10:30', 'hora_fin': '11:30', 'contacto_id': 'dr_perez'},
+            {'fecha': '2026-03-02', 'hora_inicio': '11:00', 'hora_fin': '12:00', 'contacto_id': 'dr_perez'},
+            {'fecha': '2026-03-02', 'hora_inicio': '12:30', 'hora_fin': '13:30', 'contacto_id': 'dr_perez'},
+            {'fecha': '2026-03-02', 'hora_inicio': '10:30'},
+        ])
+
+        self.assertEqual(
+            [[c['existing_appointment_id'] for c in conflicts] for conflicts in results],
+            [['apt_1'], [], ['apt_2'], []]
+        )
+
+    def test_suggestions_read_store_once(self):
+        """Test that get_suggestions checks every candidate with one index read."""
+        with mock.patch.object(AppointmentStore, '_index', wraps=self.store._index) as index:
+            suggestions = self.store.get_suggestions({
+                'fecha': '2026-03-02', 'duracion_minutos': 60, 'contacto_id': 'dr_perez',
+            })
+
+        self.assertEqual(index.call_count, 1)
+        self.assertEqual(
+            [s['hora_inicio'] for s in suggestions], ['08:00', '08:30', '09:00']
+        )
+
+
+class TestOccupancy(StoreTestCase):
+    """Tests for 5-minute day occupancy bitmaps."""
+
+    def test_window_mask(self):
+        """Test slot coverage of aligned, unaligned and empty windows."""
+        self.assertEqual(window_mask(600, 660), ((1 << 12) - 1) << 120)
+        self.assertEqual(window_mask(602, 607), 0b11 << 120)
+        self.assertEqual(window_mask(600, 600), 1 << 120)
+
+    def test_run_starts(self):
+        """Test that run_starts finds the starts of long enough free runs."""
+        free = 0b1110111100
+        self.assertEqual(list(iter_bits(run_starts(free, 3))), [2, 3, 7])
+        self.assertEqual(list(iter_bits(run_starts(free, 4))), [2])
+        self.assertEqual(run_starts(free, 5), 0)
+
+    def test_occupancy_follows_writes(self):
+        """Test that bitmaps are updated on create, reschedule and cancel."""
+        store = AppointmentStore(mode='rewrite', data_dir=self.data_dir)
+        self.assertEqual(store.occupancy('dr_perez', ['2026-03-02']), [window_mask(600, 660) | window_mask(720, 780)])
+
+        store.update('apt_1', {'hora_inicio': '15:00', 'hora_fin': '15:30'})
+        store.update('apt_2', {'status': 'cancelled'})
+        created = store.create({'fecha': '2026-03-03', 'hora_inicio': '09:00', 'hora_fin': '09:45', 'contacto_id': 'dr_perez'})
+
+        self.assertEqual(
+            store.occupancy('dr_perez', ['2026-03-02', '2026-03-03', '2026-03-04']),
+            [window_mask(900, 930), window_mask(540, 585), 0]
+        )
+        store.update(created['id'], {'status': 'cancelled'})
+        self.assertEqual(store.occupancy('dr_perez', ['2026-03-03']), [0])
+
+    def test_available_slots_skip_booked_time(self):
+        """Test that free-slot enumeration skips booked windows."""
+        from datetime import date
+
+        class _Monday(date):
+            @classmethod
+            def today(cls):
+                return cls(2026, 3, 2)
+
+        store = AppointmentStore(mode='rewrite', data_dir=self.data_dir)
+        store.create({'fecha': '2026-03-02', 'hora_inicio': '08:30', 'hora_fin': '09:10', 'contacto_id': 'dr_lopez'})
+        contact_store = ContactStore(appointment_store=store)
+
+        with mock.patch('data.stores.date', _Monday):
+            slots = contact_store.get_available_slots('dr_lopez', days_ahead=1)
+
+        # 08:00 would run into 08:30; 08:30 and 09:00 overlap the appointment
+        self.assertEqual([slot['hora_inicio'] for slot in slots[:3]], ['09:30', '10:00', '10:30'])
+        self.assertEqual(slots[0]['hora_fin'], '10:30')
+        self.assertEqual(len(slots), 10)
+
+class TestSlotFinder(StoreTestCase):
+    """Tests for the multi-day slot search of ContactStore.get_available_slots."""
+
+    def setUp(self):
+        """Set up stores."""
+        super().setUp()
+        self.store = AppointmentStore(mode='rewrite', data_dir=self.data_dir)
+        self.contact_store = ContactStore(appointment_store=self.store)
+
+    def test_matches_brute_force(self):
+        """Test the bitmap search against a per-slot check over 90 days."""
+        from datetime import date, timedelta
+        import random
+
+        rng = random.Random(7)
+        start = date(2026, 3, 2)
+        for _ in range(300):
+            minute = 8 * 60 + rng.randrange(0, 600, 5)
+            self.store.create({
+                'fecha': (start + timedelta(days=rng.randrange(90))).isoformat(),
+                'hora_inicio': f"{minute // 60:02d}:{minute % 60:02d}",
+                'hora_fin': self.store._add_minutes(f"{minute // 60:02d}:{minute % 60:02d}", rng.choice([20, 45])),
+                'contacto_id': 'dr_lopez',
+            })
+
+        slots = self.contact_store.get_available_slots(
+            'dr_lopez', days_ahead=90, duration_minutes=45, start_date=start, limit=10000
+        )
+
+        expected = []
+        for offset in range(90):
+            day = start + timedelta(days=offset)
+            if day.weekday() >= 5:
+                continue
+            for minute in range(8 * 60, 18 * 60 - 45 + 1, 30):
+                hora = f"{minute // 60:02d}:{minute % 60:02d}"
+                candidate = {'fecha': day.isoformat(), 'hora_inicio': hora,
+                             'hora_fin': self.store._add_minutes(hora, 45), 'contacto_id': 'dr_lopez'}
+                if not self.store.check_conflicts(candidate):
+                    expected.append((day.isoformat(), hora))
+
+        self.assertEqual([(slot['fecha'], slot['hora_inicio']) for slot in slots], expected)
+
+    def test_top_k_by_preferred_time(self):
+        """Test that slots closer to the preferred time rank first."""
+        from datetime import date
+
+        slots = self.contact_store.get_available_slots(
+            'dr_perez', days_ahead=2, start_date=date(2026, 3, 2), preferred_time='11:00', limit=3
+        )
+
+        # 11:00-12:00 fits between apt_1 and apt_2; 10:30 and 11:30 do not on the first day
+        self.assertEqual(
+            [(slot['fecha'], slot['hora_inicio']) for slot in slots],
+            [('2026-03-02', '11:00'), ('2026-03-03', '11:00'), ('2026-03-03', '10:30')]
+        )
+        self.assertEqual([slot['confidence'] for slot in slots], [0.95, 0.94, 0.93])
+
+
+class TestFreeSlotView(StoreTestCase):
+    """Tests for the materialized per-contact free-slot view."""
+
+    def _slots(self, contact_store):
+        from datetime import date
+
+        slots = contact_store.get_available_slots('dr_perez', days_ahead=2, start_date=date(2026, 3, 2), limit=100)
+        return [(slot['fecha'], slot['hora_inicio']) for slot in slots]
+
+    def _cached_days(self, store):
+        return set(store._index().intervals.free_slots)
+
+    def test_reads_are_materialized(self):
+        """Test that a repeated query reuses the stored free slots."""
+        store = AppointmentStore(mode='journal', data_dir=self.data_dir)
+        contact_store = ContactStore(appointment_store=store)
+
+        first = self._slots(contact_store)
+        self.assertEqual(self._cached_days(store), {('dr_perez', '2026-03-02'), ('dr_perez', '2026-03-03')})
+        with mock.patch('data.indexes.run_starts', wraps=run_starts) as computed:
+            self.assertEqual(self._slots(contact_store), first)
+        computed.assert_not_called()
+
+    def test_writes_invalidate_only_the_affected_day(self):
+        """Test that create, update and cancel recompute only the touched day."""
+        for mode in AppointmentStore.MODES:
+            with self.subTest(mode=mode):
+                store = AppointmentStore(mode=mode, data_dir=self.data_dir)
+                contact_store = ContactStore(appointment_store=store)
+                self._slots(contact_store)
+
+                created = store.create({'fecha': '2026-03-03', 'hora_inicio': '09:00', 'hora_fin': '10:00',
+                                        'contacto_id': 'dr_perez'})
+                self.assertEqual(self._cached_days(store), {('dr_perez', '2026-03-02')})
+                self.assertNotIn(('2026-03-03', '09:00'), self._slots(contact_store))
+
+                # Moving it back to the first day touches both days
+                self._slots(contact_store)
+                store.update(created['id'], {'fecha': '2026-03-02', 'hora_inicio': '15:00', 'hora_fin': '16:00'})
+                self.assertEqual(self._cached_days(store), set())
+                slots = self._slots(contact_store)
+                self.assertIn(('2026-03-03', '09:00'), slots)
+                self.assertNotIn(('2026-03-02', '15:00'), slots)
+
+                # Soft delete, as done by AppointmentViewSet.destroy
+                store.update(created['id'], {'status': 'cancelled'})
+                self.assertEqual(self._cached_days(store), {('dr_perez', '2026-03-03')})
+                self.assertIn(('2026-03-02', '15:00'), self._slots(contact_store))
+                store.update(created['id'], {'status': 'confirmed', 'fecha': '2026-03-10'})
+
+    def test_size_counts_every_variant(self):
+        """Test that the view's bound counts each duration of a day, not just the days."""
+        from datetime import date
+
+        from .indexes import IntervalIndex
+
+        store = AppointmentStore(mode='journal', data_dir=self.data_dir)
+        contact_store = ContactStore(appointment_store=store)
+        intervals = store._index().intervals
+        with mock.patch.object(IntervalIndex, 'MAX_FREE_SLOT_ENTRIES', 5):
+            for duration in range(5, 120, 5):
+                contact_store.get_available_slots('dr_perez', days_ahead=2, start_date=date(2026, 3, 2),
+                                                  duration_minutes=duration)
+                entries = sum(len(variants) for variants in intervals.free_slots.values())
+                self.assertLessEqual(entries, 5)
+                self.assertEqual(intervals.free_slot_entries, entries)
+
+        store.create({'fecha': '2026-03-03', 'hora_inicio': '09:00', 'hora_fin': '10:00', 'contacto_id': 'dr_perez'})
+        self.assertEqual(intervals.free_slot_entries, sum(len(variants) for variants in intervals.free_slots.values()))
+
+    def test_foreign_write_rebuilds_view(self):
+        """Test that a rewrite from another process discards the view."""
+        store = AppointmentStore(mode='rewrite', data_dir=self.data_dir)
+        contact_store = ContactStore(appointment_store=store)
+        self.assertIn(('2026-03-02', '14:00'), self._slots(contact_store))
+
+        _write_appointments(self.data_dir, [_appointment('apt_9', hora_inicio='14:00', hora_fin='15:00')])
+        os.utime(os.path.join(self.data_dir, 'appointments.json'), ns=(1, 1))
+        slots = self._slots(contact_store)
+        self.assertNotIn(('2026-03-02', '14:00'), slots)
+        self.assertIn(('2026-03-02', '10:00'), slots)
+
+
+class TestTimeWindow(unittest.TestCase):
+    """Tests for the canonical minute / date-ordinal time representation."""
+
+    def test_parse_once_and_format_on_output(self):
+        """Test conversion from request fields and back."""
+        from datetime import date, time
+        from .timeutils import TimeWindow, to_date_str, to_minutes
+
+        window = TimeWindow.parse('2026-03-02', '23:30', '00:15')
+        self.assertEqual(window, (date(2026, 3, 2).toordinal(), 23 * 60 + 30, 15))
+        self.assertEqual(window.duration, 45)
+        self.assertEqual(window.fields(), {'fecha': '2026-03-02', 'hora_inicio': '23:30', 'hora_fin': '00:15'})
+        self.assertEqual(TimeWindow.parse(date(2026, 3, 2), time(9, 0), 600), (window.day, 540, 600))
+        self.assertIsNone(TimeWindow.parse('2026-03-02', '10am', '11:00'))
+        self.assertIsNone(TimeWindow.parse(None, '10:00', '11:00'))
+
+        # Canonical integers pass straight through the store helpers
+        self.assertEqual(to_minutes(0), 0)
+        self.assertEqual(to_date_str(window.day), '2026-03-02')
+
+
+class TestSchedules(StoreTestCase):
+    """Tests for compiled weekly schedules and ContactStore.check_availability."""
+
+    def _contact(self, updated_at='2026-01-01T00:00:00'):
+        return {
+            'id': 'dr_perez',
+            'activo': True,
+            'updated_at': updated_at,
+            'ubicaciones': [
+                {'id': 'loc_centro', 'disponible': True,
+                 'horario': {'inicio': '09:00', 'fin': '14:00', 'dias_laborales': [1, 3, 5]}},
+                {'id': 'loc_norte', 'disponible': True,
+                 'horario': {'martes': {'dia': 2, 'hora_inicio': '16:00', 'hora_fin': '20:00'},
+                             'sabado': [{'hora_inicio': '08:00', 'hora_fin': '10:00'},
+                                        {'hora_inicio': '11:00', 'hora_fin': '12:00'}]}},
+            ],
+            'excepciones': [
+                {'fecha': '2026-03-04', 'hora_inicio': '12:00', 'hora_fin': '14:00'},
+                {'fecha': '2026-03-06'},
+                {'fecha': '2026-03-08', 'hora_inicio': '10:00', 'hora_fin': '12:00',
+                 'disponible': True, 'ubicacion_id': 'loc_norte'},
+            ],
+        }
+
+    def test_compile_weekly_recurrence(self):
+        """Test both horario formats, the union over locations and the default week."""
+        from datetime import date
+
+        schedule = compile_schedule(self._contact(), holidays=[])
+        monday, tuesday, saturday = date(2026, 3, 2), date(2026, 3, 3), date(2026, 3, 7)
+        self.assertEqual(schedule.mask(monday, 'loc_centro'), window_mask(9 * 60, 14 * 60))
+        self.assertEqual(schedule.mask(monday, 'loc_norte'), 0)
+        self.assertEqual(schedule.mask(tuesday), window_mask(16 * 60, 20 * 60))
+        self.assertEqual(schedule.mask(saturday), window_mask(8 * 60, 10 * 60) | window_mask(11 * 60, 12 * 60))
+        self.assertEqual(schedule.mask(monday, 'loc_desconocida'), 0)
+
+        default = compile_schedule({'id': 'dr_sin_horario'}, holidays=[])
+        self.assertEqual(default.mask(monday, 'loc_cualquiera'), window_mask(8 * 60, 18 * 60))
+        self.assertEqual(default.mask(saturday), 0)
+
+    def test_exceptions_and_holidays(self):
+        """Test partial and full-day closures, extra openings and global holidays."""
+        from datetime import date
+
+        schedule = compile_schedule(self._contact(), holidays=['2026-03-09'])
+        self.assertEqual(schedule.mask(date(2026, 3, 4)), window_mask(9 * 60, 12 * 60))
+        self.assertEqual(schedule.mask(date(2026, 3, 6)), 0)
+        self.assertEqual(schedule.mask(date(2026, 3, 8), 'loc_norte'), window_mask(10 * 60, 12 * 60))
+        self.assertEqual(schedule.mask(date(2026, 3, 8), 'loc_centro'), 0)
+        self.assertEqual(schedule.mask(date(2026, 3, 9)), 0)
+        self.assertEqual(schedule.mask(date(2026, 3, 11)), window_mask(9 * 60, 14 * 60))
+
+        with self.assertRaises(ValueError):
+            compile_schedule({'ubicaciones': [{'id': 'loc_1', 'disponible': True,
+                                               'horario': {'inicio': '18:00', 'fin': '09:00'}}]})
+
+    def test_malformed_schedule_is_closed(self):
+        """Test that a schedule that does not compile is rejected on save and closed at runtime."""
+        from datetime import date
+
+        from django.core.exceptions import ValidationError
+
+        from apps.contacts.models import Contact
+        from .schedules import validate_schedule
+
+        bad_location = {'id': 'loc_1', 'disponible': True, 'horario': [{'inicio': '09:00'}]}
+        for ubicaciones, excepciones in (([bad_location], []), (['loc_1'], []), ([], [{'hora_inicio': '10:00'}]),
+                                         ([], [{'fecha': 'mañana'}])):
+            with self.subTest(ubicaciones=ubicaciones, excepciones=excepciones):
+                with self.assertRaises(ValueError):
+                    validate_schedule(ubicaciones, excepciones)
+                with self.assertRaises(ValidationError):
+                    Contact(id='dr_perez', ubicaciones=ubicaciones, excepciones=excepciones).clean()
+        Contact(id='dr_perez', ubicaciones=self._contact()['ubicaciones'],
+                excepciones=self._contact()['excepciones']).clean()
+
+        contact = dict(self._contact(), ubicaciones=[bad_location])
+        contact_store = ContactStore(appointment_store=AppointmentStore(mode='rewrite', data_dir=self.data_dir))
+        with mock.patch.object(ContactStore, 'get_by_id', return_value=contact), \
+                self.assertLogs('data.schedules', 'WARNING'):
+            self.assertEqual(contact_store.check_availability('dr_perez', '2026-03-02', '09:00', '10:00'),
+                             (False, "Día no laborable"))
+            self.assertEqual(contact_store.get_available_slots('dr_perez', start_date=date(2026, 3, 2)), [])
+
+    def test_check_availability_uses_cached_schedule(self):
+        """Test schedule reasons, compile-once caching and recompiling on update."""
+        contact_store = ContactStore(appointment_store=AppointmentStore(mode='rewrite', data_dir=self.data_dir))
+
+        with mock.patch.object(ContactStore, 'get_by_id', return_value=self._contact()), \
+                mock.patch('data.schedules.compile_schedule', wraps=compile_schedule) as compiled:
+            self.assertEqual(contact_store.check_availability('dr_perez', '2026-03-02', '09:00', '10:00'), (True, None))
+            self.assertEqual(contact_store.check_availability('dr_perez', '2026-03-02', '13:30', '14:30'),
+                             (False, "Fuera del horario de atención"))
+            self.assertEqual(contact_store.check_availability('dr_perez', '2026-03-06', '09:00', '10:00'),
+                             (False, "Día no laborable"))
+            self.assertEqual(contact_store.check_availability('dr_perez', '2026-03-03', '16:00', '17:00',
+                                                              ubicacion_id='loc_centro'),
+                             (False, "Día no laborable"))
+            self.assertEqual(compiled.call_count, 1)
+
+        changed = self._contact(updated_at='2026-01-02T00:00:00')
+        changed['ubicaciones'][0]['horario']['fin'] = '15:00'
+        with mock.patch.object(ContactStore, 'get_by_id', return_value=changed):
+            self.assertEqual(contact_store.check_availability('dr_perez', '2026-03-02', '13:30', '14:30'), (True, None))
+
+    def test_check_availability_without_end_time(self):
+        """Test that a missing hora_fin is a default-length slot, so a booking starting then is seen."""
+        from datetime import date, time
+
+        contact_store = ContactStore(appointment_store=AppointmentStore(mode='rewrite', data_dir=self.data_dir))
+        with mock.patch.object(ContactStore, 'get_by_id', return_value=self._contact()):
+            self.assertEqual(contact_store.check_availability('dr_perez', date(2026, 3, 2), time(10, 0), None),
+                             (False, "Horario ocupado por otra cita"))
+            self.assertEqual(contact_store.check_availability('dr_perez', '2026-03-02', '11:30'),
+                             (False, "Horario ocupado por otra cita"))
+            self.assertEqual(contact_store.check_availability('dr_perez', '2026-03-02', '09:00'), (True, None))
+            self.assertEqual(contact_store.check_availability('dr_perez', None, '09:00'), (False, "Fecha requerida"))
+
+    def test_location_without_disponible_is_unavailable(self):
+        """Test that a location without the 'disponible' key is closed, as for disponible=False."""
+        from datetime import date
+
+        contact = self._contact()
+        del contact['ubicaciones'][0]['disponible']
+        contact_store = ContactStore(appointment_store=AppointmentStore(mode='rewrite', data_dir=self.data_dir))
+        with mock.patch.object(ContactStore, 'get_by_id', return_value=contact):
+            self.assertEqual(contact_store.check_availability('dr_perez', '2026-03-02', '09:00', '10:00',
+                                                              ubicacion_id='loc_centro'),
+                             (False, "Ubicación no disponible"))
+        self.assertEqual(compile_schedule(contact, holidays=[]).mask(date(2026, 3, 2), 'loc_centro'), 0)
+
+    def test_available_slots_follow_schedule(self):
+        """Test that slot search only offers the contact's hours at the location."""
+        from datetime import date
+
+        contact_store = ContactStore(appointment_store=AppointmentStore(mode='rewrite', data_dir=self.data_dir))
+        with mock.patch.object(ContactStore, 'get_by_id', return_value=self._contact()):
+            slots = contact_store.get_available_slots(
+                'dr_perez', days_ahead=2, start_date=date(2026, 3, 2), location_id='loc_norte', limit=100
+            )
+        self.assertEqual(
+            [(slot['fecha'], slot['hora_inicio']) for slot in slots],
+            [('2026-03-03', f'{hour}:{minute}') for hour in ('16', '17', '18') for minute in ('00', '30')]
+            + [('2026-03-03', '19:00')]
+        )
+
+
+class TestJointAvailability(StoreTestCase):
+    """Tests for the k-way sweep behind joint availability."""
+
+    def test_merge_busy(self):
+        """Test that overlapping and touching intervals are coalesced."""
+        merged = list(merge_busy([[(0, 10), (30, 40)], [(5, 20), (40, 50)], [(60, 70)]]))
+        self.assertEqual(merged, [(0, 20), (30, 50), (60, 70)])
+
+    def test_free_windows(self):
+        """Test gaps between busy blocks, clipped to the range and min length."""
+        streams = [[(10, 20), (50, 55)], [(15, 30)]]
+        self.assertEqual(free_windows(streams, 0, 100), [(0, 10), (30, 50), (55, 100)])
+        self.assertEqual(free_windows(streams, 0, 100, min_length=20), [(30, 50), (55, 100)])
+
+    def test_joint_windows(self):
+        """Test common windows of a provider, a resource and a location."""
+        from datetime import date
+
+        store = AppointmentStore(mode='rewrite', data_dir=self.data_dir)
+        store.create({'fecha': '2026-03-02', 'hora_inicio': '14:00', 'hora_fin': '15:00',
+                      'contacto_id': 'sala_rx', 'ubicacion_id': 'loc_1'})
+        store.create({'fecha': '2026-03-02', 'hora_inicio': '16:00', 'hora_fin': '17:30',
+                      'contacto_id': 'dr_otro', 'ubicacion_id': 'loc_1'})
+        contact_store = ContactStore(appointment_store=store)
+
+        windows = contact_store.find_joint_windows(
+            ['dr_perez', 'sala_rx'], date(2026, 3, 2), days_ahead=1, ubicacion_id='loc_1'
+        )
+        self.assertEqual(
+            [(w['hora_inicio'], w['hora_fin']) for w in windows],
+            [('08:00', '10:00'), ('11:00', '12:00'), ('13:00', '14:00'), ('15:00', '16:00'), ('17:30', '18:00')]
+        )
+
+        # Friday to Monday: the weekend is outside working hours
+        windows = contact_store.find_joint_windows(['dr_perez'], date(2026, 3, 6), days_ahead=4, min_minutes=90)
+        self.assertEqual(
+            [(w['fecha'], w['hora_inicio'], w['duracion_minutos']) for w in windows],
+            [('2026-03-06', '08:00', 600), ('2026-03-09', '08:00', 600)]
+        )
+
+
+class TestEarliestBySpecialty(StoreTestCase):
+    """Tests for the heap merge of per-provider slot streams."""
+
+    def setUp(self):
+        """Set up stores with three cardiologists."""
+        super().setUp()
+        self.store = AppointmentStore(mode='rewrite', data_dir=self.data_dir)
+        for contact_id in ('dr_ana', 'dr_beto'):
+            self.store.create({'fecha': '2026-03-02', 'hora_inicio': '08:00', 'hora_fin': '12:00', 'contacto_id': contact_id})
+        self.contact_store = ContactStore(appointment_store=self.store)
+        providers = [{'id': contact_id, 'nombre': contact_id} for contact_id in ('dr_ana', 'dr_beto', 'dr_perez')]
+        patcher = mock.patch.object(ContactStore, 'list_by_specialty', return_value=providers)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_global_earliest_slots(self):
+        """Test that slots from all providers come out in time order."""
+        from datetime import date
+
+        slots = self.contact_store.earliest_by_specialty('cardiología', date(2026, 3, 2), limit=6)
+        self.assertEqual(
+            [(slot['contacto_id'], slot['hora_inicio']) for slot in slots],
+            [('dr_perez', '08:00'), ('dr_perez', '08:30'), ('dr_perez', '09:00'),
+             ('dr_perez', '11:00'), ('dr_ana', '12:00'), ('dr_beto', '12:00')]
+        )
+
+    def test_not_before_and_laziness(self):
+        """Test that past starts are skipped and only the first chunk is read."""
+        from datetime import date
+
+        with mock.patch.object(AppointmentStore, 'free_starts', wraps=self.store.free_starts) as day_reads:
+            slots = self.contact_store.earliest_by_specialty(
+                'cardiología', date(2026, 3, 2), limit=2, days_ahead=90, not_before=13 * 60 + 10
+            )
+
+        self.assertEqual([slot['hora_inicio'] for slot in slots], ['13:30', '13:30'])
+        self.assertEqual(day_reads.call_count, 3)
+
+
+class TestContactNameIndex(unittest.TestCase):
+    """Tests for the folded trigram name index."""
+
+    def setUp(self):
+        """Set up an index over a small directory."""
+        self.index = ContactNameIndex()
+        self.index.build([
+            ('contact_perez', 'Dr. Pérez', True),
+            ('contact_perez_gomez', 'Dra. Ana Pérez Gómez', True),
+            ('contact_nunez', 'Dr. Luis Núñez', True),
+            ('contact_garcia_ana', 'Dra. Ana García', True),
+            ('contact_garcia_luis', 'Dr. Luis García', True),
+            ('contact_lopez', 'Lic. Marta López', False),
+        ])
+
+    def _ids(self, query):
+        return [c['id'] for c in self.index.search(query)]
+
+    def test_fold(self):
+        """Test that accents, case and punctuation are folded."""
+        self.assertEqual(fold('Dra. NÚÑEZ-Peña'), 'dra nunez pena')
+
+    def test_accent_and_case_insensitive(self):
+        """Test that unaccented, lowercase and honorific-free queries find the contact."""
+        self.assertEqual(self._ids('nunez')[0], 'contact_nunez')
+        self.assertEqual(self._ids('DR LUIS NUÑEZ')[0], 'contact_nunez')
+        self.assertEqual(self._ids('Núñez')[0], 'contact_nunez')
+
+    def test_closest_name_ranks_first(self):
+        """Test that the exact name beats a longer name containing it, without ambiguity."""
+        candidates = self.index.search('Dr. Perez')
+        self.assertEqual([c['id'] for c in candidates], ['contact_perez', 'contact_perez_gomez'])
+        self.assertTrue(candidates[0]['exact'])
+        self.assertEqual(candidates[0]['score'], candidates[1]['score'])
+        self.assertEqual(ContactNameIndex.ambiguous(candidates), [])
+
+    def test_misspelling_and_partial_names(self):
+        """Test that a typo or a surname alone still ranks the right contact first."""
+        self.assertEqual(self._ids('Dr. Nuñes')[0], 'contact_nunez')
+        self.assertEqual(self._ids('Perez Gomez')[0], 'contact_perez_gomez')
+        self.assertEqual(self._ids('Dr. Zapata'), [])
+
+    def test_ambiguous_surname(self):
+        """Test that several equally good matches are reported as ambiguous."""
+        tied = ContactNameIndex.ambiguous(self.index.search('Dr. García'))
+        self.assertEqual(sorted(c['id'] for c in tied), ['contact_garcia_ana', 'contact_garcia_luis'])
+        self.assertEqual(ContactNameIndex.ambiguous(self.index.search('Ana García')), [])
+
+    def test_inactive_contacts_rank_last(self):
+        """Test that inactive contacts are found but never make a query ambiguous."""
+        self.index.update('contact_lopez_2', 'Dra. Marta López', True)
+        candidates = self.index.search('Marta Lopez')
+        self.assertEqual([c['id'] for c in candidates], ['contact_lopez_2', 'contact_lopez'])
+        self.assertEqual(ContactNameIndex.ambiguous(candidates), [])
+
+    def test_updates_and_removals(self):
+        """Test that renames and deletes are reflected without a rebuild."""
+        self.index.update('contact_nunez', 'Dr. Luis Zapata', True)
+        self.assertEqual(self._ids('Zapata'), ['contact_nunez'])
+        self.assertNotIn('contact_nunez', self._ids('Núñez'))
+
+        self.index.remove('contact_nunez')
+        self.assertEqual(self._ids('Zapata'), [])
+
+    def test_updates_before_build_are_ignored(self):
+        """Test that writes before the first build leave the index to be built from the database."""
+        index = ContactNameIndex()
+        index.update('contact_perez', 'Dr. Pérez', True)
+        self.assertFalse(index.built)
+        index.ensure(lambda: ([('contact_perez', 'Dr. Pérez', True)], (1, 'v1')))
+        self.assertTrue(index.built)
+        self.assertFalse(index.refresh((1, 'v1'), lambda: self.fail('rebuilt at the same version')))
+        self.assertTrue(index.refresh((2, 'v2'), lambda: ([], (2, 'v2'))))
+        self.assertEqual(index.search('Pérez'), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+"""
+Time helpers shared by the data stores and agents.
+
+Stores keep times as "HH:MM" strings in JSON. Internally a time is an
+integer number of minutes since midnight and a day is a date ordinal
+(``date.toordinal()``); ``TimeWindow`` bundles both. Request values are
+converted once where they enter (API views, agent inputs) and formatted
+back only for output. Every helper also accepts the canonical integers, and
+serializer values (date/time objects) so views can pass validated data
+straight through.
+"""
+
+from datetime import date, time
+from typing import Any, Dict, NamedTuple, Optional
+
+# Length of an appointment or a requested slot given without an end time
+DEFAULT_DURATION_MINUTES = 60
+# Minutes in a day: a window must end by midnight
+DAY_MINUTES = 24 * 60
+
+
+def to_minutes(value: Any) -> Optional[int]:
+    """
+    Convert a time to minutes since midnight.
+
+    Args:
+        value: "HH:MM" / "HH:MM:SS" string, datetime.time or minutes (int)
+
+    Returns:
+        Minutes since midnight, or None if value is empty
+    """
+    if isinstance(value, int):
+        return value
+    if not value:
+        return None
+    if isinstance(value, time):
+        return value.hour * 60 + value.minute
+    h, m = str(value).split(':')[:2]
+    return int(h) * 60 + int(m)
+
+
+def format_minutes(minutes: int) -> str:
+    """Format minutes since midnight as "HH:MM" (wrapping past midnight)."""
+    return f"{(minutes // 60) % 24:02d}:{minutes % 60:02d}"
+
+
+def to_date_str(value: Any) -> Optional[str]:
+    """Convert a date, date ordinal or "YYYY-MM-DD" string to the "YYYY-MM-DD" store format."""
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, int):
+        return date.fromordinal(value).isoformat()
+    return value
+
+
+def to_ordinal(value: Any) -> Optional[int]:
+    """
+    Convert a date to its ordinal.
+
+    Args:
+        value: "YYYY-MM-DD" string, date or ordinal (int)
+
+    Returns:
+        Date ordinal, or None if value is empty
+    """
+    if isinstance(value, int):
+        return value
+    if not value:
+        return None
+    if isinstance(value, date):
+        return value.toordinal()
+    return date.fromisoformat(value).toordinal()
+
+
+class TimeWindow(NamedTuple):
+    """A [start, end) window on one day, in canonical integers."""
+
+    day: int  # date ordinal
+    start: int  # minutes since midnight
+    end: int
+
+    @classmethod
+    def parse(cls, fecha: Any, hora_inicio: Any, hora_fin: Any) -> Optional['TimeWindow']:
+        """Convert request fields once; None if any is missing or malformed."""
+        try:
+            day, start, end = to_ordinal(fecha), to_minutes(hora_inicio), to_minutes(hora_fin)
+        except (TypeError, ValueError):
+            return None
+        if day is None or start is None or end is None:
+            return None
+        return cls(day, start, end)
+
+    @property
+    def duration(self) -> int:
+        """Length in minutes (an end before the start wraps past midnight)."""
+        return (self.end - self.start) % (24 * 60)
+
+    def fields(self) -> Dict[str, str]:
+        """fecha / hora_inicio / hora_fin strings for output."""
+        return {
+            'fecha': date.fromordinal(self.day).isoformat(),
+            'hora_inicio': format_minutes(self.start),
+            'hora_fin': format_minutes(self.end),
+        }